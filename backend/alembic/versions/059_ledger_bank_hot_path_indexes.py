@@ -0,0 +1,113 @@
+"""Composite and partial indexes for the ledger, bank and subledger hot paths.
+
+Access paths covered (mirrored in the models' ``__table_args__``)::
+
+    journal_entries   (administration_id, status, entry_date)
+    journal_lines     (account_id, journal_entry_id) INCLUDE (debit_amount, credit_amount)
+    journal_lines     (vat_code_id, journal_entry_id) WHERE vat_code_id IS NOT NULL
+    bank_transactions (administration_id, status, booking_date)
+    bank_transactions (administration_id, booking_date) WHERE status IN ('NEW', 'NEEDS_REVIEW')
+    open_items        (administration_id, item_type, due_date) WHERE status IN ('OPEN', 'PARTIAL')
+
+``ix_journal_lines_account`` and ``ix_journal_lines_vat_code`` become
+redundant (same leading column) and are dropped.  Lookups by
+``(administration_id, import_hash)`` are already served by the
+``uq_bank_transactions_admin_hash`` unique constraint.
+
+Indexes are built with ``CREATE INDEX CONCURRENTLY`` so the rollout does not
+block writes on large tables, and every step is idempotent (existing
+indexes are skipped), so a partially applied run can simply be retried.
+
+Use ``python -m app.core.index_advisor`` to check the query plans.
+
+Revision ID: 059_ledger_bank_hot_path_indexes
+Revises: 058_backfill_bank_transactions_matched_entity
+Create Date: 2026-10-18 10:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "059_ledger_bank_hot_path_indexes"
+down_revision: Union[str, None] = "058_backfill_bank_transactions_matched_entity"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# name -> (table, columns, options)
+NEW_INDEXES = {
+    "ix_journal_entries_admin_status_date": (
+        "journal_entries", ["administration_id", "status", "entry_date"], {},
+    ),
+    "ix_journal_lines_account_entry": (
+        "journal_lines", ["account_id", "journal_entry_id"],
+        {"postgresql_include": ["debit_amount", "credit_amount"]},
+    ),
+    "ix_journal_lines_vat_code_entry": (
+        "journal_lines", ["vat_code_id", "journal_entry_id"],
+        {"postgresql_where": sa.text("vat_code_id IS NOT NULL")},
+    ),
+    "ix_bank_transactions_admin_status_date": (
+        "bank_transactions", ["administration_id", "status", "booking_date"], {},
+    ),
+    "ix_bank_transactions_admin_unmatched": (
+        "bank_transactions", ["administration_id", "booking_date"],
+        {"postgresql_where": sa.text("status IN ('NEW', 'NEEDS_REVIEW')")},
+    ),
+    "ix_open_items_admin_type_due_open": (
+        "open_items", ["administration_id", "item_type", "due_date"],
+        {"postgresql_where": sa.text("status IN ('OPEN', 'PARTIAL')")},
+    ),
+}
+
+# Superseded single-column indexes: name -> (table, columns)
+REDUNDANT_INDEXES = {
+    "ix_journal_lines_account": ("journal_lines", ["account_id"]),
+    "ix_journal_lines_vat_code": ("journal_lines", ["vat_code_id"]),
+}
+
+
+def _existing_indexes(inspector, table: str) -> set:
+    if not inspector.has_table(table):
+        return set()
+    return {ix["name"] for ix in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = {
+        table: _existing_indexes(inspector, table)
+        for table in {t for t, _, _ in NEW_INDEXES.values()}
+    }
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, (table, columns, options) in NEW_INDEXES.items():
+            if not inspector.has_table(table) or name in existing[table]:
+                continue
+            op.create_index(name, table, columns, postgresql_concurrently=True, **options)
+
+        for name, (table, _) in REDUNDANT_INDEXES.items():
+            if name in existing.get(table, set()):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+    # Refresh planner statistics so the new indexes are considered immediately
+    for table in existing:
+        if inspector.has_table(table):
+            op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    with op.get_context().autocommit_block():
+        for name, (table, columns) in REDUNDANT_INDEXES.items():
+            if inspector.has_table(table) and name not in _existing_indexes(inspector, table):
+                op.create_index(name, table, columns, postgresql_concurrently=True)
+
+        for name, (table, _, _) in NEW_INDEXES.items():
+            if name in _existing_indexes(inspector, table):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,65 @@
+"""Add content_sha256 to documents and zzp_documents for upload deduplication.
+
+Uploads are now hashed while they are streamed to disk.  The digest is
+stored on the document so a file that is uploaded again for the same
+administration is answered with the existing document instead of being
+stored and processed twice.  Lookups are by
+``(administration_id, content_sha256)``, hence the composite indexes.
+
+Existing rows keep ``NULL`` (they are simply never matched); no backfill
+is needed.
+
+Revision ID: 060_document_content_hash
+Revises: 059_ledger_bank_hot_path_indexes
+Create Date: 2026-10-18 12:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "060_document_content_hash"
+down_revision: Union[str, None] = "059_ledger_bank_hot_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table -> index name
+TABLES = {
+    "documents": "ix_documents_admin_content_sha256",
+    "zzp_documents": "ix_zzp_documents_admin_content_sha256",
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    for table, index_name in TABLES.items():
+        if not inspector.has_table(table):
+            continue
+
+        columns = {c["name"] for c in inspector.get_columns(table)}
+        if "content_sha256" not in columns:
+            op.add_column(table, sa.Column("content_sha256", sa.String(64), nullable=True))
+
+        existing_indexes = {ix["name"] for ix in inspector.get_indexes(table)}
+        if index_name not in existing_indexes:
+            op.create_index(index_name, table, ["administration_id", "content_sha256"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    for table, index_name in TABLES.items():
+        if not inspector.has_table(table):
+            continue
+
+        existing_indexes = {ix["name"] for ix in inspector.get_indexes(table)}
+        if index_name in existing_indexes:
+            op.drop_index(index_name, table_name=table)
+
+        columns = {c["name"] for c in inspector.get_columns(table)}
+        if "content_sha256" in columns:
+            op.drop_column(table, "content_sha256")
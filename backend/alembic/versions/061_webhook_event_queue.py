@@ -0,0 +1,76 @@
+"""Turn webhook_events into the Mollie webhook ingestion queue.
+
+The Mollie webhook endpoint now stores the callback as a RECEIVED event
+and acknowledges immediately; a background consumer fetches the resource
+from Mollie and applies it.  The queue state lives on the existing
+idempotency table:
+
+- ``status`` (RECEIVED / PROCESSING / PROCESSED / FAILED); existing rows
+  were processed inline and become PROCESSED
+- ``received_at`` / ``claimed_at`` for ordering, lag and claim leases
+- ``attempts`` / ``last_error`` for retries
+- ``processed_at`` becomes nullable (set once processed)
+
+Pending events are found through ``(status, received_at)``.
+
+Revision ID: 061_webhook_event_queue
+Revises: 060_document_content_hash
+Create Date: 2026-10-18 14:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "061_webhook_event_queue"
+down_revision: Union[str, None] = "060_document_content_hash"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "webhook_events"
+INDEX = "ix_webhook_events_status_received"
+
+COLUMNS = [
+    sa.Column("status", sa.String(20), nullable=False, server_default="PROCESSED"),
+    sa.Column("received_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    sa.Column("last_error", sa.String(1000), nullable=True),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return
+
+    existing = {c["name"] for c in inspector.get_columns(TABLE)}
+    for column in COLUMNS:
+        if column.name not in existing:
+            op.add_column(TABLE, column)
+
+    # Existing events were processed inline; they were received when processed
+    op.execute(sa.text(f"UPDATE {TABLE} SET received_at = processed_at WHERE processed_at IS NOT NULL"))
+    op.alter_column(TABLE, "processed_at", nullable=True, server_default=None)
+
+    if INDEX not in {ix["name"] for ix in inspector.get_indexes(TABLE)}:
+        op.create_index(INDEX, TABLE, ["status", "received_at"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return
+
+    if INDEX in {ix["name"] for ix in inspector.get_indexes(TABLE)}:
+        op.drop_index(INDEX, table_name=TABLE)
+
+    op.execute(sa.text(f"UPDATE {TABLE} SET processed_at = received_at WHERE processed_at IS NULL"))
+    op.alter_column(TABLE, "processed_at", nullable=False, server_default=sa.func.now())
+
+    existing = {c["name"] for c in inspector.get_columns(TABLE)}
+    for column in reversed(COLUMNS):
+        if column.name in existing:
+            op.drop_column(TABLE, column.name)
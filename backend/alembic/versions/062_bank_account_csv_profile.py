@@ -0,0 +1,43 @@
+"""Remember the CSV column profile per bank account.
+
+``bank_accounts.csv_profile`` stores the layout of the bank's CSV export
+(dialect, column mapping, date format, decimal separator) detected on the
+first import, so later imports of the same export skip detection.
+
+Revision ID: 062_bank_account_csv_profile
+Revises: 061_webhook_event_queue
+Create Date: 2026-10-18 16:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "062_bank_account_csv_profile"
+down_revision: Union[str, None] = "061_webhook_event_queue"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "bank_accounts"
+COLUMN = "csv_profile"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return
+
+    if COLUMN not in {c["name"] for c in inspector.get_columns(TABLE)}:
+        op.add_column(TABLE, sa.Column(COLUMN, postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return
+
+    if COLUMN in {c["name"] for c in inspector.get_columns(TABLE)}:
+        op.drop_column(TABLE, COLUMN)
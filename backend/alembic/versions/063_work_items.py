@@ -0,0 +1,91 @@
+"""Precompute work queue items.
+
+``work_items`` holds one row per open work item of a client (issues,
+document backlog, VAT deadline, period in review, stale client, critical
+alerts), so the accountant work queue filters, sorts and paginates in SQL
+and the SLA summary counts from the same rows.
+
+``client_readiness_cache.needs_refresh`` is set when the client's issues,
+documents, periods, journal entries or alerts change; the client's items
+are rebuilt on the next read.
+
+Revision ID: 063_work_items
+Revises: 062_bank_account_csv_profile
+Create Date: 2026-10-18 18:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "063_work_items"
+down_revision: Union[str, None] = "062_bank_account_csv_profile"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "work_items"
+CACHE_TABLE = "client_readiness_cache"
+CACHE_COLUMN = "needs_refresh"
+
+INDEXES = {
+    "ix_work_items_administration_id": ["administration_id"],
+    "ix_work_items_type_severity": ["work_item_type", "severity"],
+    "ix_work_items_score": ["readiness_score", "id"],
+    "ix_work_items_due_date": ["due_date", "id"],
+    "ix_work_items_severity_rank": ["severity_rank", "id"],
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table(CACHE_TABLE):
+        if CACHE_COLUMN not in {c["name"] for c in inspector.get_columns(CACHE_TABLE)}:
+            op.add_column(
+                CACHE_TABLE,
+                sa.Column(CACHE_COLUMN, sa.Boolean(), nullable=False, server_default=sa.false()),
+            )
+
+    if not inspector.has_table(TABLE):
+        op.create_table(
+            TABLE,
+            sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("administration_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("client_name", sa.String(255), nullable=False),
+            sa.Column("period_id", postgresql.UUID(as_uuid=True), nullable=True),
+            sa.Column("period_status", sa.String(50), nullable=True),
+            sa.Column("work_item_type", sa.String(30), nullable=False),
+            sa.Column("severity", sa.String(20), nullable=False),
+            sa.Column("severity_rank", sa.Integer(), nullable=False),
+            sa.Column("readiness_score", sa.Integer(), nullable=False),
+            sa.Column("due_date", sa.Date(), nullable=True),
+            sa.Column("since", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("age_days", sa.Integer(), nullable=True),
+            sa.Column("item_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=False),
+            sa.Column("suggested_next_action", sa.String(255), nullable=False),
+            sa.Column("counts", postgresql.JSON(), nullable=True),
+            sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.ForeignKeyConstraint(["administration_id"], ["administrations.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    existing = {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(TABLE)}
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, TABLE, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table(TABLE):
+        op.drop_table(TABLE)
+
+    if inspector.has_table(CACHE_TABLE):
+        if CACHE_COLUMN in {c["name"] for c in inspector.get_columns(CACHE_TABLE)}:
+            op.drop_column(CACHE_TABLE, CACHE_COLUMN)
@@ -0,0 +1,45 @@
+"""Lease column for reminders being sent.
+
+The reminder dispatcher marks a claimed batch SENDING and commits before
+sending, so no row locks are held during delivery. ``claimed_at`` records
+when a reminder was claimed; SENDING reminders of a crashed worker are
+claimed again once REMINDER_DISPATCH_LEASE_SECONDS have passed.
+
+Revision ID: 064_client_reminder_claimed_at
+Revises: 063_work_items
+Create Date: 2026-10-19 09:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "064_client_reminder_claimed_at"
+down_revision: Union[str, None] = "063_work_items"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "client_reminders"
+COLUMN = "claimed_at"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return
+
+    if COLUMN not in {c["name"] for c in inspector.get_columns(TABLE)}:
+        op.add_column(TABLE, sa.Column(COLUMN, sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return
+
+    # Reminders caught mid-send go back to the queue
+    op.execute(sa.text(f"UPDATE {TABLE} SET status = 'SCHEDULED' WHERE status = 'SENDING'"))
+    if COLUMN in {c["name"] for c in inspector.get_columns(TABLE)}:
+        op.drop_column(TABLE, COLUMN)
@@ -0,0 +1,68 @@
+"""Unique entry numbers per administration.
+
+Entry numbers were derived from a row count without a lock, so concurrent
+postings could hand out the same number. Allocation now locks the
+administration row; this index makes a duplicate fail instead of slipping
+through.
+
+Existing duplicates are renumbered first: the earliest entry keeps its
+number, later ones get a "-2", "-3", ... suffix. The index is built with
+``CREATE INDEX CONCURRENTLY`` so the rollout does not block postings.
+
+Revision ID: 065_journal_entry_number_unique
+Revises: 064_client_reminder_claimed_at
+Create Date: 2026-10-19 12:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "065_journal_entry_number_unique"
+down_revision: Union[str, None] = "064_client_reminder_claimed_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "journal_entries"
+INDEX = "uq_journal_entries_admin_entry_number"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return
+    if INDEX in {ix["name"] for ix in inspector.get_indexes(TABLE)}:
+        return
+
+    op.execute(sa.text(
+        f"""
+        UPDATE {TABLE} AS je
+        SET entry_number = je.entry_number || '-' || dup.rn
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY administration_id, entry_number ORDER BY created_at, id
+            ) AS rn
+            FROM {TABLE}
+        ) AS dup
+        WHERE je.id = dup.id AND dup.rn > 1
+        """
+    ))
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            INDEX, TABLE, ["administration_id", "entry_number"],
+            unique=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return
+
+    if INDEX in {ix["name"] for ix in inspector.get_indexes(TABLE)}:
+        with op.get_context().autocommit_block():
+            op.drop_index(INDEX, table_name=TABLE, postgresql_concurrently=True)
@@ -16,7 +16,7 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.document import Document, DocumentStatus
 from app.models.ledger import JournalEntry, JournalEntryStatus
 from app.models.subledger import OpenItem, OpenItemStatus
@@ -71,7 +71,7 @@ router = APIRouter()
 async def get_client_overview(
     client_id: UUID,
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ):
     """
     Get high-level status for a client.
@@ -159,7 +159,7 @@ async def get_client_overview(
 async def get_client_issues(
     client_id: UUID,
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     include_resolved: bool = Query(False, description="Include resolved issues"),
 ):
     """
@@ -254,7 +254,7 @@ async def recalculate_journal(
 async def get_balance_sheet(
     client_id: UUID,
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     as_of_date: Optional[date] = Query(None, description="Date for the report (default: today)"),
 ):
     """
@@ -305,7 +305,7 @@ async def get_balance_sheet(
 async def get_profit_and_loss(
     client_id: UUID,
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     start_date: Optional[date] = Query(None, description="Start date (default: start of year)"),
     end_date: Optional[date] = Query(None, description="End date (default: today)"),
 ):
@@ -361,7 +361,7 @@ async def get_profit_and_loss(
 async def get_accounts_receivable(
     client_id: UUID,
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     as_of_date: Optional[date] = Query(None, description="Date for the report (default: today)"),
 ):
     """
@@ -404,7 +404,7 @@ async def get_accounts_receivable(
 async def get_accounts_payable(
     client_id: UUID,
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     as_of_date: Optional[date] = Query(None, description="Date for the report (default: today)"),
 ):
     """
@@ -449,7 +449,7 @@ async def get_accounts_payable(
 async def get_client_audit_logs(
     client_id: UUID,
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     date_from: Optional[date] = Query(None, description="Filter by date from (inclusive)"),
     date_to: Optional[date] = Query(None, description="Filter by date to (inclusive)"),
     entity_type: Optional[str] = Query(None, description="Filter by entity type (e.g., 'invoice', 'expense')"),
@@ -332,6 +332,7 @@ async def reprocess_document_in_admin(
         "storage_path": document.storage_path,
         "mime_type": document.mime_type,
         "original_filename": document.original_filename,
+        "content_sha256": document.content_sha256 or "",
     }
     
     await enqueue_document_job_to_redis(job_data)
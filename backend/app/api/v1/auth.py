@@ -10,7 +10,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.config import settings
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import (
+    PasswordHashingOverloaded,
+    create_access_token,
+    get_password_hash_async,
+    verify_and_update_password,
+    verify_password_async,
+)
 from app.core.rate_limit import check_rate_limit, get_client_ip
 from app.models.user import User
 from app.models.auth_token import TokenType
@@ -43,6 +49,16 @@ def _hash_for_logging(value: str) -> str:
     return hashlib.sha256(value.encode()).hexdigest()[:12]
 
 
+def _hashing_overloaded() -> HTTPException:
+    """503 returned when the password hashing pool is saturated."""
+    logger.warning("Password hashing queue full, shedding auth request", extra={"event": "password_hash_overloaded"})
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is temporarily busy. Please try again shortly.",
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
+
 @router.post("/register", response_model=RegisterResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_in: UserCreate,
@@ -80,10 +96,15 @@ async def register(
                 detail="Email already registered"
             )
         
+        try:
+            hashed_password = await get_password_hash_async(user_in.password)
+        except PasswordHashingOverloaded:
+            raise _hashing_overloaded()
+
         # Create user with email_verified_at = None
         user = User(
             email=user_in.email,
-            hashed_password=get_password_hash(user_in.password),
+            hashed_password=hashed_password,
             full_name=user_in.full_name,
             role=user_in.role,
             email_verified_at=None,  # User starts unverified
@@ -267,7 +288,14 @@ async def login(
         result = await db.execute(select(User).where(User.email == form_data.username))
         user = result.scalar_one_or_none()
         
-        if not user or not verify_password(form_data.password, user.hashed_password):
+        valid, new_hash = False, None
+        if user:
+            try:
+                valid, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+            except PasswordHashingOverloaded:
+                raise _hashing_overloaded()
+
+        if not valid:
             logger.warning(
                 "Failed login attempt",
                 extra={
@@ -334,6 +362,14 @@ async def login(
                     },
                 )
         
+        # Upgrade hashes made with outdated bcrypt parameters
+        if new_hash:
+            user.hashed_password = new_hash
+            logger.info(
+                "Password hash upgraded on login",
+                extra={"event": "password_rehashed", "user_id": str(user.id), "request_id": request_id},
+            )
+
         # Update last login time
         user.last_login_at = datetime.now(timezone.utc)
         await db.commit()
@@ -450,7 +486,10 @@ async def reset_password(
         )
     
     # Update password
-    user.hashed_password = get_password_hash(reset_request.new_password)
+    try:
+        user.hashed_password = await get_password_hash_async(reset_request.new_password)
+    except PasswordHashingOverloaded:
+        raise _hashing_overloaded()
     await db.commit()
     
     logger.info(
@@ -481,15 +520,19 @@ async def change_password(
         - 400: Current password is incorrect
         - 422: New password doesn't meet requirements
     """
-    # Verify current password
-    if not verify_password(change_request.current_password, current_user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Huidig wachtwoord is onjuist",
-        )
-    
-    # Update password
-    current_user.hashed_password = get_password_hash(change_request.new_password)
+    try:
+        # Verify current password
+        if not await verify_password_async(change_request.current_password, current_user.hashed_password):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Huidig wachtwoord is onjuist",
+            )
+        
+        # Update password
+        new_hash = await get_password_hash_async(change_request.new_password)
+    except PasswordHashingOverloaded:
+        raise _hashing_overloaded()
+    current_user.hashed_password = new_hash
     await db.commit()
     
     logger.info(
@@ -19,7 +19,7 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.administration import Administration, AdministrationMember, MemberRole
 from app.models.document import Document, DocumentStatus
 from app.models.transaction import Transaction, TransactionStatus
@@ -247,7 +247,7 @@ async def build_client_issues(
 @router.get("/dashboard", response_model=AccountantDashboardResponse)
 async def get_accountant_dashboard(
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ):
     """
     Get the accountant master dashboard.
@@ -378,7 +378,7 @@ async def get_accountant_dashboard(
 async def get_client_issues(
     client_id: UUID,
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ):
     """
     Get all issues for a specific client.
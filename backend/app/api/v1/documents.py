@@ -1,23 +1,39 @@
 import os
 import json
+import logging
 from pathlib import Path
-from typing import Annotated, List, Optional
+from typing import Annotated, List, Optional, Tuple
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-import aiofiles
 
 from app.core.database import get_db
 from app.core.config import settings
 from app.models.administration import Administration, AdministrationMember, MemberRole
 from app.models.document import Document, DocumentStatus
-from app.schemas.document import DocumentUploadResponse, DocumentResponse, DocumentDetailResponse
+from app.schemas.document import (
+    DocumentBatchUploadResponse,
+    DocumentUploadResponse,
+    DocumentResponse,
+    DocumentDetailResponse,
+)
+from app.services.documents.upload import (
+    StagedUpload,
+    UploadTooLarge,
+    discard_on_failure,
+    find_by_content_hash,
+    stage_upload,
+)
 from app.api.v1.deps import CurrentUser
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+DOCUMENT_STREAM = "document_processing_stream"
+MAX_BATCH_FILES = 20
 
 ALLOWED_MIME_TYPES = [
     "image/png",
@@ -41,64 +57,44 @@ async def get_redis_client():
         await client.close()
 
 
-async def enqueue_document_job(redis_client, job_data: dict) -> bool:
-    """Enqueue a document processing job to Redis. Returns True if successful."""
+async def enqueue_document_jobs(redis_client, jobs: List[dict]) -> int:
+    """
+    Enqueue document processing jobs to Redis in a single pipelined round trip.
+    Returns the number of jobs queued.
+    """
+    if not jobs:
+        return 0
     if redis_client is None:
-        print("Redis not configured - document processing job not queued")
-        return False
+        logger.info("Redis not configured - %d document processing job(s) not queued", len(jobs))
+        return 0
     
     try:
-        await redis_client.xadd(
-            "document_processing_stream",
-            job_data,
-            maxlen=10000,  # Keep last 10000 messages
-        )
-        return True
+        pipe = redis_client.pipeline(transaction=False)
+        for job_data in jobs:
+            pipe.xadd(
+                DOCUMENT_STREAM,
+                job_data,
+                maxlen=10000,  # Keep last 10000 messages
+            )
+        await pipe.execute()
+        return len(jobs)
     except Exception as e:
         # Log error but don't fail the upload
-        print(f"Failed to enqueue job: {e}")
-        return False
+        logger.warning("Failed to enqueue %d document job(s): %s", len(jobs), e)
+        return 0
 
 
-@router.post("/upload", response_model=DocumentUploadResponse)
-async def upload_document(
-    file: Annotated[UploadFile, File(...)],
-    current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    redis_client: Annotated[Optional[object], Depends(get_redis_client)],
-    administration_id: Annotated[UUID | None, Form()] = None,
-):
-    """Upload a document and enqueue for processing"""
-    print(f"\n{'='*80}")
-    print(f"📤 UPLOAD REQUEST RECEIVED")
-    print(f"{'='*80}")
-    print(f"User ID: {current_user.id}")
-    print(f"User Email: {current_user.email}")
-    print(f"Filename: {file.filename}")
-    print(f"Content-Type: {file.content_type}")
-    print(f"Administration ID (from request): {administration_id}")
-    print(f"{'='*80}\n")
-    
-    # Validate file type
-    if file.content_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_MIME_TYPES)}"
-        )
-    
-    # Read file content
-    content = await file.read()
-    file_size_mb = len(content) / (1024 * 1024)
-    max_size_mb = settings.MAX_UPLOAD_SIZE / (1024 * 1024)
-    print(f"📊 File size: {file_size_mb:.2f}MB (max: {max_size_mb:.0f}MB)")
-    
-    if len(content) > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE // (1024*1024)}MB"
-        )
-    
-    # Get or validate administration
+async def enqueue_document_job(redis_client, job_data: dict) -> bool:
+    """Enqueue a document processing job to Redis. Returns True if successful."""
+    return await enqueue_document_jobs(redis_client, [job_data]) == 1
+
+
+async def _get_upload_administration(
+    db: AsyncSession,
+    current_user,
+    administration_id: Optional[UUID],
+) -> Administration:
+    """Resolve the administration an upload belongs to and check membership."""
     if administration_id:
         result = await db.execute(
             select(Administration)
@@ -116,83 +112,164 @@ async def upload_document(
         )
         if not member:
             raise HTTPException(status_code=403, detail="Not a member of this administration")
-    else:
-        # Get first administration user is member of
-        result = await db.execute(
-            select(Administration)
-            .join(AdministrationMember)
-            .where(AdministrationMember.user_id == current_user.id)
-            .where(Administration.is_active == True)
-            .limit(1)
+        return administration
+    
+    # Get first administration user is member of
+    result = await db.execute(
+        select(Administration)
+        .join(AdministrationMember)
+        .where(AdministrationMember.user_id == current_user.id)
+        .where(Administration.is_active == True)
+        .limit(1)
+    )
+    administration = result.scalar_one_or_none()
+    if not administration:
+        raise HTTPException(
+            status_code=400,
+            detail="No administration found. Please create one first."
         )
-        administration = result.scalar_one_or_none()
-        if not administration:
+    return administration
+
+
+async def _store_uploads(
+    files: List[UploadFile],
+    administration: Administration,
+    db: AsyncSession,
+) -> List[Tuple[Document, Optional[dict]]]:
+    """
+    Stream files to disk and create their document records.
+    
+    All files are staged (size-checked and hashed) before any record is
+    created, so an invalid file fails the request without side effects.
+    Files identical to an existing document of the administration return
+    that document and no processing job. The records are committed here, so
+    a failed write also removes the staged and promoted files. Returns
+    (document, job) pairs; the caller enqueues the jobs.
+    """
+    for file in files:
+        if file.content_type not in ALLOWED_MIME_TYPES:
             raise HTTPException(
                 status_code=400,
-                detail="No administration found. Please create one first."
+                detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_MIME_TYPES)}"
             )
     
-    # Determine file extension
-    original_filename = file.filename or "document"
-    ext = original_filename.rsplit(".", 1)[-1] if "." in original_filename else "bin"
+    staged: List[StagedUpload] = []
+    try:
+        for file in files:
+            staged.append(await stage_upload(file))
+    except UploadTooLarge:
+        for upload in staged:
+            upload.discard()
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE // (1024*1024)}MB"
+        )
     
-    # Create document record
-    print(f"📝 Creating document record...")
-    print(f"   Administration: {administration.id} ({administration.name})")
-    document = Document(
-        administration_id=administration.id,
-        original_filename=original_filename,
-        storage_path="",  # Will update after saving
-        mime_type=file.content_type,
-        file_size=len(content),
-        status=DocumentStatus.UPLOADED,
+    results: List[Tuple[Document, Optional[dict]]] = []
+    with discard_on_failure(staged):
+        for upload in staged:
+            existing = await find_by_content_hash(
+                db, Document, administration.id, upload.sha256,
+                # Failed and rejected files can be submitted again
+                exclude_statuses=(DocumentStatus.FAILED, DocumentStatus.REJECTED),
+            )
+            if existing:
+                upload.discard()
+                logger.info(
+                    "Duplicate upload of document %s in administration %s",
+                    existing.id, administration.id,
+                )
+                results.append((existing, None))
+                continue
+            
+            document = Document(
+                administration_id=administration.id,
+                original_filename=upload.filename,
+                storage_path="",  # Will update after saving
+                mime_type=upload.content_type,
+                file_size=upload.size,
+                content_sha256=upload.sha256,
+                status=DocumentStatus.UPLOADED,
+            )
+            db.add(document)
+            await db.flush()
+            
+            storage_path = upload.promote(
+                Path(settings.UPLOAD_DIR) / str(administration.id) / str(document.id) / f"original.{upload.extension}"
+            )
+            document.storage_path = str(storage_path)
+            results.append((document, {
+                "document_id": str(document.id),
+                "administration_id": str(administration.id),
+                "storage_path": str(storage_path),
+                "mime_type": upload.content_type,
+                "original_filename": upload.filename,
+                "content_sha256": upload.sha256,
+            }))
+        await db.commit()
+    return results
+
+
+def _upload_response(document: Document, job: Optional[dict]) -> DocumentUploadResponse:
+    if job is None:
+        return DocumentUploadResponse(
+            message="Document already uploaded",
+            document_id=document.id,
+            is_duplicate=True,
+        )
+    return DocumentUploadResponse(
+        message="Document uploaded successfully",
+        document_id=document.id,
     )
-    db.add(document)
-    await db.flush()
-    print(f"✅ Document record created with ID: {document.id}")
-    
-    # Create storage path
-    storage_dir = Path(settings.UPLOAD_DIR) / str(administration.id) / str(document.id)
-    storage_dir.mkdir(parents=True, exist_ok=True)
-    storage_path = storage_dir / f"original.{ext}"
+
+
+@router.post("/upload", response_model=DocumentUploadResponse)
+async def upload_document(
+    file: Annotated[UploadFile, File(...)],
+    current_user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    redis_client: Annotated[Optional[object], Depends(get_redis_client)],
+    administration_id: Annotated[UUID | None, Form()] = None,
+):
+    """Upload a document and enqueue for processing"""
+    # Validate file type before touching the database
+    if file.content_type not in ALLOWED_MIME_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_MIME_TYPES)}"
+        )
     
-    print(f"💾 Saving file to: {storage_path}")
-    # Save file
-    async with aiofiles.open(storage_path, "wb") as f:
-        await f.write(content)
-    print(f"✅ File saved successfully")
+    administration = await _get_upload_administration(db, current_user, administration_id)
+    [(document, job)] = await _store_uploads([file], administration, db)
     
-    # Update storage path
-    document.storage_path = str(storage_path)
-    await db.commit()
-    await db.refresh(document)
-    print(f"✅ Document record updated in database")
+    if job is not None:
+        await enqueue_document_jobs(redis_client, [job])
     
-    # Enqueue job to Redis Streams
-    job_data = {
-        "document_id": str(document.id),
-        "administration_id": str(administration.id),
-        "storage_path": str(storage_path),
-        "mime_type": file.content_type,
-        "original_filename": original_filename,
-    }
+    return _upload_response(document, job)
+
+
+@router.post("/upload/batch", response_model=DocumentBatchUploadResponse)
+async def upload_documents_batch(
+    current_user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    redis_client: Annotated[Optional[object], Depends(get_redis_client)],
+    files: List[UploadFile] = File(...),
+    administration_id: Annotated[UUID | None, Form()] = None,
+):
+    """Upload several documents and enqueue them in one Redis pipeline"""
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files. Maximum per upload: {MAX_BATCH_FILES}"
+        )
     
-    print(f"📬 Attempting to enqueue job to Redis...")
-    enqueue_result = await enqueue_document_job(redis_client, job_data)
-    if enqueue_result:
-        print(f"✅ Job enqueued to Redis successfully")
-    else:
-        print(f"⚠️  Job not enqueued (Redis disabled or error)")
+    administration = await _get_upload_administration(db, current_user, administration_id)
+    stored = await _store_uploads(files, administration, db)
     
-    print(f"\n{'='*80}")
-    print(f"✅ UPLOAD COMPLETED SUCCESSFULLY")
-    print(f"Document ID: {document.id}")
-    print(f"Status: {document.status}")
-    print(f"{'='*80}\n")
+    await enqueue_document_jobs(redis_client, [job for _, job in stored if job is not None])
     
-    return DocumentUploadResponse(
-        message="Document uploaded successfully",
-        document_id=document.id,
+    return DocumentBatchUploadResponse(
+        documents=[_upload_response(document, job) for document, job in stored]
     )
 
 
@@ -346,6 +423,8 @@ async def reprocess_document(
         "storage_path": document.storage_path,
         "mime_type": document.mime_type,
         "original_filename": document.original_filename,
+        # The worker reuses cached extraction output for this content hash
+        "content_sha256": document.content_sha256 or "",
     }
     
     await enqueue_document_job(redis_client, job_data)
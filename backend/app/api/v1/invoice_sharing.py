@@ -23,14 +23,17 @@ from sqlalchemy.orm import selectinload
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.startup import lazy_module
 from app.models.zzp import ZZPInvoice, BusinessProfile
 from app.models.administration import Administration, AdministrationMember
 from app.api.v1.deps import CurrentUser, require_zzp
-from app.services.invoice_pdf_reportlab import generate_invoice_pdf_reportlab
 from app.services.invoice_pdf import generate_invoice_pdf, get_invoice_pdf_filename
 
 logger = logging.getLogger(__name__)
 
+# ReportLab is only imported when the first PDF is rendered
+invoice_pdf_reportlab = lazy_module("app.services.invoice_pdf_reportlab")
+
 # ── Token helpers ────────────────────────────────────────────────────
 SHARE_TOKEN_TTL_SECONDS = 30 * 24 * 60 * 60  # 30 days
 _SEP = "."  # separator inside the URL-safe token
@@ -188,7 +191,7 @@ async def get_public_invoice_pdf(
 
     # Generate PDF
     try:
-        pdf_bytes = generate_invoice_pdf_reportlab(invoice)
+        pdf_bytes = invoice_pdf_reportlab.generate_invoice_pdf_reportlab(invoice)
         filename = get_invoice_pdf_filename(invoice)
     except Exception as reportlab_err:
         logger.warning("ReportLab failed for public PDF, trying WeasyPrint: %s", reportlab_err)
@@ -4,19 +4,22 @@ Observability API Endpoints
 Provides endpoints for application health, metrics, and alerts:
 - GET /health - Application health check
 - GET /metrics - Application metrics
+- GET /metrics/prometheus - Prometheus text exposition (in-process counters)
 - Alerts management endpoints
 """
+import hmac
 from datetime import datetime, timezone
 from typing import Annotated, Optional, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
-import redis.asyncio as redis
 
 from app.core.config import settings
 from app.core.database import engine, get_db
+from app.core.startup import lazy_module
 from app.models.administration import Administration, AdministrationMember, MemberRole
 from app.models.alerts import Alert, AlertSeverity
 from app.schemas.alerts import (
@@ -28,11 +31,15 @@ from app.schemas.alerts import (
     AlertGroupedResponse,
 )
 from app.services.alerts import AlertService
-from app.services.metrics import MetricsService
+from app.core.metrics import registry, PROMETHEUS_CONTENT_TYPE
+from app.services.metrics import MetricsService, business_metrics_cache
 from app.api.v1.deps import CurrentUser
 
 router = APIRouter()
 
+# Only needed when Redis is configured
+redis = lazy_module("redis.asyncio")
+
 
 # ============ Health Endpoint ============
 
@@ -166,12 +173,40 @@ async def get_metrics(
         if not administration:
             raise HTTPException(status_code=404, detail="Client not found or access denied")
     
+    # Global metrics are refreshed in the background; serve the cached snapshot
+    # while it is fresh instead of re-running the aggregate queries.
+    if administration_id is None:
+        cached = business_metrics_cache.get(max_age_seconds=2 * settings.METRICS_REFRESH_INTERVAL_SECONDS)
+        if cached is not None:
+            return cached
+    
     metrics_service = MetricsService(db)
     metrics = await metrics_service.get_all_metrics(administration_id)
     
     return metrics
 
 
+@router.get("/metrics/prometheus", tags=["metrics"], response_class=PlainTextResponse)
+async def get_prometheus_metrics(request: Request):
+    """
+    Prometheus scrape endpoint.
+    
+    Renders in-process counters and histograms (request latency per route,
+    DB query count/time per request, background job durations, postings)
+    plus the cached business gauges. No database access per scrape.
+    
+    The scraper must send METRICS_TOKEN as a bearer token. Without a
+    configured token the endpoint is disabled (404) rather than public.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not hmac.compare_digest(request.headers.get("authorization", ""), expected):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # ============ Alerts Endpoints ============
 
 async def verify_accountant_access(
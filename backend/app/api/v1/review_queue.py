@@ -7,6 +7,7 @@ Provides endpoints for accountants to review and process documents:
 - POST /clients/{client_id}/documents/{doc_id}/post
 - POST /clients/{client_id}/documents/{doc_id}/reject
 - POST /clients/{client_id}/documents/{doc_id}/reprocess
+- POST /clients/{client_id}/documents/match
 - GET /clients/{client_id}/periods/{period_id}/closing-checklist
 """
 from datetime import datetime, timezone
@@ -31,6 +32,9 @@ from app.schemas.document import (
     DocumentRejectRequest,
     DocumentRejectResponse,
     DocumentReprocessResponse,
+    DocumentBatchMatchRequest,
+    DocumentBatchMatchResponse,
+    DocumentMatchResult,
     ClosingChecklistResponse,
     ClosingChecklistItem,
 )
@@ -375,6 +379,42 @@ async def run_document_matching(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/clients/{client_id}/documents/match", response_model=DocumentBatchMatchResponse)
+async def run_document_matching_batch(
+    client_id: UUID,
+    payload: DocumentBatchMatchRequest,
+    current_user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Run matching logic on a batch of documents.
+    
+    Candidates are loaded once for the whole batch, which makes this much
+    cheaper than matching the documents one by one (e.g. a month-end backlog).
+    """
+    administration = await require_assigned_client(client_id, current_user, db)
+    
+    matching_service = DocumentMatchingService(db, client_id)
+    documents = await matching_service.run_matching_many(payload.document_ids)
+    await db.commit()
+    
+    found = {document.id for document in documents}
+    return DocumentBatchMatchResponse(
+        results=[
+            DocumentMatchResult(
+                document_id=document.id,
+                status=document.status,
+                is_duplicate=document.is_duplicate,
+                match_confidence=document.match_confidence,
+                matched_party_id=document.matched_party_id,
+                matched_open_item_id=document.matched_open_item_id,
+            )
+            for document in documents
+        ],
+        not_found=[doc_id for doc_id in dict.fromkeys(payload.document_ids) if doc_id not in found],
+    )
+
+
 @router.get("/clients/{client_id}/periods/{period_id}/closing-checklist", response_model=ClosingChecklistResponse)
 async def get_closing_checklist(
     client_id: UUID,
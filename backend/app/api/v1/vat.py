@@ -18,6 +18,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.startup import lazy_module
 from app.models.ledger import AccountingPeriod, PeriodStatus as ModelPeriodStatus
 from app.models.accounting import VatCode
 from app.schemas.vat import (
@@ -46,7 +47,7 @@ from app.schemas.vat import (
     QueueSubmissionResponse,
     VatSubmissionType,
 )
-from app.services.vat import VatReportService, VatLineageService, generate_vat_overview_pdf
+from app.services.vat import VatReportService, VatLineageService
 from app.services.vat.report import VatReportError, PeriodNotEligibleError
 from app.services.vat.submission import SubmissionPackageService, SubmissionPackageError
 from app.services.vat.box_mapping import generate_mapping_reason
@@ -54,6 +55,9 @@ from app.api.v1.deps import CurrentUser, require_assigned_client
 
 router = APIRouter()
 
+# ReportLab is only imported when the first PDF is rendered
+vat_pdf = lazy_module("app.services.vat.pdf")
+
 
 @router.get(
     "/clients/{client_id}/periods/{period_id}/reports/vat",
@@ -362,7 +366,7 @@ async def download_vat_report_pdf(
     except (PeriodNotEligibleError, VatReportError) as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-    pdf_bytes = generate_vat_overview_pdf(administration, report)
+    pdf_bytes = vat_pdf.generate_vat_overview_pdf(administration, report)
     filename = f"btw-overzicht-{report.period_name.lower().replace(' ', '-')}.pdf"
     return Response(
         content=pdf_bytes,
@@ -6,8 +6,8 @@ Handles incoming webhooks from Mollie and other payment providers.
 import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Header
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Header
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.database import get_db
 from app.core.config import settings
@@ -65,6 +65,7 @@ async def mollie_webhook_probe(request: Request):
 @router.post("/webhooks/mollie")
 async def mollie_webhook(
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
     """
@@ -77,11 +78,18 @@ async def mollie_webhook(
     The ``secret`` verification token is expected as a URL query parameter
     (embedded in the webhook URL registered with Mollie).
 
+    The event is stored and acknowledged immediately; fetching the resource
+    from Mollie and updating the subscription happens after the response
+    (see services/mollie_webhook_queue.py).
+
     Returns:
-        200 OK if webhook is processed successfully
+        200 OK once the event is queued (or was already known)
     """
-    from app.services.mollie_subscription_service import mollie_subscription_service
-    from app.integrations.mollie.client import MollieError
+    from app.services.mollie_webhook_queue import (
+        drain_mollie_webhooks,
+        enqueue_mollie_webhook,
+        mollie_event_type,
+    )
     
     # Verify webhook authenticity
     if not verify_mollie_webhook(request):
@@ -110,58 +118,47 @@ async def mollie_webhook(
         )
     
     # Determine resource type (payment starts with tr_, subscription with sub_)
-    payment_id = resource_id if resource_id.startswith("tr_") else None
-    subscription_id = resource_id if resource_id.startswith("sub_") else None
-    
-    if not payment_id and not subscription_id:
+    event_type = mollie_event_type(resource_id)
+    if event_type is None:
         logger.error(f"Unknown Mollie resource type: {resource_id}")
         raise HTTPException(
             status_code=400,
             detail={"code": "UNKNOWN_RESOURCE", "message": "Unknown resource type"}
         )
 
-    event_type = "payment" if payment_id else "subscription"
-    logger.info(
-        "Mollie webhook received: event_type=%s resource_id=%s",
-        event_type,
-        resource_id,
-    )
-
     try:
-        # Process webhook
-        result = await mollie_subscription_service.process_webhook(
-            db=db,
-            payment_id=payment_id,
-            subscription_id=subscription_id,
-        )
-
-        logger.info(
-            "Mollie webhook completed: event_type=%s resource_id=%s result_status=%s",
-            event_type,
-            resource_id,
-            result.get("status"),
-        )
-        
-        return {"status": "ok", "result": result}
-    
-    except MollieError as e:
-        logger.error(
-            "Mollie webhook error: event_type=%s resource_id=%s error=%s",
-            event_type,
-            resource_id,
-            e,
-        )
-        raise HTTPException(
-            status_code=500,
-            detail={"code": "MOLLIE_ERROR", "message": str(e)}
-        )
-    except Exception as e:
+        queued = await enqueue_mollie_webhook(db, resource_id)
+        await db.commit()
+    except Exception:
         logger.exception(
-            "Mollie webhook unexpected error: event_type=%s resource_id=%s",
+            "Mollie webhook could not be stored: event_type=%s resource_id=%s",
             event_type,
             resource_id,
         )
+        # Non-2xx makes Mollie deliver the webhook again later
         raise HTTPException(
             status_code=500,
-            detail={"code": "WEBHOOK_ERROR", "message": "Failed to process webhook"}
+            detail={"code": "WEBHOOK_ERROR", "message": "Failed to store webhook"}
         )
+
+    logger.info(
+        "Mollie webhook received: event_type=%s resource_id=%s queued=%s",
+        event_type,
+        resource_id,
+        queued.queued,
+    )
+
+    if queued.queued:
+        # Sessions for the consumer come from the engine serving this request
+        background_tasks.add_task(
+            drain_mollie_webhooks,
+            async_sessionmaker(db.bind, class_=AsyncSession, expire_on_commit=False),
+        )
+
+    return {
+        "status": "ok",
+        "result": {
+            "status": "queued" if queued.queued else "duplicate",
+            "event_id": queued.event_id,
+        },
+    }
@@ -31,7 +31,7 @@ from app.schemas.work_queue import (
     EvidencePackResponse,
     EvidencePackListResponse,
 )
-from app.services.work_queue import WorkQueueService, SLAService
+from app.services.work_queue import WorkQueueService, WorkQueueServiceError, SLAService
 from app.services.reminders import ReminderService, RateLimitExceededError as ReminderRateLimitError
 from app.services.evidence_pack import EvidencePackService, EvidencePackServiceError, RateLimitExceededError as EvidenceRateLimitError
 from app.api.v1.deps import CurrentUser
@@ -66,12 +66,24 @@ async def get_work_queue(
         description="Queue filter: red, review, vat_due, stale, all"
     ),
     limit: int = Query(50, ge=1, le=100, description="Max items to return"),
-    cursor: Optional[str] = Query(None, description="Pagination cursor"),
+    cursor: Optional[str] = Query(None, description="Pagination cursor (next_cursor of the previous page)"),
     sort: Optional[str] = Query(
         "readiness_score",
         description="Sort field: readiness_score, due_date, severity"
     ),
     order: Optional[str] = Query("asc", description="Sort order: asc or desc"),
+    item_type: Optional[str] = Query(
+        None,
+        alias="type",
+        description="Work item type: ISSUE, VAT, BACKLOG, ALERT, PERIOD_REVIEW, STALE"
+    ),
+    severity: Optional[str] = Query(
+        None,
+        description="Severity: CRITICAL, RED, WARNING, YELLOW, INFO"
+    ),
+    due_within_days: Optional[int] = Query(
+        None, ge=0, le=365, description="Only items due within this many days (overdue included)"
+    ),
 ):
     """
     Get unified work queue for accountant dashboard.
@@ -84,17 +96,25 @@ async def get_work_queue(
     - Critical alerts
     
     Each item includes readiness score and suggested next action.
+    Items are filtered, sorted and paginated server-side; pass
+    ``next_cursor`` as ``cursor`` to fetch the next page.
     """
     verify_accountant_role(current_user)
     
     service = WorkQueueService(db, current_user.id)
-    result = await service.get_work_queue(
-        queue_type=queue,
-        limit=limit,
-        cursor=cursor,
-        sort_by=sort,
-        sort_order=order,
-    )
+    try:
+        result = await service.get_work_queue(
+            queue_type=queue,
+            limit=limit,
+            cursor=cursor,
+            sort_by=sort,
+            sort_order=order,
+            work_item_type=item_type.upper() if item_type else None,
+            severity=severity.upper() if severity else None,
+            due_within_days=due_within_days,
+        )
+    except WorkQueueServiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return WorkQueueResponse(
         items=[
@@ -118,6 +138,7 @@ async def get_work_queue(
         ],
         total_count=result["total_count"],
         returned_count=result["returned_count"],
+        next_cursor=result["next_cursor"],
         queue_type=result["queue_type"],
         counts=result["counts"],
         sort_by=result["sort_by"],
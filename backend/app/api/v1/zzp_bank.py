@@ -27,6 +27,7 @@ from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
 from app.core.config import settings
+from app.core.startup import lazy_module
 from app.models.bank import BankAccount, BankTransaction, BankTransactionStatus
 from app.models.zzp import ZZPInvoice, InvoiceStatus, ZZPBankTransactionMatch
 from app.models.administration import Administration, AdministrationMember
@@ -53,10 +54,12 @@ from app.schemas.zzp import (
 from app.api.v1.deps import CurrentUser, require_zzp
 from app.repositories.ledger_repository import LedgerRepository
 from app.services.ledger_service import LedgerPostingService, LedgerPostingError
-from app.services.gocardless import GoCardlessService, GoCardlessError
 
 router = APIRouter()
 
+# GoCardless client (and its HTTP stack) is imported on first use
+gocardless = lazy_module("app.services.gocardless")
+
 # Frontend path for GoCardless redirect callback
 BANK_CALLBACK_PATH = "/zzp/instellingen"
 
@@ -1018,7 +1021,7 @@ async def get_bank_connection_status(
     require_zzp(current_user)
     administration = await get_user_administration(current_user.id, db)
     
-    service = GoCardlessService(db, administration.id)
+    service = gocardless.GoCardlessService(db, administration.id)
     status = await service.get_connection_status()
     
     if not status:
@@ -1051,11 +1054,11 @@ async def list_bank_institutions(
         )
     
     administration = await get_user_administration(current_user.id, db)
-    service = GoCardlessService(db, administration.id)
+    service = gocardless.GoCardlessService(db, administration.id)
     
     try:
         institutions = await service.list_institutions(country)
-    except GoCardlessError as e:
+    except gocardless.GoCardlessError as e:
         raise HTTPException(status_code=e.status_code or 502, detail={"code": "GOCARDLESS_ERROR", "message": e.message})
     
     return ZZPBankInstitutionListResponse(
@@ -1099,14 +1102,14 @@ async def connect_bank(
     frontend_url = settings.FRONTEND_URL.rstrip("/")
     redirect_url = f"{frontend_url}{BANK_CALLBACK_PATH}?bank_callback=true"
     
-    service = GoCardlessService(db, administration.id)
+    service = gocardless.GoCardlessService(db, administration.id)
     
     try:
         result = await service.create_requisition(
             institution_id=request.institution_id,
             redirect_url=redirect_url,
         )
-    except GoCardlessError as e:
+    except gocardless.GoCardlessError as e:
         raise HTTPException(
             status_code=e.status_code or 502,
             detail={"code": "GOCARDLESS_ERROR", "message": e.message},
@@ -1130,11 +1133,11 @@ async def bank_callback(
     require_zzp(current_user)
     administration = await get_user_administration(current_user.id, db)
     
-    service = GoCardlessService(db, administration.id)
+    service = gocardless.GoCardlessService(db, administration.id)
     
     try:
         connection = await service.handle_callback(ref)
-    except GoCardlessError as e:
+    except gocardless.GoCardlessError as e:
         raise HTTPException(
             status_code=e.status_code or 502,
             detail={"code": "GOCARDLESS_ERROR", "message": e.message},
@@ -1180,11 +1183,11 @@ async def sync_bank_transactions(
             detail={"code": "NO_CONNECTION", "message": "Geen actieve bankkoppeling gevonden. Koppel eerst je bank."}
         )
     
-    service = GoCardlessService(db, administration.id)
+    service = gocardless.GoCardlessService(db, administration.id)
     
     try:
         sync_result = await service.sync_transactions(connection.id)
-    except GoCardlessError as e:
+    except gocardless.GoCardlessError as e:
         raise HTTPException(
             status_code=e.status_code or 502,
             detail={"code": "GOCARDLESS_ERROR", "message": e.message},
@@ -1,4 +1,3 @@
-import calendar
 from datetime import date, timedelta
 from decimal import Decimal
 from typing import Annotated, Optional
@@ -18,6 +17,20 @@ from app.models.financial_commitment import CommitmentStatus, CommitmentType, Fi
 from app.models.ledger import AccountingPeriod, PeriodStatus
 from app.models.zzp import ZZPExpense
 from app.repositories.ledger_repository import LedgerRepository
+from app.services.commitment_engine import (
+    CommitmentSchedule,
+    PaymentRecord,
+    add_months,
+    add_years,
+    build_commitment_index,
+    build_schedule,
+    build_schedules,
+    compute_next_due_date,
+    detect_recurring_payments,
+    normalize_status as _normalize_status,
+    project_cash_flow,
+    with_day,
+)
 from app.services.ledger_service import LedgerPostingError, LedgerPostingService
 from app.schemas.commitments import (
     AmortizationRow,
@@ -25,7 +38,9 @@ from app.schemas.commitments import (
     CommitmentCreate,
     CommitmentListResponse,
     CommitmentOverviewResponse,
+    CommitmentProjectionMonth,
     CommitmentResponse,
+    CommitmentSuggestion,
     CommitmentSuggestionsResponse,
     CommitmentUpdate,
 )
@@ -41,25 +56,6 @@ class CommitmentExpenseCreateRequest(BaseModel):
     notes: Optional[str] = Field(None, max_length=2000)
 
 
-def add_months(base: date, months: int) -> date:
-    month_index = base.month - 1 + months
-    year = base.year + month_index // 12
-    month = month_index % 12 + 1
-    day = min(base.day, calendar.monthrange(year, month)[1])
-    return date(year, month, day)
-
-
-def add_years(base: date, years: int) -> date:
-    target_year = base.year + years
-    day = min(base.day, calendar.monthrange(target_year, base.month)[1])
-    return date(target_year, base.month, day)
-
-
-def with_day(base: date, day: int) -> date:
-    max_day = calendar.monthrange(base.year, base.month)[1]
-    return date(base.year, base.month, min(day, max_day))
-
-
 async def get_user_administration(user_id: UUID, db: AsyncSession) -> Administration:
     result = await db.execute(
         select(Administration)
@@ -75,79 +71,6 @@ async def get_user_administration(user_id: UUID, db: AsyncSession) -> Administra
     return administration
 
 
-def _normalize_status(item: FinancialCommitment, today: date) -> CommitmentStatus:
-    if item.status == CommitmentStatus.PAUSED:
-        return CommitmentStatus.PAUSED
-    if item.status == CommitmentStatus.ENDED:
-        return CommitmentStatus.ENDED
-
-    if item.end_date and item.end_date < today:
-        return CommitmentStatus.ENDED
-
-    if item.contract_term_months and item.contract_term_months > 0:
-        contract_end = add_months(item.start_date, item.contract_term_months - 1)
-        if contract_end < today:
-            return CommitmentStatus.ENDED
-
-    return CommitmentStatus.ACTIVE
-
-
-def _candidate_for_month(item: FinancialCommitment, year: int, month: int) -> date:
-    anchor_day = item.payment_day or item.start_date.day
-    return with_day(date(year, month, 1), anchor_day)
-
-
-def compute_next_due_date(item: FinancialCommitment, today: Optional[date] = None) -> Optional[date]:
-    today = today or date.today()
-    lifecycle_status = _normalize_status(item, today)
-    if lifecycle_status == CommitmentStatus.ENDED:
-        return None
-    if lifecycle_status == CommitmentStatus.PAUSED:
-        return None
-
-    if item.last_booked_date:
-        if item.recurring_frequency == RecurringFrequency.YEARLY:
-            candidate = add_years(item.last_booked_date, 1)
-        else:
-            candidate = add_months(item.last_booked_date, 1)
-
-        if item.end_date and candidate > item.end_date:
-            return None
-        if candidate >= today:
-            return candidate
-
-    if item.type == CommitmentType.SUBSCRIPTION and item.recurring_frequency == RecurringFrequency.YEARLY:
-        base = item.renewal_date or item.start_date
-        candidate = base
-        while candidate < today:
-            candidate = add_years(candidate, 1)
-        if item.end_date and candidate > item.end_date:
-            return None
-        return candidate
-
-    candidate = _candidate_for_month(item, today.year, today.month)
-    if candidate < today:
-        next_month = add_months(date(today.year, today.month, 1), 1)
-        candidate = _candidate_for_month(item, next_month.year, next_month.month)
-
-    if candidate < item.start_date:
-        base = date(item.start_date.year, item.start_date.month, 1)
-        candidate = _candidate_for_month(item, base.year, base.month)
-        while candidate < item.start_date:
-            base = add_months(base, 1)
-            candidate = _candidate_for_month(item, base.year, base.month)
-
-    if item.end_date and candidate > item.end_date:
-        return None
-
-    if item.contract_term_months and item.contract_term_months > 0:
-        contract_end = add_months(item.start_date, item.contract_term_months - 1)
-        if candidate > contract_end:
-            return None
-
-    return candidate
-
-
 def compute_amortization_rows(item: FinancialCommitment) -> list[AmortizationRow]:
     if item.type not in {CommitmentType.LEASE, CommitmentType.LOAN}:
         return []
@@ -197,9 +120,14 @@ def compute_end_date_status(target_end_date: Optional[date], today: date, status
     return "active"
 
 
-def to_response(item: FinancialCommitment, today: Optional[date] = None) -> CommitmentResponse:
+def to_response(
+    item: FinancialCommitment,
+    today: Optional[date] = None,
+    schedule: Optional[CommitmentSchedule] = None,
+) -> CommitmentResponse:
     today = today or date.today()
-    lifecycle_status = _normalize_status(item, today)
+    schedule = schedule or build_schedule(item, today)
+    lifecycle_status = schedule.status
     rows = compute_amortization_rows(item)
     paid_to_date_cents: Optional[int] = None
     remaining_balance_cents: Optional[int] = None
@@ -226,7 +154,7 @@ def to_response(item: FinancialCommitment, today: Optional[date] = None) -> Comm
         end_date=item.end_date,
         contract_term_months=item.contract_term_months,
         renewal_date=item.renewal_date,
-        next_due_date=compute_next_due_date(item, today=today),
+        next_due_date=schedule.next_due_date,
         btw_rate=float(item.btw_rate) if item.btw_rate is not None else None,
         vat_rate=float(item.vat_rate) if item.vat_rate is not None else (float(item.btw_rate) if item.btw_rate is not None else None),
         payment_day=item.payment_day,
@@ -280,6 +208,7 @@ async def commitment_overview(
     current_user: CurrentUser,
     db: Annotated[AsyncSession, Depends(get_db)],
     threshold_cents: int = Query(150000, ge=0),
+    months: int = Query(6, ge=0, le=36, description="Months of cash-flow projection"),
 ):
     require_zzp(current_user)
     administration = await get_user_administration(current_user.id, db)
@@ -288,29 +217,22 @@ async def commitment_overview(
 
     today = date.today()
     next_30 = today + timedelta(days=30)
+    schedules = build_schedules(items, today)
 
-    upcoming: list[FinancialCommitment] = []
+    upcoming: list[CommitmentSchedule] = []
     by_type = {"lease": 0, "loan": 0, "subscription": 0}
 
     monthly_total = 0
-    for item in items:
-        due_date = compute_next_due_date(item, today=today)
-        value = item.monthly_payment_cents or item.amount_cents
-        lifecycle_status = _normalize_status(item, today)
-
-        if lifecycle_status == CommitmentStatus.ACTIVE:
-            if item.type == CommitmentType.SUBSCRIPTION and item.recurring_frequency == RecurringFrequency.YEARLY:
-                monthly_total += item.amount_cents // 12
-            else:
-                monthly_total += value
-
-            by_type[item.type.value] += value
-            if due_date and due_date <= next_30:
-                upcoming.append(item)
+    for schedule in schedules:
+        if schedule.is_active:
+            monthly_total += schedule.monthly_cents
+            by_type[schedule.item.type.value] += schedule.item.monthly_payment_cents or schedule.item.amount_cents
+            if schedule.next_due_date and schedule.next_due_date <= next_30:
+                upcoming.append(schedule)
 
     alerts: list[CommitmentAlert] = []
-    for item in items:
-        due_date = compute_next_due_date(item, today=today)
+    for schedule in schedules:
+        item, due_date = schedule.item, schedule.next_due_date
         if item.type == CommitmentType.SUBSCRIPTION and due_date and (due_date - today).days <= 14:
             alerts.append(CommitmentAlert(code="subscription_renewal", severity="warning", message=f"Abonnement '{item.name}' verlengt binnen 14 dagen."))
         if item.type in {CommitmentType.LEASE, CommitmentType.LOAN} and item.end_date and 0 <= (item.end_date - today).days <= 30:
@@ -319,14 +241,25 @@ async def commitment_overview(
     if monthly_total > threshold_cents:
         alerts.append(CommitmentAlert(code="monthly_threshold", severity="warning", message="Maandelijkse vaste verplichtingen overschrijden de ingestelde drempel."))
 
+    upcoming.sort(key=lambda s: s.next_due_date or date.max)
     return CommitmentOverviewResponse(
         monthly_total_cents=monthly_total,
-        upcoming_total_cents=sum(i.monthly_payment_cents or i.amount_cents for i in upcoming),
+        upcoming_total_cents=sum(s.item.monthly_payment_cents or s.item.amount_cents for s in upcoming),
         warning_count=len([a for a in alerts if a.severity == "warning"]),
         by_type=by_type,
-        upcoming=[to_response(i, today=today) for i in sorted(upcoming, key=lambda x: compute_next_due_date(x, today=today) or date.max)[:10]],
+        upcoming=[to_response(s.item, today=today, schedule=s) for s in upcoming[:10]],
         alerts=alerts,
         threshold_cents=threshold_cents,
+        projection=[
+            CommitmentProjectionMonth(
+                year=month.year,
+                month=month.month,
+                total_cents=month.total_cents,
+                by_type=month.by_type,
+                payment_count=month.payment_count,
+            )
+            for month in project_cash_flow(schedules, today, months)
+        ],
     )
 
 
@@ -334,43 +267,62 @@ async def commitment_overview(
 async def subscription_suggestions(current_user: CurrentUser, db: Annotated[AsyncSession, Depends(get_db)]):
     require_zzp(current_user)
     administration = await get_user_administration(current_user.id, db)
-    since = date.today() - timedelta(days=120)
+    today = date.today()
 
+    # Only the columns detection needs, over the full history
     result = await db.execute(
-        select(BankTransaction)
+        select(
+            BankTransaction.id,
+            BankTransaction.booking_date,
+            BankTransaction.amount,
+            BankTransaction.counterparty_name,
+            BankTransaction.description,
+        )
         .where(
             and_(
                 BankTransaction.administration_id == administration.id,
-                BankTransaction.booking_date >= since,
                 BankTransaction.amount < 0,
             )
         )
-        .order_by(BankTransaction.booking_date.desc())
-        .limit(100)
+        .order_by(BankTransaction.booking_date)
     )
-    txs = result.scalars().all()
+    payments = [
+        PaymentRecord(
+            id=row.id,
+            booking_date=row.booking_date,
+            amount_cents=abs(int(round(row.amount * 100))),
+            payee=row.counterparty_name or (row.description or "")[:30],
+        )
+        for row in result.all()
+    ]
 
-    seen: dict[str, list[BankTransaction]] = {}
-    for tx in txs:
-        key = (tx.counterparty_name or tx.description[:30] or "onbekend").lower()
-        seen.setdefault(key, []).append(tx)
+    # Payments that are already tracked as a commitment are not suggested again
+    commitments = (await db.execute(
+        select(FinancialCommitment).where(FinancialCommitment.administration_id == administration.id)
+    )).scalars().all()
+    tracked = build_commitment_index(commitments)
 
     suggestions = []
-    for transactions in seen.values():
-        if len(transactions) < 2:
+    for recurring in detect_recurring_payments(payments, today):
+        if tracked.search(recurring.latest.payee, min_score=0.8):
             continue
-        avg = int(abs(sum(int(tx.amount * 100) for tx in transactions) / len(transactions)))
+        latest = recurring.latest
         suggestions.append(
-            {
-                "bank_transaction_id": transactions[0].id,
-                "booking_date": transactions[0].booking_date,
-                "amount_cents": avg,
-                "description": transactions[0].counterparty_name or transactions[0].description,
-                "confidence": min(0.95, 0.4 + (len(transactions) * 0.12)),
-            }
+            CommitmentSuggestion(
+                bank_transaction_id=latest.id,
+                booking_date=latest.booking_date,
+                amount_cents=recurring.amount_cents,
+                description=latest.payee,
+                confidence=recurring.confidence,
+                cadence=recurring.cadence,
+                occurrences=len(recurring.payments),
+                next_expected_date=recurring.next_expected_date,
+            )
         )
+        if len(suggestions) == 10:
+            break
 
-    return CommitmentSuggestionsResponse(suggestions=suggestions[:10])
+    return CommitmentSuggestionsResponse(suggestions=suggestions)
 
 
 @router.post("", response_model=CommitmentResponse, status_code=status.HTTP_201_CREATED)
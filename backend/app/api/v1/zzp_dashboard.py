@@ -23,7 +23,7 @@ from pydantic import BaseModel, Field
 from sqlalchemy import select, func, and_, extract
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.zzp import (
     ZZPInvoice, 
     ZZPExpense, 
@@ -211,7 +211,7 @@ def get_quarter_info(target_date: date) -> tuple[str, date, date, date]:
 )
 async def get_zzp_dashboard(
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> ZZPDashboardResponse:
     """Get aggregated dashboard data for the ZZP user."""
     require_zzp(current_user)
@@ -541,7 +541,7 @@ class DashboardActionsResponse(BaseModel):
 )
 async def get_zzp_dashboard_actions(
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> DashboardActionsResponse:
     """Get action items from the dashboard (lightweight standalone endpoint)."""
     require_zzp(current_user)
@@ -737,7 +737,7 @@ class MonthlyInvoicesResponse(BaseModel):
 )
 async def get_monthly_invoices(
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     period: str = Query(
         "last_6_months",
         description="Period to aggregate: this_month | last_6_months | this_year",
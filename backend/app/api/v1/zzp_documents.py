@@ -8,10 +8,9 @@ All queries are scoped by administration_id + user ownership.
 from datetime import date
 from decimal import Decimal
 from pathlib import Path
-from typing import Annotated, List, Optional
+from typing import Annotated, List, Optional, Tuple
 from uuid import UUID
 
-import aiofiles
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -29,6 +28,13 @@ from app.schemas.zzp import (
     ZZPDocTypeEnum,
     ZZPDocStatusEnum,
 )
+from app.services.documents.upload import (
+    StagedUpload,
+    UploadTooLarge,
+    discard_on_failure,
+    find_by_content_hash,
+    stage_upload,
+)
 from app.api.v1.deps import CurrentUser, require_zzp
 from app.api.v1.zzp_expenses import get_user_administration, calculate_vat_amount
 
@@ -44,7 +50,7 @@ ALLOWED_MIME_TYPES = {
 }
 
 
-def _doc_to_response(doc: ZZPDocument) -> ZZPDocumentResponse:
+def _doc_to_response(doc: ZZPDocument, is_duplicate: bool = False) -> ZZPDocumentResponse:
     return ZZPDocumentResponse(
         id=doc.id,
         administration_id=doc.administration_id,
@@ -60,6 +66,7 @@ def _doc_to_response(doc: ZZPDocument) -> ZZPDocumentResponse:
         doc_date=doc.doc_date,
         created_at=doc.created_at,
         updated_at=doc.updated_at,
+        is_duplicate=is_duplicate,
     )
 
 
@@ -94,8 +101,6 @@ async def upload_documents(
     require_zzp(current_user)
     administration = await get_user_administration(current_user.id, db)
 
-    created_docs: List[ZZPDocument] = []
-
     for file in files:
         content_type = file.content_type or ""
         if content_type not in ALLOWED_MIME_TYPES:
@@ -107,47 +112,63 @@ async def upload_documents(
                 },
             )
 
-        content = await file.read()
-        if len(content) > settings.MAX_UPLOAD_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "code": "FILE_TOO_LARGE",
-                    "message": f"Bestand te groot. Maximum: {settings.MAX_UPLOAD_SIZE // (1024 * 1024)}MB.",
-                },
-            )
-
-        original_filename = file.filename or "document"
-        ext = original_filename.rsplit(".", 1)[-1] if "." in original_filename else "bin"
-
-        # Create document record first to get an ID for storage path
-        doc = ZZPDocument(
-            administration_id=administration.id,
-            user_id=current_user.id,
-            filename=original_filename,
-            mime_type=content_type,
-            storage_ref="",  # Updated after save
-            doc_type=ZZPDocType.OVERIG,
-            status=ZZPDocStatus.NEW,
+    # Stream every file to disk (size-checked and hashed) before creating records
+    staged: List[StagedUpload] = []
+    try:
+        for file in files:
+            staged.append(await stage_upload(file))
+    except UploadTooLarge:
+        for upload in staged:
+            upload.discard()
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "FILE_TOO_LARGE",
+                "message": f"Bestand te groot. Maximum: {settings.MAX_UPLOAD_SIZE // (1024 * 1024)}MB.",
+            },
         )
-        db.add(doc)
-        await db.flush()  # Get doc.id without committing
 
-        # Save file
-        storage_dir = Path(settings.UPLOAD_DIR) / "zzp" / str(administration.id) / str(doc.id)
-        storage_dir.mkdir(parents=True, exist_ok=True)
-        storage_path = storage_dir / f"original.{ext}"
-        async with aiofiles.open(storage_path, "wb") as f:
-            await f.write(content)
+    uploaded: List[Tuple[ZZPDocument, bool]] = []
+    with discard_on_failure(staged):
+        for upload in staged:
+            # Same file uploaded before: return the existing document
+            existing = await find_by_content_hash(
+                db, ZZPDocument, administration.id, upload.sha256,
+                exclude_statuses=(ZZPDocStatus.FAILED,),
+            )
+            if existing:
+                upload.discard()
+                uploaded.append((existing, True))
+                continue
+
+            # Create document record first to get an ID for storage path
+            doc = ZZPDocument(
+                administration_id=administration.id,
+                user_id=current_user.id,
+                filename=upload.filename,
+                mime_type=upload.content_type,
+                storage_ref="",  # Updated after save
+                content_sha256=upload.sha256,
+                doc_type=ZZPDocType.OVERIG,
+                status=ZZPDocStatus.NEW,
+            )
+            db.add(doc)
+            await db.flush()  # Get doc.id without committing
+
+            storage_path = upload.promote(
+                Path(settings.UPLOAD_DIR) / "zzp" / str(administration.id) / str(doc.id) / f"original.{upload.extension}"
+            )
+            doc.storage_ref = str(storage_path)
+            uploaded.append((doc, False))
 
-        doc.storage_ref = str(storage_path)
-        created_docs.append(doc)
+        await db.commit()
 
-    await db.commit()
-    for doc in created_docs:
+    for doc, _ in uploaded:
         await db.refresh(doc)
 
-    return ZZPDocumentUploadResponse(documents=[_doc_to_response(d) for d in created_docs])
+    return ZZPDocumentUploadResponse(
+        documents=[_doc_to_response(doc, is_duplicate) for doc, is_duplicate in uploaded]
+    )
 
 
 @router.get("/documents", response_model=List[ZZPDocumentResponse])
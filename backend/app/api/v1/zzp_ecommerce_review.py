@@ -41,6 +41,7 @@ from app.schemas.ecommerce import (
     BulkMappingActionResponse,
     GenerateMappingsResponse,
 )
+from app.services import ecommerce_mapping
 from app.services.subscription_service import subscription_service
 
 logger = logging.getLogger(__name__)
@@ -134,27 +135,6 @@ def _mapping_to_response(m: EcommerceMapping, order: Optional[EcommerceOrder] =
     )
 
 
-def _compute_vat(tax_cents: int, subtotal_cents: int) -> tuple[Optional[Decimal], str]:
-    """
-    Attempt to infer Dutch VAT rate from tax/subtotal ratio.
-    Returns (vat_rate, vat_status).
-    """
-    if subtotal_cents <= 0 or tax_cents <= 0:
-        return None, "unknown"
-
-    ratio = tax_cents / subtotal_cents
-    # Dutch VAT: 21% (standard) or 9% (reduced)
-    if 0.20 <= ratio <= 0.22:
-        return Decimal("21.00"), "auto"
-    elif 0.08 <= ratio <= 0.10:
-        return Decimal("9.00"), "auto"
-    elif ratio < 0.01:
-        return Decimal("0.00"), "auto"
-    else:
-        # Mixed or non-standard: flag for manual review
-        return None, "needs_review"
-
-
 async def _write_audit_log(
     db: AsyncSession,
     administration_id: UUID,
@@ -199,116 +179,14 @@ async def generate_mappings(
     """
     administration = await _require_pro_plan(current_user, db)
 
-    # Build connection filter
-    conn_filter = [EcommerceConnection.administration_id == administration.id]
-    if connection_id:
-        conn_filter.append(EcommerceConnection.id == connection_id)
-
-    connections_result = await db.execute(
-        select(EcommerceConnection).where(*conn_filter)
-    )
-    connections = connections_result.scalars().all()
-
-    created = 0
-    skipped = 0
-    total_orders = 0
-    total_refunds = 0
-
-    for conn in connections:
-        # Orders
-        orders_result = await db.execute(
-            select(EcommerceOrder).where(EcommerceOrder.connection_id == conn.id)
-        )
-        orders = orders_result.scalars().all()
-        total_orders += len(orders)
-
-        for order in orders:
-            # Check if mapping already exists
-            existing = (await db.execute(
-                select(EcommerceMapping.id).where(EcommerceMapping.order_id == order.id)
-            )).scalar_one_or_none()
-
-            if existing:
-                skipped += 1
-                continue
-
-            # Compute initial VAT from source data
-            vat_rate, vat_status = _compute_vat(order.tax_cents, order.subtotal_cents)
-
-            # Determine initial review status
-            review_status = MappingReviewStatus.NEW
-            if vat_status == "needs_review":
-                review_status = MappingReviewStatus.NEEDS_REVIEW
-
-            mapping = EcommerceMapping(
-                administration_id=administration.id,
-                connection_id=conn.id,
-                order_id=order.id,
-                record_type="order",
-                review_status=review_status,
-                provider=conn.provider.value,
-                external_ref=order.external_order_number or order.external_order_id,
-                revenue_cents=order.subtotal_cents,
-                tax_cents=order.tax_cents,
-                shipping_cents=order.shipping_cents,
-                discount_cents=order.discount_cents,
-                refund_cents=0,
-                net_amount_cents=order.total_amount_cents,
-                vat_rate=vat_rate,
-                vat_amount_cents=order.tax_cents,
-                vat_status=vat_status,
-                currency=order.currency,
-                accounting_date=order.ordered_at.date() if order.ordered_at else None,
-            )
-            db.add(mapping)
-            created += 1
-
-        # Refunds
-        refunds_result = await db.execute(
-            select(EcommerceRefund).where(EcommerceRefund.connection_id == conn.id)
-        )
-        refunds = refunds_result.scalars().all()
-        total_refunds += len(refunds)
-
-        for refund in refunds:
-            existing = (await db.execute(
-                select(EcommerceMapping.id).where(EcommerceMapping.refund_id == refund.id)
-            )).scalar_one_or_none()
-
-            if existing:
-                skipped += 1
-                continue
-
-            mapping = EcommerceMapping(
-                administration_id=administration.id,
-                connection_id=conn.id,
-                refund_id=refund.id,
-                record_type="refund",
-                review_status=MappingReviewStatus.NEW,
-                provider=conn.provider.value,
-                external_ref=refund.external_order_id or refund.external_refund_id,
-                revenue_cents=0,
-                tax_cents=0,
-                shipping_cents=0,
-                discount_cents=0,
-                refund_cents=refund.amount_cents,
-                net_amount_cents=-refund.amount_cents,
-                vat_rate=None,
-                vat_amount_cents=0,
-                vat_status="unknown",
-                currency=refund.currency,
-                accounting_date=refund.refunded_at.date() if refund.refunded_at else None,
-            )
-            db.add(mapping)
-            created += 1
-
+    result = await ecommerce_mapping.generate_mappings(db, administration.id, connection_id)
     await db.commit()
 
     return GenerateMappingsResponse(
-        created=created,
-        skipped_existing=skipped,
-        total_orders=total_orders,
-        total_refunds=total_refunds,
+        created=result.created,
+        skipped_existing=result.skipped_existing,
+        total_orders=result.total_orders,
+        total_refunds=result.total_refunds,
     )
 
 
@@ -13,15 +13,16 @@ Metrics provided per year:
 - Preparation checklist state
 - Validation warnings for incomplete bookkeeping
 """
+from dataclasses import dataclass, field
 from datetime import datetime, date, timezone
 from decimal import Decimal
 import logging
-from typing import Annotated, List, Optional
+from typing import Annotated, Dict, List, Optional, Tuple
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
-from sqlalchemy import select, func, and_
+from sqlalchemy import Integer, Numeric, case, cast, extract, func, literal, or_, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
@@ -33,6 +34,7 @@ from app.models.zzp import (
     InvoiceStatus,
 )
 from app.models.administration import Administration, AdministrationMember
+from app.services.income_tax_cache import year_overview_cache
 from app.api.v1.deps import CurrentUser, require_zzp
 
 router = APIRouter()
@@ -127,6 +129,12 @@ class IncomeTaxResponse(BaseModel):
     btw_number: Optional[str] = None
 
 
+class IncomeTaxYearsResponse(BaseModel):
+    """Overviews for several years at once (year picker)."""
+    overviews: List[IncomeTaxYearOverview] = Field(default_factory=list)
+    available_years: List[int] = Field(default_factory=list)
+
+
 # ============================================================================
 # Category label mapping
 # ============================================================================
@@ -174,6 +182,146 @@ async def get_user_administration(user_id: UUID, db: AsyncSession) -> Administra
     return administration
 
 
+def get_available_years(today: date) -> List[int]:
+    """Current year and up to 4 previous (not before 2021)."""
+    return list(range(today.year, max(today.year - 5, 2020), -1))
+
+
+@dataclass
+class YearAggregates:
+    """Grouped invoice, expense and hours totals for one year."""
+    # status -> (count, subtotal_cents)
+    invoices_by_status: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    # category -> (count, amount_cents, count without receipt)
+    expenses_by_category: Dict[str, Tuple[int, int, int]] = field(default_factory=dict)
+    hours: Decimal = Decimal("0")
+
+    def invoices(self, *statuses: str) -> Tuple[int, int]:
+        """Combined (count, subtotal_cents) of invoices in the given statuses."""
+        rows = [self.invoices_by_status.get(s, (0, 0)) for s in statuses]
+        return sum(r[0] for r in rows), sum(r[1] for r in rows)
+
+
+def _year_of(column):
+    return cast(extract("year", column), Integer)
+
+
+async def fetch_year_aggregates(
+    admin_id: UUID,
+    years: List[int],
+    db: AsyncSession,
+) -> Dict[int, YearAggregates]:
+    """
+    Load invoice totals per status, expense totals per category and logged
+    hours for the given years in a single round trip.
+    """
+    aggregates = {year: YearAggregates() for year in years}
+    if not years:
+        return aggregates
+    range_start = date(min(years), 1, 1)
+    range_end = date(max(years), 12, 31)
+
+    invoice_year = _year_of(ZZPInvoice.issue_date)
+    invoices = (
+        select(
+            literal("invoice").label("kind"),
+            invoice_year.label("year"),
+            ZZPInvoice.status.label("bucket"),
+            func.count().label("n"),
+            cast(func.coalesce(func.sum(ZZPInvoice.subtotal_cents), 0), Numeric(18, 2)).label("total"),
+            literal(0).label("missing"),
+        )
+        .where(
+            ZZPInvoice.administration_id == admin_id,
+            ZZPInvoice.issue_date >= range_start,
+            ZZPInvoice.issue_date <= range_end,
+        )
+        .group_by(invoice_year, ZZPInvoice.status)
+    )
+
+    expense_year = _year_of(ZZPExpense.expense_date)
+    expense_category = func.coalesce(ZZPExpense.category, "overig")
+    no_receipt = or_(ZZPExpense.attachment_url.is_(None), ZZPExpense.attachment_url == "")
+    expenses = (
+        select(
+            literal("expense").label("kind"),
+            expense_year.label("year"),
+            expense_category.label("bucket"),
+            func.count().label("n"),
+            cast(func.coalesce(func.sum(ZZPExpense.amount_cents), 0), Numeric(18, 2)).label("total"),
+            func.coalesce(func.sum(case((no_receipt, 1), else_=0)), 0).label("missing"),
+        )
+        .where(
+            ZZPExpense.administration_id == admin_id,
+            ZZPExpense.expense_date >= range_start,
+            ZZPExpense.expense_date <= range_end,
+        )
+        .group_by(expense_year, expense_category)
+    )
+
+    hours_year = _year_of(ZZPTimeEntry.entry_date)
+    hours = (
+        select(
+            literal("hours").label("kind"),
+            hours_year.label("year"),
+            literal("").label("bucket"),
+            func.count().label("n"),
+            cast(func.coalesce(func.sum(ZZPTimeEntry.hours), 0), Numeric(18, 2)).label("total"),
+            literal(0).label("missing"),
+        )
+        .where(
+            ZZPTimeEntry.administration_id == admin_id,
+            ZZPTimeEntry.entry_date >= range_start,
+            ZZPTimeEntry.entry_date <= range_end,
+        )
+        .group_by(hours_year)
+    )
+
+    result = await db.execute(union_all(invoices, expenses, hours))
+    for kind, year, bucket, n, total, missing in result.all():
+        agg = aggregates.get(int(year))
+        if agg is None:
+            continue  # Year inside the range but not requested
+        total = Decimal(str(total or 0))
+        if kind == "invoice":
+            agg.invoices_by_status[bucket] = (n, int(total))
+        elif kind == "expense":
+            agg.expenses_by_category[bucket] = (n, int(total), int(missing or 0))
+        else:
+            agg.hours = total
+    return aggregates
+
+
+async def build_year_overviews(
+    admin_id: UUID,
+    years: List[int],
+    today: date,
+    db: AsyncSession,
+) -> Dict[int, IncomeTaxYearOverview]:
+    """
+    Build overviews for several years, serving cached years from memory and
+    computing the rest with one aggregate query.
+    """
+    overviews: Dict[int, IncomeTaxYearOverview] = {}
+    missing: List[int] = []
+    for year in dict.fromkeys(years):
+        cached = year_overview_cache.get(admin_id, year)
+        if cached is not None:
+            overviews[year] = cached
+        else:
+            missing.append(year)
+
+    if missing:
+        generation = year_overview_cache.generation(admin_id)
+        aggregates = await fetch_year_aggregates(admin_id, missing, db)
+        for year in missing:
+            overview = overview_from_aggregates(year, aggregates[year])
+            year_overview_cache.set(admin_id, year, overview, generation)
+            overviews[year] = overview
+
+    return {year: overviews[year] for year in dict.fromkeys(years)}
+
+
 async def build_year_overview(
     admin_id: UUID,
     year: int,
@@ -181,6 +329,12 @@ async def build_year_overview(
     db: AsyncSession,
 ) -> IncomeTaxYearOverview:
     """Build an annual income-tax preparation overview."""
+    overviews = await build_year_overviews(admin_id, [year], today, db)
+    return overviews[year]
+
+
+def overview_from_aggregates(year: int, aggregates: YearAggregates) -> IncomeTaxYearOverview:
+    """Turn a year's aggregates into the overview with warnings and checklist."""
     year_start = date(year, 1, 1)
     year_end = date(year, 12, 31)
     # Standard IB filing deadline is 1 May of the following year
@@ -194,76 +348,34 @@ async def build_year_overview(
     # ------------------------------------------------------------------
     # 1. Invoices for this year
     # ------------------------------------------------------------------
-    invoice_result = await db.execute(
-        select(ZZPInvoice).where(ZZPInvoice.administration_id == admin_id)
-    )
-    all_invoices = invoice_result.scalars().all()
-
-    year_invoices = []
-    for inv in all_invoices:
-        inv_date = inv.invoice_date if hasattr(inv, "invoice_date") and inv.invoice_date else (
-            inv.issue_date if inv.issue_date else (
-                inv.created_at.date() if inv.created_at else None
-            )
-        )
-        if inv_date and year_start <= inv_date <= year_end:
-            year_invoices.append(inv)
-
-    paid_invoices = [i for i in year_invoices if i.status == InvoiceStatus.PAID.value]
-    sent_invoices = [
-        i for i in year_invoices
-        if i.status in (InvoiceStatus.SENT.value, InvoiceStatus.OVERDUE.value)
-    ]
-    draft_invoices = [i for i in year_invoices if i.status == InvoiceStatus.DRAFT.value]
-
-    total_omzet = sum(i.subtotal_cents or 0 for i in paid_invoices)
+    invoice_count = sum(n for n, _ in aggregates.invoices_by_status.values())
+    paid_count, total_omzet = aggregates.invoices(InvoiceStatus.PAID.value)
+    sent_count, unpaid_total = aggregates.invoices(InvoiceStatus.SENT.value, InvoiceStatus.OVERDUE.value)
+    draft_count, _ = aggregates.invoices(InvoiceStatus.DRAFT.value)
 
     # ------------------------------------------------------------------
     # 2. Expenses for this year
     # ------------------------------------------------------------------
-    expense_result = await db.execute(
-        select(ZZPExpense).where(
-            ZZPExpense.administration_id == admin_id,
-            ZZPExpense.expense_date >= year_start,
-            ZZPExpense.expense_date <= year_end,
-        )
-    )
-    year_expenses = expense_result.scalars().all()
-
-    total_kosten = sum(e.amount_cents or 0 for e in year_expenses)
+    expense_count = sum(n for n, _, _ in aggregates.expenses_by_category.values())
+    total_kosten = sum(amount for _, amount, _ in aggregates.expenses_by_category.values())
+    no_receipt_count = sum(m for _, _, m in aggregates.expenses_by_category.values())
     winst = total_omzet - total_kosten
 
     # Build cost breakdown by category
-    category_buckets: dict = {}
-    for exp in year_expenses:
-        cat = exp.category or "overig"
-        if cat not in category_buckets:
-            category_buckets[cat] = {"amount": 0, "count": 0}
-        category_buckets[cat]["amount"] += exp.amount_cents or 0
-        category_buckets[cat]["count"] += 1
-
     cost_breakdown = []
-    for cat in sorted(category_buckets.keys()):
-        bucket = category_buckets[cat]
+    for cat in sorted(aggregates.expenses_by_category.keys()):
+        count, amount, _ = aggregates.expenses_by_category[cat]
         cost_breakdown.append(IncomeTaxCostBreakdown(
             category=cat,
             label=CATEGORY_LABELS.get(cat, cat.capitalize()),
-            amount_cents=bucket["amount"],
-            count=bucket["count"],
+            amount_cents=amount,
+            count=count,
         ))
 
     # ------------------------------------------------------------------
     # 3. Hours indicator (urencriterium — soft, non-binding)
     # ------------------------------------------------------------------
-    hours_result = await db.execute(
-        select(func.coalesce(func.sum(ZZPTimeEntry.hours), 0)).where(
-            ZZPTimeEntry.administration_id == admin_id,
-            ZZPTimeEntry.entry_date >= year_start,
-            ZZPTimeEntry.entry_date <= year_end,
-        )
-    )
-    total_hours_dec = hours_result.scalar() or Decimal("0")
-    total_hours = float(total_hours_dec)
+    total_hours = float(aggregates.hours)
     hours_data_available = total_hours > 0
 
     target_hours = 1225
@@ -298,7 +410,7 @@ async def build_year_overview(
     # ------------------------------------------------------------------
     # 4. Validation warnings
     # ------------------------------------------------------------------
-    if len(year_invoices) == 0:
+    if invoice_count == 0:
         warning_id += 1
         warnings.append(IncomeTaxWarning(
             id=f"IB{warning_id:03d}",
@@ -309,24 +421,23 @@ async def build_year_overview(
             related_route="/zzp/invoices",
         ))
 
-    if len(draft_invoices) > 0:
+    if draft_count > 0:
         warning_id += 1
         warnings.append(IncomeTaxWarning(
             id=f"IB{warning_id:03d}",
             severity="info",
-            title=f"{len(draft_invoices)} conceptfactuur{'en' if len(draft_invoices) != 1 else ''} niet meegeteld",
+            title=f"{draft_count} conceptfactuur{'en' if draft_count != 1 else ''} niet meegeteld",
             description="Conceptfacturen worden niet meegenomen in de omzetberekening. Verstuur of verwijder ze voor een compleet overzicht.",
             action_hint="Ga naar Facturen om concepten te bekijken.",
             related_route="/zzp/invoices?status=draft",
         ))
 
-    if len(sent_invoices) > 0:
-        unpaid_total = sum(i.subtotal_cents or 0 for i in sent_invoices)
+    if sent_count > 0:
         warning_id += 1
         warnings.append(IncomeTaxWarning(
             id=f"IB{warning_id:03d}",
             severity="warning",
-            title=f"{len(sent_invoices)} factuur{'en' if len(sent_invoices) != 1 else ''} nog niet betaald",
+            title=f"{sent_count} factuur{'en' if sent_count != 1 else ''} nog niet betaald",
             description=(
                 f"Er staat nog €{unpaid_total / 100:,.2f} open op verstuurde facturen. "
                 "Controleer of deze nog betaald worden voor het einde van het jaar."
@@ -335,7 +446,7 @@ async def build_year_overview(
             related_route="/zzp/invoices?status=sent",
         ))
 
-    if len(year_expenses) == 0:
+    if expense_count == 0:
         warning_id += 1
         warnings.append(IncomeTaxWarning(
             id=f"IB{warning_id:03d}",
@@ -346,16 +457,12 @@ async def build_year_overview(
             related_route="/zzp/expenses",
         ))
 
-    expenses_no_receipt = [
-        e for e in year_expenses
-        if not e.attachment_url
-    ]
-    if len(expenses_no_receipt) > 0:
+    if no_receipt_count > 0:
         warning_id += 1
         warnings.append(IncomeTaxWarning(
             id=f"IB{warning_id:03d}",
             severity="info",
-            title=f"{len(expenses_no_receipt)} uitgave{'n' if len(expenses_no_receipt) != 1 else ''} zonder bon",
+            title=f"{no_receipt_count} uitgave{'n' if no_receipt_count != 1 else ''} zonder bon",
             description="Sommige uitgaven hebben geen bijlage (bon/factuur). Bewaar je bonnen voor de administratieplicht.",
             action_hint="Voeg bonnen toe aan je uitgaven.",
             related_route="/zzp/expenses",
@@ -364,7 +471,7 @@ async def build_year_overview(
     # ------------------------------------------------------------------
     # 5. Preparation checklist
     # ------------------------------------------------------------------
-    all_invoices_entered = len(year_invoices) > 0
+    all_invoices_entered = invoice_count > 0
     checklist.append(IncomeTaxChecklistItem(
         id="invoices",
         label="Alle facturen ingevoerd",
@@ -373,7 +480,7 @@ async def build_year_overview(
         hint="Controleer of alle facturen van het jaar zijn ingevoerd." if not all_invoices_entered else None,
     ))
 
-    all_expenses_entered = len(year_expenses) > 0
+    all_expenses_entered = expense_count > 0
     checklist.append(IncomeTaxChecklistItem(
         id="expenses",
         label="Alle uitgaven verwerkt",
@@ -382,7 +489,7 @@ async def build_year_overview(
         hint="Voeg zakelijke uitgaven toe voor een compleet overzicht." if not all_expenses_entered else None,
     ))
 
-    no_drafts = len(draft_invoices) == 0
+    no_drafts = draft_count == 0
     checklist.append(IncomeTaxChecklistItem(
         id="no_drafts",
         label="Geen conceptfacturen meer open",
@@ -391,7 +498,7 @@ async def build_year_overview(
         hint="Verstuur of verwijder conceptfacturen." if not no_drafts else None,
     ))
 
-    all_paid = len(sent_invoices) == 0
+    all_paid = sent_count == 0
     checklist.append(IncomeTaxChecklistItem(
         id="all_paid",
         label="Alle facturen betaald of afgeboekt",
@@ -400,7 +507,7 @@ async def build_year_overview(
         hint="Werk de betaalstatus bij van openstaande facturen." if not all_paid else None,
     ))
 
-    has_receipts = len(expenses_no_receipt) == 0 or len(year_expenses) == 0
+    has_receipts = no_receipt_count == 0 or expense_count == 0
     checklist.append(IncomeTaxChecklistItem(
         id="receipts",
         label="Bonnen bij alle uitgaven bewaard",
@@ -434,7 +541,7 @@ async def build_year_overview(
         is_complete = False
         completeness_notes.append("Er zijn fouten die eerst opgelost moeten worden.")
 
-    if len(draft_invoices) > 0:
+    if draft_count > 0:
         completeness_notes.append("Let op: conceptfacturen zijn niet meegeteld in de omzet.")
 
     if is_complete and not completeness_notes:
@@ -448,11 +555,11 @@ async def build_year_overview(
         omzet_cents=total_omzet,
         kosten_cents=total_kosten,
         winst_cents=winst,
-        invoice_count=len(year_invoices),
-        paid_invoice_count=len(paid_invoices),
-        draft_invoice_count=len(draft_invoices),
-        unpaid_invoice_count=len(sent_invoices),
-        expense_count=len(year_expenses),
+        invoice_count=invoice_count,
+        paid_invoice_count=paid_count,
+        draft_invoice_count=draft_count,
+        unpaid_invoice_count=sent_count,
+        expense_count=expense_count,
         cost_breakdown=cost_breakdown,
         hours_indicator=hours_indicator,
         warnings=warnings,
@@ -523,8 +630,7 @@ async def get_zzp_income_tax(
             )],
         )
 
-    # Determine available years (current year and up to 4 previous)
-    available_years = list(range(today.year, max(today.year - 5, 2020), -1))
+    available_years = get_available_years(today)
 
     # Get business profile
     profile_result = await db.execute(
@@ -552,3 +658,39 @@ async def get_zzp_income_tax(
         kvk_number=kvk_number,
         btw_number=btw_number,
     )
+
+
+@router.get(
+    "/income-tax/years",
+    response_model=IncomeTaxYearsResponse,
+    summary="Get ZZP Inkomstenbelasting overviews for several years",
+    description="""
+    Returns the annual overview for each requested year (defaults to all
+    available years), computed with a single aggregate query for the years
+    that are not cached yet.
+    """,
+)
+async def get_zzp_income_tax_years(
+    current_user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    years: Optional[List[int]] = Query(None, description="Years to include (defaults to available years)"),
+) -> IncomeTaxYearsResponse:
+    """Get Inkomstenbelasting overviews for several years."""
+    require_zzp(current_user)
+
+    administration = await get_user_administration(current_user.id, db)
+    today = date.today()
+    available_years = get_available_years(today)
+
+    target_years = years or available_years
+    if len(target_years) > 10 or any(y < 2000 or y > today.year + 1 for y in target_years):
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "INVALID_YEARS", "message": "Kies maximaal 10 geldige jaren."},
+        )
+
+    overviews = await build_year_overviews(administration.id, target_years, today, db)
+    return IncomeTaxYearsResponse(
+        overviews=list(overviews.values()),
+        available_years=available_years,
+    )
@@ -21,7 +21,7 @@ from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import decode_token
 from app.services.invoice_pdf import generate_invoice_pdf, get_invoice_pdf_filename
-from app.services.invoice_pdf_reportlab import generate_invoice_pdf_reportlab
+from app.core.startup import lazy_module
 from app.services.email import email_service
 from app.models.zzp import (
     ZZPInvoice, 
@@ -54,6 +54,9 @@ from app.services.ledger_service import LedgerPostingService, LedgerPostingError
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# ReportLab is only imported when the first PDF is rendered
+invoice_pdf_reportlab = lazy_module("app.services.invoice_pdf_reportlab")
+
 
 
 @router.get("/invoices", response_model=InvoiceListResponse)
@@ -613,7 +616,7 @@ async def get_invoice_pdf(
 
     try:
         # Try ReportLab first (pure Python, Docker-safe, no system dependencies)
-        pdf_bytes = generate_invoice_pdf_reportlab(invoice)
+        pdf_bytes = invoice_pdf_reportlab.generate_invoice_pdf_reportlab(invoice)
         filename = get_invoice_pdf_filename(invoice)
 
     except Exception as reportlab_error:
@@ -717,7 +720,7 @@ async def send_invoice(
     
     # Generate PDF
     try:
-        pdf_bytes = generate_invoice_pdf_reportlab(invoice)
+        pdf_bytes = invoice_pdf_reportlab.generate_invoice_pdf_reportlab(invoice)
         filename = get_invoice_pdf_filename(invoice)
     except Exception as pdf_error:
         logger.error(f"Failed to generate PDF for invoice {invoice_id}: {pdf_error}")
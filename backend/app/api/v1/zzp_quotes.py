@@ -15,6 +15,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
+from app.core.startup import lazy_module
 from app.models.zzp import (
     ZZPQuote, 
     ZZPQuoteLine, 
@@ -38,10 +39,12 @@ from app.schemas.zzp import (
     QuoteConvertToInvoiceResponse,
 )
 from app.api.v1.deps import CurrentUser, require_zzp
-from app.services.invoice_pdf_reportlab import generate_quote_pdf_reportlab, get_quote_pdf_filename
 
 router = APIRouter()
 
+# ReportLab is only imported when the first PDF is rendered
+invoice_pdf_reportlab = lazy_module("app.services.invoice_pdf_reportlab")
+
 
 async def get_user_administration(user_id: UUID, db: AsyncSession) -> Administration:
     """Get the primary administration for a ZZP user."""
@@ -770,8 +773,8 @@ async def get_quote_pdf(
             detail={"code": "QUOTE_NOT_FOUND", "message": "Offerte niet gevonden."}
         )
 
-    pdf_bytes = generate_quote_pdf_reportlab(quote)
-    filename = get_quote_pdf_filename(quote)
+    pdf_bytes = invoice_pdf_reportlab.generate_quote_pdf_reportlab(quote)
+    filename = invoice_pdf_reportlab.get_quote_pdf_filename(quote)
 
     disposition = "attachment" if download else "inline"
     return Response(
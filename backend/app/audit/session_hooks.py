@@ -5,7 +5,7 @@ This module provides session event hooks to automatically log changes to entitie
 when they are created, updated, or deleted.
 """
 import logging
-from typing import Dict, Type, Any, Optional
+from typing import Dict, List, Type, Any, Optional
 from uuid import UUID
 from decimal import Decimal
 
@@ -363,6 +363,52 @@ def handle_after_flush(session: Session, flush_context) -> None:
             )
 
 
+def build_bulk_create_audit_rows(model_class: Type, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Build "create" audit log rows for records written with a bulk INSERT.
+    
+    Bulk inserts bypass the unit of work, so handle_after_flush never sees
+    them. Callers insert the returned rows in the same transaction to keep
+    the audit trail complete. Returns an empty list when the model is not
+    tracked or the audit hooks are not registered.
+    
+    Args:
+        model_class: The SQLAlchemy model class of the inserted rows
+        rows: Column values of the inserted rows (including ``id``)
+        
+    Returns:
+        List of AuditLog column dicts
+    """
+    entity_type = get_entity_type(model_class)
+    if entity_type is None or not event.contains(Session, "after_flush", handle_after_flush):
+        return []
+    
+    from app.audit.audit_logger import sanitize_payload
+    
+    context = get_audit_context()
+    if context is None:
+        from app.audit.context import AuditContext
+        context = AuditContext.create_empty()
+    
+    audit_rows = []
+    for row in rows:
+        client_id = row.get("administration_id") or context.client_id
+        if client_id is None or row.get("id") is None:
+            continue
+        audit_rows.append({
+            "client_id": client_id,
+            "entity_type": entity_type,
+            "entity_id": row["id"],
+            "action": "create",
+            "user_id": context.user_id,
+            "user_role": context.user_role,
+            "old_value": None,
+            "new_value": sanitize_payload({key: _serialize_value(value) for key, value in row.items()}),
+            "ip_address": context.ip_address,
+        })
+    return audit_rows
+
+
 def register_audit_hooks(session_factory) -> None:
     """
     Register audit logging hooks on the session factory.
@@ -73,6 +73,25 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "postgresql+asyncpg://accounting_user:change_me@db:5432/accounting_db"
     DATABASE_URL_SYNC: str = "postgresql://accounting_user:change_me@db:5432/accounting_db"
     
+    # Connection pool (ignored for SQLite URLs)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: int = 30  # Wait for a free connection before raising
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Recycle connections older than this
+    DB_POOL_PRE_PING: bool = True  # Detect connections dropped by the server/proxy
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # Default statement_timeout for primary connections (0 = server default)
+    
+    # Optional read replica used by get_read_db (reports, dashboards, listings)
+    DATABASE_READ_REPLICA_URL: Optional[str] = None
+    DB_READ_STATEMENT_TIMEOUT_MS: int = 30000  # statement_timeout applied to read-only sessions
+    DB_REPLICA_MAX_LAG_SECONDS: float = 30.0  # Fall back to the primary above this replay lag
+    DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 10.0  # How often replica lag is probed
+    
+    @property
+    def database_read_replica_enabled(self) -> bool:
+        """Check if a read replica is configured."""
+        return bool(self.DATABASE_READ_REPLICA_URL and self.DATABASE_READ_REPLICA_URL.strip())
+    
     # Redis (optional - set to None or empty string to disable)
     REDIS_URL: Optional[str] = None
     
@@ -85,6 +104,10 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change-me-in-production-use-openssl-rand-hex-32"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # bcrypt cost; lower-cost hashes are upgraded on login
+    PASSWORD_HASH_WORKERS: int = 2  # Threads dedicated to bcrypt (see core/security.py)
+    PASSWORD_HASH_MAX_PENDING: int = 32  # Queued + running hash jobs before auth endpoints return 503
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 5  # Retry-After header sent with the 503
     
     # Email (Resend)
     RESEND_API_KEY: Optional[str] = None
@@ -111,6 +134,24 @@ class Settings(BaseSettings):
         """Check if email sending is configured."""
         return bool(self.RESEND_API_KEY and self.RESEND_API_KEY.strip())
     
+    # Scheduled reminder dispatch (background loop, see services/reminder_dispatch.py)
+    REMINDER_DISPATCH_INTERVAL_SECONDS: int = 60  # How often due reminders are drained
+    REMINDER_DISPATCH_BATCH_SIZE: int = 200  # Reminders claimed (row-locked) per batch
+    REMINDER_DISPATCH_CONCURRENCY: int = 10  # Concurrent in-flight email sends
+    REMINDER_DISPATCH_LEASE_SECONDS: int = 600  # SENDING reminders are claimed again after this (crashed worker)
+    REMINDER_EMAIL_RATE_PER_SECOND: float = 10.0  # Send-rate cap towards Resend (0 = unlimited)
+    REMINDER_EMAIL_MAX_RETRIES: int = 3  # Retries for 429/5xx/network errors (exponential backoff)
+    
+    # Metrics (Prometheus exposition, see core/metrics.py)
+    METRICS_REFRESH_INTERVAL_SECONDS: int = 60  # Business gauges are recomputed this often and cached
+    METRICS_TOKEN: Optional[str] = None  # /ops/metrics/prometheus requires "Authorization: Bearer <token>"; unset disables it (404)
+    SLOW_REQUEST_THRESHOLD_MS: int = 1000  # Requests slower than this are logged with their top SQL statements
+    N_PLUS_ONE_THRESHOLD: int = 20  # Warn when one statement shape runs this often in a request/job (0 = off)
+    
+    # Financial reports (see services/reports/financial.py)
+    REPORT_USE_PERIOD_SNAPSHOTS: bool = True  # Start balances from the latest FINALIZED/LOCKED period snapshot
+    REPORT_SNAPSHOT_VERIFY: bool = False  # Also run the full aggregation, log differences and serve the full result
+    
     # Token expiry times (in hours)
     EMAIL_VERIFY_TOKEN_EXPIRE_HOURS: int = 24
     PASSWORD_RESET_TOKEN_EXPIRE_HOURS: int = 1
@@ -118,6 +159,7 @@ class Settings(BaseSettings):
     # File uploads
     UPLOAD_DIR: str = "/data/uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 256 * 1024  # Bytes read per chunk when streaming uploads to disk
     
     # CORS
     # Include production frontend URLs by default for ZZPersHub
@@ -148,6 +190,29 @@ class Settings(BaseSettings):
     DIGIPOORT_CLIENT_SECRET: Optional[str] = None  # Client secret for Digipoort
     DIGIPOORT_CERT_PATH: Optional[str] = None  # Path to client certificate (if required)
 
+    # XML signing of VAT/ICP submissions (see services/signing_keyring.py)
+    SIGNING_KEYRING_MAX_ENTRIES: int = 256  # Decrypted keys kept in memory (0 disables caching)
+    SIGNING_KEYRING_TTL_SECONDS: int = 900  # Keys are wiped this long after being loaded
+    SIGNING_WORKERS: int = 0  # Processes used by SigningService.sign_many (0 = CPU count, 1 = no pool)
+    SIGNING_PARALLEL_MIN_BATCH: int = 32  # Smaller batches are signed in-process
+
+    # Outbound integration HTTP clients (see integrations/http.py)
+    HTTP_CLIENT_HTTP2: bool = True  # Used when the h2 package is installed
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 20  # Pooled connections per upstream
+    HTTP_CLIENT_KEEPALIVE_SECONDS: float = 30.0  # Idle pooled connections are closed after this
+    HTTP_CLIENT_MAX_RETRIES: int = 3  # Retries for 429/5xx/connection errors
+    HTTP_CLIENT_BACKOFF_SECONDS: float = 0.5  # Base of the exponential backoff
+    HTTP_CLIENT_MAX_RETRY_AFTER_SECONDS: float = 30.0  # Longer Retry-After values are not waited for
+    GOCARDLESS_TOKEN_REFRESH_AHEAD_SECONDS: int = 300  # Refresh the cached access token this early
+
+    # Income-tax overview cache (see services/income_tax_cache.py)
+    INCOME_TAX_CACHE_TTL_SECONDS: int = 600  # Safety net; writes invalidate immediately (0 disables)
+    INCOME_TAX_CACHE_MAX_ENTRIES: int = 2048  # (administration, year) overviews kept in memory
+
+    # Closing checklist cache (see services/documents/checklist_cache.py)
+    CLOSING_CHECKLIST_CACHE_TTL_SECONDS: int = 300  # Safety net; writes invalidate immediately (0 disables)
+    CLOSING_CHECKLIST_CACHE_MAX_ENTRIES: int = 4096  # (administration, period) periods with issue counts kept in memory
+
     @field_validator("DIGIPOORT_ENABLED", "DIGIPOORT_SANDBOX_MODE", mode="before")
     @classmethod
     def _coerce_optional_bool(cls, value):
@@ -182,6 +247,13 @@ class Settings(BaseSettings):
     APP_PUBLIC_URL: Optional[str] = None  # Public URL for webhooks (e.g., https://yourdomain.com)
     MOLLIE_LOCALE: str = "nl_NL"  # BCP-47 locale sent to Mollie checkout; controls which payment
                                    # methods are shown. "nl_NL" makes iDEAL visible for Dutch users.
+
+    # Mollie webhook queue (see services/mollie_webhook_queue.py)
+    MOLLIE_WEBHOOK_DRAIN_INTERVAL_SECONDS: int = 30  # Background sweep for retries and events no request drained
+    MOLLIE_WEBHOOK_BATCH_SIZE: int = 100  # Events claimed per batch
+    MOLLIE_WEBHOOK_CONCURRENCY: int = 8  # Concurrent Mollie fetches / subscriptions processed at once
+    MOLLIE_WEBHOOK_MAX_ATTEMPTS: int = 5  # Events are marked FAILED after this many failed attempts
+    MOLLIE_WEBHOOK_LEASE_SECONDS: int = 300  # Claimed events are reclaimed after this (crashed consumer)
     
     @property
     def mollie_enabled(self) -> bool:
@@ -1,9 +1,18 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.dialects.postgresql import UUID as PostgreSQLUUID, JSONB, ARRAY
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 @compiles(PostgreSQLUUID, "sqlite")
 def compile_postgresql_uuid_for_sqlite(_type, _compiler, **_kwargs):
     """Allow PostgreSQL UUID columns to be created in SQLite test databases."""
@@ -21,10 +30,37 @@ def compile_postgresql_array_for_sqlite(_type, _compiler, **_kwargs):
     """Allow PostgreSQL ARRAY columns to be created in SQLite test databases."""
     return "JSON"
 
+
+def _engine_options(url: str, statement_timeout_ms: int) -> dict:
+    """
+    Build create_async_engine() keyword arguments for a database URL.
+
+    Pool sizing only applies to server databases (SQLite uses its own
+    single-connection pools). A default statement timeout is pushed to
+    PostgreSQL as a connection-level server setting so runaway queries are
+    cancelled server-side.
+    """
+    options = {"echo": settings.DEBUG, "future": True}
+    if url.startswith("sqlite"):
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if statement_timeout_ms and "asyncpg" in url:
+        options["connect_args"] = {
+            "server_settings": {"statement_timeout": str(statement_timeout_ms)},
+        }
+    return options
+
+
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
+    **_engine_options(settings.DATABASE_URL, settings.DB_STATEMENT_TIMEOUT_MS),
 )
 
 async_session_maker = async_sessionmaker(
@@ -33,14 +69,170 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Optional read replica for read-only endpoints (reports, dashboards, listings).
+# When DATABASE_READ_REPLICA_URL is unset, reads go to the primary.
+read_engine = (
+    create_async_engine(
+        settings.DATABASE_READ_REPLICA_URL,
+        **_engine_options(settings.DATABASE_READ_REPLICA_URL, settings.DB_READ_STATEMENT_TIMEOUT_MS),
+    )
+    if settings.database_read_replica_enabled
+    else None
+)
+
+read_session_maker = (
+    async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    if read_engine is not None
+    else None
+)
+
 
 class Base(DeclarativeBase):
     pass
 
 
+# Replay lag in seconds; 0 when the replica has replayed everything it received
+# (an idle primary otherwise makes pg_last_xact_replay_timestamp() look stale).
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaHealth:
+    """
+    Lag-aware routing decision for the read replica.
+
+    The replication lag is probed at most once per check interval; while the
+    replica lags more than DB_REPLICA_MAX_LAG_SECONDS (or cannot be reached)
+    reads fall back to the primary.
+    """
+
+    def __init__(self, max_lag_seconds: float, check_interval_seconds: float):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.last_lag_seconds: Optional[float] = None
+        self._healthy = True
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def _probe(self, replica_engine) -> Optional[float]:
+        try:
+            async with replica_engine.connect() as conn:
+                result = await conn.execute(REPLICA_LAG_QUERY)
+                return float(result.scalar() or 0)
+        except Exception as e:
+            logger.warning("Read replica lag probe failed, routing reads to primary: %s", e)
+            return None
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._checked_at is not None
+            and time.monotonic() - self._checked_at < self.check_interval_seconds
+        )
+
+    async def is_usable(self, replica_engine) -> bool:
+        if self._is_fresh():
+            return self._healthy
+        async with self._lock:
+            if self._is_fresh():
+                return self._healthy
+            lag = await self._probe(replica_engine)
+            self.last_lag_seconds = lag
+            healthy = lag is not None and lag <= self.max_lag_seconds
+            if healthy != self._healthy:
+                logger.warning(
+                    "Read replica %s (lag=%s s, max=%s s)",
+                    "back in rotation" if healthy else "lagging/unavailable - using primary",
+                    lag, self.max_lag_seconds,
+                )
+            self._healthy = healthy
+            self._checked_at = time.monotonic()
+            return healthy
+
+
+replica_health = ReplicaHealth(
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=settings.DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+)
+
+
+# Statement timeout each engine's connections already carry (asyncpg
+# server_settings, see _engine_options); sessions asking for the same value
+# need no SET at all.
+_engine_statement_timeouts = {
+    sync_engine: timeout_ms
+    for sync_engine, url, timeout_ms in (
+        (engine.sync_engine, settings.DATABASE_URL, settings.DB_STATEMENT_TIMEOUT_MS),
+        (read_engine and read_engine.sync_engine, settings.DATABASE_READ_REPLICA_URL, settings.DB_READ_STATEMENT_TIMEOUT_MS),
+    )
+    if sync_engine is not None and "asyncpg" in (url or "")
+}
+
+
+@event.listens_for(Session, "after_begin")
+def _set_local_statement_timeout(session, transaction, connection) -> None:
+    """
+    Apply a per-session statement timeout with SET LOCAL (PostgreSQL only).
+
+    SET LOCAL lasts until the transaction ends, so nothing has to be reset
+    before the connection goes back to the pool.
+    """
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms is not None and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
 async def get_db() -> AsyncSession:
     async with async_session_maker() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+@asynccontextmanager
+async def _routed_session(read_only: bool, timeout_ms: int):
+    """Open a session on the replica (when usable and read_only) or the primary."""
+    maker = async_session_maker
+    if read_only and read_engine is not None and await replica_health.is_usable(read_engine):
+        maker = read_session_maker
+
+    async with maker() as session:
+        # Only pay for SET LOCAL when the connection default differs
+        if timeout_ms != _engine_statement_timeouts.get(session.bind.sync_engine):
+            session.info["statement_timeout_ms"] = timeout_ms
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_read_db() -> AsyncSession:
+    """
+    Session for read-only endpoints (reports, dashboards, listings).
+
+    Routed to the read replica when one is configured and within the lag
+    budget, otherwise to the primary. Reads get DB_READ_STATEMENT_TIMEOUT_MS
+    so one heavy report cannot hold a connection indefinitely.
+
+    Never write through this session: replica transactions are read-only.
+    """
+    async with _routed_session(True, settings.DB_READ_STATEMENT_TIMEOUT_MS) as session:
+        yield session
+
+
+def db_with_statement_timeout(timeout_ms: int, read_only: bool = False):
+    """
+    Dependency factory for routes needing their own statement timeout.
+
+    Usage:
+        db: Annotated[AsyncSession, Depends(db_with_statement_timeout(60_000, read_only=True))]
+    """
+    async def dependency() -> AsyncSession:
+        async with _routed_session(read_only, timeout_ms) as session:
+            yield session
+
+    return dependency
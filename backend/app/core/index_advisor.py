@@ -0,0 +1,394 @@
+"""
+EXPLAIN-based index advisor for the ledger, bank and subledger hot paths.
+
+Runs the canonical hot queries (the statements issued by the report, VAT,
+bank reconciliation and AR/AP code paths) through the database's planner
+and flags sequential scans on the hot tables.
+
+PostgreSQL plans come from ``EXPLAIN (FORMAT JSON)``. SQLite
+(``EXPLAIN QUERY PLAN``) is supported so the test suite can check that the
+model indexes cover every hot query.
+
+The planner happily seq-scans tiny tables, so point the advisor at a
+database with realistic volumes. ``--seed`` fills a DISPOSABLE, migrated
+database with synthetic administrations first:
+
+    python -m app.core.index_advisor --database-url postgresql+asyncpg://... --seed 20000
+
+Exit status is 1 when any hot query plans a sequential scan on a hot table.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.sql import Select
+
+from app.models.accounting import ChartOfAccount, VatCode
+from app.models.administration import Administration
+from app.models.bank import BankAccount, BankTransaction, BankTransactionStatus
+from app.models.ledger import JournalEntry, JournalEntryStatus, JournalLine
+from app.models.subledger import OpenItem, OpenItemStatus, Party
+
+HOT_TABLES = frozenset({"journal_entries", "journal_lines", "bank_transactions", "open_items"})
+
+_PG_SEQ_SCAN_NODES = {"Seq Scan", "Parallel Seq Scan"}
+_PG_INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+@dataclass
+class HotQueryContext:
+    """Values the hot queries are parameterized with."""
+    administration_id: uuid.UUID
+    account_id: Optional[uuid.UUID] = None
+    as_of: date = field(default_factory=date.today)
+
+
+@dataclass
+class HotQuery:
+    name: str
+    description: str
+    build: Callable[[HotQueryContext], Optional[Select]]
+
+
+@dataclass
+class QueryPlan:
+    """Planner verdict for one hot query."""
+    name: str
+    indexes: List[str]
+    seq_scans: List[str]
+    plan: str
+
+    @property
+    def ok(self) -> bool:
+        return not self.seq_scans
+
+
+def _ledger_account_balances(ctx: HotQueryContext) -> Select:
+    # ReportService._aggregate_posted_lines
+    return (
+        select(
+            JournalLine.account_id,
+            func.sum(JournalLine.debit_amount),
+            func.sum(JournalLine.credit_amount),
+        )
+        .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
+        .where(JournalEntry.administration_id == ctx.administration_id)
+        .where(JournalEntry.status == JournalEntryStatus.POSTED)
+        .where(JournalEntry.entry_date <= ctx.as_of)
+        .group_by(JournalLine.account_id)
+    )
+
+
+def _ledger_account_detail(ctx: HotQueryContext) -> Optional[Select]:
+    if ctx.account_id is None:
+        return None
+    return (
+        select(JournalLine.debit_amount, JournalLine.credit_amount, JournalEntry.entry_date)
+        .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
+        .where(JournalLine.account_id == ctx.account_id)
+        .where(JournalEntry.status == JournalEntryStatus.POSTED)
+        .order_by(JournalEntry.entry_date)
+    )
+
+
+def _vat_period_lines(ctx: HotQueryContext) -> Select:
+    # VatReportService._get_vat_lines
+    return (
+        select(JournalLine.id, JournalLine.vat_code_id, JournalLine.vat_amount, JournalEntry.entry_date)
+        .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
+        .where(JournalEntry.administration_id == ctx.administration_id)
+        .where(JournalEntry.status == JournalEntryStatus.POSTED)
+        .where(JournalEntry.entry_date >= ctx.as_of - timedelta(days=90))
+        .where(JournalEntry.entry_date <= ctx.as_of)
+        .where(JournalLine.vat_code_id.isnot(None))
+        .order_by(JournalEntry.entry_date, JournalLine.line_number)
+    )
+
+
+def _bank_unmatched_recent(ctx: HotQueryContext) -> Select:
+    # accountant client overview: unmatched transactions of the last 30 days
+    return (
+        select(BankTransaction.id, BankTransaction.amount, BankTransaction.booking_date)
+        .where(BankTransaction.administration_id == ctx.administration_id)
+        .where(BankTransaction.status == BankTransactionStatus.NEW)
+        .where(BankTransaction.booking_date >= ctx.as_of - timedelta(days=30))
+        .order_by(BankTransaction.booking_date.desc())
+        .limit(10)
+    )
+
+
+def _bank_status_range(ctx: HotQueryContext) -> Select:
+    # bank transaction listings filtered by status and booking date
+    return (
+        select(BankTransaction.id, BankTransaction.amount)
+        .where(BankTransaction.administration_id == ctx.administration_id)
+        .where(BankTransaction.status == BankTransactionStatus.MATCHED)
+        .where(BankTransaction.booking_date >= ctx.as_of - timedelta(days=365))
+        .where(BankTransaction.booking_date <= ctx.as_of)
+        .order_by(BankTransaction.booking_date.desc())
+        .limit(50)
+    )
+
+
+def _bank_import_hash_lookup(ctx: HotQueryContext) -> Select:
+    # import deduplication (bank_reconciliation / gocardless)
+    return (
+        select(BankTransaction.import_hash)
+        .where(BankTransaction.administration_id == ctx.administration_id)
+        .where(BankTransaction.import_hash.in_([f"{i:064x}" for i in range(1, 6)]))
+    )
+
+
+def _open_receivables(ctx: HotQueryContext) -> Select:
+    # ReportService._get_subledger_report / overdue checks
+    return (
+        select(OpenItem.id, OpenItem.open_amount, OpenItem.due_date)
+        .where(OpenItem.administration_id == ctx.administration_id)
+        .where(OpenItem.item_type == "RECEIVABLE")
+        .where(OpenItem.status.in_([OpenItemStatus.OPEN, OpenItemStatus.PARTIAL]))
+        .order_by(OpenItem.due_date)
+    )
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery("ledger_account_balances", "Posted line totals per account (balance sheet, trial balance)", _ledger_account_balances),
+    HotQuery("ledger_account_detail", "Posted lines of one account (general ledger card)", _ledger_account_detail),
+    HotQuery("vat_period_lines", "VAT-coded lines of a period (BTW report)", _vat_period_lines),
+    HotQuery("bank_unmatched_recent", "Unmatched bank transactions of the last 30 days", _bank_unmatched_recent),
+    HotQuery("bank_status_range", "Bank transactions by status and booking date", _bank_status_range),
+    HotQuery("bank_import_hash_lookup", "Import deduplication by import_hash", _bank_import_hash_lookup),
+    HotQuery("open_receivables", "Open and partially paid receivables by due date", _open_receivables),
+]
+
+
+def analyze_postgres_plan(plan: Any) -> Dict[str, List[str]]:
+    """Collect seq-scanned hot tables and used indexes from EXPLAIN (FORMAT JSON) output."""
+    seq_scans: List[str] = []
+    indexes: List[str] = []
+    stack = [item["Plan"] for item in plan] if isinstance(plan, list) else [plan.get("Plan", plan)]
+    while stack:
+        node = stack.pop()
+        node_type = node.get("Node Type")
+        relation = node.get("Relation Name")
+        if node_type in _PG_SEQ_SCAN_NODES and relation in HOT_TABLES:
+            seq_scans.append(relation)
+        if node_type in _PG_INDEX_NODES and node.get("Index Name"):
+            indexes.append(node["Index Name"])
+        stack.extend(node.get("Plans", []))
+    return {"seq_scans": seq_scans, "indexes": indexes}
+
+
+def analyze_sqlite_plan(details: List[str]) -> Dict[str, List[str]]:
+    """Collect full table scans and used indexes from EXPLAIN QUERY PLAN detail rows."""
+    seq_scans: List[str] = []
+    indexes: List[str] = []
+    for detail in details:
+        words = detail.split()
+        if len(words) >= 2 and words[0] in ("SCAN", "SEARCH"):
+            table = words[1]
+            if "USING" in words:
+                index_pos = words.index("INDEX") + 1 if "INDEX" in words else None
+                if index_pos is not None and index_pos < len(words):
+                    indexes.append(words[index_pos])
+            elif words[0] == "SCAN" and table in HOT_TABLES:
+                seq_scans.append(table)
+    return {"seq_scans": seq_scans, "indexes": indexes}
+
+
+async def explain(conn: AsyncConnection, name: str, statement: Select) -> QueryPlan:
+    """Plan one statement (literal parameters inlined) and classify the scans."""
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "postgresql":
+        raw = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        plan = json.loads(raw) if isinstance(raw, str) else raw
+        found = analyze_postgres_plan(plan)
+        text_plan = "\n".join(
+            row[0] for row in (await conn.exec_driver_sql(f"EXPLAIN {sql}")).all()
+        )
+    else:
+        rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")).all()
+        details = [row[-1] for row in rows]
+        found = analyze_sqlite_plan(details)
+        text_plan = "\n".join(details)
+    return QueryPlan(name=name, indexes=found["indexes"], seq_scans=found["seq_scans"], plan=text_plan)
+
+
+async def _default_context(conn: AsyncConnection) -> Optional[HotQueryContext]:
+    """Pick the administration with the most journal entries (and one of its accounts)."""
+    admin_id = (await conn.execute(
+        select(JournalEntry.administration_id)
+        .group_by(JournalEntry.administration_id)
+        .order_by(func.count().desc())
+        .limit(1)
+    )).scalar()
+    if admin_id is None:
+        admin_id = (await conn.execute(select(Administration.id).limit(1))).scalar()
+    if admin_id is None:
+        return None
+    account_id = (await conn.execute(
+        select(ChartOfAccount.id).where(ChartOfAccount.administration_id == admin_id).limit(1)
+    )).scalar()
+    return HotQueryContext(administration_id=admin_id, account_id=account_id)
+
+
+async def run_advisor(
+    engine: AsyncEngine,
+    context: Optional[HotQueryContext] = None,
+    queries: Optional[List[HotQuery]] = None,
+) -> List[QueryPlan]:
+    """EXPLAIN every hot query against ``engine``."""
+    plans: List[QueryPlan] = []
+    async with engine.connect() as conn:
+        context = context or await _default_context(conn)
+        if context is None:
+            raise RuntimeError("Database has no administrations; seed it first (--seed)")
+        for query in queries or HOT_QUERIES:
+            statement = query.build(context)
+            if statement is not None:
+                plans.append(await explain(conn, query.name, statement))
+    return plans
+
+
+async def seed_database(
+    engine: AsyncEngine,
+    rows_per_table: int,
+    administrations: int = 20,
+    seed: int = 42,
+) -> None:
+    """
+    Insert synthetic ledger, bank and open-item rows spread over
+    ``administrations`` administrations. Only for disposable databases.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    per_admin = max(1, rows_per_table // administrations)
+    bank_statuses = list(BankTransactionStatus)
+    item_statuses = list(OpenItemStatus)
+
+    async with engine.begin() as conn:
+        vat_code_id = (await conn.execute(select(VatCode.id).limit(1))).scalar()
+        for a in range(administrations):
+            admin_id = uuid.uuid4()
+            await conn.execute(insert(Administration).values(id=admin_id, name=f"index-advisor-{a}"))
+
+            account_ids = [uuid.uuid4() for _ in range(8)]
+            await conn.execute(insert(ChartOfAccount), [
+                {"id": acc_id, "administration_id": admin_id, "account_code": f"{1000 + i * 100}",
+                 "account_name": f"Account {i}", "account_type": "ASSET" if i < 4 else "REVENUE",
+                 "is_active": True}
+                for i, acc_id in enumerate(account_ids)
+            ])
+
+            entries, lines = [], []
+            for n in range(per_admin):
+                entry_id = uuid.uuid4()
+                amount = Decimal(rng.randint(100, 100000)) / 100
+                entries.append({
+                    "id": entry_id, "administration_id": admin_id,
+                    "entry_number": f"IA-{n:07d}", "entry_date": today - timedelta(days=rng.randint(0, 3 * 365)),
+                    "description": "seed", "status": JournalEntryStatus.POSTED,
+                    "total_debit": amount, "total_credit": amount, "is_balanced": True, "posted": True,
+                })
+                debit, credit = rng.sample(account_ids, 2)
+                lines.append({"id": uuid.uuid4(), "journal_entry_id": entry_id, "account_id": debit,
+                              "line_number": 1, "debit_amount": amount, "credit_amount": Decimal("0.00"),
+                              "vat_code_id": vat_code_id if rng.random() < 0.3 else None})
+                lines.append({"id": uuid.uuid4(), "journal_entry_id": entry_id, "account_id": credit,
+                              "line_number": 2, "debit_amount": Decimal("0.00"), "credit_amount": amount,
+                              "vat_code_id": None})
+            await conn.execute(insert(JournalEntry), entries)
+            await conn.execute(insert(JournalLine), lines)
+
+            bank_account_id = uuid.uuid4()
+            await conn.execute(insert(BankAccount).values(
+                id=bank_account_id, administration_id=admin_id, iban=f"NL00SEED{a:010d}", currency="EUR",
+            ))
+            await conn.execute(insert(BankTransaction), [
+                {"id": uuid.uuid4(), "administration_id": admin_id, "bank_account_id": bank_account_id,
+                 "booking_date": today - timedelta(days=rng.randint(0, 3 * 365)),
+                 "amount": Decimal(rng.randint(-50000, 50000)) / 100, "currency": "EUR",
+                 "description": "seed", "import_hash": uuid.uuid4().hex * 2,
+                 "status": rng.choice(bank_statuses)}
+                for _ in range(per_admin)
+            ])
+
+            party_id = uuid.uuid4()
+            await conn.execute(insert(Party).values(
+                id=party_id, administration_id=admin_id, party_type="CUSTOMER", name="Seed B.V.",
+            ))
+            await conn.execute(insert(OpenItem), [
+                {"id": uuid.uuid4(), "administration_id": admin_id, "party_id": party_id,
+                 "journal_entry_id": line["journal_entry_id"], "journal_line_id": line["id"],
+                 "item_type": rng.choice(("RECEIVABLE", "PAYABLE")),
+                 "document_date": today - timedelta(days=rng.randint(30, 400)),
+                 "due_date": today - timedelta(days=rng.randint(0, 370)),
+                 "original_amount": line["debit_amount"], "paid_amount": Decimal("0.00"),
+                 "open_amount": line["debit_amount"], "currency": "EUR",
+                 "status": rng.choice(item_statuses)}
+                for line in lines[::2][: max(1, per_admin // 4)]
+            ])
+
+        for table in sorted(HOT_TABLES):
+            await conn.exec_driver_sql(f"ANALYZE {table}")
+
+
+def format_report(plans: List[QueryPlan], verbose: bool = False) -> str:
+    """Render a plain-text verdict per hot query."""
+    descriptions = {q.name: q.description for q in HOT_QUERIES}
+    lines = []
+    for plan in plans:
+        verdict = "OK  " if plan.ok else "SEQ "
+        detail = ", ".join(sorted(set(plan.indexes))) or "no index"
+        if plan.seq_scans:
+            detail = f"seq scan on {', '.join(sorted(set(plan.seq_scans)))}; indexes: {detail}"
+        lines.append(f"{verdict} {plan.name:<26} {detail}")
+        if plan.name in descriptions:
+            lines.append(f"     {descriptions[plan.name]}")
+        if verbose or not plan.ok:
+            lines.extend(f"       {row}" for row in plan.plan.splitlines())
+    flagged = sum(1 for p in plans if not p.ok)
+    lines.append("")
+    lines.append(f"{len(plans)} hot queries checked, {flagged} with sequential scans on hot tables")
+    return "\n".join(lines)
+
+
+async def _main_async(args: argparse.Namespace) -> int:
+    from app.core.config import settings
+
+    engine = create_async_engine(args.database_url or settings.DATABASE_URL)
+    try:
+        if args.seed:
+            await seed_database(engine, rows_per_table=args.seed, administrations=args.administrations)
+        context = None
+        if args.administration_id:
+            context = HotQueryContext(administration_id=uuid.UUID(args.administration_id))
+        plans = await run_advisor(engine, context=context)
+    finally:
+        await engine.dispose()
+
+    print(format_report(plans, verbose=args.verbose))
+    return 0 if all(p.ok for p in plans) else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Flag sequential scans in the ledger/bank hot queries.")
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL")
+    parser.add_argument("--administration-id", help="administration to parameterize the queries with")
+    parser.add_argument("--seed", type=int, default=0, metavar="ROWS",
+                        help="first insert ROWS synthetic rows per hot table (disposable databases only)")
+    parser.add_argument("--administrations", type=int, default=20, help="administrations to spread seeded rows over")
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only flagged ones")
+    return asyncio.run(_main_async(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Features:
+- Counter, Gauge and Histogram primitives with label support
+- ASGI middleware recording request latency, status and per-request DB usage
+- SQLAlchemy cursor hooks counting queries and query time (per-request and
+  per-job breakdown lives in app.core.query_profiler)
+- Session hook counting journal entries reaching POSTED
+
+Recording a sample is a dict lookup plus an addition under a lock, and a
+scrape only formats what is already in memory — no database access.
+
+Note: state is per process. With several uvicorn workers each worker exposes
+its own series; aggregate them in Prometheus (sum by job).
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.query_profiler import (
+    QueryStats,
+    current_query_stats,  # noqa: F401 - re-exported for callers of app.core.metrics
+    log_query_profile,
+    query_stats_var,
+    server_timing_header,
+)
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_COUNT_BUCKETS: Tuple[float, ...] = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500)
+JOB_DURATION_BUCKETS: Tuple[float, ...] = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape_label_value(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class: a named metric family keyed by label values."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+    def samples(self) -> List[str]:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    def clear(self) -> None:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets, plus _sum and _count."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            state[index] += 1
+            state[-1] += value
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return int(sum(state[:-1])) if state else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(cumulative)}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Reset all recorded samples (used by tests)."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS_TOTAL = registry.counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route"),
+)
+DB_QUERIES_TOTAL = registry.counter(
+    "db_queries_total", "Database statements executed.",
+)
+DB_QUERY_DURATION_TOTAL = registry.counter(
+    "db_query_duration_seconds_total", "Time spent executing database statements.",
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request", "Database statements executed per HTTP request.",
+    ("route",), buckets=QUERY_COUNT_BUCKETS,
+)
+DB_TIME_PER_REQUEST = registry.histogram(
+    "db_query_seconds_per_request", "Database time spent per HTTP request.", ("route",),
+)
+JOB_DURATION = registry.histogram(
+    "worker_job_duration_seconds", "Background job run duration.",
+    ("job", "outcome"), buckets=JOB_DURATION_BUCKETS,
+)
+LEDGER_POSTINGS_TOTAL = registry.counter(
+    "ledger_postings_total", "Journal entries flushed with status POSTED.",
+)
+INTEGRATION_HTTP_DURATION = registry.histogram(
+    "integration_http_request_duration_seconds", "Outbound integration request latency per attempt.",
+    ("provider", "outcome"),
+)
+INTEGRATION_HTTP_RETRIES = registry.counter(
+    "integration_http_retries_total", "Outbound integration requests retried.", ("provider",),
+)
+MOLLIE_WEBHOOK_EVENTS = registry.counter(
+    "mollie_webhook_events_total", "Mollie webhook events by outcome.", ("outcome",),
+)
+MOLLIE_WEBHOOK_LAG = registry.histogram(
+    "mollie_webhook_lag_seconds", "Time from webhook receipt until the event was processed.",
+    buckets=JOB_DURATION_BUCKETS,
+)
+MOLLIE_WEBHOOK_BACKLOG = registry.gauge(
+    "mollie_webhook_backlog", "Mollie webhook events waiting to be processed.",
+)
+MOLLIE_WEBHOOK_OLDEST_PENDING = registry.gauge(
+    "mollie_webhook_oldest_pending_seconds", "Age of the oldest unprocessed Mollie webhook event.",
+)
+N_PLUS_ONE_DETECTIONS = registry.counter(
+    "db_repeated_statement_requests_total",
+    "Requests in which one statement shape repeated past N_PLUS_ONE_THRESHOLD.",
+    ("route",),
+)
+
+
+# ============ Per-request query accounting ============
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    DB_QUERIES_TOTAL.inc()
+    DB_QUERY_DURATION_TOTAL.inc(elapsed)
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def _count_postings(session: Session, flush_context) -> None:
+    from app.models.ledger import JournalEntry, JournalEntryStatus
+
+    posted = 0
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, JournalEntry) or obj.status != JournalEntryStatus.POSTED:
+            continue
+        if inspect(obj).attrs.status.history.added:
+            posted += 1
+    if posted:
+        LEDGER_POSTINGS_TOTAL.inc(posted)
+
+
+def instrument_engine(engine) -> None:
+    """Attach query-count/time hooks to an (async or sync) engine. Idempotent."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    if not event.contains(Session, "after_flush", _count_postings):
+        event.listen(Session, "after_flush", _count_postings)
+
+
+@contextmanager
+def track_job(job: str):
+    """Time a background job run and record it in worker_job_duration_seconds."""
+    stats = QueryStats(parent=query_stats_var.get())
+    token = query_stats_var.set(stats)
+    start = time.perf_counter()
+    outcome = "success"
+    try:
+        yield stats
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        JOB_DURATION.observe(elapsed, job=job, outcome=outcome)
+        query_stats_var.reset(token)
+        log_query_profile(
+            f"job {job}", stats, elapsed,
+            slow_threshold_seconds=0,
+            repeat_threshold=settings.N_PLUS_ONE_THRESHOLD,
+        )
+
+
+# ============ ASGI middleware ============
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency, status and DB usage.
+
+    The route label is the matched path template (e.g. /api/v1/zzp/invoices/{invoice_id})
+    so label cardinality stays bounded; unmatched paths are grouped as "unmatched".
+
+    It also logs slow requests with their top statements, flags repeated
+    statement shapes (N+1 signatures) and, in DEBUG mode, adds a
+    Server-Timing header with DB time and query count.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(parent=query_stats_var.get())
+        token = query_stats_var.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+        server_timing = settings.DEBUG
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if server_timing:
+                    header = server_timing_header(stats, time.perf_counter() - start)
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode("latin-1")),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            query_stats_var.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "GET")
+            HTTP_REQUESTS_TOTAL.inc(method=method, route=route_path, status=str(status_code))
+            HTTP_REQUEST_DURATION.observe(elapsed, method=method, route=route_path)
+            DB_QUERIES_PER_REQUEST.observe(stats.count, route=route_path)
+            DB_TIME_PER_REQUEST.observe(stats.duration, route=route_path)
+            repeated = log_query_profile(
+                f"request {method} {route_path}", stats, elapsed,
+                slow_threshold_seconds=settings.SLOW_REQUEST_THRESHOLD_MS / 1000,
+                repeat_threshold=settings.N_PLUS_ONE_THRESHOLD,
+            )
+            if repeated:
+                N_PLUS_ONE_DETECTIONS.inc(route=route_path)
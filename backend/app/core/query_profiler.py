@@ -0,0 +1,181 @@
+"""
+Per-request / per-job database query profiling.
+
+Builds on the cursor hooks in app.core.metrics:
+- QueryStats accumulates query count, time and per-statement-shape totals
+- Statement shapes normalize literals, placeholders and IN-lists, so the
+  same query issued in a loop collapses onto one shape (an N+1 signature)
+- Helpers render a Server-Timing header, log slow requests with their top
+  statements and flag repeated shapes
+- assert_query_budget() is the building block of the ``query_budget``
+  pytest fixture: a regression that adds queries to an endpoint fails CI
+"""
+import logging
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"\$\d+|%\([^)]+\)s|%s|:\w+|\?")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\?(?:, )?)+\)|\bIN \(\[POSTCOMPILE_\w+\]\)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def normalize_statement(statement: str) -> str:
+    """Reduce a SQL statement to its shape (literals and bind values replaced by ?)."""
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL_RE.sub("?", shape)
+    shape = _PLACEHOLDER_RE.sub("?", shape)
+    shape = _NUMBER_RE.sub("?", shape)
+    return _IN_LIST_RE.sub("IN (...)", shape)
+
+
+@dataclass
+class StatementStat:
+    """Totals for one statement shape."""
+    shape: str
+    count: int
+    duration: float
+
+
+@dataclass
+class QueryStats:
+    """
+    Database usage accumulated for the current request or job.
+
+    Nested scopes (e.g. a test budget around a request that the metrics
+    middleware also tracks) forward every record to their parent.
+    """
+    count: int = 0
+    duration: float = 0.0
+    statements: Dict[str, List[float]] = field(default_factory=dict)
+    parent: Optional["QueryStats"] = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        shape = normalize_statement(statement)
+        stats: Optional[QueryStats] = self
+        while stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+            totals = stats.statements.get(shape)
+            if totals is None:
+                stats.statements[shape] = [1, elapsed]
+            else:
+                totals[0] += 1
+                totals[1] += elapsed
+            stats = stats.parent
+
+    def top_statements(self, limit: int = 5) -> List[StatementStat]:
+        """Statement shapes ordered by total time spent."""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [StatementStat(shape, int(c), d) for shape, (c, d) in ranked[:limit]]
+
+    def repeated_statements(self, threshold: int) -> List[StatementStat]:
+        """Statement shapes executed at least ``threshold`` times (N+1 signatures)."""
+        return sorted(
+            (
+                StatementStat(shape, int(c), d)
+                for shape, (c, d) in self.statements.items()
+                if c >= threshold
+            ),
+            key=lambda stat: stat.count,
+            reverse=True,
+        )
+
+
+query_stats_var: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Return the QueryStats of the active request/job, if any."""
+    return query_stats_var.get()
+
+
+def server_timing_header(stats: QueryStats, elapsed: float) -> str:
+    """Render a Server-Timing header value (durations in milliseconds)."""
+    return (
+        f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+        f"app;dur={elapsed * 1000:.1f}"
+    )
+
+
+def _shorten(shape: str, width: int = 200) -> str:
+    return shape if len(shape) <= width else shape[: width - 3] + "..."
+
+
+def log_query_profile(
+    label: str,
+    stats: QueryStats,
+    elapsed: float,
+    slow_threshold_seconds: float,
+    repeat_threshold: int,
+) -> List[StatementStat]:
+    """
+    Log slow requests/jobs with their top statements and flag N+1 signatures.
+
+    Returns the repeated statement shapes that were detected.
+    """
+    repeated = stats.repeated_statements(repeat_threshold) if repeat_threshold else []
+    for stat in repeated:
+        logger.warning(
+            "Possible N+1 in %s: %d executions (%.1f ms) of: %s",
+            label, stat.count, stat.duration * 1000, _shorten(stat.shape),
+        )
+
+    if slow_threshold_seconds and elapsed >= slow_threshold_seconds:
+        top = "; ".join(
+            f"{s.count}x {s.duration * 1000:.1f}ms {_shorten(s.shape, 120)}"
+            for s in stats.top_statements()
+        )
+        logger.warning(
+            "Slow %s: %.1f ms total, %d queries (%.1f ms in DB). Top statements: %s",
+            label, elapsed * 1000, stats.count, stats.duration * 1000, top or "-",
+        )
+    return repeated
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block executes more queries than its budget allows."""
+
+
+def _format_budget_failure(message: str, stats: QueryStats) -> str:
+    lines = [message, "Statements by total time:"]
+    for stat in stats.top_statements(limit=10):
+        lines.append(f"  {stat.count}x {_shorten(stat.shape)}")
+    return "\n".join(lines)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int, max_repeats: Optional[int] = None):
+    """
+    Assert that the enclosed block runs at most ``max_queries`` statements,
+    and (optionally) no statement shape more than ``max_repeats`` times.
+
+    Usage:
+        with assert_query_budget(max_queries=8, max_repeats=2) as stats:
+            await client.get("/api/v1/...")
+    """
+    stats = QueryStats(parent=query_stats_var.get())
+    token = query_stats_var.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats_var.reset(token)
+
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(_format_budget_failure(
+            f"Query budget exceeded: {stats.count} queries > {max_queries}", stats,
+        ))
+    if max_repeats is not None:
+        repeated = stats.repeated_statements(max_repeats + 1)
+        if repeated:
+            raise QueryBudgetExceeded(_format_budget_failure(
+                f"Repeated statement (N+1) detected: {repeated[0].count}x > {max_repeats}", stats,
+            ))
@@ -1,5 +1,8 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional, Tuple, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -7,7 +10,15 @@ from fastapi.security import OAuth2PasswordBearer
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds == default_rounds makes needs_update()/verify_and_update() flag
+# hashes created with a lower cost, so raising PASSWORD_BCRYPT_ROUNDS
+# upgrades existing users on their next login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
@@ -19,6 +30,95 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# ---------------------------------------------------------------------------
+# Non-blocking hashing
+# ---------------------------------------------------------------------------
+# bcrypt costs ~250 ms of CPU per call. Running it on the event loop stalls
+# every other request on the worker, so the async handlers hand it to a small
+# dedicated pool (bcrypt releases the GIL while hashing). The number of
+# in-flight jobs is capped: beyond PASSWORD_HASH_MAX_PENDING callers get
+# PasswordHashingOverloaded immediately instead of queueing, which the auth
+# endpoints turn into a 503 so a login storm cannot starve the rest of the API.
+
+T = TypeVar("T")
+
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_pending = 0
+_hash_lock = threading.Lock()
+
+
+class PasswordHashingOverloaded(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    with _hash_lock:
+        if _hash_executor is None:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.PASSWORD_HASH_WORKERS),
+                thread_name_prefix="password-hash",
+            )
+        return _hash_executor
+
+
+def _release_hash_slot(_future) -> None:
+    global _hash_pending
+    with _hash_lock:
+        _hash_pending -= 1
+
+
+async def _run_hashing(func: Callable[..., T], *args) -> T:
+    """Run a hashing function in the bounded pool, shedding load when full."""
+    global _hash_pending
+    executor = _get_hash_executor()
+    with _hash_lock:
+        if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise PasswordHashingOverloaded("Password hashing queue is full")
+        _hash_pending += 1
+    try:
+        future = executor.submit(func, *args)
+    except BaseException:
+        _release_hash_slot(None)
+        raise
+    # The slot is held until the worker finishes, even if the caller is
+    # cancelled, so the cap reflects real CPU work.
+    future.add_done_callback(_release_hash_slot)
+    return await asyncio.wrap_future(future)
+
+
+def password_hashing_pending() -> int:
+    """Number of hashing jobs queued or running in the pool."""
+    return _hash_pending
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(get_password_hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a replacement hash if the stored one is
+    outdated (e.g. a lower bcrypt cost than the current context default).
+    """
+    return await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+def shutdown_password_hashing() -> None:
+    """Stop the hashing pool (application shutdown)."""
+    global _hash_executor
+    with _hash_lock:
+        executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
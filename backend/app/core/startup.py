@@ -0,0 +1,166 @@
+"""
+API process startup-time helpers.
+
+- lazy_module() defers importing a heavy optional dependency (ReportLab,
+  Redis, the GoCardless/HTTP client stack, ...) until one of its attributes
+  is first used, through a single module-level accessor
+- profile_imports() measures ``import app.main`` in a fresh interpreter with
+  ``python -X importtime`` and aggregates the cumulative time per module
+
+Run the profile from the backend directory:
+
+    python -m app.core.startup [--top 30] [--module app.main]
+"""
+import argparse
+import importlib
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, List, Optional
+
+
+class LazyModule:
+    """
+    Module proxy that imports the real module on first attribute access.
+
+    Attributes are looked up on the real module at every access, so patching
+    ``module.name`` in tests keeps working for callers going through the proxy.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """
+    Return a module-level accessor for a module that is imported on first use.
+
+    Usage (in a router module):
+        invoice_pdf_reportlab = lazy_module("app.services.invoice_pdf_reportlab")
+        ...
+        pdf_bytes = invoice_pdf_reportlab.generate_invoice_pdf_reportlab(invoice)
+    """
+    return LazyModule(name)
+
+
+@dataclass
+class ImportTiming:
+    """One line of ``-X importtime`` output (times in microseconds)."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    """Import-time profile of one module in a fresh interpreter."""
+    module: str
+    wall_seconds: float
+    timings: List[ImportTiming] = field(default_factory=list)
+
+    @property
+    def total_us(self) -> int:
+        return sum(t.cumulative_us for t in self.timings if t.depth == 0)
+
+    def top(self, limit: int = 30, prefix: Optional[str] = None) -> List[ImportTiming]:
+        """Modules ordered by cumulative import time."""
+        rows = [t for t in self.timings if prefix is None or t.module.startswith(prefix)]
+        return sorted(rows, key=lambda t: t.cumulative_us, reverse=True)[:limit]
+
+    def is_loaded(self, module: str) -> bool:
+        return any(t.module == module for t in self.timings)
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse ``python -X importtime`` stderr output."""
+    timings: List[ImportTiming] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        timings.append(ImportTiming(
+            module=stripped,
+            self_us=int(parts[0]),
+            cumulative_us=int(parts[1]),
+            depth=max(depth, 0),
+        ))
+    return timings
+
+
+def profile_imports(
+    module: str = "app.main",
+    python: Optional[str] = None,
+    cwd: Optional[str] = None,
+) -> ImportProfile:
+    """Import ``module`` in a fresh interpreter and return its import-time profile."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        tail = "\n".join(result.stderr.splitlines()[-20:])
+        raise RuntimeError(f"Importing {module} failed:\n{tail}")
+    return ImportProfile(module=module, wall_seconds=wall, timings=parse_importtime(result.stderr))
+
+
+def format_profile(profile: ImportProfile, limit: int = 30) -> str:
+    """Render a plain-text report of the slowest imports."""
+    lines = [
+        f"Cold import of {profile.module}: {profile.wall_seconds:.2f}s wall, "
+        f"{profile.total_us / 1e6:.2f}s importing {len(profile.timings)} modules",
+        "",
+        f"{'cumulative ms':>14} {'self ms':>9}  module",
+    ]
+    for timing in profile.top(limit):
+        lines.append(
+            f"{timing.cumulative_us / 1000:>14.1f} {timing.self_us / 1000:>9.1f}  {timing.module}"
+        )
+    app_rows = profile.top(limit, prefix="app.")
+    if app_rows:
+        lines += ["", "Application modules:"]
+        for timing in app_rows:
+            lines.append(f"{timing.cumulative_us / 1000:>14.1f} {timing.self_us / 1000:>9.1f}  {timing.module}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile API process import time.")
+    parser.add_argument("--module", default="app.main", help="module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=30, help="number of modules to list")
+    args = parser.parse_args(argv)
+
+    print(format_profile(profile_imports(args.module), limit=args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
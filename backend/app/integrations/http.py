@@ -0,0 +1,262 @@
+"""
+Shared outbound HTTP clients for integrations.
+
+One pooled ``httpx.AsyncClient`` per upstream (Shopify, WooCommerce,
+GoCardless, Mollie, Resend) instead of a new client - and a new TLS
+handshake - per call:
+
+- Keep-alive connection pools, HTTP/2 when the ``h2`` package is installed
+- Per-provider concurrency limits
+- Retry with exponential backoff for 429/5xx and connection errors,
+  honoring ``Retry-After`` (only idempotent requests are retried on 5xx
+  or read errors unless the caller opts in)
+- Request timing and retry metrics (``integration_http_*``)
+
+Clients are created lazily on first use and closed from the application
+lifespan (``close_http_clients``). Tests inject a transport with
+``http_clients.set_transport(httpx.MockTransport(handler))``.
+"""
+import asyncio
+import importlib.util
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import INTEGRATION_HTTP_DURATION, INTEGRATION_HTTP_RETRIES
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    name: str
+    base_url: str = ""
+    timeout: float = 30.0
+    max_concurrency: int = 10
+
+
+PROVIDERS: Dict[str, ProviderConfig] = {
+    # Shopify's REST bucket drains at 2 requests/second per store
+    "shopify": ProviderConfig("shopify", max_concurrency=4),
+    "woocommerce": ProviderConfig("woocommerce", max_concurrency=4),
+    "gocardless": ProviderConfig("gocardless", max_concurrency=4),
+    "mollie": ProviderConfig("mollie", base_url="https://api.mollie.com/v2"),
+    "resend": ProviderConfig("resend"),
+}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class ProviderClient:
+    """Pooled client for one upstream with concurrency limit, retries and timing."""
+
+    def __init__(
+        self,
+        config: ProviderConfig,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.config = config
+        self._sleep = sleep
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=config.base_url,
+            timeout=config.timeout,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_SECONDS,
+            ),
+            http2=settings.HTTP_CLIENT_HTTP2 and HTTP2_AVAILABLE and transport is None,
+            transport=transport,
+        )
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def request(self, method: str, url: str, retry: Optional[bool] = None, **kwargs: Any) -> httpx.Response:
+        return await self._send(method, url, lambda: self._client.request(method, url, **kwargs), retry)
+
+    async def get(self, url: str, retry: Optional[bool] = None, **kwargs: Any) -> httpx.Response:
+        return await self._send("GET", url, lambda: self._client.get(url, **kwargs), retry)
+
+    async def post(self, url: str, retry: Optional[bool] = None, **kwargs: Any) -> httpx.Response:
+        return await self._send("POST", url, lambda: self._client.post(url, **kwargs), retry)
+
+    async def put(self, url: str, retry: Optional[bool] = None, **kwargs: Any) -> httpx.Response:
+        return await self._send("PUT", url, lambda: self._client.put(url, **kwargs), retry)
+
+    async def patch(self, url: str, retry: Optional[bool] = None, **kwargs: Any) -> httpx.Response:
+        return await self._send("PATCH", url, lambda: self._client.patch(url, **kwargs), retry)
+
+    async def delete(self, url: str, retry: Optional[bool] = None, **kwargs: Any) -> httpx.Response:
+        return await self._send("DELETE", url, lambda: self._client.delete(url, **kwargs), retry)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        send: Callable[[], Awaitable[httpx.Response]],
+        retry: Optional[bool],
+    ) -> httpx.Response:
+        """
+        Send with retries. ``retry=None`` retries 429 and connection failures
+        for every method, and 5xx/read errors only for idempotent methods;
+        ``True``/``False`` force retrying on or off.
+
+        The final response is returned whatever its status; callers keep
+        their own error handling.
+        """
+        provider = self.config.name
+        idempotent = method.upper() in IDEMPOTENT_METHODS if retry is None else retry
+        max_retries = settings.HTTP_CLIENT_MAX_RETRIES if retry is not False else 0
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    response = await send()
+            except httpx.TransportError as e:
+                INTEGRATION_HTTP_DURATION.observe(time.perf_counter() - started, provider=provider, outcome="error")
+                # Connection failures never reached the upstream and are always safe to retry
+                connect_error = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if attempt >= max_retries or not (connect_error or idempotent):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning("%s %s %s failed (%s), retrying in %.1fs", provider, method, url, type(e).__name__, delay)
+            else:
+                status = response.status_code
+                INTEGRATION_HTTP_DURATION.observe(time.perf_counter() - started, provider=provider, outcome=str(status))
+                if status not in RETRYABLE_STATUS_CODES or attempt >= max_retries or not (status == 429 or idempotent):
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > settings.HTTP_CLIENT_MAX_RETRY_AFTER_SECONDS:
+                    return response  # Upstream asks for a longer pause than a request should wait
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                logger.warning("%s %s %s returned %s, retrying in %.1fs", provider, method, url, status, delay)
+            INTEGRATION_HTTP_RETRIES.inc(provider=provider)
+            attempt += 1
+            await self._sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        base = settings.HTTP_CLIENT_BACKOFF_SECONDS * (2 ** attempt)
+        return base / 2 + random.uniform(0, base / 2)
+
+
+class BoundClient:
+    """
+    Provider client view adding fixed headers (e.g. an API key) to each
+    request, with a default ``retry`` policy. The shared client is looked up
+    per request, so a BoundClient can be created outside the event loop.
+    """
+
+    def __init__(self, provider: str, headers: Dict[str, str], retry: Optional[bool] = None):
+        self.provider = provider
+        self.headers = headers
+        self.retry = retry
+
+    def _merge(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        kwargs["headers"] = {**self.headers, **(kwargs.get("headers") or {})}
+        kwargs.setdefault("retry", self.retry)
+        return kwargs
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        return await get_http_client(self.provider).request(method, url, **self._merge(kwargs))
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await get_http_client(self.provider).get(url, **self._merge(kwargs))
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await get_http_client(self.provider).post(url, **self._merge(kwargs))
+
+    async def put(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await get_http_client(self.provider).put(url, **self._merge(kwargs))
+
+    async def patch(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await get_http_client(self.provider).patch(url, **self._merge(kwargs))
+
+    async def delete(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await get_http_client(self.provider).delete(url, **self._merge(kwargs))
+
+
+class HttpClientRegistry:
+    """Process-wide ProviderClients, created lazily per provider."""
+
+    def __init__(self):
+        self._clients: Dict[str, ProviderClient] = {}
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        self._sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self, provider: str) -> ProviderClient:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Pools and semaphores belong to the loop that created them
+            # (one loop per process in production, one per test here)
+            self._clients = {}
+            self._loop = loop
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = ProviderClient(PROVIDERS[provider], transport=self._transport, sleep=self._sleep)
+            self._clients[provider] = client
+        return client
+
+    def set_transport(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport],
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        """Route all providers through ``transport`` (tests); ``None`` restores the network."""
+        self._transport = transport
+        self._sleep = sleep
+        self._clients = {}
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+http_clients = HttpClientRegistry()
+
+
+def get_http_client(provider: str) -> ProviderClient:
+    """Shared client for an integration provider (see PROVIDERS)."""
+    return http_clients.get(provider)
+
+
+async def close_http_clients() -> None:
+    """Close all pooled integration clients (application shutdown)."""
+    await http_clients.aclose()
@@ -16,6 +16,7 @@ import httpx
 from decimal import Decimal
 
 from app.core.config import settings
+from app.integrations.http import BoundClient
 
 logger = logging.getLogger(__name__)
 
@@ -53,18 +54,14 @@ class MollieClient:
         if not self.api_key:
             logger.warning("Mollie API key not configured - Mollie integration disabled")
         
-        self.client = httpx.AsyncClient(
-            base_url=self.BASE_URL,
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            },
-            timeout=30.0,
-        )
+        # Requests go through the shared, pooled Mollie connection
+        self.client = BoundClient("mollie", {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        })
     
     async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
+        """Release the client (the pooled connections are shared and stay open)"""
     
     async def __aenter__(self):
         """Async context manager entry"""
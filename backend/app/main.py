@@ -10,7 +10,8 @@ from sqlalchemy.orm import configure_mappers
 from datetime import datetime, timezone
 
 from app.core.config import settings
-from app.core.database import engine
+from app.core.database import engine, read_engine
+from app.core.metrics import MetricsMiddleware, instrument_engine, track_job
 from app.api.v1 import auth, administrations, documents, transactions, dashboard, accountant, decisions, periods, vat, review_queue, observability, accountant_dashboard, work_queue, admin, zzp, bank, meta, zzp_customers, zzp_profile, zzp_invoices, zzp_expenses, zzp_time, zzp_calendar, zzp_work_sessions, zzp_bank, zzp_insights, zzp_quotes, zzp_dashboard, bookkeeping, client_data, zzp_payments, zzp_ledger, zzp_commitments, certificates, subscriptions, webhooks, contact_messages, zzp_documents, push, zzp_btw, zzp_income_tax, invoice_sharing, zzp_import, zzp_integrations, zzp_ecommerce_review
 logger = logging.getLogger(__name__)
 
@@ -50,7 +51,7 @@ def verify_orm_mappings() -> None:
         AuditLog,
         Certificate,
         ContactMessage,
-        ClientReadinessCache, EscalationEvent, EvidencePack, DashboardAuditLog,
+        ClientReadinessCache, WorkItem, EscalationEvent, EvidencePack, DashboardAuditLog,
         ZZPDocument,
         EcommerceConnection, EcommerceOrder, EcommerceCustomer, EcommerceRefund, EcommerceSyncLog,
     )
@@ -173,14 +174,42 @@ async def verify_database_enums() -> None:
         raise
 
 
+async def run_startup_checks() -> None:
+    """
+    Run the ORM mapping and database enum checks concurrently.
+
+    configure_mappers() is CPU-bound and runs in a worker thread while the enum
+    query waits on the database. Failure handling is the same as running them
+    one after the other: a mapping error or a missing enum value aborts
+    startup, any other enum check error (DB not ready yet) is only logged.
+    """
+    orm_error, enum_error = await asyncio.gather(
+        asyncio.to_thread(verify_orm_mappings),
+        verify_database_enums(),
+        return_exceptions=True,
+    )
+
+    if isinstance(orm_error, BaseException):
+        logger.error("ORM mapper configuration failed during startup", exc_info=orm_error)
+        raise RuntimeError(f"Application cannot start: ORM mapping error - {orm_error}") from orm_error
+
+    if isinstance(enum_error, RuntimeError):
+        logger.error("Database enum verification failed during startup", exc_info=enum_error)
+        raise enum_error
+    if isinstance(enum_error, BaseException):
+        # Non-critical: log warning but allow startup (DB might not be ready yet)
+        logger.warning(f"Could not verify database enums (DB may not be ready): {enum_error}")
+
+
 async def _run_billing_maintenance_once() -> None:
     """Run billing maintenance (enforce_trial_override) once using a fresh DB session."""
     from app.services.billing_maintenance import enforce_trial_override
     from app.core.database import async_session_maker
 
     try:
-        async with async_session_maker() as db:
-            await enforce_trial_override(db)
+        with track_job("billing_maintenance"):
+            async with async_session_maker() as db:
+                await enforce_trial_override(db)
     except Exception:
         logger.exception("Billing maintenance run failed (non-fatal)")
 
@@ -196,6 +225,74 @@ async def _billing_maintenance_loop() -> None:
         await _run_billing_maintenance_once()
 
 
+async def _run_reminder_dispatch_once() -> None:
+    """Dispatch due scheduled reminders once using a fresh DB session."""
+    from app.services.reminders import process_scheduled_reminders
+    from app.core.database import async_session_maker
+
+    try:
+        with track_job("reminder_dispatch"):
+            async with async_session_maker() as db:
+                await process_scheduled_reminders(db)
+    except Exception:
+        logger.exception("Reminder dispatch run failed (non-fatal)")
+
+
+async def _reminder_dispatch_loop() -> None:
+    """
+    Periodic background task: deliver due scheduled/queued reminders.
+    Started from the lifespan context on application startup.
+    """
+    while True:
+        await asyncio.sleep(settings.REMINDER_DISPATCH_INTERVAL_SECONDS)
+        await _run_reminder_dispatch_once()
+
+
+async def _run_mollie_webhook_drain_once() -> None:
+    """Process queued Mollie webhook events (retries and events no request drained)."""
+    from app.services.mollie_webhook_queue import drain_mollie_webhooks
+    from app.core.database import async_session_maker
+
+    try:
+        with track_job("mollie_webhooks"):
+            await drain_mollie_webhooks(async_session_maker)
+    except Exception:
+        logger.exception("Mollie webhook drain failed (non-fatal)")
+
+
+async def _mollie_webhook_loop() -> None:
+    """
+    Periodic background task: sweep the Mollie webhook queue.
+    Started from the lifespan context on application startup.
+    """
+    while True:
+        await asyncio.sleep(settings.MOLLIE_WEBHOOK_DRAIN_INTERVAL_SECONDS)
+        await _run_mollie_webhook_drain_once()
+
+
+async def _run_business_metrics_refresh_once() -> None:
+    """Recompute the cached business gauges served by the metrics endpoints."""
+    from app.services.metrics import refresh_business_metrics
+    from app.core.database import async_session_maker
+
+    try:
+        with track_job("business_metrics_refresh"):
+            async with async_session_maker() as db:
+                await refresh_business_metrics(db)
+    except Exception:
+        logger.exception("Business metrics refresh failed (non-fatal)")
+
+
+async def _business_metrics_loop() -> None:
+    """
+    Periodic background task: refresh business gauges so scrapes never hit the DB.
+    Started from the lifespan context on application startup.
+    """
+    while True:
+        await _run_business_metrics_refresh_once()
+        await asyncio.sleep(settings.METRICS_REFRESH_INTERVAL_SECONDS)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -203,7 +300,7 @@ async def lifespan(app: FastAPI):
     
     Startup:
     - Verify ORM mappings to fail fast if models are misconfigured
-    - Verify database enum values match Python enums
+    - Verify database enum values match Python enums (both checks run concurrently)
     - Log enum values and router status for diagnostics
     - Register audit logging hooks
     
@@ -218,22 +315,9 @@ async def lifespan(app: FastAPI):
     from app.core.config import settings as _settings
     _settings.validate_production_environment()
 
-    try:
-        verify_orm_mappings()
-    except Exception as e:
-        logger.exception("ORM mapper configuration failed during startup")
-        raise RuntimeError(f"Application cannot start: ORM mapping error - {e}") from e
-    
-    # Verify database enums match expected values
-    try:
-        await verify_database_enums()
-    except RuntimeError as e:
-        logger.exception("Database enum verification failed during startup")
-        raise
-    except Exception as e:
-        # Non-critical: log warning but allow startup (DB might not be ready yet)
-        logger.warning(f"Could not verify database enums (DB may not be ready): {e}")
-    
+    # Verify ORM mappings and database enums (concurrently)
+    await run_startup_checks()
+
     # Log enum and router status for production diagnostics
     log_enum_and_router_status()
 
@@ -249,6 +333,15 @@ async def lifespan(app: FastAPI):
     # Billing maintenance: enforce trial override on startup and schedule periodic runs
     await _run_billing_maintenance_once()
     asyncio.create_task(_billing_maintenance_loop())
+
+    # Reminder dispatch: drain due reminders (EMAIL sends happen off the request path)
+    asyncio.create_task(_reminder_dispatch_loop())
+
+    # Mollie webhooks: process events the endpoint queued (retries, leftovers)
+    asyncio.create_task(_mollie_webhook_loop())
+
+    # Metrics: keep cached business gauges fresh for /ops/metrics scrapes
+    asyncio.create_task(_business_metrics_loop())
     if settings.billing_force_paywall:
         logger.warning(
             "BILLING_FORCE_PAYWALL is ENABLED – ZZP users without ACTIVE subscription "
@@ -261,6 +354,12 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown (cleanup if needed)
+    from app.core.security import shutdown_password_hashing
+    from app.services.signing_service import shutdown_signing_pool
+    from app.integrations.http import close_http_clients
+    shutdown_password_hashing()
+    shutdown_signing_pool()
+    await close_http_clients()
     logger.info("Application shutdown complete")
 
 
@@ -286,6 +385,12 @@ app.add_middleware(
 from app.audit.middleware import AuditMiddleware
 app.add_middleware(AuditMiddleware)
 
+# Metrics middleware - added last so it is outermost and times the full request
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+if read_engine is not None:
+    instrument_engine(read_engine)
+
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -94,6 +94,7 @@ from app.models.ecommerce import (
 )
 from app.models.work_queue import (
     ClientReadinessCache,
+    WorkItem,
     EscalationEvent,
     EscalationType,
     EscalationSeverity,
@@ -196,6 +197,7 @@ __all__ = [
     "ContactMessage",
     "ContactMessageStatus",
     "ClientReadinessCache",
+    "WorkItem",
     "EscalationEvent",
     "EscalationType",
     "EscalationSeverity",
@@ -226,6 +226,7 @@ class ReminderStatus(str, enum.Enum):
     """Status of a reminder."""
     PENDING = "PENDING"
     SCHEDULED = "SCHEDULED"
+    SENDING = "SENDING"
     SENT = "SENT"
     FAILED = "FAILED"
 
@@ -273,6 +274,7 @@ class ClientReminder(Base):
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="PENDING")
     email_address: Mapped[str] = mapped_column(String(255), nullable=True)
     send_error: Mapped[str] = mapped_column(Text, nullable=True)
+    claimed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)  # Set while SENDING
 
     # Relationships
     administration = relationship("Administration")
@@ -54,6 +54,9 @@ class BankAccount(Base):
     iban: Mapped[str] = mapped_column(String(34), nullable=False)
     bank_name: Mapped[str] = mapped_column(String(120), nullable=True)
     currency: Mapped[str] = mapped_column(String(3), default="EUR", nullable=False)
+    # Column profile of the bank's CSV export, detected on the first import
+    # (see app.services.bank.csv_profile.CsvColumnProfile)
+    csv_profile: Mapped[dict] = mapped_column(JSONB, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -73,6 +76,16 @@ class BankTransaction(Base):
     hash = SHA256(administration_id + booking_date + amount + description + reference + counterparty_iban)
     """
     __tablename__ = "bank_transactions"
+    __table_args__ = (
+        sa.UniqueConstraint("administration_id", "import_hash", name="uq_bank_transactions_admin_hash"),
+        sa.Index("ix_bank_transactions_admin_status_date", "administration_id", "status", "booking_date"),
+        # Reconciliation work lists: transactions still waiting for a match
+        sa.Index(
+            "ix_bank_transactions_admin_unmatched", "administration_id", "booking_date",
+            postgresql_where=sa.text("status IN ('NEW', 'NEEDS_REVIEW')"),
+            sqlite_where=sa.text("status IN ('NEW', 'NEEDS_REVIEW')"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import String, DateTime, func, ForeignKey, Enum as SQLEnum, Text, JSON, Boolean, Numeric
+from sqlalchemy import String, DateTime, func, ForeignKey, Enum as SQLEnum, Text, JSON, Boolean, Numeric, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
@@ -43,6 +43,9 @@ class Document(Base):
     Workflow: UPLOADED -> PROCESSING -> EXTRACTED -> NEEDS_REVIEW -> POSTED/REJECTED
     """
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_admin_content_sha256", "administration_id", "content_sha256"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -54,6 +57,8 @@ class Document(Base):
     storage_path: Mapped[str] = mapped_column(String(1000), nullable=False)
     mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
     file_size: Mapped[int] = mapped_column(nullable=False)
+    # SHA-256 of the file content, used to deduplicate re-uploads
+    content_sha256: Mapped[str] = mapped_column(String(64), nullable=True)
     status: Mapped[DocumentStatus] = mapped_column(
         SQLEnum(DocumentStatus), default=DocumentStatus.UPLOADED, nullable=False
     )
@@ -12,7 +12,7 @@ from datetime import datetime, date
 from decimal import Decimal
 from sqlalchemy import (
     String, DateTime, Date, func, ForeignKey, Boolean, Numeric, 
-    Text, Integer, Enum as SQLEnum
+    Text, Integer, Enum as SQLEnum, Index, text
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -195,6 +195,12 @@ class PeriodAuditLog(Base):
 class JournalEntry(Base):
     """Journal entry header - enforces double-entry accounting."""
     __tablename__ = "journal_entries"
+    __table_args__ = (
+        Index('ix_journal_entries_admin_date', 'administration_id', 'entry_date'),
+        # Reports, VAT and dashboards: posted entries of one administration in a date range
+        Index('ix_journal_entries_admin_status_date', 'administration_id', 'status', 'entry_date'),
+        Index('uq_journal_entries_admin_entry_number', 'administration_id', 'entry_number', unique=True),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -263,6 +269,19 @@ class JournalEntry(Base):
 class JournalLine(Base):
     """Individual debit/credit line in a journal entry."""
     __tablename__ = "journal_lines"
+    __table_args__ = (
+        Index('ix_journal_lines_entry', 'journal_entry_id'),
+        # Account balances: covers the per-account debit/credit sums
+        Index(
+            'ix_journal_lines_account_entry', 'account_id', 'journal_entry_id',
+            postgresql_include=['debit_amount', 'credit_amount'],
+        ),
+        Index(
+            'ix_journal_lines_vat_code_entry', 'vat_code_id', 'journal_entry_id',
+            postgresql_where=text('vat_code_id IS NOT NULL'),
+            sqlite_where=text('vat_code_id IS NOT NULL'),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
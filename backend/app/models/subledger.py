@@ -11,7 +11,7 @@ from datetime import datetime, date
 from decimal import Decimal
 from sqlalchemy import (
     String, DateTime, Date, func, ForeignKey, Boolean, Numeric, 
-    Text, Integer, Enum as SQLEnum
+    Text, Integer, Enum as SQLEnum, Index, text
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -77,6 +77,16 @@ class OpenItem(Base):
     and track outstanding amounts until fully paid/allocated.
     """
     __tablename__ = "open_items"
+    __table_args__ = (
+        Index('ix_open_items_admin_type_status', 'administration_id', 'item_type', 'status'),
+        Index('ix_open_items_party', 'party_id'),
+        # AR/AP reports and overdue checks only look at unsettled items
+        Index(
+            'ix_open_items_admin_type_due_open', 'administration_id', 'item_type', 'due_date',
+            postgresql_where=text("status IN ('OPEN', 'PARTIAL')"),
+            sqlite_where=text("status IN ('OPEN', 'PARTIAL')"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
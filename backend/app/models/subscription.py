@@ -1,7 +1,7 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey, Numeric, Integer, Boolean, func, Enum as SQLEnum
+from sqlalchemy import String, DateTime, ForeignKey, Numeric, Integer, Boolean, Index, func, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -100,14 +100,23 @@ class WebhookEvent(Base):
     Track webhook events for idempotency.
     
     Ensures we don't process the same webhook event multiple times.
+    Mollie callbacks are stored as RECEIVED and acknowledged immediately;
+    the webhook consumer (services/mollie_webhook_queue.py) processes them.
     """
     __tablename__ = "webhook_events"
+    __table_args__ = (
+        Index("ix_webhook_events_status_received", "status", "received_at"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     provider: Mapped[str] = mapped_column(String(50), nullable=False, index=True)  # "mollie"
     event_id: Mapped[str] = mapped_column(String(255), nullable=False, unique=True, index=True)  # Provider's event ID
     event_type: Mapped[str] = mapped_column(String(100), nullable=False)  # e.g., "payment.paid", "subscription.canceled"
     resource_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)  # Payment/subscription ID
-    processed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="PROCESSED", server_default="PROCESSED")  # RECEIVED | PROCESSING | PROCESSED | FAILED
+    received_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)  # Set while a consumer holds the event
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    last_error: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     payload: Mapped[str | None] = mapped_column(String(5000), nullable=True)  # JSON payload (for debugging)
-
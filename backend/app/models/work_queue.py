@@ -3,16 +3,17 @@ Work Queue and Enhanced Dashboard Models
 
 Models for:
 - Client readiness score caching
+- Precomputed work items for the work queue
 - Escalation events for SLA tracking
 - Evidence packs for compliance export
 - Dashboard audit logging
 """
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from sqlalchemy import (
-    String, DateTime, func, ForeignKey, Boolean, Integer, BigInteger,
-    Text, Enum as SQLEnum
+    String, Date, DateTime, func, ForeignKey, Boolean, Integer, BigInteger,
+    Text, Index, Enum as SQLEnum
 )
 from sqlalchemy.dialects.postgresql import UUID, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -27,6 +28,11 @@ class ClientReadinessCache(Base):
     
     Updated by scheduled job or on-demand when data changes.
     Allows for efficient sorting and filtering without N+1 queries.
+    
+    Rebuilt together with the client's WorkItem rows. ``needs_refresh`` is
+    set when issues, documents, periods, journal entries or alerts of the
+    client change; rows computed before today are rebuilt as well, since
+    deadlines and staleness move with the date.
     """
     __tablename__ = "client_readiness_cache"
 
@@ -46,6 +52,7 @@ class ClientReadinessCache(Base):
     period_status: Mapped[str] = mapped_column(String(50), nullable=True)
     has_critical_alerts: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     staleness_days: Mapped[int] = mapped_column(Integer, nullable=True)
+    needs_refresh: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     computed_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -54,6 +61,54 @@ class ClientReadinessCache(Base):
     administration = relationship("Administration")
 
 
+class WorkItem(Base):
+    """
+    Precomputed work queue item.
+    
+    One row per open item of a client (RED/YELLOW issues, document backlog,
+    VAT deadline, period in review, stale client, critical alerts), rebuilt
+    with the client's ClientReadinessCache row. The work queue filters,
+    sorts and paginates over this table, and the SLA summary counts from it.
+    
+    ``since`` is when the underlying condition started (oldest unresolved
+    RED issue, period review started, last journal entry), so SLA age
+    thresholds are compared in SQL.
+    """
+    __tablename__ = "work_items"
+    __table_args__ = (
+        Index("ix_work_items_type_severity", "work_item_type", "severity"),
+        Index("ix_work_items_score", "readiness_score", "id"),
+        Index("ix_work_items_due_date", "due_date", "id"),
+        Index("ix_work_items_severity_rank", "severity_rank", "id"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    administration_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("administrations.id", ondelete="CASCADE"), 
+        nullable=False, index=True
+    )
+    client_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    period_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), nullable=True)
+    period_status: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    work_item_type: Mapped[str] = mapped_column(String(30), nullable=False)
+    severity: Mapped[str] = mapped_column(String(20), nullable=False)
+    severity_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    readiness_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    due_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    since: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    age_days: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=False)
+    suggested_next_action: Mapped[str] = mapped_column(String(255), nullable=False)
+    counts: Mapped[dict] = mapped_column(JSON, nullable=True)
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 class EscalationType(str, enum.Enum):
     """Types of escalation events."""
     RED_UNRESOLVED = "RED_UNRESOLVED"  # RED issues unresolved > threshold
@@ -115,6 +170,7 @@ class ReminderStatus(str, enum.Enum):
     """Status of a reminder."""
     PENDING = "PENDING"
     SCHEDULED = "SCHEDULED"
+    SENDING = "SENDING"
     SENT = "SENT"
     FAILED = "FAILED"
 
@@ -9,7 +9,7 @@ from datetime import datetime, date
 from decimal import Decimal
 from typing import Optional, List
 from enum import Enum
-from sqlalchemy import String, DateTime, Date, Numeric, Integer, Boolean, Text, func, ForeignKey, Enum as SQLEnum
+from sqlalchemy import String, DateTime, Date, Numeric, Integer, Boolean, Text, func, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -41,6 +41,9 @@ class ZZPDocument(Base):
     Workflow: NEW -> REVIEW -> PROCESSED (or FAILED)
     """
     __tablename__ = "zzp_documents"
+    __table_args__ = (
+        Index("ix_zzp_documents_admin_content_sha256", "administration_id", "content_sha256"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -62,6 +65,8 @@ class ZZPDocument(Base):
     filename: Mapped[str] = mapped_column(String(500), nullable=False)
     mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
     storage_ref: Mapped[str] = mapped_column(String(1000), nullable=False)
+    # SHA-256 of the file content, used to deduplicate re-uploads
+    content_sha256: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
 
     # Classification
     doc_type: Mapped[ZZPDocType] = mapped_column(
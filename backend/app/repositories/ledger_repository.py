@@ -3,7 +3,7 @@ import uuid
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -11,6 +11,7 @@ from app.models.accounting import ChartOfAccount
 from app.models.bank import BankTransaction
 from app.models.ledger import JournalEntry, JournalLine, JournalEntryStatus
 from app.models.zzp import ZZPExpense, ZZPInvoice
+from app.services.ledger.posting import allocate_entry_numbers
 
 
 class LedgerRepository:
@@ -53,12 +54,7 @@ class LedgerRepository:
         return result.scalar_one_or_none()
 
     async def get_next_entry_number(self) -> str:
-        result = await self.db.execute(
-            select(func.count(JournalEntry.id))
-            .where(JournalEntry.administration_id == self.administration_id)
-        )
-        count = result.scalar() or 0
-        return f"JE-{count + 1:06d}"
+        return (await allocate_entry_numbers(self.db, self.administration_id, 1))[0]
 
     async def has_posted_entry_for_reference(self, source_type: str, source_id: uuid.UUID) -> bool:
         result = await self.db.execute(
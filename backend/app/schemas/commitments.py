@@ -150,6 +150,14 @@ class CommitmentAlert(BaseModel):
     message: str
 
 
+class CommitmentProjectionMonth(BaseModel):
+    year: int
+    month: int
+    total_cents: int
+    by_type: dict[str, int]
+    payment_count: int
+
+
 class CommitmentOverviewResponse(BaseModel):
     monthly_total_cents: int
     upcoming_total_cents: int
@@ -158,6 +166,7 @@ class CommitmentOverviewResponse(BaseModel):
     upcoming: list[CommitmentResponse]
     alerts: list[CommitmentAlert]
     threshold_cents: int
+    projection: list[CommitmentProjectionMonth] = Field(default_factory=list)
 
 
 class CommitmentSuggestion(BaseModel):
@@ -166,6 +175,9 @@ class CommitmentSuggestion(BaseModel):
     amount_cents: int
     description: str
     confidence: float
+    cadence: Optional[str] = None
+    occurrences: int = 0
+    next_expected_date: Optional[date] = None
 
 
 class CommitmentSuggestionsResponse(BaseModel):
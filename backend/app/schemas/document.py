@@ -10,6 +10,11 @@ from app.models.document import DocumentStatus, DocumentSuggestedActionType
 class DocumentUploadResponse(BaseModel):
     message: str
     document_id: UUID
+    is_duplicate: bool = False  # Identical file already uploaded; existing document returned
+
+
+class DocumentBatchUploadResponse(BaseModel):
+    documents: List[DocumentUploadResponse]
 
 
 class DocumentResponse(BaseModel):
@@ -142,6 +147,27 @@ class DocumentReprocessResponse(BaseModel):
     message: str
 
 
+class DocumentBatchMatchRequest(BaseModel):
+    """Request to run matching on several documents at once."""
+    document_ids: List[UUID] = Field(..., min_length=1, max_length=5000)
+
+
+class DocumentMatchResult(BaseModel):
+    """Matching outcome for one document."""
+    document_id: UUID
+    status: DocumentStatus
+    is_duplicate: bool
+    match_confidence: Optional[Decimal] = None
+    matched_party_id: Optional[UUID] = None
+    matched_open_item_id: Optional[UUID] = None
+
+
+class DocumentBatchMatchResponse(BaseModel):
+    """Response after batch matching."""
+    results: List[DocumentMatchResult]
+    not_found: List[UUID] = []
+
+
 # === Closing Checklist Schemas ===
 
 class ClosingChecklistItem(BaseModel):
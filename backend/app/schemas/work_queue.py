@@ -46,6 +46,7 @@ class WorkQueueResponse(BaseModel):
     items: List[WorkQueueItem]
     total_count: int
     returned_count: int
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
     queue_type: str
     counts: Dict[str, int]
     sort_by: str
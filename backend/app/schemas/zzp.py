@@ -1107,6 +1107,7 @@ class ZZPDocumentResponse(BaseModel):
     doc_date: Optional[date] = None
     created_at: datetime
     updated_at: datetime
+    is_duplicate: bool = False  # Set on upload when an identical file already existed
 
     model_config = {"from_attributes": True}
 
@@ -31,6 +31,7 @@ from app.models.accountant_dashboard import (
     ClientReminder,
 )
 from app.services.validation import ConsistencyEngine
+from app.services.decisions import SuggestionService
 from app.services.vat.report import VatReportService
 from app.services.period import PeriodControlService
 
@@ -635,6 +636,7 @@ class BulkOperationsService:
         # Process each client
         successful = 0
         failed = 0
+        success_results: Dict[uuid.UUID, BulkOperationResult] = {}
         
         for client_id in target_ids:
             try:
@@ -653,6 +655,7 @@ class BulkOperationsService:
                     },
                 )
                 self.db.add(result)
+                success_results[client_id] = result
                 successful += 1
                 
             except Exception as e:
@@ -678,6 +681,17 @@ class BulkOperationsService:
                 )
                 self.db.add(alert)
         
+        # Suggestions for the new issues of all recalculated clients in one pass
+        if success_results:
+            try:
+                async with self.db.begin_nested():
+                    created = await SuggestionService(self.db).refresh_suggestions_for_clients(success_results)
+            except Exception:
+                logger.exception("Suggestion refresh after bulk recalculation failed (non-fatal)")
+            else:
+                for client_id, result in success_results.items():
+                    result.result_data = {**result.result_data, "suggestions_created": created.get(client_id, 0)}
+        
         # Update bulk operation status
         bulk_op.processed_clients = len(target_ids)
         bulk_op.successful_clients = successful
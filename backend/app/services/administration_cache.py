@@ -0,0 +1,121 @@
+"""
+Per-Administration Result Cache
+
+In-process cache for derived results that belong to one administration and
+are read far more often than the data behind them changes (income-tax year
+overviews, closing checklists). Values are keyed by (administration, key).
+
+Invalidation is driven by SQLAlchemy session events: whenever a flush
+touches one of the cache's watched models, the administration is remembered
+on the session and all of its entries are dropped once the transaction
+commits. Every administration also carries a generation counter; a value
+computed while a write was being committed is not stored, so a slow reader
+cannot put stale results back. The TTL is only a safety net for writes that
+bypass the ORM unit of work (bulk UPDATE/DELETE statements).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class AdministrationCache:
+    """Bounded TTL cache of per-administration results with commit-driven invalidation."""
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        max_entries: int,
+        watched_models: Optional[Callable[[], tuple]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            name: Identifies the cache in session.info
+            ttl_seconds: Lifetime of an entry (0 disables the cache)
+            max_entries: Entries kept before the least recently used is evicted
+            watched_models: Returns the models whose writes invalidate an
+                administration; called lazily so model imports stay out of
+                module import time. Without it no session hooks are installed.
+            clock: Monotonic time source (tests)
+        """
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[Hashable, Hashable], Tuple[Any, float]]" = OrderedDict()
+        self._generations: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        if watched_models is not None:
+            self._install_session_hooks(watched_models)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def generation(self, administration_id: Hashable) -> int:
+        """Current generation; pass it to ``set`` when the computation is done."""
+        return self._generations.get(administration_id, 0)
+
+    def get(self, administration_id: Hashable, key: Hashable) -> Optional[Any]:
+        entry_key = (administration_id, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                return None
+            if entry[1] <= self._clock():
+                del self._entries[entry_key]
+                return None
+            self._entries.move_to_end(entry_key)
+            return entry[0]
+
+    def set(self, administration_id: Hashable, key: Hashable, value: Any, generation: int) -> bool:
+        """Store a value unless the administration was invalidated since ``generation``."""
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return False
+        entry_key = (administration_id, key)
+        with self._lock:
+            if self._generations.get(administration_id, 0) != generation:
+                return False
+            self._entries[entry_key] = (value, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, administration_id: Hashable) -> None:
+        """Drop all cached entries of an administration."""
+        with self._lock:
+            self._generations[administration_id] = self._generations.get(administration_id, 0) + 1
+            for entry_key in [k for k in self._entries if k[0] == administration_id]:
+                del self._entries[entry_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+    def _install_session_hooks(self, watched_models: Callable[[], tuple]) -> None:
+        session_key = f"{self.name}_dirty_administrations"
+
+        def collect_dirty_administrations(session: Session, flush_context) -> None:
+            watched = watched_models()
+            dirty: Set[Hashable] = session.info.setdefault(session_key, set())
+            for instance in (*session.new, *session.dirty, *session.deleted):
+                if isinstance(instance, watched):
+                    administration_id = getattr(instance, "administration_id", None)
+                    if administration_id is not None:
+                        dirty.add(administration_id)
+
+        def invalidate_after_commit(session: Session) -> None:
+            for administration_id in session.info.pop(session_key, ()):
+                self.invalidate(administration_id)
+
+        # after_flush still sees the flushed objects in new/dirty/deleted.
+        # Entries left over from a rolled back transaction only cause a
+        # harmless extra invalidation on the next commit.
+        event.listen(Session, "after_flush", collect_dirty_administrations)
+        event.listen(Session, "after_commit", invalidate_after_commit)
@@ -0,0 +1,418 @@
+"""
+CSV Column Profiles for Bank Exports
+
+A column profile records how a bank's CSV export is laid out: the dialect,
+which header holds which field, the date format and the decimal separator.
+It is detected once from the header and the first rows (and stored on the
+BankAccount for later imports), then compiled into a row converter that
+uses the fixed formats instead of sniffing and trying formats per cell.
+
+CsvStatementReader reads the file once: rows are decoded and converted
+one at a time, only the sample used for detection is buffered.
+"""
+import csv
+import io
+import re
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import chain, islice
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+# Characters of the file used to sniff the dialect
+SNIFF_CHARS = 2048
+
+# Rows used to detect the date format, decimal separator and account IBAN
+SAMPLE_ROWS = 50
+
+# Header aliases per field (normalized: lowercase, spaces and dashes as
+# underscores), generic names first, then ING and Rabobank exports
+COLUMN_ALIASES: Dict[str, Sequence[str]] = {
+    "booking_date": ("date", "booking_date", "datum", "boekdatum", "transactiedatum"),
+    "amount": ("amount", "bedrag", "bedrag_(eur)", "transactiebedrag"),
+    "description": ("description", "omschrijving", "omschrijving_1", "mededelingen"),
+    "counterparty_iban": ("iban", "counterparty_iban", "tegenrekening", "tegenrekening_iban/bban"),
+    "counterparty_name": ("counterparty_name", "naam_tegenpartij", "naam_/_omschrijving"),
+    "reference": ("reference", "betalingskenmerk"),
+    "account_iban": ("account_iban", "rekening", "rekeningnummer", "iban/bban"),
+    # Debit/credit indicator for exports with unsigned amounts (ING "Af Bij")
+    "debit_credit": ("debit_credit", "af_bij"),
+}
+
+REQUIRED_COLUMNS = ("booking_date", "amount", "description")
+
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%Y/%m/%d", "%d.%m.%Y", "%Y%m%d")
+
+# Values of the debit/credit column that mark a debit
+DEBIT_MARKERS = frozenset({"af", "d", "debit", "dbit"})
+
+# Amount shapes the fast path may convert with a profile's decimal separator:
+# plain or thousands-grouped digits with optional decimals. Anything else
+# ("12.50" under a "," profile) goes to parse_any_amount.
+AMOUNT_SHAPES = {
+    ",": re.compile(r"[+-]?(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d+)?"),
+    ".": re.compile(r"[+-]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?"),
+}
+
+
+class CsvRowError(ValueError):
+    """A CSV row that cannot be converted into a transaction."""
+
+
+class CsvRow(NamedTuple):
+    """Converted values of one CSV row."""
+    booking_date: date
+    amount: Decimal
+    description: str
+    counterparty_iban: Optional[str]
+    counterparty_name: Optional[str]
+    reference: Optional[str]
+    account_iban: Optional[str]
+
+
+def normalize_header(header: str) -> str:
+    return header.strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def resolve_columns(headers: Sequence[str]) -> Optional[Dict[str, str]]:
+    """Map fields to headers; None if a required column is missing."""
+    normalized = {normalize_header(h): h for h in headers if h}
+
+    resolved: Dict[str, str] = {}
+    for key, options in COLUMN_ALIASES.items():
+        for option in options:
+            if option in normalized:
+                resolved[key] = normalized[option]
+                break
+
+    required = all(resolved.get(k) for k in REQUIRED_COLUMNS)
+    return resolved if required else None
+
+
+def parse_any_amount(value: Optional[str]) -> Optional[Decimal]:
+    """Parse amount from various formats."""
+    if not value:
+        return None
+
+    # Remove whitespace
+    value = value.strip()
+
+    # Handle European format (1.234,56)
+    if ',' in value and '.' in value:
+        # Check which is the decimal separator
+        if value.rfind(',') > value.rfind('.'):
+            # European: 1.234,56
+            value = value.replace('.', '').replace(',', '.')
+        else:
+            # US: 1,234.56
+            value = value.replace(',', '')
+    elif ',' in value:
+        # Could be 1234,56 (European decimal) or 1,234 (US thousands)
+        # Assume European decimal if there are exactly 2 digits after comma
+        parts = value.split(',')
+        if len(parts) == 2 and len(parts[1]) == 2:
+            value = value.replace(',', '.')
+        else:
+            value = value.replace(',', '')
+
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return None
+
+
+def parse_any_date(value: Optional[str], date_format: str = "%Y-%m-%d") -> Optional[date]:
+    """Parse date from string, trying the given format and then common formats."""
+    if not value:
+        return None
+
+    value = value.strip()
+
+    for fmt in (date_format, *DATE_FORMATS):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+
+    return None
+
+
+def compile_date_parser(date_format: str) -> Callable[[str], date]:
+    """
+    Parser for one of DATE_FORMATS that splits instead of using strptime.
+
+    Raises ValueError for values in another format.
+    """
+    if date_format == "%Y%m%d":
+        def parse_compact(value: str) -> date:
+            if len(value) != 8 or not value.isdigit():
+                raise ValueError(value)
+            return date(int(value[:4]), int(value[4:6]), int(value[6:]))
+        return parse_compact
+
+    separator = date_format[2]
+    order = date_format.split(separator)
+    year, month, day = order.index("%Y"), order.index("%m"), order.index("%d")
+
+    def parse(value: str) -> date:
+        parts = value.split(separator)
+        if len(parts) != 3 or len(parts[year]) != 4:
+            raise ValueError(value)
+        return date(int(parts[year]), int(parts[month]), int(parts[day]))
+    return parse
+
+
+def detect_date_format(values: Sequence[str]) -> Optional[str]:
+    """The format parsing the most sample values (ties: DATE_FORMATS order)."""
+    best, best_count = None, 0
+    for fmt in DATE_FORMATS:
+        parse = compile_date_parser(fmt)
+        count = 0
+        for value in values:
+            try:
+                parse(value)
+                count += 1
+            except ValueError:
+                pass
+        if count > best_count:
+            best, best_count = fmt, count
+            if count == len(values):
+                break
+    return best
+
+
+def detect_decimal_separator(values: Sequence[str]) -> Optional[str]:
+    """
+    "," or "." depending on which separator the sample amounts use for decimals.
+
+    "1.234,56" and "12,5" vote for ","; "1,234.56" and "12.5" for ".".
+    A single separator followed by three digits is ambiguous and skipped.
+    None when no sample amount decides it (e.g. whole amounts only).
+    """
+    comma = dot = 0
+    for value in values:
+        last_comma, last_dot = value.rfind(','), value.rfind('.')
+        if last_comma >= 0 and last_dot >= 0:
+            if last_comma > last_dot:
+                comma += 1
+            else:
+                dot += 1
+        elif last_comma >= 0:
+            if len(value) - last_comma - 1 != 3:
+                comma += 1
+        elif last_dot >= 0:
+            if value.count('.') > 1:
+                comma += 1  # 1.234.567 uses dots for thousands
+            elif len(value) - last_dot - 1 != 3:
+                dot += 1
+    if comma == dot == 0:
+        return None
+    return "," if comma > dot else "."
+
+
+@dataclass
+class CsvColumnProfile:
+    """
+    Layout of a bank's CSV export.
+
+    ``headers`` is the header row as read; a stored profile is only reused
+    for files with the same header row.
+    """
+    headers: List[str]
+    delimiter: str
+    quotechar: str
+    columns: Dict[str, str]
+    date_format: Optional[str] = None
+    decimal_separator: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["CsvColumnProfile"]:
+        """Profile stored with to_dict; None if absent or not a profile."""
+        if not data:
+            return None
+        try:
+            return cls(**data)
+        except TypeError:
+            return None
+
+    @classmethod
+    def detect(
+        cls, headers: List[str], dialect, sample: Sequence[List[str]]
+    ) -> Optional["CsvColumnProfile"]:
+        """Detect the profile from the header and sample rows; None without the required columns."""
+        columns = resolve_columns(headers)
+        if not columns:
+            return None
+
+        def sample_values(key: str) -> List[str]:
+            index = headers.index(columns[key])
+            return [row[index].strip() for row in sample if index < len(row) and row[index].strip()]
+
+        return cls(
+            headers=list(headers),
+            delimiter=dialect.delimiter,
+            quotechar=dialect.quotechar or '"',
+            columns=columns,
+            date_format=detect_date_format(sample_values("booking_date")),
+            decimal_separator=detect_decimal_separator(sample_values("amount")),
+        )
+
+    def compile(self) -> Callable[[List[str]], CsvRow]:
+        """
+        Row converter using this profile's columns and formats.
+
+        Cells that do not match the profile's formats fall back to the
+        flexible parsers; amounts only take the fast path when their shape
+        fits the decimal separator, so a stored profile never misreads a
+        file (or row) using the other separator. Raises CsvRowError for
+        rows without a valid date, amount or description.
+        """
+        index = {header: i for i, header in enumerate(self.headers)}
+
+        def position(key: str) -> Optional[int]:
+            header = self.columns.get(key)
+            return index.get(header) if header else None
+
+        date_at, amount_at, description_at = (position(key) for key in REQUIRED_COLUMNS)
+        counterparty_iban_at = position("counterparty_iban")
+        counterparty_name_at = position("counterparty_name")
+        reference_at = position("reference")
+        account_iban_at = position("account_iban")
+        debit_credit_at = position("debit_credit")
+
+        parse_date = compile_date_parser(self.date_format) if self.date_format else None
+        decimal_separator = self.decimal_separator
+        amount_shape = AMOUNT_SHAPES.get(decimal_separator)
+
+        def cell(row: List[str], at: Optional[int]) -> Optional[str]:
+            if at is None or at >= len(row):
+                return None
+            return row[at].strip() or None
+
+        def convert(row: List[str]) -> CsvRow:
+            date_str = cell(row, date_at)
+            booking_date = None
+            if date_str and parse_date:
+                try:
+                    booking_date = parse_date(date_str)
+                except ValueError:
+                    pass
+            if booking_date is None:
+                booking_date = parse_any_date(date_str)
+                if not booking_date:
+                    raise CsvRowError(f"Ongeldige datum: {date_str}")
+
+            amount_str = cell(row, amount_at)
+            amount = None
+            if amount_str and amount_shape and amount_shape.fullmatch(amount_str):
+                if decimal_separator == ",":
+                    amount = Decimal(amount_str.replace('.', '').replace(',', '.'))
+                else:
+                    amount = Decimal(amount_str.replace(',', ''))
+            if amount is None:
+                amount = parse_any_amount(amount_str)
+            if amount is None:
+                raise CsvRowError(f"Ongeldig bedrag: {amount_str}")
+
+            debit_credit = cell(row, debit_credit_at)
+            if debit_credit and amount > 0 and debit_credit.lower() in DEBIT_MARKERS:
+                amount = -amount
+
+            description = cell(row, description_at)
+            if not description:
+                raise CsvRowError("Omschrijving is verplicht")
+
+            return CsvRow(
+                booking_date,
+                amount,
+                description,
+                cell(row, counterparty_iban_at),
+                cell(row, counterparty_name_at),
+                cell(row, reference_at),
+                cell(row, account_iban_at),
+            )
+
+        return convert
+
+
+def decode_lines(source: Union[bytes, BinaryIO]) -> Iterator[str]:
+    """Decode lines (keeping line ends) as UTF-8, falling back to latin-1 per line."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    first = True
+    for raw in source:
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            line = raw.decode("latin-1")
+        if first:
+            line = line.lstrip("\ufeff")
+            first = False
+        yield line
+
+
+class CsvStatementReader:
+    """
+    Single-pass reader of a bank CSV export.
+
+    Reads the header and up to SAMPLE_ROWS rows, reuses ``profile`` when
+    it was stored for the same header row and otherwise detects one.
+    ``profile`` is None when required columns are missing; ``headers`` is
+    empty for a file without a header row.
+    """
+
+    def __init__(self, source: Union[bytes, BinaryIO], profile: Optional[CsvColumnProfile] = None):
+        lines = decode_lines(source)
+        head: List[str] = []
+        size = 0
+        for line in lines:
+            head.append(line)
+            size += len(line)
+            if size >= SNIFF_CHARS:
+                break
+
+        self.profile_reused = False
+        if profile is not None:
+            header = next(csv.reader(head[:1], delimiter=profile.delimiter, quotechar=profile.quotechar), [])
+            if header == profile.headers:
+                self.profile_reused = True
+                dialect_args = {"delimiter": profile.delimiter, "quotechar": profile.quotechar}
+            else:
+                profile = None
+        if profile is None:
+            try:
+                dialect = csv.Sniffer().sniff("".join(head)[:SNIFF_CHARS], delimiters=";,")
+            except csv.Error:
+                dialect = csv.get_dialect("excel")
+            dialect_args = {"dialect": dialect}
+
+        self._reader = csv.reader(chain(head, lines), **dialect_args)
+        self.headers: List[str] = next(self._reader, [])
+        self.sample: List[List[str]] = [row for row in islice(self._reader, SAMPLE_ROWS) if row]
+
+        if profile is None and self.headers:
+            profile = CsvColumnProfile.detect(self.headers, dialect, self.sample)
+        self.profile: Optional[CsvColumnProfile] = profile
+
+    def infer_account_iban(self) -> Optional[str]:
+        """The account IBAN of the sample rows, if they name exactly one."""
+        column = self.profile.columns.get("account_iban") if self.profile else None
+        if not column or column not in self.headers:
+            return None
+        at = self.headers.index(column)
+        candidates = {
+            row[at].replace(" ", "").upper()
+            for row in self.sample
+            if at < len(row) and row[at].strip()
+        }
+        return candidates.pop() if len(candidates) == 1 else None
+
+    def rows(self) -> Iterator[List[str]]:
+        """Data rows (sample first), skipping blank lines."""
+        yield from self.sample
+        for row in self._reader:
+            if row:
+                yield row
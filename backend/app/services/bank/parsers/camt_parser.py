@@ -5,17 +5,65 @@ Parses CAMT.053 XML files (Bank-to-Customer Account Statement).
 This is the standard format used by European banks for PSD2 compliance.
 
 Namespace: urn:iso:std:iso:20022:tech:xsd:camt.053.001.0X (X = version)
+
+Files are read with iterparse: every Ntry element is turned into
+transactions and removed from the tree as soon as it is complete, so year
+exports of hundreds of MB are parsed in bounded memory. Format detection
+only looks at the first bytes of the file.
 """
+import io
 import logging
+import re
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 
 from .base_parser import BaseStatementParser, ParsedTransaction
 
 logger = logging.getLogger(__name__)
 
+# Bytes inspected by can_parse and namespace detection
+SNIFF_BYTES = 4096
+
+_NAMESPACE_RE = re.compile(rb'xmlns(?::[\w.-]+)?\s*=\s*["\']([^"\']*camt\.053[^"\']*)["\']')
+
+
+def _local(tag: str) -> str:
+    """Tag name without its namespace."""
+    return tag.rpartition('}')[2]
+
+
+_Paths = Dict[Tuple[str, ...], ET.Element]
+
+
+def _index_paths(scope: ET.Element) -> _Paths:
+    """
+    Index a subtree by path suffix in one walk.
+    
+    Maps the last one, two and three local names of every path below (and
+    including) ``scope`` to the first such element in document order, so
+    ``paths.get(("BookgDt", "Dt"))`` answers ``scope.find(".//{*}BookgDt/{*}Dt")``
+    without walking the subtree again.
+    """
+    paths: _Paths = {}
+    
+    def walk(elem: ET.Element, chain: Tuple[str, ...]) -> None:
+        for child in elem:
+            child_chain = chain[-2:] + (_local(child.tag),)
+            for size in range(len(child_chain), 0, -1):
+                paths.setdefault(child_chain[-size:], child)
+            walk(child, child_chain)
+    
+    walk(scope, (_local(scope.tag),))
+    return paths
+
+
+def _text(elem: Optional[ET.Element]) -> Optional[str]:
+    if elem is None or not elem.text:
+        return None
+    return elem.text.strip() or None
+
 
 class CAMT053Parser(BaseStatementParser):
     """
@@ -32,227 +80,241 @@ class CAMT053Parser(BaseStatementParser):
         'camt08': 'urn:iso:std:iso:20022:tech:xsd:camt.053.001.08',
     }
     
+    def __init__(self):
+        # IBAN of the first statement, set while iterating transactions
+        self.account_iban: Optional[str] = None
+    
     def can_parse(self, file_bytes: bytes, filename: Optional[str] = None) -> bool:
-        """Check if file is CAMT.053 XML format."""
-        # Check file extension
-        if filename and filename.lower().endswith('.xml'):
-            # Check if content looks like XML
-            try:
-                content = file_bytes.decode('utf-8')
-                if 'camt.053' in content or 'BkToCstmrStmt' in content:
-                    return True
-            except UnicodeDecodeError:
-                return False
-        
-        # Try parsing as XML
-        try:
-            root = ET.fromstring(file_bytes.decode('utf-8'))
-            # Check if root tag contains CAMT.053 indicators
-            if 'camt.053' in root.tag or 'BkToCstmrStmt' in root.tag:
-                return True
-        except (ET.ParseError, UnicodeDecodeError):
+        """Check if file is CAMT.053 XML format (from the first bytes only)."""
+        head = file_bytes[:SNIFF_BYTES]
+        if not head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<'):
             return False
-        
-        return False
+        return self.detect_namespace(head) is not None or b'BkToCstmrStmt' in head
+    
+    def detect_namespace(self, head: bytes) -> Optional[str]:
+        """Return the CAMT.053 namespace declared in the first bytes of a file, if any."""
+        match = _NAMESPACE_RE.search(head[:SNIFF_BYTES])
+        return match.group(1).decode('ascii', errors='replace') if match else None
     
     def parse(self, file_bytes: bytes) -> tuple[List[ParsedTransaction], Optional[str]]:
         """Parse CAMT.053 XML file."""
-        try:
-            content = file_bytes.decode('utf-8')
-        except UnicodeDecodeError:
-            raise ValueError("Invalid encoding for CAMT.053 file (expected UTF-8)")
+        transactions = list(self.iter_transactions(file_bytes))
+        return transactions, self.account_iban
+    
+    def iter_transactions(self, source: Union[bytes, BinaryIO]) -> Iterator[ParsedTransaction]:
+        """
+        Yield the transactions of a CAMT.053 file lazily.
         
+        ``source`` is the file content or a binary file object. Every Ntry
+        is removed from the tree once its transactions have been yielded.
+        The account IBAN of the first statement is available as
+        ``account_iban`` once its Acct block has been read, i.e. before the
+        first transaction.
+        
+        Raises:
+            ValueError: If the XML is malformed (possibly after earlier
+                transactions were yielded)
+        """
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        self.account_iban = None
+        
+        stack: List[ET.Element] = []
         try:
-            root = ET.fromstring(content)
+            for event, elem in ET.iterparse(source, events=('start', 'end')):
+                if event == 'start':
+                    stack.append(elem)
+                    continue
+                
+                stack.pop()
+                tag = _local(elem.tag)
+                if tag == 'Ntry':
+                    try:
+                        yield from self._parse_entry_transactions(elem)
+                    except Exception as e:
+                        logger.warning(f"Failed to parse CAMT entry: {e}")
+                    # Drop the processed entry so the tree does not grow
+                    if stack:
+                        stack[-1].remove(elem)
+                elif tag == 'Acct' and self.account_iban is None and stack and _local(stack[-1].tag) == 'Stmt':
+                    self.account_iban = _text(elem.find('{*}Id/{*}IBAN')) or _text(elem.find('Id/IBAN'))
         except ET.ParseError as e:
             raise ValueError(f"Invalid XML format: {e}")
-        
-        # Detect namespace
-        ns = self._detect_namespace(root)
-        
-        # Extract account IBAN
-        account_iban = self._extract_account_iban(root, ns)
-        
-        # Parse transactions
-        transactions = self._parse_transactions(root, ns)
-        
-        return transactions, account_iban
     
     def get_format_name(self) -> str:
         return "CAMT.053 (ISO 20022)"
     
-    def _detect_namespace(self, root: ET.Element) -> dict:
-        """Detect which CAMT.053 namespace version is used."""
-        # Try to find namespace in root tag
-        if '}' in root.tag:
-            xmlns = root.tag.split('}')[0].strip('{')
-            # Map to our namespace prefixes
-            for prefix, uri in self.NAMESPACES.items():
-                if xmlns == uri or 'camt.053' in xmlns:
-                    return {prefix: xmlns}
+    def _parse_entry_transactions(self, entry: ET.Element) -> Iterator[ParsedTransaction]:
+        """
+        Transactions of one entry.
         
-        # Default to most common version
-        return {'camt': self.NAMESPACES['camt']}
-    
-    def _extract_account_iban(self, root: ET.Element, ns: dict) -> Optional[str]:
-        """Extract account IBAN from statement."""
-        # Try multiple XPath patterns for different versions
-        patterns = [
-            ".//Acct/Id/IBAN",
-            ".//Stmt/Acct/Id/IBAN",
-            ".//{*}Acct/{*}Id/{*}IBAN",
+        A batch-booked entry (several TxDtls) becomes one transaction per
+        TxDtls, provided every TxDtls carries its own amount; otherwise the
+        entry is booked as a single transaction.
+        """
+        paths = _index_paths(entry)
+        details = [
+            child
+            for entry_details in entry if _local(entry_details.tag) == 'NtryDtls'
+            for child in entry_details if _local(child.tag) == 'TxDtls'
         ]
+        if len(details) > 1:
+            indexed = [_index_paths(d) for d in details]
+            if all(self._details_amount(d) is not None for d in indexed):
+                for index, tx_paths in enumerate(indexed, start=1):
+                    transaction = self._parse_batch_transaction(paths, tx_paths, index)
+                    if transaction:
+                        yield transaction
+                return
         
-        for pattern in patterns:
-            try:
-                elem = root.find(pattern, ns)
-                if elem is not None and elem.text:
-                    return elem.text.strip()
-            except Exception:
-                # Try without namespace
-                try:
-                    elem = root.find(pattern)
-                    if elem is not None and elem.text:
-                        return elem.text.strip()
-                except Exception:
-                    continue
-        
-        return None
-    
-    def _parse_transactions(self, root: ET.Element, ns: dict) -> List[ParsedTransaction]:
-        """Parse all transactions from CAMT.053 XML."""
-        transactions = []
-        
-        # Find all entry elements (transactions)
-        # Try with namespace
-        entries = root.findall(".//{*}Ntry")
-        if not entries:
-            # Try without namespace filter
-            entries = root.findall(".//Ntry")
-        
-        for entry in entries:
-            try:
-                transaction = self._parse_entry(entry)
-                if transaction:
-                    transactions.append(transaction)
-            except Exception as e:
-                logger.warning(f"Failed to parse CAMT entry: {e}")
-                continue
-        
-        return transactions
+        transaction = self._parse_entry(paths, _index_paths(details[0]) if details else None)
+        if transaction:
+            yield transaction
     
-    def _parse_entry(self, entry: ET.Element) -> Optional[ParsedTransaction]:
+    def _parse_entry(self, paths: _Paths, details: Optional[_Paths]) -> Optional[ParsedTransaction]:
         """Parse a single transaction entry."""
-        # Booking date
-        booking_date_elem = entry.find(".//{*}BookgDt/{*}Dt")
-        if booking_date_elem is None or not booking_date_elem.text:
-            booking_date_elem = entry.find(".//{*}BookgDt/{*}DtTm")
-        
-        if booking_date_elem is None or not booking_date_elem.text:
+        booking_date = self._booking_date(paths)
+        if booking_date is None:
             return None
         
-        booking_date_str = booking_date_elem.text.strip()
-        booking_date = self._parse_date(booking_date_str)
-        
-        # Value date (optional)
-        value_date = None
-        value_date_elem = entry.find(".//{*}ValDt/{*}Dt")
-        if value_date_elem is not None and value_date_elem.text:
-            value_date = self._parse_date(value_date_elem.text.strip())
-        
         # Amount
-        amount_elem = entry.find(".//{*}Amt")
+        amount_elem = paths.get(("Amt",))
         if amount_elem is None or not amount_elem.text:
             return None
         
-        amount_str = amount_elem.text.strip()
-        amount = Decimal(amount_str)
+        amount = Decimal(amount_elem.text.strip())
         currency = amount_elem.get('Ccy', 'EUR')
         
         # Credit/Debit indicator
-        cdt_dbt_ind_elem = entry.find(".//{*}CdtDbtInd")
-        if cdt_dbt_ind_elem is not None and cdt_dbt_ind_elem.text:
-            if cdt_dbt_ind_elem.text.strip() == 'DBIT':
-                amount = -amount
-        
-        # Transaction details
-        details = entry.find(".//{*}NtryDtls/{*}TxDtls")
+        if _text(paths.get(("CdtDbtInd",))) == 'DBIT':
+            amount = -amount
         
         # Description
         description_parts = []
         
         # Unstructured remittance information
-        ustrd_elem = entry.find(".//{*}RmtInf/{*}Ustrd")
-        if details is not None:
-            ustrd_elem = details.find(".//{*}RmtInf/{*}Ustrd")
-        if ustrd_elem is not None and ustrd_elem.text:
-            description_parts.append(ustrd_elem.text.strip())
+        ustrd = _text((details or paths).get(("RmtInf", "Ustrd")))
+        if ustrd:
+            description_parts.append(ustrd)
         
         # Additional transaction info
-        addtl_info_elem = entry.find(".//{*}AddtlNtryInf")
-        if addtl_info_elem is not None and addtl_info_elem.text:
-            description_parts.append(addtl_info_elem.text.strip())
+        addtl_info = _text(paths.get(("AddtlNtryInf",)))
+        if addtl_info:
+            description_parts.append(addtl_info)
         
         description = " / ".join(description_parts) if description_parts else "Bank transaction"
         
+        return self._transaction(
+            paths, details,
+            booking_date=booking_date,
+            amount=amount,
+            currency=currency,
+            description=description,
+            transaction_id=_text(paths.get(("NtryRef",))),
+        )
+    
+    def _parse_batch_transaction(
+        self, paths: _Paths, details: _Paths, index: int
+    ) -> Optional[ParsedTransaction]:
+        """Parse one TxDtls of a batch-booked entry."""
+        booking_date = self._booking_date(paths)
+        if booking_date is None:
+            return None
+        
+        amount_elem = self._details_amount(details)
+        amount = Decimal(amount_elem.text.strip())
+        currency = amount_elem.get('Ccy', 'EUR')
+        
+        # The transaction's own indicator, falling back to the entry's
+        indicator = _text(details.get(("TxDtls", "CdtDbtInd"))) or _text(paths.get(("Ntry", "CdtDbtInd")))
+        if indicator == 'DBIT':
+            amount = -amount
+        
+        description_parts = [
+            part for part in (
+                _text(details.get(("RmtInf", "Ustrd"))),
+                _text(details.get(("TxDtls", "AddtlTxInf"))),
+            ) if part
+        ]
+        description = " / ".join(description_parts) or _text(paths.get(("Ntry", "AddtlNtryInf"))) or "Bank transaction"
+        
+        transaction_id = _text(details.get(("TxDtls", "Refs", "AcctSvcrRef")))
+        if transaction_id is None:
+            entry_ref = _text(paths.get(("Ntry", "NtryRef")))
+            transaction_id = f"{entry_ref}/{index}" if entry_ref else None
+        
+        return self._transaction(
+            paths, details,
+            booking_date=booking_date,
+            amount=amount,
+            currency=currency,
+            description=description,
+            transaction_id=transaction_id,
+        )
+    
+    def _details_amount(self, details: _Paths) -> Optional[ET.Element]:
+        """Amount of a TxDtls (Amt in newer versions, AmtDtls in .02)."""
+        for path in (("TxDtls", "Amt"), ("AmtDtls", "TxAmt", "Amt"), ("AmtDtls", "InstdAmt", "Amt")):
+            elem = details.get(path)
+            if _text(elem):
+                return elem
+        return None
+    
+    def _booking_date(self, paths: _Paths):
+        booking_date_elem = paths.get(("BookgDt", "Dt"))
+        if _text(booking_date_elem) is None:
+            booking_date_elem = paths.get(("BookgDt", "DtTm"))
+        booking_date_str = _text(booking_date_elem)
+        return self._parse_date(booking_date_str) if booking_date_str else None
+    
+    def _transaction(
+        self, paths: _Paths, details: Optional[_Paths], **fields
+    ) -> ParsedTransaction:
+        """Add value date, counterparty and reference to the parsed fields."""
+        # Value date (optional)
+        value_date_str = _text(paths.get(("ValDt", "Dt")))
+        value_date = self._parse_date(value_date_str) if value_date_str else None
+        
         # Counterparty information
         counterparty_name = None
         counterparty_iban = None
         counterparty_bic = None
-        
-        if details is not None:
-            # Related parties
-            related_party = details.find(".//{*}RltdPties")
-            if related_party is not None:
-                # Debtor (for credits) or Creditor (for debits)
-                party = related_party.find(".//{*}Dbtr/{*}Nm")
-                if party is None:
-                    party = related_party.find(".//{*}Cdtr/{*}Nm")
-                if party is not None and party.text:
-                    counterparty_name = party.text.strip()
-                
-                # IBAN
-                iban = related_party.find(".//{*}DbtrAcct/{*}Id/{*}IBAN")
-                if iban is None:
-                    iban = related_party.find(".//{*}CdtrAcct/{*}Id/{*}IBAN")
-                if iban is not None and iban.text:
-                    counterparty_iban = iban.text.strip()
-                
-                # BIC
-                bic = related_party.find(".//{*}DbtrAgt/{*}FinInstnId/{*}BIC")
-                if bic is None:
-                    bic = related_party.find(".//{*}CdtrAgt/{*}FinInstnId/{*}BIC")
-                if bic is not None and bic.text:
-                    counterparty_bic = bic.text.strip()
-        
-        # Reference (end-to-end ID or transaction ID)
         reference = None
+        
         if details is not None:
-            ref_elem = details.find(".//{*}Refs/{*}EndToEndId")
+            # Debtor (for credits) or Creditor (for debits)
+            party = details.get(("RltdPties", "Dbtr", "Nm"))
+            if party is None:
+                party = details.get(("RltdPties", "Cdtr", "Nm"))
+            counterparty_name = _text(party)
+            
+            # IBAN
+            iban = details.get(("DbtrAcct", "Id", "IBAN"))
+            if iban is None:
+                iban = details.get(("CdtrAcct", "Id", "IBAN"))
+            counterparty_iban = _text(iban)
+            
+            # BIC
+            bic = details.get(("DbtrAgt", "FinInstnId", "BIC"))
+            if bic is None:
+                bic = details.get(("CdtrAgt", "FinInstnId", "BIC"))
+            counterparty_bic = _text(bic)
+            
+            # Reference (end-to-end ID or transaction ID)
+            ref_elem = details.get(("Refs", "EndToEndId"))
             if ref_elem is None:
-                ref_elem = details.find(".//{*}Refs/{*}TxId")
-            if ref_elem is not None and ref_elem.text:
-                ref_text = ref_elem.text.strip()
-                if ref_text and ref_text != 'NOTPROVIDED':
-                    reference = ref_text
-        
-        # Transaction ID
-        transaction_id = None
-        tx_id_elem = entry.find(".//{*}NtryRef")
-        if tx_id_elem is not None and tx_id_elem.text:
-            transaction_id = tx_id_elem.text.strip()
+                ref_elem = details.get(("Refs", "TxId"))
+            ref_text = _text(ref_elem)
+            if ref_text and ref_text != 'NOTPROVIDED':
+                reference = ref_text
         
         return ParsedTransaction(
-            booking_date=booking_date,
-            amount=amount,
-            currency=currency,
-            description=description,
             counterparty_name=counterparty_name,
             counterparty_iban=counterparty_iban,
             counterparty_bic=counterparty_bic,
             reference=reference,
-            transaction_id=transaction_id,
             value_date=value_date,
+            **fields,
         )
     
     def _parse_date(self, date_str: str) -> datetime:
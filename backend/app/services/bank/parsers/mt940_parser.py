@@ -5,17 +5,63 @@ Parses MT940 text files (Statement Message).
 This is a legacy but widely-used format for bank statements.
 
 Format: Plain text with tags like :20:, :25:, :60F:, :61:, :86:, :62F:
+
+The file is read once, line by line: a tokenizer turns lines into
+(tag, value) records and transactions are built from those records as
+soon as their :86: block is complete, so files with many statements
+(accounts) are parsed lazily without decoding the whole file up front.
 """
+import io
 import logging
 import re
 from datetime import datetime, date
 from decimal import Decimal
-from typing import List, Optional, Dict
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 
 from .base_parser import BaseStatementParser, ParsedTransaction
 
 logger = logging.getLogger(__name__)
 
+# Bytes inspected by can_parse
+SNIFF_BYTES = 4096
+
+_SNIFF_20_RE = re.compile(rb'(?m)^[ \t]*:20:')
+_SNIFF_25_RE = re.compile(rb'(?m)^[ \t]*:25:')
+
+# ":61:" -> "61", ":60F:" -> "60F", ":28C:" -> "28C"
+_TAG_RE = re.compile(r':(\d{2}[A-Z]?):')
+# SWIFT block header such as {1:F01...} or {4:
+_BLOCK_HEADER_RE = re.compile(r'\{\d:')
+
+# :61: YYMMDD[MMDD](C|D|RC|RD)[funds code]amount[type code][reference][//bank reference]
+_STATEMENT_LINE_RE = re.compile(
+    r'(?P<value_date>\d{6})(?P<entry_date>\d{4})?'
+    r'(?P<mark>R?[CD])(?P<funds>[A-Z](?=\d))?'
+    r'(?P<amount>\d[\d,.]*)'
+    r'(?P<type>[A-Z][A-Z0-9]{2,3})?'
+    r'(?P<rest>.*)'
+)
+
+_IBAN_RE = re.compile(r'[A-Z]{2}\d{2}[0-9A-Z]{4,30}')
+_ACCOUNT_SPLIT_RE = re.compile(r'[/\s]')
+_LEADING_CODE_RE = re.compile(r'^/[A-Z]{3,4}/')
+
+
+# Subfield codes of structured :86: blocks (ABN AMRO, ING, Rabobank, ASN/SNS, Triodos)
+STRUCTURED_CODES = frozenset({
+    'TRTP', 'IBAN', 'BIC', 'NAME', 'REMI', 'EREF', 'MARF', 'CSID', 'CNTP',
+    'ORDP', 'BENM', 'ULTC', 'ULTD', 'PURP', 'RTRN', 'ADDR', 'ISDT', 'PREF',
+    'SVCL',
+})
+
+# Values banks put in reference subfields when there is none
+_NO_REFERENCE = frozenset({'NOTPROVIDED', 'NONREF'})
+
+
+def _normalize_space(value: str) -> str:
+    """Trim a subfield value and collapse the padding a line wrap may leave inside it."""
+    return ' '.join(value.split())
+
 
 class MT940Parser(BaseStatementParser):
     """
@@ -29,219 +75,187 @@ class MT940Parser(BaseStatementParser):
     - :61: Statement Line (transaction)
     - :86: Information to Account Owner (description)
     - :62F: Closing Balance
+    
+    A file may hold several statements (e.g. one per account or day).
     """
     
+    def __init__(self):
+        # IBAN of the first statement, set while iterating transactions
+        self.account_iban: Optional[str] = None
+        # Parsed YYMMDD dates (and YYMMDD+MMDD booking dates); statements
+        # repeat the same few dates
+        self._dates: Dict[str, date] = {}
+    
     def can_parse(self, file_bytes: bytes, filename: Optional[str] = None) -> bool:
-        """Check if file is MT940 format."""
-        # Check file extension
-        if filename and (filename.lower().endswith('.sta') or filename.lower().endswith('.mt940') or filename.lower().endswith('.txt')):
-            try:
-                content = file_bytes.decode('utf-8')
-                # Check for MT940 markers
-                if ':20:' in content and ':61:' in content:
-                    return True
-            except UnicodeDecodeError:
-                return False
-        
-        # Try decoding and checking for MT940 tags
-        try:
-            content = file_bytes.decode('utf-8')
-            # MT940 files must have transaction reference and statement lines
-            if ':20:' in content and ':61:' in content:
-                return True
-        except UnicodeDecodeError:
-            try:
-                content = file_bytes.decode('latin-1')
-                if ':20:' in content and ':61:' in content:
-                    return True
-            except UnicodeDecodeError:
-                return False
-        
-        return False
+        """Check if file is MT940 format (from the first bytes only)."""
+        # MT940 statements open with :20: followed by :25:; bank headers
+        # ({1:...} blocks, "ABNANL2A", "940") may precede them
+        head = file_bytes[:SNIFF_BYTES]
+        return bool(_SNIFF_20_RE.search(head) and _SNIFF_25_RE.search(head))
     
     def parse(self, file_bytes: bytes) -> tuple[List[ParsedTransaction], Optional[str]]:
         """Parse MT940 file."""
-        # Try UTF-8 first, then latin-1
-        try:
-            content = file_bytes.decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                content = file_bytes.decode('latin-1')
-            except UnicodeDecodeError:
-                raise ValueError("Invalid encoding for MT940 file")
-        
-        # Extract account IBAN
-        account_iban = self._extract_account_iban(content)
-        
-        # Parse transactions
-        transactions = self._parse_transactions(content)
-        
-        return transactions, account_iban
+        transactions = list(self.iter_transactions(file_bytes))
+        return transactions, self.account_iban
     
     def get_format_name(self) -> str:
         return "MT940 (SWIFT)"
     
-    def _extract_account_iban(self, content: str) -> Optional[str]:
-        """Extract account IBAN from :25: tag."""
-        # :25: tag contains account identification
-        match = re.search(r':25:([^\n]+)', content)
-        if match:
-            account_info = match.group(1).strip()
-            # IBAN is usually after a space or slash
-            # Format can be: :25:NL91ABNA0417164300 or :25:12345/NL91ABNA0417164300
-            parts = re.split(r'[/\s]', account_info)
-            for part in parts:
-                # Check if this looks like an IBAN (starts with 2 letters)
-                if len(part) > 10 and part[:2].isalpha() and part[2:].replace(' ', '').isalnum():
-                    return part.replace(' ', '').upper()
+    def iter_records(self, source: Union[bytes, BinaryIO]) -> Iterator[Tuple[str, str]]:
+        """
+        Tokenize an MT940 file into (tag, value) records in one pass.
+        
+        Continuation lines are appended to the value of the open record,
+        separated by newlines. Only the line break is removed, so a space
+        at the wrap point survives. Message separator lines ("-", "-}")
+        and SWIFT header blocks close the open record, while other lines
+        starting with "-" or "{" are continuations; lines outside a record
+        are skipped. Each line is decoded as UTF-8, falling back to latin-1.
+        """
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
         
-        return None
+        tag = None
+        parts: List[str] = []
+        for raw in source:
+            try:
+                line = raw.decode('utf-8').rstrip('\r\n')
+            except UnicodeDecodeError:
+                line = raw.decode('latin-1').rstrip('\r\n')
+            head = line.lstrip()
+            
+            match = _TAG_RE.match(head) if head.startswith(':') else None
+            if match:
+                if tag is not None:
+                    yield tag, '\n'.join(parts)
+                tag = match.group(1)
+                parts = [head[match.end():].lstrip()]
+            elif head.rstrip() in ('-', '-}') or _BLOCK_HEADER_RE.match(head):
+                if tag is not None:
+                    yield tag, '\n'.join(parts)
+                tag = None
+            elif head.strip() and tag is not None:
+                parts.append(line)
+        
+        if tag is not None:
+            yield tag, '\n'.join(parts)
     
-    def _parse_transactions(self, content: str) -> List[ParsedTransaction]:
-        """Parse all transactions from MT940 content."""
-        transactions = []
-        
-        # Split content by :61: tags (statement lines)
-        # Each :61: represents a transaction
-        lines = content.split('\n')
-        
-        current_transaction = None
-        current_description_lines = []
+    def iter_transactions(self, source: Union[bytes, BinaryIO]) -> Iterator[ParsedTransaction]:
+        """
+        Yield the transactions of an MT940 file lazily.
         
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # New transaction starts with :61:
-            if line.startswith(':61:'):
-                # Save previous transaction if exists
-                if current_transaction:
-                    description = self._build_description(current_description_lines)
-                    if description:
-                        current_transaction['description'] = description
-                    # Store the full text for extracting counterparty info
-                    current_transaction['full_description_text'] = ' '.join(current_description_lines)
-                    try:
-                        parsed = self._create_transaction(current_transaction)
-                        if parsed:
-                            transactions.append(parsed)
-                    except Exception as e:
-                        logger.warning(f"Failed to parse MT940 transaction: {e}")
-                
-                # Start new transaction
-                current_transaction = self._parse_statement_line(line)
-                current_description_lines = []
-            
-            # Description follows with :86: tag
-            elif line.startswith(':86:') and current_transaction:
-                desc = line[4:].strip()  # Remove :86: prefix
-                if desc:
-                    current_description_lines.append(desc)
+        ``source`` is the file content or a binary file object. A :61:
+        statement line becomes a transaction once the record after it has
+        been read (its :86: block or the next tag). The IBAN of the first
+        statement's :25: tag is available as ``account_iban``.
+        """
+        self.account_iban = None
+        self._dates = {}
+        
+        statement_line: Optional[Dict] = None
+        info: List[str] = []
+        for tag, value in self.iter_records(source):
+            if tag == '86':
+                if statement_line is not None:
+                    info.append(value)
+                continue
             
-            # Multi-line description continuation
-            elif current_description_lines and not line.startswith(':') and line:
-                current_description_lines.append(line)
+            if statement_line is not None:
+                transaction = self._build_transaction(statement_line, info)
+                if transaction:
+                    yield transaction
+                statement_line = None
+                info = []
             
-            # End of statement
-            elif line.startswith(':62') and current_transaction:
-                # Save last transaction
-                description = self._build_description(current_description_lines)
-                if description:
-                    current_transaction['description'] = description
-                # Store the full text for extracting counterparty info
-                current_transaction['full_description_text'] = ' '.join(current_description_lines)
+            if tag == '61':
                 try:
-                    parsed = self._create_transaction(current_transaction)
-                    if parsed:
-                        transactions.append(parsed)
+                    statement_line = self._parse_statement_line(value.split('\n', 1)[0])
                 except Exception as e:
                     logger.warning(f"Failed to parse MT940 transaction: {e}")
-                current_transaction = None
-                current_description_lines = []
-            
-            i += 1
+            elif tag == '25' and self.account_iban is None:
+                self.account_iban = self._extract_account_iban(value)
         
-        # Handle last transaction if not closed by :62:
-        if current_transaction:
-            description = self._build_description(current_description_lines)
-            if description:
-                current_transaction['description'] = description
-            # Store the full text for extracting counterparty info
-            current_transaction['full_description_text'] = ' '.join(current_description_lines)
-            try:
-                parsed = self._create_transaction(current_transaction)
-                if parsed:
-                    transactions.append(parsed)
-            except Exception:
-                pass
+        if statement_line is not None:
+            transaction = self._build_transaction(statement_line, info)
+            if transaction:
+                yield transaction
+    
+    def _extract_account_iban(self, account_info: str) -> Optional[str]:
+        """Extract account IBAN from the value of a :25: tag."""
+        # IBAN is usually after a space or slash
+        # Format can be: :25:NL91ABNA0417164300 or :25:12345/NL91ABNA0417164300
+        for part in _ACCOUNT_SPLIT_RE.split(account_info.strip()):
+            # Check if this looks like an IBAN (starts with 2 letters)
+            if len(part) > 10 and part[:2].isalpha() and part[2:].isalnum():
+                # ING appends the currency: NL20INGB0001234567EUR
+                if len(part) > 18 and part[-3:].isalpha() and part[-4].isdigit():
+                    part = part[:-3]
+                return part.upper()
         
-        return transactions
+        return None
+    
+    def _build_transaction(self, statement_line: Dict, info: List[str]) -> Optional[ParsedTransaction]:
+        """Combine a parsed :61: line with its :86: block."""
+        try:
+            return self._create_transaction(statement_line, self._join_information(info))
+        except Exception as e:
+            logger.warning(f"Failed to parse MT940 transaction: {e}")
+            return None
     
-    def _parse_statement_line(self, line: str) -> Dict:
+    def _join_information(self, info: List[str]) -> str:
         """
-        Parse :61: statement line.
+        Join the lines of :86: blocks.
         
-        Format: :61:YYMMDD[MMDD]C/D[C]amount[Nxxx]//reference[//additional]
-        Example: :61:2401150115D123,45NMSCNONREF//1234567890
+        Structured blocks are wrapped at a fixed width, possibly inside a
+        subfield value or right after a space, so their lines are joined
+        exactly as they were split. Free text lines are trimmed and joined
+        with spaces.
+        """
+        text = '\n'.join(info)
+        if text.startswith('/'):
+            return text.replace('\n', '')
+        return ' '.join(line.strip() for line in text.split('\n') if line.strip())
+    
+    def _parse_statement_line(self, data: str) -> Dict:
+        """
+        Parse the value of a :61: statement line.
+        
+        Format: YYMMDD[MMDD]C/D[funds code]amount[Nxxx][reference][//bank reference]
+        Example: 2401150115D123,45NMSCNONREF//1234567890
         
         Components:
         - YYMMDD: Value date
         - MMDD (optional): Booking date
-        - C/D: Credit/Debit
-        - C (optional): Reversal indicator
+        - C/D: Credit/Debit, RC/RD for reversals
+        - Funds code (optional): third letter of the currency code
         - amount: Transaction amount
         - Nxxx: Transaction type code
-        - reference: Bank reference
+        - reference: Bank reference (after //)
         """
-        # Remove :61: prefix
-        data = line[4:].strip()
+        match = _STATEMENT_LINE_RE.match(data.strip())
+        if not match:
+            raise ValueError(f"Cannot parse statement line: {data}")
         
-        # Extract value date (first 6 digits: YYMMDD)
-        value_date_str = data[:6]
+        value_date_str, entry_date, mark, _, amount_str, _, rest = match.groups()
         value_date = self._parse_mt940_date(value_date_str)
         
-        # Check if booking date follows (next 4 digits: MMDD)
-        booking_date = value_date  # Default to value date
-        offset = 6
-        if len(data) > 10 and data[6:10].isdigit():
-            booking_date_str = value_date_str[:2] + data[6:10]  # YYMMDD
-            booking_date = self._parse_mt940_date(booking_date_str)
-            offset = 10
-        
-        # Extract debit/credit indicator
-        remaining = data[offset:]
-        debit_credit = remaining[0] if remaining else 'C'
-        remaining = remaining[1:]
-        
-        # Skip reversal indicator if present
-        if remaining and remaining[0] in ('R', 'C'):
-            remaining = remaining[1:]
+        # Booking date defaults to the value date; it has no year of its own
+        booking_date = value_date
+        if entry_date:
+            booking_date = self._dates.get(value_date_str + entry_date)
+            if booking_date is None:
+                booking_date = self._booking_date(value_date_str, value_date, entry_date)
         
-        # Extract amount (ends with first letter or 'N')
-        amount_match = re.match(r'([0-9,\.]+)', remaining)
-        if not amount_match:
-            raise ValueError(f"Cannot parse amount from: {remaining}")
-        
-        amount_str = amount_match.group(1)
         amount = self._parse_amount(amount_str)
         
-        # Apply debit/credit
-        if debit_credit == 'D':
+        # D and RC (reversal of a credit) take money out of the account
+        if mark in ('D', 'RC'):
             amount = -amount
         
-        remaining = remaining[len(amount_str):]
-        
-        # Skip transaction type code (Nxxx or similar)
-        type_match = re.match(r'[A-Z][A-Z0-9]{2,3}', remaining)
-        if type_match:
-            remaining = remaining[len(type_match.group(0)):]
-        
         # Extract reference (after //)
         reference = None
-        if '//' in remaining:
-            ref_parts = remaining.split('//')
-            if len(ref_parts) > 1:
-                reference = ref_parts[1].strip()
+        if '//' in rest:
+            reference = rest.split('//', 2)[1].strip() or None
         
         return {
             'booking_date': booking_date,
@@ -251,84 +265,125 @@ class MT940Parser(BaseStatementParser):
             'currency': 'EUR',  # MT940 usually doesn't specify, assume EUR
         }
     
-    def _build_description(self, lines: List[str]) -> str:
-        """Build description from :86: tag lines."""
-        if not lines:
-            return "Bank transaction"
-        
-        # Join lines, but try to extract structured information
-        full_text = ' '.join(lines)
+    def _booking_date(self, value_date_str: str, value_date: date, entry_date: str) -> date:
+        """Booking date (MMDD) in the year of the value date, or the adjacent one."""
+        year = int(value_date_str[:2])
+        # Value date late December, booked early January (or vice versa)
+        entry_month = int(entry_date[:2])
+        if entry_month - value_date.month > 6:
+            year -= 1
+        elif value_date.month - entry_month > 6:
+            year += 1
+        booking_date = self._dates[value_date_str + entry_date] = self._parse_mt940_date(
+            f"{year % 100:02d}{entry_date}"
+        )
+        return booking_date
+    
+    def _parse_subfields(self, text: str) -> Dict[str, List[str]]:
+        """
+        Split a structured :86: block into its subfields.
         
-        # MT940 :86: often has structured codes like:
-        # /IBAN/NL12BANK0123456789/NAME/John Doe/REMI/Payment for invoice 123
-        # We'll extract the most relevant parts
+        ``/IBAN/NL12BANK0123456789/NAME/John Doe/REMI/Invoice 123`` becomes
+        ``{'IBAN': ['NL12BANK0123456789'], 'NAME': ['John Doe'], 'REMI': ['Invoice 123']}``.
+        Values spanning several slash-separated tokens keep their tokens,
+        e.g. ING's ``/CNTP/<iban>/<bic>/<name>/<city>/`` and
+        ``/REMI/USTD//<text>/``. The first occurrence of a code wins.
+        """
+        fields: Dict[str, List[str]] = {}
+        current: Optional[List[str]] = None
+        for token in text.split('/'):
+            if token in STRUCTURED_CODES and token not in fields:
+                current = fields[token] = []
+            elif current is not None:
+                current.append(token)
+        return fields
+    
+    def _build_description(self, text: str, fields: Dict[str, List[str]]) -> str:
+        """Build description from a :86: block and its subfields."""
+        if not text:
+            return "Bank transaction"
         
         parts = []
         
-        # Extract REMI (remittance information)
-        remi_match = re.search(r'/REMI/([^/]+)', full_text)
-        if remi_match:
-            parts.append(remi_match.group(1).strip())
+        # Remittance information
+        remittance = self._remittance(fields.get('REMI'))
+        if remittance:
+            parts.append(remittance)
         
-        # Extract EREF (end-to-end reference)
-        eref_match = re.search(r'/EREF/([^/]+)', full_text)
-        if eref_match:
-            parts.append(eref_match.group(1).strip())
+        # End-to-end reference
+        eref = self._field_value(fields.get('EREF'))
+        if eref and eref not in _NO_REFERENCE:
+            parts.append(eref)
         
         # If no structured data found, use full text
         if not parts:
             # Remove common prefixes
-            cleaned = re.sub(r'^/[A-Z]{3,4}/', '', full_text)
-            parts.append(cleaned.strip())
+            parts.append(_LEADING_CODE_RE.sub('', text).strip())
         
-        return ' / '.join(parts) if parts else full_text
+        return ' / '.join(parts) if parts else text
+    
+    def _remittance(self, tokens: Optional[List[str]]) -> Optional[str]:
+        """
+        Remittance text of a /REMI/ subfield.
+        
+        ING and Rabobank qualify it: ``USTD//<free text>/`` or
+        ``STRD/CUR/<payment reference>/``.
+        """
+        if not tokens:
+            return None
+        if tokens[0] == 'USTD':
+            return self._field_value(tokens[2:] if len(tokens) > 2 and not tokens[1] else tokens[1:])
+        if tokens[0] == 'STRD':
+            values = [token for token in tokens[1:] if token and token != 'CUR']
+            return (_normalize_space(values[-1]) or None) if values else None
+        return self._field_value(tokens)
     
-    def _create_transaction(self, data: Dict) -> Optional[ParsedTransaction]:
-        """Create ParsedTransaction from parsed data."""
+    def _field_value(self, tokens: Optional[List[str]]) -> Optional[str]:
+        """Single-token value, or the tokens rejoined when the value contains slashes."""
+        if not tokens:
+            return None
+        value = _normalize_space('/'.join(tokens).strip('/'))
+        return value or None
+    
+    def _create_transaction(self, data: Dict, text: str) -> Optional[ParsedTransaction]:
+        """Create ParsedTransaction from a parsed :61: line and its :86: text."""
         if not data.get('booking_date') or data.get('amount') is None:
             return None
         
-        # Extract counterparty info from the full :86: text (not the processed description)
-        # This preserves structured fields like /NAME/ and /IBAN/
-        full_text = data.get('full_description_text', '')
-        counterparty_name = self._extract_counterparty_name(full_text)
-        counterparty_iban = self._extract_counterparty_iban(full_text)
-        
-        # Use the processed description for the description field
-        description = data.get('description', '')
+        # Structured fields like /NAME/ and /IBAN/ give the counterparty
+        fields = self._parse_subfields(text) if text.startswith('/') else {}
+        counterparty = fields.get('CNTP') or []
         
         return ParsedTransaction(
             booking_date=data['booking_date'],
             amount=data['amount'],
             currency=data.get('currency', 'EUR'),
-            description=description or "Bank transaction",
-            counterparty_name=counterparty_name,
-            counterparty_iban=counterparty_iban,
+            description=self._build_description(text, fields),
+            counterparty_name=self._extract_counterparty_name(fields, counterparty),
+            counterparty_iban=self._extract_counterparty_iban(fields, counterparty),
+            counterparty_bic=self._field_value(fields.get('BIC')) or self._token(counterparty, 1),
             reference=data.get('reference'),
             value_date=data.get('value_date'),
         )
     
-    def _extract_counterparty_name(self, description: str) -> Optional[str]:
-        """Extract counterparty name from description."""
-        # Look for /NAME/ tag
-        match = re.search(r'/NAME/([^/]+)', description)
-        if match:
-            return match.group(1).strip()
-        
-        # Look for /BENM/ tag (beneficiary)
-        match = re.search(r'/BENM/([^/]+)', description)
-        if match:
-            return match.group(1).strip()
-        
+    def _token(self, tokens: List[str], index: int) -> Optional[str]:
+        if index < len(tokens):
+            return _normalize_space(tokens[index]) or None
         return None
     
-    def _extract_counterparty_iban(self, description: str) -> Optional[str]:
-        """Extract counterparty IBAN from description."""
-        # Look for /IBAN/ tag
-        match = re.search(r'/IBAN/([A-Z]{2}[0-9A-Z]+)', description)
-        if match:
-            return match.group(1).strip()
-        
+    def _extract_counterparty_name(self, fields: Dict[str, List[str]], counterparty: List[str]) -> Optional[str]:
+        """Extract counterparty name from /NAME/, /CNTP/ or /BENM/."""
+        return (
+            self._token(fields.get('NAME') or [], 0)
+            or self._token(counterparty, 2)
+            or self._token(fields.get('BENM') or [], 0)
+        )
+    
+    def _extract_counterparty_iban(self, fields: Dict[str, List[str]], counterparty: List[str]) -> Optional[str]:
+        """Extract counterparty IBAN from /IBAN/ or the first /CNTP/ token."""
+        for candidate in (self._token(fields.get('IBAN') or [], 0), self._token(counterparty, 0)):
+            if candidate and _IBAN_RE.fullmatch(candidate.replace(' ', '').upper()):
+                return candidate
         return None
     
     def _parse_mt940_date(self, date_str: str) -> date:
@@ -339,6 +394,10 @@ class MT940Parser(BaseStatementParser):
         in the past or 49 years in the future from current year.
         This makes the parser future-proof and avoids Y2K-style issues.
         """
+        parsed = self._dates.get(date_str)
+        if parsed is not None:
+            return parsed
+        
         year = int(date_str[:2])
         month = int(date_str[2:4])
         day = int(date_str[4:6])
@@ -357,7 +416,8 @@ class MT940Parser(BaseStatementParser):
         elif full_year < current_year - 50:
             full_year += 100
         
-        return date(full_year, month, day)
+        parsed = self._dates[date_str] = date(full_year, month, day)
+        return parsed
     
     def _parse_amount(self, amount_str: str) -> Decimal:
         """Parse amount from MT940 format."""
@@ -13,7 +13,6 @@ import re
 import uuid
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from difflib import SequenceMatcher
 from typing import List, Optional, Tuple, Dict, Any
 
 from sqlalchemy import select, func, or_, and_, delete
@@ -33,6 +32,7 @@ from app.models.bank import (
 from app.models.subledger import OpenItem, OpenItemStatus
 from app.models.financial_commitment import FinancialCommitment, RecurringFrequency, CommitmentStatus
 from app.models.audit_log import AuditLog
+from app.services.commitment_engine import NameIndex
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +65,7 @@ class BankMatchingEngine:
         self.db = db
         self.client_id = client_id
         self.user_id = user_id
+        self._commitment_matcher = None
     
     async def generate_proposals(
         self,
@@ -333,23 +334,56 @@ class BankMatchingEngine:
         
         return proposals
     
+    async def _load_commitment_matcher(self) -> Tuple[List[FinancialCommitment], Dict[int, List[FinancialCommitment]], NameIndex]:
+        """
+        Load active commitments once per engine and index them by amount
+        (cents) and by provider name.
+        """
+        if self._commitment_matcher is None:
+            query = (
+                select(FinancialCommitment)
+                .where(
+                    FinancialCommitment.administration_id == self.client_id,
+                    FinancialCommitment.status == CommitmentStatus.ACTIVE,
+                )
+            )
+            result = await self.db.execute(query)
+            commitments = list(result.scalars().all())
+
+            by_amount: Dict[int, List[FinancialCommitment]] = {}
+            providers = NameIndex()
+            for position, commitment in enumerate(commitments):
+                if commitment.amount_cents:
+                    by_amount.setdefault(commitment.amount_cents, []).append(commitment)
+                if commitment.provider:
+                    providers.add(position, commitment.provider)
+            self._commitment_matcher = (commitments, by_amount, providers)
+        return self._commitment_matcher
+
     async def _match_commitments(self, transaction: BankTransaction) -> List[Dict[str, Any]]:
         """Match transaction against recurring commitments."""
         proposals = []
-        
-        # Query active commitments
-        query = (
-            select(FinancialCommitment)
-            .where(
-                FinancialCommitment.administration_id == self.client_id,
-                FinancialCommitment.status == CommitmentStatus.ACTIVE,
-            )
-        )
-        
-        result = await self.db.execute(query)
-        commitments = result.scalars().all()
-        
-        for commitment in commitments:
+        commitments, by_amount, providers = await self._load_commitment_matcher()
+        if not commitments:
+            return proposals
+
+        # Only commitments matching on amount or provider name can reach the
+        # proposal threshold; everything else is skipped without scoring.
+        candidates: Dict[uuid.UUID, FinancialCommitment] = {}
+        amount_cents = int(round(abs(Decimal(str(transaction.amount))) * 100))
+        tolerance_cents = int(self.AMOUNT_TOLERANCE_FIXED * 100)
+        for cents in range(amount_cents - tolerance_cents, amount_cents + tolerance_cents + 1):
+            for commitment in by_amount.get(cents, ()):
+                candidates[commitment.id] = commitment
+
+        similarities: Dict[uuid.UUID, float] = {}
+        if transaction.counterparty_name:
+            for position, similarity in providers.search(transaction.counterparty_name, min_score=0.5):
+                commitment = commitments[position]
+                similarities[commitment.id] = similarity
+                candidates[commitment.id] = commitment
+
+        for commitment in candidates.values():
             confidence = 0
             reasons = []
             
@@ -362,16 +396,12 @@ class BankMatchingEngine:
                     reasons.append(f"Bedrag komt overeen met abonnement")
             
             # Check vendor name similarity
-            if commitment.provider and transaction.counterparty_name:
-                similarity = self._string_similarity(
-                    commitment.provider.upper(),
-                    transaction.counterparty_name.upper()
-                )
-                if similarity > 0.7:
-                    confidence += 30
-                    reasons.append(f"Leverancier lijkt op '{commitment.provider}'")
-                elif similarity > 0.5:
-                    confidence += 15
+            similarity = similarities.get(commitment.id, 0.0)
+            if similarity > 0.7:
+                confidence += 30
+                reasons.append(f"Leverancier lijkt op '{commitment.provider}'")
+            elif similarity > 0.5:
+                confidence += 15
             
             # Check recurring frequency (monthly/yearly recurring)
             if commitment.recurring_frequency in [RecurringFrequency.MONTHLY, RecurringFrequency.YEARLY]:
@@ -394,10 +424,6 @@ class BankMatchingEngine:
         
         return proposals
     
-    def _string_similarity(self, s1: str, s2: str) -> float:
-        """Calculate similarity ratio between two strings (0.0 to 1.0)."""
-        return SequenceMatcher(None, s1, s2).ratio()
-    
     async def _expire_old_proposals(self, transaction_id: uuid.UUID, keep_entity_ids: List[uuid.UUID]):
         """Mark old proposals as expired if they're not in the new top list."""
         query = (
@@ -8,21 +8,21 @@ Handles:
 - Match suggestion generation with enhanced rules
 - Reconciliation action execution
 """
-import csv
 import hashlib
-import io
 import logging
 import re
 import uuid
 from datetime import datetime, date, timezone, timedelta
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal
 from typing import List, Optional, Tuple
 
-from sqlalchemy import select, func, or_
+from sqlalchemy import insert, select, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
+from app.audit.session_hooks import build_bulk_create_audit_rows
+from app.models.audit_log import AuditLog
 from app.models.bank import (
     BankAccount,
     BankTransaction,
@@ -48,6 +48,18 @@ from app.services.bank.parsers import (
     CAMT053Parser,
     MT940Parser,
 )
+from app.services.bank.csv_profile import (
+    CsvColumnProfile,
+    CsvRowError,
+    CsvStatementReader,
+    normalize_header,
+    parse_any_amount,
+    parse_any_date,
+    resolve_columns,
+)
+
+# Rows per bulk INSERT during CSV import
+CSV_IMPORT_CHUNK_SIZE = 1000
 
 
 class BankReconciliationService:
@@ -90,138 +102,39 @@ class BankReconciliationService:
 
     def _parse_amount(self, value: str) -> Optional[Decimal]:
         """Parse amount from various formats."""
-        if not value:
-            return None
-        
-        # Remove whitespace
-        value = value.strip()
-        
-        # Handle European format (1.234,56)
-        if ',' in value and '.' in value:
-            # Check which is the decimal separator
-            if value.rfind(',') > value.rfind('.'):
-                # European: 1.234,56
-                value = value.replace('.', '').replace(',', '.')
-            else:
-                # US: 1,234.56
-                value = value.replace(',', '')
-        elif ',' in value:
-            # Could be 1234,56 (European decimal) or 1,234 (US thousands)
-            # Assume European decimal if there are exactly 2 digits after comma
-            parts = value.split(',')
-            if len(parts) == 2 and len(parts[1]) == 2:
-                value = value.replace(',', '.')
-            else:
-                value = value.replace(',', '')
-        
-        try:
-            return Decimal(value)
-        except InvalidOperation:
-            return None
+        return parse_any_amount(value)
 
     def _parse_date(self, value: str, date_format: str = "%Y-%m-%d") -> Optional[date]:
         """Parse date from string using specified format."""
-        if not value:
-            return None
-        
-        value = value.strip()
-        
-        # Try specified format first
-        try:
-            return datetime.strptime(value, date_format).date()
-        except ValueError:
-            pass
-        
-        # Try common formats
-        formats = [
-            "%Y-%m-%d",
-            "%d-%m-%Y",
-            "%d/%m/%Y",
-            "%Y/%m/%d",
-            "%d.%m.%Y",
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(value, fmt).date()
-            except ValueError:
-                continue
-        
-        return None
+        return parse_any_date(value, date_format)
 
     def _normalize_header(self, header: str) -> str:
-        normalized = header.strip().lower().replace(" ", "_").replace("-", "_")
-        return normalized
+        return normalize_header(header)
 
     def _resolve_columns(self, headers: List[str]) -> Optional[dict]:
-        normalized = {self._normalize_header(h): h for h in headers if h}
-        aliases = {
-            "booking_date": {"date", "booking_date"},
-            "amount": {"amount"},
-            "description": {"description"},
-            "counterparty_iban": {"iban", "counterparty_iban"},
-            "counterparty_name": {"counterparty_name"},
-            "reference": {"reference"},
-            "account_iban": {"account_iban", "rekening", "rekeningnummer"},
-        }
-
-        resolved: dict = {}
-        for key, options in aliases.items():
-            for option in options:
-                if option in normalized:
-                    resolved[key] = normalized[option]
-                    break
-
-        required = all(resolved.get(k) for k in ("booking_date", "amount", "description"))
-        return resolved if required else None
+        return resolve_columns(headers)
 
-    def _build_reader(self, decoded: str) -> csv.DictReader:
-        sample = decoded[:2048]
-        try:
-            dialect = csv.Sniffer().sniff(sample, delimiters=";,")
-        except csv.Error:
-            dialect = csv.get_dialect("excel")
-        return csv.DictReader(io.StringIO(decoded), dialect=dialect)
-
-    def _get_row_value(self, row: dict, key: Optional[str]) -> Optional[str]:
-        if not key:
-            return None
-        value = row.get(key)
-        if value is None:
-            return None
-        value = str(value).strip()
-        return value or None
-
-    def _infer_bank_account_iban(self, rows: List[dict], account_iban_column: Optional[str]) -> Optional[str]:
-        if not account_iban_column:
-            return None
-        candidates: set[str] = set()
-        for row in rows:
-            value = self._get_row_value(row, account_iban_column)
-            if value:
-                candidates.add(value.replace(" ", "").upper())
-            if len(candidates) > 1:
-                break
-        return candidates.pop() if len(candidates) == 1 else None
-
-    async def _get_or_create_bank_account(
-        self,
-        iban: str,
-        bank_name: Optional[str],
-    ) -> BankAccount:
+    async def _find_bank_account(self, iban: str) -> Optional[BankAccount]:
         normalized_iban = iban.replace(" ", "").upper()
         result = await self.db.execute(
             select(BankAccount)
             .where(BankAccount.administration_id == self.administration_id)
             .where(BankAccount.iban == normalized_iban)
         )
-        bank_account = result.scalar_one_or_none()
+        return result.scalar_one_or_none()
+
+    async def _get_or_create_bank_account(
+        self,
+        iban: str,
+        bank_name: Optional[str],
+    ) -> BankAccount:
+        bank_account = await self._find_bank_account(iban)
         if bank_account:
             return bank_account
 
         bank_account = BankAccount(
             administration_id=self.administration_id,
-            iban=normalized_iban,
+            iban=iban.replace(" ", "").upper(),
             bank_name=bank_name,
             currency="EUR",
         )
@@ -364,15 +277,23 @@ class BankReconciliationService:
         """
         Import bank transactions from a CSV file.
         
+        The file is read in one pass. The column profile stored on the bank
+        account is reused when the header row matches; otherwise it is
+        detected from the first rows and stored once the import succeeds.
+        Rows are converted with the profile's fixed date and amount formats
+        and written with bulk INSERTs per CSV_IMPORT_CHUNK_SIZE rows.
+        
         Returns counts of imported, skipped (duplicate), and failed rows.
         """
-        try:
-            decoded = file_bytes.decode("utf-8-sig")
-        except UnicodeDecodeError:
-            decoded = file_bytes.decode("latin-1")
-
-        reader = self._build_reader(decoded)
-        if not reader.fieldnames:
+        bank_account: Optional[BankAccount] = None
+        stored_profile: Optional[CsvColumnProfile] = None
+        if bank_account_iban:
+            bank_account = await self._find_bank_account(bank_account_iban)
+            if bank_account is not None:
+                stored_profile = CsvColumnProfile.from_dict(bank_account.csv_profile)
+
+        reader = CsvStatementReader(file_bytes, stored_profile)
+        if not reader.headers:
             return BankImportResponse(
                 imported_count=0,
                 skipped_duplicates_count=0,
@@ -382,8 +303,7 @@ class BankReconciliationService:
                 bank_account_id=None,
             )
 
-        column_map = self._resolve_columns(reader.fieldnames)
-        if not column_map:
+        if reader.profile is None:
             return BankImportResponse(
                 imported_count=0,
                 skipped_duplicates_count=0,
@@ -393,8 +313,8 @@ class BankReconciliationService:
                 bank_account_id=None,
             )
 
-        rows = list(reader)
-        iban_from_file = self._infer_bank_account_iban(rows, column_map.get("account_iban"))
+        # Without an IBAN the account comes from the first rows of the file
+        iban_from_file = None if bank_account_iban else reader.infer_account_iban()
         effective_iban = bank_account_iban or iban_from_file
         if not effective_iban:
             return BankImportResponse(
@@ -406,77 +326,77 @@ class BankReconciliationService:
                 bank_account_id=None,
             )
 
-        bank_account = await self._get_or_create_bank_account(effective_iban, bank_name)
+        if bank_account is None:
+            bank_account = await self._get_or_create_bank_account(effective_iban, bank_name)
 
+        convert = reader.profile.compile()
         imported_count = 0
         skipped_duplicates = 0
         total_in_file = 0
+        error_count = 0
         errors: List[str] = []
+        pending: dict = {}
 
-        existing_hashes_result = await self.db.execute(
-            select(BankTransaction.import_hash)
-            .where(BankTransaction.administration_id == self.administration_id)
-        )
-        existing_hashes = set(row[0] for row in existing_hashes_result.fetchall())
-
-        for row_num, row in enumerate(rows, start=2):
+        for row_num, row in enumerate(reader.rows(), start=2):
             total_in_file += 1
 
-            date_str = self._get_row_value(row, column_map.get("booking_date"))
-            amount_str = self._get_row_value(row, column_map.get("amount"))
-            description = self._get_row_value(row, column_map.get("description"))
-            counterparty_iban = self._get_row_value(row, column_map.get("counterparty_iban"))
-            counterparty_name = self._get_row_value(row, column_map.get("counterparty_name"))
-            reference = self._get_row_value(row, column_map.get("reference"))
-
-            booking_date = self._parse_date(date_str)
-            if not booking_date:
-                errors.append(f"Rij {row_num}: Ongeldige datum: {date_str}")
-                continue
-
-            amount = self._parse_amount(amount_str)
-            if amount is None:
-                errors.append(f"Rij {row_num}: Ongeldig bedrag: {amount_str}")
-                continue
-
-            if not description:
-                errors.append(f"Rij {row_num}: Omschrijving is verplicht")
+            try:
+                values = convert(row)
+                if iban_from_file and values.account_iban:
+                    account_iban = values.account_iban.replace(" ", "").upper()
+                    if account_iban != iban_from_file:
+                        raise CsvRowError(f"Andere rekening: {account_iban}")
+            except CsvRowError as e:
+                error_count += 1
+                if len(errors) < 10:
+                    errors.append(f"Rij {row_num}: {e}")
                 continue
 
             raw_hash = self._compute_hash(
-                booking_date,
-                amount,
-                description,
-                reference=reference,
-                counterparty_iban=counterparty_iban,
+                values.booking_date,
+                values.amount,
+                values.description,
+                reference=values.reference,
+                counterparty_iban=values.counterparty_iban,
             )
-            if raw_hash in existing_hashes:
+            if raw_hash in pending:
                 skipped_duplicates += 1
                 continue
 
-            transaction = BankTransaction(
-                administration_id=self.administration_id,
-                bank_account_id=bank_account.id,
-                booking_date=booking_date,
-                amount=amount,
-                currency="EUR",
-                counterparty_name=counterparty_name,
-                counterparty_iban=counterparty_iban,
-                description=description,
-                reference=reference,
-                import_hash=raw_hash,
-                status=BankTransactionStatus.NEW,
-            )
-            self.db.add(transaction)
-            existing_hashes.add(raw_hash)
-            imported_count += 1
+            pending[raw_hash] = {
+                "id": uuid.uuid4(),
+                "administration_id": self.administration_id,
+                "bank_account_id": bank_account.id,
+                "booking_date": values.booking_date,
+                "amount": values.amount,
+                "currency": "EUR",
+                "counterparty_name": values.counterparty_name,
+                "counterparty_iban": values.counterparty_iban,
+                "description": values.description,
+                "reference": values.reference,
+                "import_hash": raw_hash,
+                "status": BankTransactionStatus.NEW,
+            }
+            if len(pending) >= CSV_IMPORT_CHUNK_SIZE:
+                inserted = await self._insert_new_transactions(pending)
+                imported_count += inserted
+                skipped_duplicates += len(pending) - inserted
+                pending = {}
+
+        if pending:
+            inserted = await self._insert_new_transactions(pending)
+            imported_count += inserted
+            skipped_duplicates += len(pending) - inserted
+
+        if not reader.profile_reused and (imported_count or skipped_duplicates):
+            bank_account.csv_profile = reader.profile.to_dict()
 
         await self.db.commit()
 
-        if imported_count > 0 and len(errors) == 0:
+        if imported_count > 0 and error_count == 0:
             message = f"{imported_count} transacties geïmporteerd."
         elif imported_count > 0:
-            message = f"{imported_count} transacties geïmporteerd, {len(errors)} fouten."
+            message = f"{imported_count} transacties geïmporteerd, {error_count} fouten."
         elif skipped_duplicates > 0:
             message = f"Geen nieuwe transacties. {skipped_duplicates} duplicaten overgeslagen."
         else:
@@ -486,11 +406,36 @@ class BankReconciliationService:
             imported_count=imported_count,
             skipped_duplicates_count=skipped_duplicates,
             total_in_file=total_in_file,
-            errors=errors[:10],
+            errors=errors,
             message=message,
             bank_account_id=bank_account.id,
         )
 
+    async def _insert_new_transactions(self, rows_by_hash: dict) -> int:
+        """
+        Bulk insert the rows whose import hash is not stored yet.
+        
+        Earlier chunks of the same import are visible to the lookup, so
+        duplicates across chunks are skipped too. Returns the number of
+        inserted rows.
+        """
+        existing = await self.db.execute(
+            select(BankTransaction.import_hash)
+            .where(BankTransaction.administration_id == self.administration_id)
+            .where(BankTransaction.import_hash.in_(list(rows_by_hash)))
+        )
+        existing_hashes = set(existing.scalars().all())
+        rows = [row for raw_hash, row in rows_by_hash.items() if raw_hash not in existing_hashes]
+        if not rows:
+            return 0
+
+        await self.db.execute(insert(BankTransaction).execution_options(render_nulls=True), rows)
+        # Bulk inserts bypass the audit session hooks
+        audit_rows = build_bulk_create_audit_rows(BankTransaction, rows)
+        if audit_rows:
+            await self.db.execute(insert(AuditLog), audit_rows)
+        return len(rows)
+
     async def get_match_suggestions(self, transaction_id: uuid.UUID) -> Tuple[BankTransaction, List[MatchSuggestion]]:
         """
         Generate match suggestions for a bank transaction.
@@ -21,6 +21,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.certificate import Certificate
 from app.models.administration import Administration
+from app.services.signing_keyring import SigningKeyring, signing_keyring
+from app.services.xml_signing import SigningKey
 
 
 class CertificateError(Exception):
@@ -54,8 +56,9 @@ class CertificateService:
     - Managing certificate lifecycle
     """
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, keyring: Optional[SigningKeyring] = None):
         self.db = db
+        self.keyring = keyring if keyring is not None else signing_keyring
     
     async def register_certificate(
         self,
@@ -218,6 +221,7 @@ class CertificateService:
         certificate = await self.get_certificate(certificate_id, administration_id)
         certificate.is_active = False
         await self.db.commit()
+        self.keyring.evict(certificate.id)
     
     async def load_certificate_for_signing(
         self,
@@ -241,22 +245,47 @@ class CertificateService:
             CertificateNotFoundError: If certificate not found
             CertificateLoadError: If certificate cannot be loaded from filesystem
         """
+        key = await self.load_signing_key(certificate_id, administration_id)
+        return key.certificate, key.private_key
+    
+    async def load_signing_key(
+        self,
+        certificate_id: UUID,
+        administration_id: UUID,
+    ) -> SigningKey:
+        """
+        Load the signing key for a certificate, served from the keyring when
+        it was decrypted recently.
+        
+        Ownership and validity are checked against the database on every
+        call; only the file read and decryption are cached.
+        
+        Raises:
+            CertificateNotFoundError: If certificate not found
+            CertificateValidationError: If certificate is expired or inactive
+            CertificateLoadError: If certificate cannot be loaded from filesystem
+        """
         certificate = await self.get_certificate(certificate_id, administration_id)
         
         # Verify certificate is still valid
         if not certificate.is_valid():
+            self.keyring.evict(certificate.id)
             raise CertificateValidationError(
                 f"Certificate {certificate_id} is not valid "
                 f"(expired or inactive)"
             )
         
-        # Load actual certificate and key from filesystem
-        cert_data, private_key = await self._load_certificate_from_ref(
-            certificate.storage_ref,
-            certificate.passphrase_ref
-        )
+        key = self.keyring.get(certificate.id)
+        if key is None:
+            # Load actual certificate and key from filesystem
+            cert_data, private_key = await self._load_certificate_from_ref(
+                certificate.storage_ref,
+                certificate.passphrase_ref
+            )
+            key = SigningKey(cert_data, private_key)
+            self.keyring.put(certificate.id, key)
         
-        return cert_data, private_key
+        return key
     
     async def _load_certificate_from_ref(
         self,
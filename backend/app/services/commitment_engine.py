@@ -0,0 +1,459 @@
+"""
+Commitment Engine
+
+Shared logic for recurring financial commitments (lease, loan, subscription):
+
+- Due-date arithmetic (next due date, lifecycle status)
+- Schedules: status, next due date and monthly value of every commitment,
+  computed once per request and reused for totals, alerts and ordering
+- Cash-flow projection for N months ahead in a single pass over the
+  schedules
+- Recurring payment detection over the full bank history by clustering
+  payments per payee and amount and checking their intervals
+- A name matcher (normalized tokens + trigram index) used both by the
+  subscription suggestions and by bank matching against commitments
+"""
+import calendar
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from statistics import median
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.models.financial_commitment import CommitmentStatus, CommitmentType, FinancialCommitment, RecurringFrequency
+
+
+# ---------------------------------------------------------------------------
+# Date arithmetic
+# ---------------------------------------------------------------------------
+
+def add_months(base: date, months: int) -> date:
+    month_index = base.month - 1 + months
+    year = base.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(base.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def add_years(base: date, years: int) -> date:
+    target_year = base.year + years
+    day = min(base.day, calendar.monthrange(target_year, base.month)[1])
+    return date(target_year, base.month, day)
+
+
+def with_day(base: date, day: int) -> date:
+    max_day = calendar.monthrange(base.year, base.month)[1]
+    return date(base.year, base.month, min(day, max_day))
+
+
+def contract_end_date(item: FinancialCommitment) -> Optional[date]:
+    """Date of the last payment within the contract term, if the term is known."""
+    if item.contract_term_months and item.contract_term_months > 0:
+        return add_months(item.start_date, item.contract_term_months - 1)
+    return None
+
+
+def normalize_status(item: FinancialCommitment, today: date) -> CommitmentStatus:
+    if item.status == CommitmentStatus.PAUSED:
+        return CommitmentStatus.PAUSED
+    if item.status == CommitmentStatus.ENDED:
+        return CommitmentStatus.ENDED
+
+    if item.end_date and item.end_date < today:
+        return CommitmentStatus.ENDED
+
+    contract_end = contract_end_date(item)
+    if contract_end and contract_end < today:
+        return CommitmentStatus.ENDED
+
+    return CommitmentStatus.ACTIVE
+
+
+def _candidate_for_month(item: FinancialCommitment, year: int, month: int) -> date:
+    anchor_day = item.payment_day or item.start_date.day
+    return with_day(date(year, month, 1), anchor_day)
+
+
+def is_yearly_subscription(item: FinancialCommitment) -> bool:
+    return item.type == CommitmentType.SUBSCRIPTION and item.recurring_frequency == RecurringFrequency.YEARLY
+
+
+def compute_next_due_date(
+    item: FinancialCommitment,
+    today: Optional[date] = None,
+    lifecycle_status: Optional[CommitmentStatus] = None,
+) -> Optional[date]:
+    today = today or date.today()
+    lifecycle_status = lifecycle_status or normalize_status(item, today)
+    if lifecycle_status == CommitmentStatus.ENDED:
+        return None
+    if lifecycle_status == CommitmentStatus.PAUSED:
+        return None
+
+    if item.last_booked_date:
+        if item.recurring_frequency == RecurringFrequency.YEARLY:
+            candidate = add_years(item.last_booked_date, 1)
+        else:
+            candidate = add_months(item.last_booked_date, 1)
+
+        if item.end_date and candidate > item.end_date:
+            return None
+        if candidate >= today:
+            return candidate
+
+    if is_yearly_subscription(item):
+        base = item.renewal_date or item.start_date
+        candidate = base
+        while candidate < today:
+            candidate = add_years(candidate, 1)
+        if item.end_date and candidate > item.end_date:
+            return None
+        return candidate
+
+    candidate = _candidate_for_month(item, today.year, today.month)
+    if candidate < today:
+        next_month = add_months(date(today.year, today.month, 1), 1)
+        candidate = _candidate_for_month(item, next_month.year, next_month.month)
+
+    if candidate < item.start_date:
+        base = date(item.start_date.year, item.start_date.month, 1)
+        candidate = _candidate_for_month(item, base.year, base.month)
+        while candidate < item.start_date:
+            base = add_months(base, 1)
+            candidate = _candidate_for_month(item, base.year, base.month)
+
+    if item.end_date and candidate > item.end_date:
+        return None
+
+    contract_end = contract_end_date(item)
+    if contract_end and candidate > contract_end:
+        return None
+
+    return candidate
+
+
+# ---------------------------------------------------------------------------
+# Schedules and projection
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class CommitmentSchedule:
+    """Per-request view of a commitment: computed once, read many times."""
+    item: FinancialCommitment
+    status: CommitmentStatus
+    next_due_date: Optional[date]
+    payment_cents: int  # Amount of a single payment
+    monthly_cents: int  # Payment normalized to a monthly amount
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == CommitmentStatus.ACTIVE
+
+
+@dataclass
+class ProjectedMonth:
+    year: int
+    month: int
+    total_cents: int = 0
+    by_type: Dict[str, int] = field(default_factory=lambda: {t.value: 0 for t in CommitmentType})
+    payment_count: int = 0
+
+
+def build_schedule(item: FinancialCommitment, today: date) -> CommitmentSchedule:
+    lifecycle_status = normalize_status(item, today)
+    payment = item.monthly_payment_cents or item.amount_cents
+    if is_yearly_subscription(item):
+        payment, monthly = item.amount_cents, item.amount_cents // 12
+    else:
+        monthly = payment
+    return CommitmentSchedule(
+        item=item,
+        status=lifecycle_status,
+        next_due_date=compute_next_due_date(item, today=today, lifecycle_status=lifecycle_status),
+        payment_cents=payment,
+        monthly_cents=monthly,
+    )
+
+
+def build_schedules(items: Iterable[FinancialCommitment], today: date) -> List[CommitmentSchedule]:
+    return [build_schedule(item, today) for item in items]
+
+
+def _last_payment_date(item: FinancialCommitment) -> Optional[date]:
+    ends = [d for d in (item.end_date, contract_end_date(item)) if d]
+    return min(ends) if ends else None
+
+
+def project_cash_flow(schedules: Sequence[CommitmentSchedule], today: date, months: int) -> List[ProjectedMonth]:
+    """
+    Expected commitment payments per calendar month, starting with the
+    current month, for ``months`` months.
+
+    Each schedule contributes its payments from its next due date onwards,
+    stepping by its frequency and stopping at the end date or contract end.
+    """
+    if months <= 0:
+        return []
+    buckets: List[ProjectedMonth] = []
+    for offset in range(months):
+        first = add_months(date(today.year, today.month, 1), offset)
+        buckets.append(ProjectedMonth(year=first.year, month=first.month))
+    horizon = add_months(date(today.year, today.month, 1), months)
+
+    for schedule in schedules:
+        if not schedule.is_active or schedule.next_due_date is None or schedule.payment_cents <= 0:
+            continue
+        item = schedule.item
+        step = 12 if item.recurring_frequency == RecurringFrequency.YEARLY else 1
+        last_payment = _last_payment_date(item)
+        first_due = schedule.next_due_date
+        k = 0
+        due = first_due
+        while due < horizon and (last_payment is None or due <= last_payment):
+            bucket = buckets[(due.year - today.year) * 12 + due.month - today.month]
+            bucket.total_cents += schedule.payment_cents
+            bucket.by_type[item.type.value] += schedule.payment_cents
+            bucket.payment_count += 1
+            k += step
+            # Offset from the first due date so month-end anchors do not drift
+            due = add_months(first_due, k)
+    return buckets
+
+
+# ---------------------------------------------------------------------------
+# Name matching
+# ---------------------------------------------------------------------------
+
+# Legal forms and payment-channel words that say nothing about the payee
+_NOISE_TOKENS = frozenset({
+    "bv", "nv", "vof", "cv", "ltd", "inc", "llc", "gmbh", "sa", "sarl", "ab",
+    "sepa", "incasso", "machtiging", "ideal", "betaling", "betaalverzoek",
+    "via", "www", "com", "nl", "eu", "europe",
+})
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: Optional[str]) -> Tuple[str, ...]:
+    """Lowercase, strip accents and punctuation, drop noise words and numbers."""
+    if not name:
+        return ()
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    tokens = []
+    for token in _NON_ALNUM.split(text):
+        if len(token) < 2 or token in _NOISE_TOKENS or token.isdigit():
+            continue
+        tokens.append(token)
+    return tuple(tokens)
+
+
+def name_key(name: Optional[str], max_tokens: int = 3) -> str:
+    """Grouping key for a payee: its first few significant tokens."""
+    return " ".join(normalize_name(name)[:max_tokens])
+
+
+def trigrams(tokens: Sequence[str]) -> Set[str]:
+    grams: Set[str] = set()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def name_similarity(a: Optional[str], b: Optional[str]) -> float:
+    """Dice coefficient of the trigram sets of two names (0.0 to 1.0)."""
+    ga, gb = trigrams(normalize_name(a)), trigrams(normalize_name(b))
+    if not ga or not gb:
+        return 0.0
+    return 2 * len(ga & gb) / (len(ga) + len(gb))
+
+
+class NameIndex:
+    """
+    Trigram index over names.
+
+    Trigrams of every name are computed once when it is added; a search
+    only scores the entries that share at least one trigram with the query.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[Hashable, Set[str]]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: Hashable, name: Optional[str]) -> None:
+        grams = trigrams(normalize_name(name))
+        if not grams:
+            return
+        position = len(self._entries)
+        self._entries.append((key, grams))
+        for gram in grams:
+            self._postings[gram].append(position)
+
+    def search(self, name: Optional[str], min_score: float = 0.5) -> List[Tuple[Hashable, float]]:
+        """Entries scoring at least ``min_score``, best first."""
+        grams = trigrams(normalize_name(name))
+        if not grams:
+            return []
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for position in self._postings.get(gram, ()):
+                shared[position] += 1
+        matches = []
+        for position, overlap in shared.items():
+            key, entry_grams = self._entries[position]
+            score = 2 * overlap / (len(grams) + len(entry_grams))
+            if score >= min_score:
+                matches.append((key, score))
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return matches
+
+
+def build_commitment_index(items: Iterable[FinancialCommitment]) -> NameIndex:
+    """Index commitments by provider and by name."""
+    index = NameIndex()
+    for item in items:
+        index.add(item.id, item.provider)
+        if item.name and item.name != item.provider:
+            index.add(item.id, item.name)
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Recurring payment detection
+# ---------------------------------------------------------------------------
+
+# Cadence name -> (expected interval in days, tolerance in days)
+CADENCES: Dict[str, Tuple[int, int]] = {
+    "weekly": (7, 1),
+    "monthly": (30, 4),
+    "quarterly": (91, 7),
+    "yearly": (365, 10),
+}
+
+# Payments whose amounts differ less than this share an amount cluster
+AMOUNT_TOLERANCE_PERCENT = Decimal("0.10")
+AMOUNT_TOLERANCE_CENTS = 100
+
+
+@dataclass(frozen=True)
+class PaymentRecord:
+    """The columns of a bank transaction that detection needs."""
+    id: Hashable
+    booking_date: date
+    amount_cents: int  # Absolute amount
+    payee: str
+
+
+@dataclass
+class RecurringPayment:
+    payee_key: str
+    cadence: str
+    payments: List[PaymentRecord]
+    amount_cents: int
+    confidence: float
+    next_expected_date: date
+
+    @property
+    def latest(self) -> PaymentRecord:
+        return self.payments[-1]
+
+
+def _amount_clusters(payments: List[PaymentRecord]) -> List[List[PaymentRecord]]:
+    """Split a payee's payments into clusters of similar amounts."""
+    clusters: List[List[PaymentRecord]] = []
+    for payment in sorted(payments, key=lambda p: p.amount_cents):
+        if clusters:
+            anchor = clusters[-1][0].amount_cents
+            tolerance = max(AMOUNT_TOLERANCE_CENTS, int(anchor * AMOUNT_TOLERANCE_PERCENT))
+            if payment.amount_cents - anchor <= tolerance:
+                clusters[-1].append(payment)
+                continue
+        clusters.append([payment])
+    return clusters
+
+
+def _classify_intervals(intervals: List[int]) -> Optional[Tuple[str, float]]:
+    """Return (cadence, share of intervals matching it) for the median interval."""
+    typical = median(intervals)
+    for cadence, (days, tolerance) in CADENCES.items():
+        if abs(typical - days) <= tolerance:
+            regular = sum(1 for i in intervals if abs(i - days) <= tolerance) / len(intervals)
+            return cadence, regular
+    return None
+
+
+def _next_expected(last: date, cadence: str) -> date:
+    if cadence == "monthly":
+        return add_months(last, 1)
+    if cadence == "quarterly":
+        return add_months(last, 3)
+    if cadence == "yearly":
+        return add_years(last, 1)
+    return date.fromordinal(last.toordinal() + CADENCES[cadence][0])
+
+
+def detect_recurring_payments(
+    payments: Iterable[PaymentRecord],
+    today: date,
+    min_occurrences: int = 2,
+) -> List[RecurringPayment]:
+    """
+    Find recurring payments: payments to the same payee with a stable amount
+    at a regular interval. Sorted by confidence, best first.
+    """
+    by_payee: Dict[str, List[PaymentRecord]] = defaultdict(list)
+    for payment in payments:
+        key = name_key(payment.payee)
+        if key:
+            by_payee[key].append(payment)
+
+    detected: List[RecurringPayment] = []
+    for payee_key, payee_payments in by_payee.items():
+        if len(payee_payments) < min_occurrences:
+            continue
+        for cluster in _amount_clusters(payee_payments):
+            if len(cluster) < min_occurrences:
+                continue
+            cluster.sort(key=lambda p: (p.booking_date, str(p.id)))
+            # Several payments on one day (e.g. a retry) count once
+            dates = sorted({p.booking_date for p in cluster})
+            if len(dates) < min_occurrences:
+                continue
+            intervals = [(b - a).days for a, b in zip(dates, dates[1:])]
+            classified = _classify_intervals(intervals)
+            if classified is None:
+                continue
+            cadence, regularity = classified
+            if regularity < 0.5:
+                continue
+
+            amounts = [p.amount_cents for p in cluster]
+            typical_amount = int(median(amounts))
+            next_expected = _next_expected(dates[-1], cadence)
+
+            confidence = 0.4 + 0.12 * len(dates)
+            confidence *= 0.5 + 0.5 * regularity
+            if max(amounts) == min(amounts):
+                confidence += 0.05
+            # A series that stopped well before today was probably cancelled
+            days, tolerance = CADENCES[cadence]
+            if (today - next_expected).days > days + tolerance:
+                confidence *= 0.6
+
+            detected.append(RecurringPayment(
+                payee_key=payee_key,
+                cadence=cadence,
+                payments=cluster,
+                amount_cents=typical_amount,
+                confidence=round(min(0.95, confidence), 2),
+                next_expected_date=next_expected,
+            ))
+
+    detected.sort(key=lambda r: (r.confidence, r.latest.booking_date), reverse=True)
+    return detected
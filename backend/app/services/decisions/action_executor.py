@@ -28,6 +28,7 @@ from app.models.assets import FixedAsset, DepreciationSchedule, AssetStatus
 from app.models.subledger import OpenItem, OpenItemStatus
 from app.models.accounting import ChartOfAccount, VatCode
 from app.models.document import Document, DocumentStatus
+from app.services.ledger import LedgerError, LedgerService
 
 
 class ActionExecutionError(Exception):
@@ -146,63 +147,15 @@ class ActionExecutor:
         # Process the first unposted schedule
         schedule = sorted(unposted, key=lambda s: s.period_date)[0]
         
-        # Get next entry number
-        entry_number = await self._get_next_entry_number(issue.administration_id)
-        
-        # Create journal entry
-        journal_entry = JournalEntry(
-            administration_id=issue.administration_id,
-            entry_number=entry_number,
-            entry_date=schedule.period_date,
-            description=f"Depreciation - {asset.name} - {schedule.period_date.strftime('%B %Y')}",
-            status=JournalEntryStatus.POSTED,
-            source_type="ASSET_DEPRECIATION",
-            source_id=asset.id,
-            posted_at=datetime.now(timezone.utc),
-            posted_by_id=decision.decided_by_id,
-        )
-        self.db.add(journal_entry)
-        await self.db.flush()
-        
-        # Create debit line (depreciation expense)
-        debit_line = JournalLine(
-            journal_entry_id=journal_entry.id,
-            account_id=asset.expense_account_id,
-            line_number=1,
-            description=f"Depreciation expense - {asset.name}",
-            debit_amount=schedule.depreciation_amount,
-            credit_amount=Decimal("0.00"),
-        )
-        self.db.add(debit_line)
-        
-        # Create credit line (accumulated depreciation)
-        credit_line = JournalLine(
-            journal_entry_id=journal_entry.id,
-            account_id=asset.depreciation_account_id,
-            line_number=2,
-            description=f"Accumulated depreciation - {asset.name}",
-            debit_amount=Decimal("0.00"),
-            credit_amount=schedule.depreciation_amount,
-        )
-        self.db.add(credit_line)
-        
-        # Update journal entry totals
-        journal_entry.total_debit = schedule.depreciation_amount
-        journal_entry.total_credit = schedule.depreciation_amount
-        journal_entry.is_balanced = True
-        
-        # Mark schedule as posted
-        schedule.is_posted = True
-        schedule.posted_at = datetime.now(timezone.utc)
-        schedule.journal_entry_id = journal_entry.id
-        
-        # Update asset accumulated depreciation
-        asset.accumulated_depreciation += schedule.depreciation_amount
-        asset.update_book_value()
-        
-        await self.db.flush()
+        ledger = LedgerService(self.db, issue.administration_id)
+        try:
+            batch = await ledger.post_depreciation_batch(
+                [schedule], posted_by_id=decision.decided_by_id, commit=False
+            )
+        except LedgerError as e:
+            raise ActionExecutionError(str(e))
         
-        return journal_entry.id
+        return batch.entry_ids[0]
     
     async def _execute_correct_vat_rate(
         self,
@@ -3,14 +3,18 @@ Suggestion Service
 
 Generates actionable suggestions for detected issues.
 Uses issue code mapping and historical patterns to determine best actions.
+
+Refreshing many clients at once (after a bulk recalculation) is done in
+a fixed number of queries: issues without suggestions are selected with
+an anti-join, the decision patterns of all affected administrations are
+loaded in one query, and the suggestions are bulk-inserted.
 """
 import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
-from sqlalchemy import select, func
+from typing import Iterable, List, Optional, Dict, Any, Tuple
+from sqlalchemy import select, func, insert, exists
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.models.issues import ClientIssue, IssueCode
 from app.models.decisions import SuggestedAction, DecisionPattern, ActionType
@@ -173,6 +177,13 @@ ISSUE_ACTION_MAPPING: Dict[str, List[Dict[str, Any]]] = {
 }
 
 
+# Suggestions inserted per bulk INSERT statement
+SUGGESTION_INSERT_CHUNK_SIZE = 1000
+
+# Patterns per (administration_id, issue_code), keyed by action type
+PatternMap = Dict[Tuple[uuid.UUID, str], Dict[ActionType, DecisionPattern]]
+
+
 class SuggestionService:
     """
     Service for generating and managing suggested actions for issues.
@@ -195,13 +206,8 @@ class SuggestionService:
         
         Returns a list of SuggestedAction objects (not yet persisted).
         """
-        suggestions = []
-        
-        # Get action templates for this issue code
-        action_templates = ISSUE_ACTION_MAPPING.get(issue.issue_code, [])
-        
-        if not action_templates:
-            return suggestions
+        if not ISSUE_ACTION_MAPPING.get(issue.issue_code):
+            return []
         
         # Get historical patterns for confidence boosting
         patterns = await self._get_patterns_for_issue(
@@ -209,38 +215,7 @@ class SuggestionService:
             issue.issue_code
         )
         
-        for template in action_templates:
-            action_type = template["action_type"]
-            
-            # Calculate confidence with pattern boost
-            base_confidence = template["base_confidence"]
-            pattern = patterns.get(action_type)
-            confidence_boost = pattern.confidence_boost if pattern else Decimal("0.0000")
-            final_confidence = min(base_confidence + confidence_boost, Decimal("0.9999"))
-            
-            # Build parameters from issue context
-            parameters = self._build_parameters(issue, action_type)
-            
-            # Format title and explanation with context
-            title = self._format_template(template["title_template"], issue, parameters)
-            explanation = self._format_template(template["explanation_template"], issue, parameters)
-            
-            suggestion = SuggestedAction(
-                issue_id=issue.id,
-                action_type=action_type,
-                title=title,
-                explanation=explanation,
-                parameters=parameters,
-                confidence_score=final_confidence,
-                is_auto_suggested=pattern is not None and pattern.approval_count >= 3,
-                priority=template["priority"],
-            )
-            suggestions.append(suggestion)
-        
-        # Sort by confidence (highest first)
-        suggestions.sort(key=lambda s: (s.priority, -float(s.confidence_score)))
-        
-        return suggestions
+        return [SuggestedAction(**values) for values in self._build_suggestions(issue, patterns)]
     
     async def get_or_create_suggestions(
         self,
@@ -290,27 +265,70 @@ class SuggestionService:
         
         Returns count of new suggestions created.
         """
-        # Get all unresolved issues without suggestions
+        counts = await self.refresh_suggestions_for_clients([administration_id])
+        return counts.get(administration_id, 0)
+    
+    async def refresh_suggestions_for_clients(
+        self,
+        administration_ids: Iterable[uuid.UUID],
+    ) -> Dict[uuid.UUID, int]:
+        """
+        Create suggestions for all unresolved issues without suggestions,
+        across many clients in one pass.
+        
+        Runs one query for the issues, one for the decision patterns of all
+        affected administrations, and one bulk INSERT per
+        SUGGESTION_INSERT_CHUNK_SIZE suggestions.
+        
+        Returns count of new suggestions created per administration.
+        """
+        administration_ids = list(dict.fromkeys(administration_ids))
+        if not administration_ids:
+            return {}
+        
+        # Unresolved issues with a known action mapping and no suggestions yet
         result = await self.db.execute(
-            select(ClientIssue)
-            .where(ClientIssue.administration_id == administration_id)
+            select(
+                ClientIssue.id,
+                ClientIssue.administration_id,
+                ClientIssue.issue_code,
+                ClientIssue.document_id,
+                ClientIssue.journal_entry_id,
+                ClientIssue.account_id,
+                ClientIssue.fixed_asset_id,
+                ClientIssue.party_id,
+                ClientIssue.open_item_id,
+                ClientIssue.amount_discrepancy,
+            )
+            .where(ClientIssue.administration_id.in_(administration_ids))
             .where(ClientIssue.is_resolved == False)
-            .options(selectinload(ClientIssue.suggested_actions))
+            .where(ClientIssue.issue_code.in_(list(ISSUE_ACTION_MAPPING)))
+            .where(~exists().where(SuggestedAction.issue_id == ClientIssue.id))
+        )
+        issues = result.all()
+        if not issues:
+            return {}
+        
+        patterns = await self._get_patterns_for_issues(
+            {issue.administration_id for issue in issues},
+            {issue.issue_code for issue in issues},
         )
-        issues = result.scalars().all()
         
-        count = 0
+        counts: Dict[uuid.UUID, int] = {}
+        rows: List[Dict[str, Any]] = []
         for issue in issues:
-            if not issue.suggested_actions:
-                suggestions = await self.generate_suggestions_for_issue(issue)
-                for suggestion in suggestions:
-                    self.db.add(suggestion)
-                count += len(suggestions)
+            suggestions = self._build_suggestions(
+                issue, patterns.get((issue.administration_id, issue.issue_code), {})
+            )
+            for values in suggestions:
+                values["id"] = uuid.uuid4()
+            rows.extend(suggestions)
+            counts[issue.administration_id] = counts.get(issue.administration_id, 0) + len(suggestions)
         
-        if count > 0:
-            await self.db.flush()
+        for start in range(0, len(rows), SUGGESTION_INSERT_CHUNK_SIZE):
+            await self.db.execute(insert(SuggestedAction), rows[start:start + SUGGESTION_INSERT_CHUNK_SIZE])
         
-        return count
+        return counts
     
     async def _get_patterns_for_issue(
         self,
@@ -326,9 +344,68 @@ class SuggestionService:
         patterns = result.scalars().all()
         return {p.action_type: p for p in patterns}
     
+    async def _get_patterns_for_issues(
+        self,
+        administration_ids: Iterable[uuid.UUID],
+        issue_codes: Iterable[str],
+    ) -> PatternMap:
+        """Get decision patterns for many administrations and issue codes in one query."""
+        result = await self.db.execute(
+            select(DecisionPattern)
+            .where(DecisionPattern.administration_id.in_(list(administration_ids)))
+            .where(DecisionPattern.issue_code.in_(list(issue_codes)))
+        )
+        patterns: PatternMap = {}
+        for p in result.scalars().all():
+            patterns.setdefault((p.administration_id, p.issue_code), {})[p.action_type] = p
+        return patterns
+    
+    def _build_suggestions(
+        self,
+        issue: Any,
+        patterns: Dict[ActionType, DecisionPattern],
+    ) -> List[Dict[str, Any]]:
+        """
+        Column values of the suggestions for an issue (a ClientIssue or a
+        row with its columns), given its patterns by action type.
+        """
+        suggestions = []
+        
+        for template in ISSUE_ACTION_MAPPING.get(issue.issue_code, []):
+            action_type = template["action_type"]
+            
+            # Calculate confidence with pattern boost
+            base_confidence = template["base_confidence"]
+            pattern = patterns.get(action_type)
+            confidence_boost = pattern.confidence_boost if pattern else Decimal("0.0000")
+            final_confidence = min(base_confidence + confidence_boost, Decimal("0.9999"))
+            
+            # Build parameters from issue context
+            parameters = self._build_parameters(issue, action_type)
+            
+            # Format title and explanation with context
+            title = self._format_template(template["title_template"], issue, parameters)
+            explanation = self._format_template(template["explanation_template"], issue, parameters)
+            
+            suggestions.append({
+                "issue_id": issue.id,
+                "action_type": action_type,
+                "title": title,
+                "explanation": explanation,
+                "parameters": parameters,
+                "confidence_score": final_confidence,
+                "is_auto_suggested": pattern is not None and pattern.approval_count >= 3,
+                "priority": template["priority"],
+            })
+        
+        # Sort by confidence (highest first)
+        suggestions.sort(key=lambda s: (s["priority"], -float(s["confidence_score"])))
+        
+        return suggestions
+    
     def _build_parameters(
         self,
-        issue: ClientIssue,
+        issue: Any,
         action_type: ActionType,
     ) -> Dict[str, Any]:
         """Build action parameters from issue context."""
@@ -358,7 +435,7 @@ class SuggestionService:
     def _format_template(
         self,
         template: str,
-        issue: ClientIssue,
+        issue: Any,
         parameters: Dict[str, Any],
     ) -> str:
         """Format a template string with issue context."""
@@ -7,20 +7,61 @@ Provides the period closing checklist functionality:
 - VAT report readiness
 - AR/AP reconciliation
 - Asset schedule consistency
+
+All document and issue counts come from one aggregate query. The period
+and its issue counts are cached per (administration, period) until an
+issue, journal entry or the period itself changes (see checklist_cache.py).
+Document counts are always read: the worker moves documents through
+PROCESSING to DRAFT_READY or FAILED with plain SQL, which the cache never
+hears about.
 """
 import uuid
-from datetime import datetime, timezone, date
+from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, List
+from typing import Dict, Optional, List
 from dataclasses import dataclass
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, case, true
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.document import Document, DocumentStatus
-from app.models.ledger import AccountingPeriod, PeriodStatus, JournalEntry
+from app.models.ledger import AccountingPeriod
 from app.models.issues import ClientIssue, IssueSeverity, IssueCode
-from app.models.subledger import OpenItem, OpenItemStatus
-from app.models.assets import FixedAsset, DepreciationSchedule
+from app.services.documents.checklist_cache import closing_checklist_cache
+
+
+# Documents that still need processing before the period can close
+PENDING_DOCUMENT_STATUSES = (
+    DocumentStatus.UPLOADED,
+    DocumentStatus.PROCESSING,
+    DocumentStatus.EXTRACTED,
+    DocumentStatus.NEEDS_REVIEW,
+    DocumentStatus.FAILED,
+)
+
+VAT_ISSUE_CODES = (
+    IssueCode.VAT_RATE_MISMATCH,
+    IssueCode.VAT_NEGATIVE,
+    IssueCode.VAT_MISSING,
+)
+
+ASSET_ISSUE_CODES = (
+    IssueCode.DEPRECIATION_MISMATCH,
+    IssueCode.DEPRECIATION_NOT_POSTED,
+)
+
+
+def _count_where(condition):
+    return func.count(case((condition, 1)))
+
+
+@dataclass(frozen=True)
+class _CachedPeriod:
+    """The cached, document-independent part of a checklist."""
+    name: str
+    status: str
+    start_date: date
+    end_date: date
+    issue_counts: Dict[str, int]
 
 
 @dataclass
@@ -83,104 +124,138 @@ class ClosingChecklistService:
         administration_name: str = "Client",
     ) -> ClosingChecklist:
         """Generate the closing checklist for a period."""
-        # Load period
-        result = await self.db.execute(
-            select(AccountingPeriod)
-            .where(AccountingPeriod.id == period_id)
-            .where(AccountingPeriod.administration_id == self.administration_id)
-        )
-        period = result.scalar_one_or_none()
-        
-        if not period:
-            raise ValueError(f"Period {period_id} not found")
-        
-        items: List[ChecklistItem] = []
-        
-        # Check 1: Documents posted
-        doc_item = await self._check_documents(period.start_date, period.end_date)
-        items.append(doc_item)
-        
-        # Check 2: RED issues
-        red_item = await self._check_red_issues()
-        items.append(red_item)
-        
-        # Check 3: YELLOW issues
-        yellow_item, unacknowledged = await self._check_yellow_issues()
-        items.append(yellow_item)
-        
-        # Check 4: VAT report
-        vat_item = await self._check_vat_report(period.start_date, period.end_date)
-        items.append(vat_item)
-        
-        # Check 5: AR reconciliation
-        ar_item = await self._check_ar_reconciliation()
-        items.append(ar_item)
-        
-        # Check 6: AP reconciliation
-        ap_item = await self._check_ap_reconciliation()
-        items.append(ap_item)
-        
-        # Check 7: Asset schedules
-        asset_item = await self._check_asset_schedules(period.end_date)
-        items.append(asset_item)
+        period = closing_checklist_cache.get(self.administration_id, period_id)
+        if period is not None:
+            counts = {
+                **period.issue_counts,
+                **await self._fetch_document_counts(period.start_date, period.end_date),
+            }
+        else:
+            period, counts = await self._load_period(period_id)
+        
+        doc_item = self._check_documents(counts)
+        yellow_item, unacknowledged = self._check_yellow_issues(counts)
+        vat_item = self._check_vat_report(counts)
+        ar_item = self._check_ar_reconciliation(counts)
+        ap_item = self._check_ap_reconciliation(counts)
+        asset_item = self._check_asset_schedules(counts)
+        items: List[ChecklistItem] = [
+            doc_item,
+            self._check_red_issues(counts),
+            yellow_item,
+            vat_item,
+            ar_item,
+            ap_item,
+            asset_item,
+        ]
         
         # Calculate summary
         blocking_items = sum(1 for i in items if i.status == "FAILED" and i.required)
         warning_items = sum(1 for i in items if i.status == "WARNING")
         can_finalize = blocking_items == 0
         
-        # Get counts
-        red_count = await self._count_red_issues()
-        yellow_count = await self._count_yellow_issues()
-        doc_stats = await self._get_document_stats(period.start_date, period.end_date)
+        total_docs = counts["documents_total"]
+        posted_percent = (
+            Decimal("100.0") if total_docs == 0
+            else Decimal(counts["documents_posted"] * 100 / total_docs).quantize(Decimal("0.1"))
+        )
         
-        return ClosingChecklist(
+        checklist = ClosingChecklist(
             client_id=self.administration_id,
             client_name=administration_name,
             period_id=period_id,
             period_name=period.name,
-            period_status=period.status.value,
+            period_status=period.status,
             can_finalize=can_finalize,
             blocking_items=blocking_items,
             warning_items=warning_items,
             items=items,
-            documents_posted_percent=doc_stats["posted_percent"],
-            documents_pending_review=doc_stats["pending_review"],
-            red_issues_count=red_count,
-            yellow_issues_count=yellow_count,
+            documents_posted_percent=posted_percent,
+            documents_pending_review=counts["documents_needs_review"],
+            red_issues_count=counts["red_issues"],
+            yellow_issues_count=counts["yellow_issues"],
             unacknowledged_yellow_count=unacknowledged,
             vat_report_ready=vat_item.status != "FAILED",
             ar_reconciled=ar_item.status == "PASSED",
             ap_reconciled=ap_item.status == "PASSED",
             assets_consistent=asset_item.status == "PASSED",
         )
+        return checklist
     
-    async def _check_documents(self, start_date: date, end_date: date) -> ChecklistItem:
-        """Check if all documents in the period are posted or rejected."""
-        # Count documents in period
+    async def _load_period(self, period_id: uuid.UUID):
+        """Load the period with all counts and cache its document-independent part."""
+        generation = closing_checklist_cache.generation(self.administration_id)
         result = await self.db.execute(
-            select(func.count(Document.id))
-            .where(Document.administration_id == self.administration_id)
-            .where(Document.created_at >= datetime.combine(start_date, datetime.min.time()))
-            .where(Document.created_at <= datetime.combine(end_date, datetime.max.time()))
+            select(AccountingPeriod)
+            .where(AccountingPeriod.id == period_id)
+            .where(AccountingPeriod.administration_id == self.administration_id)
         )
-        total_docs = result.scalar() or 0
+        period = result.scalar_one_or_none()
         
-        # Count unprocessed documents
-        result = await self.db.execute(
-            select(func.count(Document.id))
+        if not period:
+            raise ValueError(f"Period {period_id} not found")
+        
+        counts = await self._fetch_counts(period.start_date, period.end_date)
+        cached = _CachedPeriod(
+            name=period.name,
+            status=period.status.value,
+            start_date=period.start_date,
+            end_date=period.end_date,
+            issue_counts={key: value for key, value in counts.items() if not key.startswith("documents_")},
+        )
+        closing_checklist_cache.set(self.administration_id, period_id, cached, generation)
+        return cached, counts
+    
+    def _documents_query(self, start_date: date, end_date: date):
+        return (
+            select(
+                func.count(Document.id).label("documents_total"),
+                _count_where(Document.status.in_(PENDING_DOCUMENT_STATUSES)).label("documents_pending"),
+                _count_where(
+                    Document.status.in_([DocumentStatus.POSTED, DocumentStatus.REJECTED])
+                ).label("documents_posted"),
+                _count_where(Document.status == DocumentStatus.NEEDS_REVIEW).label("documents_needs_review"),
+            )
             .where(Document.administration_id == self.administration_id)
             .where(Document.created_at >= datetime.combine(start_date, datetime.min.time()))
             .where(Document.created_at <= datetime.combine(end_date, datetime.max.time()))
-            .where(Document.status.in_([
-                DocumentStatus.UPLOADED,
-                DocumentStatus.PROCESSING,
-                DocumentStatus.EXTRACTED,
-                DocumentStatus.NEEDS_REVIEW,
-                DocumentStatus.FAILED,
-            ]))
         )
-        pending_docs = result.scalar() or 0
+    
+    async def _fetch_document_counts(self, start_date: date, end_date: date) -> Dict[str, int]:
+        """Count the period's documents."""
+        result = await self.db.execute(self._documents_query(start_date, end_date))
+        return {key: value or 0 for key, value in result.one()._mapping.items()}
+    
+    async def _fetch_counts(self, start_date: date, end_date: date) -> Dict[str, int]:
+        """
+        Count the period's documents and the open issues in one round-trip.
+        
+        Both aggregates return exactly one row, so they are cross joined into
+        a single result row.
+        """
+        documents = self._documents_query(start_date, end_date).subquery()
+        issues = (
+            select(
+                _count_where(ClientIssue.severity == IssueSeverity.RED).label("red_issues"),
+                _count_where(ClientIssue.severity == IssueSeverity.YELLOW).label("yellow_issues"),
+                _count_where(ClientIssue.issue_code.in_(VAT_ISSUE_CODES)).label("vat_issues"),
+                _count_where(ClientIssue.issue_code == IssueCode.AR_RECON_MISMATCH).label("ar_issues"),
+                _count_where(ClientIssue.issue_code == IssueCode.AP_RECON_MISMATCH).label("ap_issues"),
+                _count_where(ClientIssue.issue_code.in_(ASSET_ISSUE_CODES)).label("asset_issues"),
+            )
+            .where(ClientIssue.administration_id == self.administration_id)
+            .where(ClientIssue.is_resolved == False)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(documents, issues).select_from(documents.join(issues, true()))
+        )
+        return {key: value or 0 for key, value in result.one()._mapping.items()}
+    
+    def _check_documents(self, counts: Dict[str, int]) -> ChecklistItem:
+        """Check if all documents in the period are posted or rejected."""
+        total_docs = counts["documents_total"]
+        pending_docs = counts["documents_pending"]
         
         if total_docs == 0:
             return ChecklistItem(
@@ -212,9 +287,9 @@ class ClosingChecklistService:
             value=f"{posted_count}/{total_docs} ({percent}%)",
         )
     
-    async def _check_red_issues(self) -> ChecklistItem:
+    def _check_red_issues(self, counts: Dict[str, int]) -> ChecklistItem:
         """Check if there are any RED issues (must be zero)."""
-        count = await self._count_red_issues()
+        count = counts["red_issues"]
         
         if count == 0:
             return ChecklistItem(
@@ -233,16 +308,9 @@ class ClosingChecklistService:
             value=str(count),
         )
     
-    async def _check_yellow_issues(self) -> tuple[ChecklistItem, int]:
+    def _check_yellow_issues(self, counts: Dict[str, int]) -> tuple[ChecklistItem, int]:
         """Check if all YELLOW issues are acknowledged."""
-        # Count unresolved YELLOW issues
-        result = await self.db.execute(
-            select(func.count(ClientIssue.id))
-            .where(ClientIssue.administration_id == self.administration_id)
-            .where(ClientIssue.severity == IssueSeverity.YELLOW)
-            .where(ClientIssue.is_resolved == False)
-        )
-        total_yellow = result.scalar() or 0
+        total_yellow = counts["yellow_issues"]
         
         # For now, treat all unresolved as unacknowledged
         # In a full implementation, we'd track acknowledgments separately
@@ -275,20 +343,9 @@ class ClosingChecklistService:
             required=False,  # Warnings don't block, but should be acknowledged
         ), unacknowledged
     
-    async def _check_vat_report(self, start_date: date, end_date: date) -> ChecklistItem:
+    def _check_vat_report(self, counts: Dict[str, int]) -> ChecklistItem:
         """Check if VAT report is ready and anomalies resolved."""
-        # Check for VAT-related issues
-        result = await self.db.execute(
-            select(func.count(ClientIssue.id))
-            .where(ClientIssue.administration_id == self.administration_id)
-            .where(ClientIssue.is_resolved == False)
-            .where(ClientIssue.issue_code.in_([
-                IssueCode.VAT_RATE_MISMATCH,
-                IssueCode.VAT_NEGATIVE,
-                IssueCode.VAT_MISSING,
-            ]))
-        )
-        vat_issues = result.scalar() or 0
+        vat_issues = counts["vat_issues"]
         
         if vat_issues == 0:
             return ChecklistItem(
@@ -307,16 +364,9 @@ class ClosingChecklistService:
             value=f"{vat_issues} issues",
         )
     
-    async def _check_ar_reconciliation(self) -> ChecklistItem:
+    def _check_ar_reconciliation(self, counts: Dict[str, int]) -> ChecklistItem:
         """Check AR reconciliation status."""
-        # Check for AR reconciliation issues
-        result = await self.db.execute(
-            select(func.count(ClientIssue.id))
-            .where(ClientIssue.administration_id == self.administration_id)
-            .where(ClientIssue.is_resolved == False)
-            .where(ClientIssue.issue_code == IssueCode.AR_RECON_MISMATCH)
-        )
-        ar_issues = result.scalar() or 0
+        ar_issues = counts["ar_issues"]
         
         if ar_issues == 0:
             return ChecklistItem(
@@ -335,16 +385,9 @@ class ClosingChecklistService:
             value=f"{ar_issues} issues",
         )
     
-    async def _check_ap_reconciliation(self) -> ChecklistItem:
+    def _check_ap_reconciliation(self, counts: Dict[str, int]) -> ChecklistItem:
         """Check AP reconciliation status."""
-        # Check for AP reconciliation issues
-        result = await self.db.execute(
-            select(func.count(ClientIssue.id))
-            .where(ClientIssue.administration_id == self.administration_id)
-            .where(ClientIssue.is_resolved == False)
-            .where(ClientIssue.issue_code == IssueCode.AP_RECON_MISMATCH)
-        )
-        ap_issues = result.scalar() or 0
+        ap_issues = counts["ap_issues"]
         
         if ap_issues == 0:
             return ChecklistItem(
@@ -363,19 +406,9 @@ class ClosingChecklistService:
             value=f"{ap_issues} issues",
         )
     
-    async def _check_asset_schedules(self, period_end: date) -> ChecklistItem:
+    def _check_asset_schedules(self, counts: Dict[str, int]) -> ChecklistItem:
         """Check if asset depreciation schedules are consistent."""
-        # Check for depreciation issues
-        result = await self.db.execute(
-            select(func.count(ClientIssue.id))
-            .where(ClientIssue.administration_id == self.administration_id)
-            .where(ClientIssue.is_resolved == False)
-            .where(ClientIssue.issue_code.in_([
-                IssueCode.DEPRECIATION_MISMATCH,
-                IssueCode.DEPRECIATION_NOT_POSTED,
-            ]))
-        )
-        asset_issues = result.scalar() or 0
+        asset_issues = counts["asset_issues"]
         
         if asset_issues == 0:
             return ChecklistItem(
@@ -394,63 +427,3 @@ class ClosingChecklistService:
             value=f"{asset_issues} issues",
             required=False,  # Depreciation issues are warnings, not blockers
         )
-    
-    async def _count_red_issues(self) -> int:
-        """Count unresolved RED issues."""
-        result = await self.db.execute(
-            select(func.count(ClientIssue.id))
-            .where(ClientIssue.administration_id == self.administration_id)
-            .where(ClientIssue.severity == IssueSeverity.RED)
-            .where(ClientIssue.is_resolved == False)
-        )
-        return result.scalar() or 0
-    
-    async def _count_yellow_issues(self) -> int:
-        """Count unresolved YELLOW issues."""
-        result = await self.db.execute(
-            select(func.count(ClientIssue.id))
-            .where(ClientIssue.administration_id == self.administration_id)
-            .where(ClientIssue.severity == IssueSeverity.YELLOW)
-            .where(ClientIssue.is_resolved == False)
-        )
-        return result.scalar() or 0
-    
-    async def _get_document_stats(self, start_date: date, end_date: date) -> dict:
-        """Get document statistics for the period."""
-        # Total documents in period
-        result = await self.db.execute(
-            select(func.count(Document.id))
-            .where(Document.administration_id == self.administration_id)
-            .where(Document.created_at >= datetime.combine(start_date, datetime.min.time()))
-            .where(Document.created_at <= datetime.combine(end_date, datetime.max.time()))
-        )
-        total = result.scalar() or 0
-        
-        # Posted documents
-        result = await self.db.execute(
-            select(func.count(Document.id))
-            .where(Document.administration_id == self.administration_id)
-            .where(Document.created_at >= datetime.combine(start_date, datetime.min.time()))
-            .where(Document.created_at <= datetime.combine(end_date, datetime.max.time()))
-            .where(Document.status.in_([DocumentStatus.POSTED, DocumentStatus.REJECTED]))
-        )
-        posted = result.scalar() or 0
-        
-        # Pending review
-        result = await self.db.execute(
-            select(func.count(Document.id))
-            .where(Document.administration_id == self.administration_id)
-            .where(Document.created_at >= datetime.combine(start_date, datetime.min.time()))
-            .where(Document.created_at <= datetime.combine(end_date, datetime.max.time()))
-            .where(Document.status == DocumentStatus.NEEDS_REVIEW)
-        )
-        pending = result.scalar() or 0
-        
-        posted_percent = Decimal("100.0") if total == 0 else Decimal(posted * 100 / total).quantize(Decimal("0.1"))
-        
-        return {
-            "total": total,
-            "posted": posted,
-            "pending_review": pending,
-            "posted_percent": posted_percent,
-        }
@@ -0,0 +1,32 @@
+"""
+Closing Checklist Cache
+
+Caches the document-independent part of closing checklists (the period and
+its open issue counts) per (administration, period). At period end
+accountants open the checklist for every client in turn, usually more than
+once, while those figures only change when issues, journal entries or the
+period itself change. Document counts are not cached: the worker updates
+document statuses with plain SQL.
+
+A commit touching one of the watched models drops the administration's
+cached periods; see AdministrationCache for the invalidation and generation
+rules. The validation engine deletes issues with a bulk DELETE, but always
+writes a ValidationRun in the same transaction, so it is caught too; the TTL
+covers any other write that bypasses the ORM unit of work.
+"""
+from app.core.config import settings
+from app.services.administration_cache import AdministrationCache
+
+
+def _watched_models() -> tuple:
+    from app.models.issues import ClientIssue, ValidationRun
+    from app.models.ledger import AccountingPeriod, JournalEntry
+    return (ClientIssue, ValidationRun, JournalEntry, AccountingPeriod)
+
+
+closing_checklist_cache = AdministrationCache(
+    "closing_checklist",
+    ttl_seconds=settings.CLOSING_CHECKLIST_CACHE_TTL_SECONDS,
+    max_entries=settings.CLOSING_CHECKLIST_CACHE_MAX_ENTRIES,
+    watched_models=_watched_models,
+)
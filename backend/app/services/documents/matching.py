@@ -5,12 +5,15 @@ Provides deterministic matching logic for documents:
 - Duplicate detection (invoice number + supplier + amount + date tolerance)
 - Match to open items (AR/AP)
 - Auto-suggest actions based on document content
+
+Lookups go through a DocumentMatchingIndex loaded once per run, so
+run_matching_many can process a large batch without per-document queries.
 """
 import uuid
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
-from typing import Optional, List, Tuple
-from sqlalchemy import select, func, and_, or_
+from typing import Dict, Optional, List, Sequence
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -20,8 +23,11 @@ from app.models.document import (
     DocumentSuggestedAction,
     DocumentSuggestedActionType,
 )
-from app.models.subledger import Party, OpenItem, OpenItemStatus
-from app.models.assets import FixedAsset
+from app.services.documents.matching_index import (
+    DocumentMatchingIndex,
+    PARTIAL_AMOUNT_TOLERANCE,
+    dates_within_tolerance,
+)
 
 
 # Matching thresholds
@@ -30,6 +36,9 @@ HIGH_MATCH_CONFIDENCE = Decimal("0.85")
 MEDIUM_MATCH_CONFIDENCE = Decimal("0.65")
 LOW_MATCH_CONFIDENCE = Decimal("0.40")
 
+# Documents loaded per query in run_matching_many
+BATCH_CHUNK_SIZE = 500
+
 
 class DocumentMatchingService:
     """
@@ -45,6 +54,8 @@ class DocumentMatchingService:
     def __init__(self, db: AsyncSession, administration_id: uuid.UUID):
         self.db = db
         self.administration_id = administration_id
+        self._index: Optional[DocumentMatchingIndex] = None
+        self._suggestion_counts: Dict[uuid.UUID, int] = {}
     
     async def run_matching(self, document_id: uuid.UUID) -> Document:
         """
@@ -52,49 +63,82 @@ class DocumentMatchingService:
         
         This is idempotent - can be run multiple times safely.
         """
-        # Load document with extracted fields
-        result = await self.db.execute(
-            select(Document)
-            .where(Document.id == document_id)
-            .where(Document.administration_id == self.administration_id)
-            .options(selectinload(Document.extracted_fields))
-        )
-        document = result.scalar_one_or_none()
-        
-        if not document:
+        documents = await self.run_matching_many([document_id])
+        if not documents:
             raise ValueError(f"Document {document_id} not found")
+        return documents[0]
+    
+    async def run_matching_many(self, document_ids: Sequence[uuid.UUID]) -> List[Document]:
+        """
+        Run all matching logic for a batch of documents.
         
-        # Clear existing suggested actions for idempotency
-        existing_actions = await self.db.execute(
-            select(DocumentSuggestedAction)
-            .where(DocumentSuggestedAction.document_id == document_id)
+        Candidate documents, parties and open items are loaded once into a
+        DocumentMatchingIndex and shared by the whole batch. Documents that
+        do not exist in this administration are skipped; the others are
+        returned in the order requested. Idempotent, like run_matching.
+        """
+        ids = list(dict.fromkeys(document_ids))
+        if not ids:
+            return []
+        
+        # Load documents with extracted fields
+        documents: Dict[uuid.UUID, Document] = {}
+        for start in range(0, len(ids), BATCH_CHUNK_SIZE):
+            chunk = ids[start:start + BATCH_CHUNK_SIZE]
+            result = await self.db.execute(
+                select(Document)
+                .where(Document.id.in_(chunk))
+                .where(Document.administration_id == self.administration_id)
+                .options(selectinload(Document.extracted_fields))
+            )
+            documents.update((doc.id, doc) for doc in result.scalars().all())
+            
+            # Clear existing suggested actions for idempotency
+            existing_actions = await self.db.execute(
+                select(DocumentSuggestedAction)
+                .where(DocumentSuggestedAction.document_id.in_(chunk))
+            )
+            for action in existing_actions.scalars().all():
+                await self.db.delete(action)
+        
+        ordered = [documents[doc_id] for doc_id in ids if doc_id in documents]
+        self._index = await DocumentMatchingIndex.load(
+            self.db,
+            self.administration_id,
+            [doc.invoice_number for doc in ordered if doc.invoice_number and doc.supplier_name],
         )
-        for action in existing_actions.scalars().all():
-            await self.db.delete(action)
         
-        # Run matching steps
-        await self._check_duplicates(document)
-        await self._match_party(document)
-        await self._match_open_items(document)
-        await self._check_asset_purchase(document)
-        await self._generate_default_suggestions(document)
-        
-        # Update document status if needed
-        if document.status == DocumentStatus.EXTRACTED:
-            document.status = DocumentStatus.NEEDS_REVIEW
-        
-        document.last_processed_at = datetime.now(timezone.utc)
-        document.process_count += 1
+        now = datetime.now(timezone.utc)
+        for document in ordered:
+            self._suggestion_counts[document.id] = 0
+            
+            # Run matching steps
+            self._check_duplicates(document)
+            self._match_party(document)
+            self._match_open_items(document)
+            self._check_asset_purchase(document)
+            self._generate_default_suggestions(document)
+            
+            # Update document status if needed
+            if document.status == DocumentStatus.EXTRACTED:
+                document.status = DocumentStatus.NEEDS_REVIEW
+            
+            document.last_processed_at = now
+            document.process_count += 1
         
         await self.db.flush()
-        return document
+        return ordered
+    
+    def _add_suggestion(self, suggestion: DocumentSuggestedAction) -> None:
+        self.db.add(suggestion)
+        self._suggestion_counts[suggestion.document_id] = self._suggestion_counts.get(suggestion.document_id, 0) + 1
     
-    async def _check_duplicates(self, document: Document) -> None:
+    def _check_duplicates(self, document: Document) -> None:
         """
         Check for duplicate documents.
         
         Duplicates are detected based on:
-        - Same supplier name (fuzzy)
+        - Same supplier name (case-insensitive)
         - Same invoice number
         - Same or similar amount
         - Date within tolerance
@@ -102,114 +146,56 @@ class DocumentMatchingService:
         if not document.invoice_number or not document.supplier_name:
             return
         
-        # Query for potential duplicates
-        query = (
-            select(Document)
-            .where(Document.administration_id == self.administration_id)
-            .where(Document.id != document.id)
-            .where(Document.invoice_number == document.invoice_number)
-            .where(Document.status.in_([
-                DocumentStatus.EXTRACTED,
-                DocumentStatus.NEEDS_REVIEW,
-                DocumentStatus.POSTED,
-            ]))
+        dup = self._index.find_duplicate(
+            document.id,
+            document.invoice_number,
+            document.supplier_name,
+            document.total_amount,
+            document.invoice_date,
+            DUPLICATE_DATE_TOLERANCE_DAYS,
         )
+        if dup is None:
+            return
         
-        # Add supplier name filter (exact match for now)
-        if document.supplier_name:
-            query = query.where(
-                func.lower(Document.supplier_name) == func.lower(document.supplier_name)
-            )
-        
-        result = await self.db.execute(query)
-        potential_duplicates = result.scalars().all()
-        
-        for dup in potential_duplicates:
-            # Check amount similarity
-            amount_match = self._amounts_similar(document.total_amount, dup.total_amount)
-            
-            # Check date proximity
-            date_match = self._dates_within_tolerance(
-                document.invoice_date, 
-                dup.invoice_date,
-                DUPLICATE_DATE_TOLERANCE_DAYS
-            )
-            
-            if amount_match and date_match:
-                # Mark as duplicate
-                document.is_duplicate = True
-                document.duplicate_of_id = dup.id
-                document.match_confidence = HIGH_MATCH_CONFIDENCE
-                
-                # Create suggestion
-                suggestion = DocumentSuggestedAction(
-                    document_id=document.id,
-                    action_type=DocumentSuggestedActionType.MARK_DUPLICATE,
-                    title="Potential duplicate detected",
-                    explanation=f"This document appears to be a duplicate of document uploaded on {dup.created_at.date()}. "
-                              f"Same invoice number ({document.invoice_number}), supplier ({document.supplier_name}), "
-                              f"and amount ({document.total_amount}).",
-                    confidence_score=HIGH_MATCH_CONFIDENCE,
-                    parameters={
-                        "duplicate_of_id": str(dup.id),
-                        "duplicate_filename": dup.original_filename,
-                    },
-                    priority=1,
-                )
-                self.db.add(suggestion)
-                break  # Only flag first duplicate found
+        # Mark as duplicate
+        document.is_duplicate = True
+        document.duplicate_of_id = dup.id
+        document.match_confidence = HIGH_MATCH_CONFIDENCE
+        
+        # Create suggestion
+        suggestion = DocumentSuggestedAction(
+            document_id=document.id,
+            action_type=DocumentSuggestedActionType.MARK_DUPLICATE,
+            title="Potential duplicate detected",
+            explanation=f"This document appears to be a duplicate of document uploaded on {dup.created_at.date()}. "
+                      f"Same invoice number ({document.invoice_number}), supplier ({document.supplier_name}), "
+                      f"and amount ({document.total_amount}).",
+            confidence_score=HIGH_MATCH_CONFIDENCE,
+            parameters={
+                "duplicate_of_id": str(dup.id),
+                "duplicate_filename": dup.original_filename,
+            },
+            priority=1,
+        )
+        self._add_suggestion(suggestion)
     
-    async def _match_party(self, document: Document) -> None:
+    def _match_party(self, document: Document) -> None:
         """Match document to a party (supplier/customer)."""
         if not document.supplier_name:
             return
         
-        # Try exact match first
-        result = await self.db.execute(
-            select(Party)
-            .where(Party.administration_id == self.administration_id)
-            .where(func.lower(Party.name) == func.lower(document.supplier_name))
-            .where(Party.is_active == True)
-        )
-        party = result.scalar_one_or_none()
-        
+        party, exact = self._index.match_party(document.supplier_name)
         if party:
             document.matched_party_id = party.id
-            document.match_confidence = HIGH_MATCH_CONFIDENCE
-            return
-        
-        # Try partial match
-        result = await self.db.execute(
-            select(Party)
-            .where(Party.administration_id == self.administration_id)
-            .where(Party.is_active == True)
-            .where(
-                or_(
-                    func.lower(Party.name).contains(func.lower(document.supplier_name)),
-                    func.lower(document.supplier_name).contains(func.lower(Party.name)),
-                )
-            )
-        )
-        parties = result.scalars().all()
-        
-        if len(parties) == 1:
-            document.matched_party_id = parties[0].id
-            document.match_confidence = MEDIUM_MATCH_CONFIDENCE
+            document.match_confidence = HIGH_MATCH_CONFIDENCE if exact else MEDIUM_MATCH_CONFIDENCE
     
-    async def _match_open_items(self, document: Document) -> None:
+    def _match_open_items(self, document: Document) -> None:
         """Match document to open items (AR/AP)."""
         if not document.total_amount or not document.matched_party_id:
             return
         
         # Look for open items from this party with matching amount
-        result = await self.db.execute(
-            select(OpenItem)
-            .where(OpenItem.administration_id == self.administration_id)
-            .where(OpenItem.party_id == document.matched_party_id)
-            .where(OpenItem.status.in_([OpenItemStatus.OPEN, OpenItemStatus.PARTIAL]))
-            .where(OpenItem.open_amount == document.total_amount)
-        )
-        matching_items = result.scalars().all()
+        matching_items = self._index.open_items_for(document.matched_party_id, document.total_amount)
         
         if len(matching_items) == 1:
             # Exact match - high confidence
@@ -233,24 +219,12 @@ class DocumentMatchingService:
                 },
                 priority=2,
             )
-            self.db.add(suggestion)
+            self._add_suggestion(suggestion)
             return
         
         # Check for partial matches (amount within 10%)
-        tolerance = document.total_amount * Decimal("0.10")
-        result = await self.db.execute(
-            select(OpenItem)
-            .where(OpenItem.administration_id == self.administration_id)
-            .where(OpenItem.party_id == document.matched_party_id)
-            .where(OpenItem.status.in_([OpenItemStatus.OPEN, OpenItemStatus.PARTIAL]))
-            .where(
-                and_(
-                    OpenItem.open_amount >= document.total_amount - tolerance,
-                    OpenItem.open_amount <= document.total_amount + tolerance,
-                )
-            )
-        )
-        partial_matches = result.scalars().all()
+        tolerance = document.total_amount * PARTIAL_AMOUNT_TOLERANCE
+        partial_matches = self._index.open_items_for(document.matched_party_id, document.total_amount, tolerance)
         
         for item in partial_matches:
             # Create suggestion with lower confidence
@@ -269,9 +243,9 @@ class DocumentMatchingService:
                 },
                 priority=3,
             )
-            self.db.add(suggestion)
+            self._add_suggestion(suggestion)
     
-    async def _check_asset_purchase(self, document: Document) -> None:
+    def _check_asset_purchase(self, document: Document) -> None:
         """
         Check if document indicates an asset purchase.
         
@@ -318,16 +292,12 @@ class DocumentMatchingService:
                 },
                 priority=4,
             )
-            self.db.add(suggestion)
+            self._add_suggestion(suggestion)
     
-    async def _generate_default_suggestions(self, document: Document) -> None:
+    def _generate_default_suggestions(self, document: Document) -> None:
         """Generate default suggestions for documents without specific matches."""
-        # Check if any suggestions already exist
-        result = await self.db.execute(
-            select(func.count(DocumentSuggestedAction.id))
-            .where(DocumentSuggestedAction.document_id == document.id)
-        )
-        suggestion_count = result.scalar() or 0
+        # Check if any suggestions were made by the earlier steps
+        suggestion_count = self._suggestion_counts.get(document.id, 0)
         
         if suggestion_count == 0 and document.total_amount:
             # Add default expense posting suggestion
@@ -344,7 +314,7 @@ class DocumentMatchingService:
                 },
                 priority=5,
             )
-            self.db.add(suggestion)
+            self._add_suggestion(suggestion)
         
         # Add manual review suggestion if extraction confidence is low
         if document.extraction_confidence and document.extraction_confidence < Decimal("0.70"):
@@ -360,7 +330,7 @@ class DocumentMatchingService:
                 },
                 priority=1,
             )
-            self.db.add(suggestion)
+            self._add_suggestion(suggestion)
     
     def _amounts_similar(
         self, 
@@ -380,11 +350,7 @@ class DocumentMatchingService:
         tolerance_days: int
     ) -> bool:
         """Check if two dates are within tolerance."""
-        if date1 is None or date2 is None:
-            return True  # If dates missing, don't fail on date check
-        
-        diff = abs((date1 - date2).days)
-        return diff <= tolerance_days
+        return dates_within_tolerance(date1, date2, tolerance_days)
     
     async def find_duplicates(
         self,
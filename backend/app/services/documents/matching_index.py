@@ -0,0 +1,248 @@
+"""
+Document Matching Index
+
+In-memory lookup structures for DocumentMatchingService, built once per
+matching run and shared by every document in it:
+
+- Duplicate candidates grouped by (invoice number, supplier), sorted by
+  amount, plus a hash of (invoice number, supplier, amount, date) for
+  exact duplicates
+- Active parties by normalized name, with partial-match results memoized
+  per supplier name
+- Open items (OPEN/PARTIAL) per party, sorted by open amount
+
+Matching a document is then a dictionary lookup plus a binary search
+instead of one or more queries with a scan over the candidate rows, which
+keeps large batch runs (month-end backlogs) linear in the number of
+documents.
+"""
+import uuid
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document, DocumentStatus
+from app.models.subledger import OpenItem, OpenItemStatus, Party
+
+# Documents in these statuses can be the original of a duplicate
+DUPLICATE_CANDIDATE_STATUSES = (
+    DocumentStatus.EXTRACTED,
+    DocumentStatus.NEEDS_REVIEW,
+    DocumentStatus.POSTED,
+)
+OPEN_ITEM_STATUSES = (OpenItemStatus.OPEN, OpenItemStatus.PARTIAL)
+
+DUPLICATE_AMOUNT_TOLERANCE = Decimal("0.01")
+PARTIAL_AMOUNT_TOLERANCE = Decimal("0.10")
+
+# Keep IN (...) lists well below database parameter limits
+_IN_CHUNK_SIZE = 500
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Case-insensitive, whitespace-normalized name used as a lookup key."""
+    return " ".join(name.lower().split()) if name else ""
+
+
+def dates_within_tolerance(date1: Optional[datetime], date2: Optional[datetime], tolerance_days: int) -> bool:
+    """Check if two dates are within tolerance (missing dates never fail the check)."""
+    if date1 is None or date2 is None:
+        return True
+    if isinstance(date1, datetime) and isinstance(date2, datetime) and (date1.tzinfo is None) != (date2.tzinfo is None):
+        # Some drivers (SQLite) hand back naive UTC datetimes
+        date1, date2 = (_naive_utc(d) for d in (date1, date2))
+    return abs((date1 - date2).days) <= tolerance_days
+
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _day(value: Optional[datetime]) -> Optional[date]:
+    return value.date() if isinstance(value, datetime) else value
+
+
+@dataclass(frozen=True)
+class DocumentCandidate:
+    id: uuid.UUID
+    invoice_number: str
+    supplier_name: str
+    total_amount: Decimal
+    invoice_date: Optional[datetime]
+    created_at: datetime
+    original_filename: str
+
+
+@dataclass(frozen=True)
+class PartyCandidate:
+    id: uuid.UUID
+    name: str
+
+
+@dataclass(frozen=True)
+class OpenItemCandidate:
+    id: uuid.UUID
+    party_id: uuid.UUID
+    open_amount: Decimal
+    document_number: Optional[str]
+    document_date: date
+
+
+class DocumentMatchingIndex:
+    """Lookup structures for duplicate, party and open-item matching."""
+
+    def __init__(
+        self,
+        documents: Iterable[DocumentCandidate] = (),
+        parties: Iterable[PartyCandidate] = (),
+        open_items: Iterable[OpenItemCandidate] = (),
+    ):
+        # (invoice_number, supplier) -> candidates sorted by amount, and their amounts
+        self._duplicates: Dict[Tuple[str, str], Tuple[List[Decimal], List[DocumentCandidate]]] = {}
+        self._exact: Dict[Tuple[str, str, Decimal, Optional[date]], DocumentCandidate] = {}
+        self._parties_by_name: Dict[str, List[PartyCandidate]] = {}
+        self._parties: List[Tuple[str, PartyCandidate]] = []
+        self._partial_party_cache: Dict[str, List[PartyCandidate]] = {}
+        # party_id -> (open amounts, items) sorted by amount
+        self._open_items: Dict[uuid.UUID, Tuple[List[Decimal], List[OpenItemCandidate]]] = {}
+
+        grouped: Dict[Tuple[str, str], List[DocumentCandidate]] = {}
+        for doc in documents:
+            if doc.total_amount is None:
+                continue  # Can never satisfy the amount check
+            supplier = normalize_name(doc.supplier_name)
+            grouped.setdefault((doc.invoice_number, supplier), []).append(doc)
+            self._exact.setdefault((doc.invoice_number, supplier, doc.total_amount, _day(doc.invoice_date)), doc)
+        for key, docs in grouped.items():
+            docs.sort(key=lambda d: d.total_amount)
+            self._duplicates[key] = ([d.total_amount for d in docs], docs)
+
+        for party in parties:
+            name = normalize_name(party.name)
+            self._parties_by_name.setdefault(name, []).append(party)
+            self._parties.append((name, party))
+
+        by_party: Dict[uuid.UUID, List[OpenItemCandidate]] = {}
+        for item in open_items:
+            by_party.setdefault(item.party_id, []).append(item)
+        for party_id, items in by_party.items():
+            items.sort(key=lambda i: i.open_amount)
+            self._open_items[party_id] = ([i.open_amount for i in items], items)
+
+    @classmethod
+    async def load(
+        cls,
+        db: AsyncSession,
+        administration_id: uuid.UUID,
+        invoice_numbers: Sequence[str],
+    ) -> "DocumentMatchingIndex":
+        """
+        Load the index for an administration.
+
+        Duplicate candidates are limited to the given invoice numbers (those
+        of the documents being matched), so a single-document run reads no
+        more rows than the per-document query did.
+        """
+        documents: List[DocumentCandidate] = []
+        numbers = sorted(set(n for n in invoice_numbers if n))
+        for start in range(0, len(numbers), _IN_CHUNK_SIZE):
+            result = await db.execute(
+                select(
+                    Document.id,
+                    Document.invoice_number,
+                    Document.supplier_name,
+                    Document.total_amount,
+                    Document.invoice_date,
+                    Document.created_at,
+                    Document.original_filename,
+                )
+                .where(Document.administration_id == administration_id)
+                .where(Document.invoice_number.in_(numbers[start:start + _IN_CHUNK_SIZE]))
+                .where(Document.status.in_(DUPLICATE_CANDIDATE_STATUSES))
+            )
+            documents.extend(DocumentCandidate(*row) for row in result.all())
+
+        result = await db.execute(
+            select(Party.id, Party.name)
+            .where(Party.administration_id == administration_id)
+            .where(Party.is_active == True)
+        )
+        parties = [PartyCandidate(*row) for row in result.all()]
+
+        result = await db.execute(
+            select(OpenItem.id, OpenItem.party_id, OpenItem.open_amount, OpenItem.document_number, OpenItem.document_date)
+            .where(OpenItem.administration_id == administration_id)
+            .where(OpenItem.status.in_(OPEN_ITEM_STATUSES))
+        )
+        open_items = [OpenItemCandidate(*row) for row in result.all()]
+
+        return cls(documents, parties, open_items)
+
+    def find_duplicate(
+        self,
+        document_id: uuid.UUID,
+        invoice_number: str,
+        supplier_name: str,
+        amount: Optional[Decimal],
+        invoice_date: Optional[datetime],
+        tolerance_days: int,
+    ) -> Optional[DocumentCandidate]:
+        """First other document with the same invoice number and supplier, a
+        similar amount and a date within tolerance."""
+        if amount is None:
+            return None
+        supplier = normalize_name(supplier_name)
+
+        exact = self._exact.get((invoice_number, supplier, amount, _day(invoice_date)))
+        if exact is not None and exact.id != document_id:
+            return exact
+
+        group = self._duplicates.get((invoice_number, supplier))
+        if group is None:
+            return None
+        amounts, docs = group
+        lo = bisect_left(amounts, amount - DUPLICATE_AMOUNT_TOLERANCE)
+        hi = bisect_right(amounts, amount + DUPLICATE_AMOUNT_TOLERANCE)
+        for candidate in docs[lo:hi]:
+            if candidate.id != document_id and dates_within_tolerance(invoice_date, candidate.invoice_date, tolerance_days):
+                return candidate
+        return None
+
+    def match_party(self, supplier_name: str) -> Tuple[Optional[PartyCandidate], bool]:
+        """
+        Return (party, exact). Exact name matches win; otherwise a party is
+        only returned when exactly one name contains, or is contained in,
+        the supplier name.
+        """
+        name = normalize_name(supplier_name)
+        if not name:
+            return None, False
+        exact = self._parties_by_name.get(name, ())
+        if len(exact) == 1:
+            return exact[0], True
+
+        partial = self._partial_party_cache.get(name)
+        if partial is None:
+            partial = [party for party_name, party in self._parties if party_name in name or name in party_name]
+            self._partial_party_cache[name] = partial
+        if len(partial) == 1:
+            return partial[0], False
+        return None, False
+
+    def open_items_for(
+        self,
+        party_id: uuid.UUID,
+        amount: Decimal,
+        tolerance: Decimal = Decimal("0"),
+    ) -> List[OpenItemCandidate]:
+        """Open items of a party whose open amount is within ``tolerance`` of ``amount``."""
+        group = self._open_items.get(party_id)
+        if group is None:
+            return []
+        amounts, items = group
+        return items[bisect_left(amounts, amount - tolerance):bisect_right(amounts, amount + tolerance)]
@@ -0,0 +1,164 @@
+"""
+Document Upload Pipeline
+
+Streams uploaded files to disk in fixed-size chunks instead of reading them
+into memory, enforcing the size limit as soon as it is exceeded and computing
+the SHA-256 of the content on the way. The digest is stored on the document
+so identical files uploaded again for the same administration can be
+recognised and answered with the existing document (storage and extraction
+results included) instead of being stored and processed a second time.
+
+Files are first written to a staging file under UPLOAD_DIR and moved to their
+final location only once the document record exists, so a rejected or
+duplicate upload never leaves a half-written file behind. When storing the
+records fails afterwards, discard_on_failure() removes the staged and the
+already promoted files alike.
+"""
+import hashlib
+import os
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Type, TypeVar
+
+import aiofiles
+from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+STAGING_DIRNAME = ".staging"
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured maximum size."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"Upload exceeds {max_size} bytes")
+
+
+@dataclass
+class StagedUpload:
+    """A fully received upload waiting to be moved to its final location."""
+    path: Path
+    size: int
+    sha256: str
+    filename: str
+    content_type: str
+    promoted: bool = False
+
+    @property
+    def extension(self) -> str:
+        return self.filename.rsplit(".", 1)[-1] if "." in self.filename else "bin"
+
+    def promote(self, destination: Path) -> Path:
+        """Move the staged file to its final path (same filesystem, atomic)."""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.path, destination)
+        self.path = destination
+        self.promoted = True
+        return destination
+
+    def discard(self) -> None:
+        """
+        Remove the file (duplicate or failed upload), wherever it is now.
+
+        A promoted file's directory was created for this document only and
+        is removed as well once it is empty.
+        """
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        if self.promoted:
+            try:
+                self.path.parent.rmdir()
+            except OSError:
+                pass
+
+
+@contextmanager
+def discard_on_failure(uploads: Iterable[StagedUpload]):
+    """
+    Remove every upload's file, staged or promoted, if the block raises.
+
+    Wrap the record creation and commit so a failed database write does not
+    leave orphaned files in UPLOAD_DIR.
+    """
+    try:
+        yield
+    except BaseException:
+        for upload in uploads:
+            upload.discard()
+        raise
+
+
+async def stage_upload(
+    file: UploadFile,
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    upload_dir: Optional[str] = None,
+) -> StagedUpload:
+    """
+    Stream an upload to a staging file, hashing it chunk by chunk.
+
+    Raises UploadTooLarge as soon as more than ``max_size`` bytes have been
+    received (or immediately when the declared size is already too large).
+    """
+    max_size = settings.MAX_UPLOAD_SIZE if max_size is None else max_size
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    if file.size is not None and file.size > max_size:
+        raise UploadTooLarge(max_size)
+
+    staging_dir = Path(upload_dir or settings.UPLOAD_DIR) / STAGING_DIRNAME
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    path = staging_dir / f"{uuid.uuid4().hex}.part"
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(path, "wb") as out:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge(max_size)
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    return StagedUpload(
+        path=path,
+        size=size,
+        sha256=digest.hexdigest(),
+        filename=file.filename or "document",
+        content_type=file.content_type or "",
+    )
+
+
+async def find_by_content_hash(
+    db: AsyncSession,
+    model: Type[T],
+    administration_id: uuid.UUID,
+    sha256: str,
+    exclude_statuses=(),
+) -> Optional[T]:
+    """
+    Return the oldest document of ``model`` in the administration with the
+    same content digest, ignoring documents in ``exclude_statuses``.
+    """
+    query = (
+        select(model)
+        .where(model.administration_id == administration_id)
+        .where(model.content_sha256 == sha256)
+    )
+    if exclude_statuses:
+        query = query.where(model.status.notin_(exclude_statuses))
+    result = await db.execute(query.order_by(model.created_at).limit(1))
+    return result.scalar_one_or_none()
@@ -0,0 +1,223 @@
+"""
+E-commerce Mapping Generation
+
+Creates the review-workflow mapping rows (EcommerceMapping) for imported
+orders and refunds that do not have one yet.
+
+Unmapped records are found with an anti-join (records LEFT JOIN mappings
+WHERE mapping IS NULL), read in keyset-paginated chunks and inserted with
+one bulk INSERT per chunk. Already-mapped records are never loaded, so
+regenerating after a sync only touches the newly imported rows, in a
+number of queries proportional to those rows / MAPPING_CHUNK_SIZE.
+
+Used by the sales-review "generate" endpoint and right after each
+Shopify/WooCommerce sync.
+"""
+import logging
+import uuid
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ecommerce import (
+    EcommerceConnection,
+    EcommerceMapping,
+    EcommerceOrder,
+    EcommerceRefund,
+    MappingReviewStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+MAPPING_CHUNK_SIZE = 1000
+
+
+@dataclass
+class MappingGenerationResult:
+    created: int = 0
+    skipped_existing: int = 0
+    total_orders: int = 0
+    total_refunds: int = 0
+
+
+def compute_vat(tax_cents: int, subtotal_cents: int) -> tuple[Optional[Decimal], str]:
+    """
+    Attempt to infer Dutch VAT rate from tax/subtotal ratio.
+    Returns (vat_rate, vat_status).
+    """
+    if subtotal_cents <= 0 or tax_cents <= 0:
+        return None, "unknown"
+
+    ratio = tax_cents / subtotal_cents
+    # Dutch VAT: 21% (standard) or 9% (reduced)
+    if 0.20 <= ratio <= 0.22:
+        return Decimal("21.00"), "auto"
+    elif 0.08 <= ratio <= 0.10:
+        return Decimal("9.00"), "auto"
+    elif ratio < 0.01:
+        return Decimal("0.00"), "auto"
+    else:
+        # Mixed or non-standard: flag for manual review
+        return None, "needs_review"
+
+
+def _order_mapping(administration_id: uuid.UUID, row) -> dict:
+    vat_rate, vat_status = compute_vat(row.tax_cents, row.subtotal_cents)
+    return {
+        "id": uuid.uuid4(),
+        "administration_id": administration_id,
+        "connection_id": row.connection_id,
+        "order_id": row.id,
+        "record_type": "order",
+        "review_status": MappingReviewStatus.NEEDS_REVIEW if vat_status == "needs_review" else MappingReviewStatus.NEW,
+        "provider": row.provider.value,
+        "external_ref": row.external_order_number or row.external_order_id,
+        "revenue_cents": row.subtotal_cents,
+        "tax_cents": row.tax_cents,
+        "shipping_cents": row.shipping_cents,
+        "discount_cents": row.discount_cents,
+        "refund_cents": 0,
+        "net_amount_cents": row.total_amount_cents,
+        "vat_rate": vat_rate,
+        "vat_amount_cents": row.tax_cents,
+        "vat_status": vat_status,
+        "currency": row.currency,
+        "accounting_date": row.ordered_at.date() if row.ordered_at else None,
+    }
+
+
+def _refund_mapping(administration_id: uuid.UUID, row) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "administration_id": administration_id,
+        "connection_id": row.connection_id,
+        "refund_id": row.id,
+        "record_type": "refund",
+        "review_status": MappingReviewStatus.NEW,
+        "provider": row.provider.value,
+        "external_ref": row.external_order_id or row.external_refund_id,
+        "revenue_cents": 0,
+        "tax_cents": 0,
+        "shipping_cents": 0,
+        "discount_cents": 0,
+        "refund_cents": row.amount_cents,
+        "net_amount_cents": -row.amount_cents,
+        "vat_rate": None,
+        "vat_amount_cents": 0,
+        "vat_status": "unknown",
+        "currency": row.currency,
+        "accounting_date": row.refunded_at.date() if row.refunded_at else None,
+    }
+
+
+async def _count(db: AsyncSession, model, connection_filter) -> int:
+    result = await db.execute(
+        select(func.count(model.id))
+        .join(EcommerceConnection, EcommerceConnection.id == model.connection_id)
+        .where(*connection_filter)
+    )
+    return result.scalar() or 0
+
+
+async def _insert_unmapped(
+    db: AsyncSession,
+    administration_id: uuid.UUID,
+    model,
+    columns,
+    mapping_fk,
+    build,
+    connection_filter,
+    chunk_size: int,
+) -> int:
+    """Insert mappings for unmapped rows of ``model``, one chunk at a time."""
+    created = 0
+    last_id = None
+    while True:
+        stmt = (
+            select(model.id, model.connection_id, EcommerceConnection.provider, *columns)
+            .join(EcommerceConnection, EcommerceConnection.id == model.connection_id)
+            .outerjoin(EcommerceMapping, mapping_fk == model.id)
+            .where(*connection_filter)
+            .where(EcommerceMapping.id.is_(None))
+            .order_by(model.id)
+            .limit(chunk_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(model.id > last_id)
+        rows = (await db.execute(stmt)).all()
+        if not rows:
+            return created
+        await db.execute(insert(EcommerceMapping), [build(administration_id, row) for row in rows])
+        created += len(rows)
+        if len(rows) < chunk_size:
+            return created
+        last_id = rows[-1].id
+
+
+async def generate_mappings(
+    db: AsyncSession,
+    administration_id: uuid.UUID,
+    connection_id: Optional[uuid.UUID] = None,
+    chunk_size: int = MAPPING_CHUNK_SIZE,
+) -> MappingGenerationResult:
+    """
+    Create mappings for all unmapped orders and refunds of an administration
+    (optionally a single connection). Safe to call repeatedly; the caller
+    commits.
+    """
+    connection_filter = [EcommerceConnection.administration_id == administration_id]
+    if connection_id:
+        connection_filter.append(EcommerceConnection.id == connection_id)
+
+    result = MappingGenerationResult(
+        total_orders=await _count(db, EcommerceOrder, connection_filter),
+        total_refunds=await _count(db, EcommerceRefund, connection_filter),
+    )
+    result.created += await _insert_unmapped(
+        db, administration_id, EcommerceOrder,
+        (
+            EcommerceOrder.external_order_number,
+            EcommerceOrder.external_order_id,
+            EcommerceOrder.subtotal_cents,
+            EcommerceOrder.tax_cents,
+            EcommerceOrder.shipping_cents,
+            EcommerceOrder.discount_cents,
+            EcommerceOrder.total_amount_cents,
+            EcommerceOrder.currency,
+            EcommerceOrder.ordered_at,
+        ),
+        EcommerceMapping.order_id, _order_mapping, connection_filter, chunk_size,
+    )
+    result.created += await _insert_unmapped(
+        db, administration_id, EcommerceRefund,
+        (
+            EcommerceRefund.external_order_id,
+            EcommerceRefund.external_refund_id,
+            EcommerceRefund.amount_cents,
+            EcommerceRefund.currency,
+            EcommerceRefund.refunded_at,
+        ),
+        EcommerceMapping.refund_id, _refund_mapping, connection_filter, chunk_size,
+    )
+    result.skipped_existing = result.total_orders + result.total_refunds - result.created
+    return result
+
+
+async def generate_mappings_after_sync(db: AsyncSession, connection: EcommerceConnection) -> int:
+    """
+    Map the records a sync just imported. Runs in a savepoint so a failure
+    here never fails the sync itself; the records stay unmapped and the
+    review workspace can generate them later.
+    """
+    try:
+        async with db.begin_nested():
+            result = await generate_mappings(db, connection.administration_id, connection.id)
+    except Exception:
+        logger.exception("Mapping generation after sync failed for connection %s", connection.id)
+        return 0
+    if result.created:
+        logger.info("Created %d mapping(s) after sync of connection %s", result.created, connection.id)
+    return result.created
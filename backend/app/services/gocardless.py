@@ -16,23 +16,26 @@ Flow:
   7. Manual sync pulls transactions from GoCardless → creates BankTransaction records
 
 Security:
-  - GoCardless access tokens are short-lived (24h) and refreshed as needed
+  - GoCardless access tokens are short-lived (24h); one is cached per process
+    and refreshed ahead of expiry
   - Bank account access tokens (from GoCardless) stored in bank_connections.access_token
   - Requisition IDs stored as provider_connection_id
   - No bank credentials are ever stored; only GoCardless-issued tokens
 """
+import asyncio
 import hashlib
 import logging
+import time
 import uuid
 from datetime import datetime, date, timedelta, timezone
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
 
-import httpx
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.integrations.http import get_http_client
 from app.models.bank import (
     BankAccount,
     BankConnectionModel,
@@ -60,6 +63,109 @@ class GoCardlessError(Exception):
         super().__init__(message)
 
 
+class GoCardlessTokenCache:
+    """
+    Process-wide GoCardless access token.
+
+    All service instances share one token. Once it is within
+    GOCARDLESS_TOKEN_REFRESH_AHEAD_SECONDS of expiry it is refreshed in the
+    background (with the refresh token while that is valid) and the current
+    token keeps being served; only an expired or missing token makes a
+    request wait for the token endpoint.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._access: Optional[str] = None
+        self._access_expires = 0.0
+        self._refresh: Optional[str] = None
+        self._refresh_expires = 0.0
+        self._secret_id: Optional[str] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or loop is not self._loop:
+            self._lock, self._loop, self._refresh_task = asyncio.Lock(), loop, None
+        return self._lock
+
+    def _valid(self) -> bool:
+        return (
+            self._access is not None
+            and self._secret_id == settings.GOCARDLESS_SECRET_ID
+            and self._clock() < self._access_expires
+        )
+
+    async def get_token(self) -> str:
+        if self._valid():
+            if self._clock() >= self._access_expires - settings.GOCARDLESS_TOKEN_REFRESH_AHEAD_SECONDS:
+                self._refresh_in_background()
+            return self._access
+        async with self._get_lock():
+            if not self._valid():  # Another request may have fetched one meanwhile
+                await self._obtain()
+            return self._access
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """Drop the cached token (only if it is still ``token``, when given)."""
+        if token is None or token == self._access:
+            self._access = None
+
+    def _refresh_in_background(self) -> None:
+        lock = self._get_lock()
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh(lock))
+
+    async def _background_refresh(self, lock: asyncio.Lock) -> None:
+        async with lock:
+            if self._valid() and self._clock() < self._access_expires - settings.GOCARDLESS_TOKEN_REFRESH_AHEAD_SECONDS:
+                return
+            try:
+                await self._obtain()
+            except Exception as e:
+                # The current token is still valid; the next request tries again
+                logger.warning("GoCardless token refresh-ahead failed: %s", e)
+
+    async def _obtain(self) -> None:
+        client = get_http_client("gocardless")
+        started = self._clock()
+        if self._refresh and self._secret_id == settings.GOCARDLESS_SECRET_ID and started < self._refresh_expires:
+            response = await client.post(f"{GOCARDLESS_BASE_URL}/token/refresh/", json={"refresh": self._refresh}, retry=True)
+            if response.status_code == 200:
+                data = response.json()
+                self._access = data["access"]
+                self._access_expires = started + data.get("access_expires", 86400)
+                return
+
+        response = await client.post(
+            f"{GOCARDLESS_BASE_URL}/token/new/",
+            json={
+                "secret_id": settings.GOCARDLESS_SECRET_ID,
+                "secret_key": settings.GOCARDLESS_SECRET_KEY,
+            },
+            retry=True,
+        )
+        if response.status_code != 200:
+            logger.error("GoCardless token request failed: %s %s", response.status_code, response.text)
+            raise GoCardlessError(
+                "Kan geen toegangstoken verkrijgen van GoCardless",
+                status_code=response.status_code,
+                detail=response.text,
+            )
+
+        data = response.json()
+        self._secret_id = settings.GOCARDLESS_SECRET_ID
+        self._access = data["access"]
+        self._access_expires = started + data.get("access_expires", 86400)
+        self._refresh = data.get("refresh")
+        self._refresh_expires = started + data.get("refresh_expires", 0)
+
+
+gocardless_tokens = GoCardlessTokenCache()
+
+
 class GoCardlessService:
     """
     Service for GoCardless Bank Account Data API integration.
@@ -85,31 +191,14 @@ class GoCardlessService:
         """
         Obtain a GoCardless API access token.
 
-        Tokens are short-lived (24h). We request a new one each time
-        since this is called infrequently (connect + sync).
+        Tokens are short-lived (24h) and shared by all service instances
+        through the process-wide token cache, which refreshes them ahead of
+        expiry.
         """
         if not settings.gocardless_enabled:
             raise GoCardlessError("GoCardless is niet geconfigureerd", status_code=503)
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{GOCARDLESS_BASE_URL}/token/new/",
-                json={
-                    "secret_id": settings.GOCARDLESS_SECRET_ID,
-                    "secret_key": settings.GOCARDLESS_SECRET_KEY,
-                },
-            )
-
-        if response.status_code != 200:
-            logger.error("GoCardless token request failed: %s %s", response.status_code, response.text)
-            raise GoCardlessError(
-                "Kan geen toegangstoken verkrijgen van GoCardless",
-                status_code=response.status_code,
-                detail=response.text,
-            )
-
-        data = response.json()
-        self._access_token = data["access"]
+        self._access_token = await gocardless_tokens.get_token()
         return self._access_token
 
     async def _api_request(
@@ -120,25 +209,21 @@ class GoCardlessService:
         params: Optional[dict] = None,
     ) -> dict:
         """Make an authenticated request to the GoCardless API."""
-        if not self._access_token:
-            await self._get_access_token()
+        await self._get_access_token()
 
         url = f"{GOCARDLESS_BASE_URL}{path}"
-        headers = {"Authorization": f"Bearer {self._access_token}"}
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.request(
-                method, url, headers=headers, json=json, params=params
-            )
+        client = get_http_client("gocardless")
+        response = await client.request(
+            method, url, headers={"Authorization": f"Bearer {self._access_token}"}, json=json, params=params
+        )
 
         if response.status_code == 401:
-            # Token expired, retry once with fresh token
+            # Token revoked or expired early, retry once with a fresh token
+            gocardless_tokens.invalidate(self._access_token)
             await self._get_access_token()
-            headers = {"Authorization": f"Bearer {self._access_token}"}
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.request(
-                    method, url, headers=headers, json=json, params=params
-                )
+            response = await client.request(
+                method, url, headers={"Authorization": f"Bearer {self._access_token}"}, json=json, params=params
+            )
 
         if response.status_code >= 400:
             logger.error("GoCardless API error: %s %s → %s", method, path, response.text)
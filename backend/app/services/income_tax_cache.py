@@ -0,0 +1,26 @@
+"""
+Income Tax Overview Cache
+
+Caches the computed annual income-tax overview per (administration, year).
+Users flip between years on the Inkomstenbelasting page, and the figures
+only change when invoices, expenses or time entries change.
+
+A commit touching a ZZPInvoice, ZZPExpense or ZZPTimeEntry drops the
+administration's cached years; see AdministrationCache for the invalidation
+and generation rules.
+"""
+from app.core.config import settings
+from app.services.administration_cache import AdministrationCache
+
+
+def _watched_models() -> tuple:
+    from app.models.zzp import ZZPExpense, ZZPInvoice, ZZPTimeEntry
+    return (ZZPInvoice, ZZPExpense, ZZPTimeEntry)
+
+
+year_overview_cache = AdministrationCache(
+    "income_tax",
+    ttl_seconds=settings.INCOME_TAX_CACHE_TTL_SECONDS,
+    max_entries=settings.INCOME_TAX_CACHE_MAX_ENTRIES,
+    watched_models=_watched_models,
+)
@@ -1,4 +1,16 @@
 # Ledger services module
-from app.services.ledger.posting import LedgerService
+from app.services.ledger.posting import (
+    JournalEntryDraft,
+    LedgerError,
+    LedgerService,
+    PostingBatchResult,
+    UnbalancedEntryError,
+)
 
-__all__ = ["LedgerService"]
+__all__ = [
+    "JournalEntryDraft",
+    "LedgerError",
+    "LedgerService",
+    "PostingBatchResult",
+    "UnbalancedEntryError",
+]
@@ -3,18 +3,38 @@ Ledger Service
 
 Handles journal entry posting with double-entry enforcement.
 All operations are idempotent and use database transactions.
+
+Bulk flows use post_entries: a whole batch is validated in memory, periods,
+accounts and parties are loaded once per batch, entry numbers are allocated
+as one block and entries, lines and open items are written with bulk INSERTs
+in a single transaction.
+
+Entry numbers (JE-000001, ...) are unique per administration. Allocation
+locks the administration row until the transaction ends, so concurrent
+single postings and batches of one administration take turns.
 """
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, date, timezone, timedelta
 from decimal import Decimal
-from typing import List, Optional, Tuple
-from sqlalchemy import select, func
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, func, insert, case
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.audit.session_hooks import build_bulk_create_audit_rows
+from app.core.metrics import LEDGER_POSTINGS_TOTAL
+from app.models.administration import Administration
+from app.models.audit_log import AuditLog
 from app.models.ledger import JournalEntry, JournalLine, JournalEntryStatus, AccountingPeriod, PeriodStatus
 from app.models.accounting import ChartOfAccount
 from app.models.subledger import Party, OpenItem, OpenItemStatus
 from app.models.assets import FixedAsset, DepreciationSchedule
+from app.services.work_queue import flag_work_items_outdated
+
+# Rows per bulk INSERT statement (and ids per IN list) in post_entries
+POSTING_CHUNK_SIZE = 1000
+
+DEFAULT_PAYMENT_TERMS_DAYS = 30
 
 
 class LedgerError(Exception):
@@ -33,6 +53,156 @@ class UnbalancedEntryError(LedgerError):
         )
 
 
+@dataclass
+class JournalEntryDraft:
+    """A journal entry to create with post_entries; lines as for create_journal_entry."""
+    entry_date: date
+    description: str
+    lines: List[dict]
+    reference: Optional[str] = None
+    document_id: Optional[uuid.UUID] = None
+    source_type: Optional[str] = None
+    source_id: Optional[uuid.UUID] = None
+
+
+@dataclass
+class PostingBatchResult:
+    """Entries created by post_entries, in the order of the drafts."""
+    entry_ids: List[uuid.UUID] = field(default_factory=list)
+    entry_numbers: List[str] = field(default_factory=list)
+    lines_created: int = 0
+    open_items_created: int = 0
+
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(value))
+
+
+def _line_totals(lines: List[dict]) -> Tuple[Decimal, Decimal]:
+    """Validate that the lines balance; returns (total_debit, total_credit)."""
+    total_debit = sum(_decimal(line.get("debit_amount", 0)) for line in lines)
+    total_credit = sum(_decimal(line.get("credit_amount", 0)) for line in lines)
+    
+    if total_debit != total_credit:
+        raise UnbalancedEntryError(total_debit, total_credit)
+    
+    if not lines:
+        raise LedgerError("Journal entry must have at least one line")
+    
+    return total_debit, total_credit
+
+
+def _check_period_accepts_entries(period: Optional[AccountingPeriod]) -> None:
+    """Enforce period control rules for new entries."""
+    if not period:
+        return
+    if period.status == PeriodStatus.LOCKED:
+        raise LedgerError(
+            f"Period '{period.name}' is LOCKED and cannot accept any entries. "
+            f"This period is immutable."
+        )
+    elif period.status == PeriodStatus.FINALIZED:
+        raise LedgerError(
+            f"Period '{period.name}' is FINALIZED and cannot accept new entries. "
+            f"To correct entries in this period, create a reversal in the next open period."
+        )
+    elif period.is_closed:
+        raise LedgerError(f"Period {period.name} is closed and cannot accept new entries")
+
+
+def _line_values(journal_entry_id: uuid.UUID, line_number: int, line_data: dict) -> dict:
+    """Column values of a JournalLine built from a line dict."""
+    return dict(
+        journal_entry_id=journal_entry_id,
+        account_id=line_data["account_id"],
+        line_number=line_number,
+        description=line_data.get("description"),
+        debit_amount=_decimal(line_data.get("debit_amount", 0)),
+        credit_amount=_decimal(line_data.get("credit_amount", 0)),
+        vat_code_id=line_data.get("vat_code_id"),
+        vat_amount=_decimal(line_data["vat_amount"]) if line_data.get("vat_amount") else None,
+        taxable_amount=_decimal(line_data["taxable_amount"]) if line_data.get("taxable_amount") else None,
+        # Extended VAT fields for Dutch BTW compliance
+        vat_base_amount=_decimal(line_data["vat_base_amount"]) if line_data.get("vat_base_amount") else None,
+        vat_country=line_data.get("vat_country"),
+        vat_is_reverse_charge=line_data.get("vat_is_reverse_charge", False),
+        party_type=line_data.get("party_type"),
+        party_id=line_data.get("party_id"),
+        party_vat_number=line_data.get("party_vat_number"),
+    )
+
+
+def _open_item_values(
+    administration_id: uuid.UUID,
+    entry_id: uuid.UUID,
+    entry_date: date,
+    reference: Optional[str],
+    line_id: uuid.UUID,
+    line: dict,
+    control_type: Optional[str],
+    payment_terms_days: int,
+) -> Optional[dict]:
+    """Column values of the OpenItem for an AR/AP control line, or None."""
+    if control_type not in ("AR", "AP") or not line["party_id"]:
+        return None
+    # Determine item type and amount
+    item_type = "RECEIVABLE" if control_type == "AR" else "PAYABLE"
+    amount = line["debit_amount"] - line["credit_amount"]
+    if control_type == "AP":
+        amount = -amount  # AP is credit-normal
+    if amount == 0:
+        return None
+    return dict(
+        administration_id=administration_id,
+        party_id=line["party_id"],
+        journal_entry_id=entry_id,
+        journal_line_id=line_id,
+        item_type=item_type,
+        document_number=reference,
+        document_date=entry_date,
+        due_date=entry_date + timedelta(days=payment_terms_days),
+        original_amount=abs(amount),
+        open_amount=abs(amount),
+        status=OpenItemStatus.OPEN,
+    )
+
+
+async def allocate_entry_numbers(db: AsyncSession, administration_id: uuid.UUID, count: int) -> List[str]:
+    """
+    Allocate a block of consecutive JE-nnnnnn entry numbers.
+    
+    Takes FOR NO KEY UPDATE on the administration row, which serializes
+    allocations of one administration until commit or rollback without
+    blocking inserts that only reference the row. Numbering continues after
+    the highest JE-nnnnnn number, or after the entry count when that is
+    higher, so deleted entries never cause a number to be handed out twice.
+    """
+    await db.execute(
+        select(Administration.id)
+        .where(Administration.id == administration_id)
+        .with_for_update(key_share=True)
+    )
+    result = await db.execute(
+        select(
+            func.count(JournalEntry.id),
+            func.max(case(
+                (JournalEntry.entry_number.like("JE-______"), JournalEntry.entry_number)
+            )),
+        )
+        .where(JournalEntry.administration_id == administration_id)
+    )
+    existing, highest = result.one()
+    last = existing or 0
+    if highest and highest[3:].isdigit():
+        last = max(last, int(highest[3:]))
+    return [f"JE-{last + i:06d}" for i in range(1, count + 1)]
+
+
+def _chunks(items: Sequence, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
 class LedgerService:
     """
     Service for ledger operations.
@@ -50,12 +220,11 @@ class LedgerService:
     
     async def get_next_entry_number(self) -> str:
         """Generate next sequential entry number for the administration."""
-        result = await self.db.execute(
-            select(func.count(JournalEntry.id))
-            .where(JournalEntry.administration_id == self.administration_id)
-        )
-        count = result.scalar() or 0
-        return f"JE-{count + 1:06d}"
+        return (await self.allocate_entry_numbers(1))[0]
+    
+    async def allocate_entry_numbers(self, count: int) -> List[str]:
+        """Allocate a block of consecutive entry numbers (see allocate_entry_numbers)."""
+        return await allocate_entry_numbers(self.db, self.administration_id, count)
     
     async def create_journal_entry(
         self,
@@ -91,32 +260,11 @@ class LedgerService:
             LedgerError: For other validation errors
         """
         # Validate lines balance
-        total_debit = sum(Decimal(str(line.get("debit_amount", 0))) for line in lines)
-        total_credit = sum(Decimal(str(line.get("credit_amount", 0))) for line in lines)
-        
-        if total_debit != total_credit:
-            raise UnbalancedEntryError(total_debit, total_credit)
-        
-        if not lines:
-            raise LedgerError("Journal entry must have at least one line")
+        total_debit, total_credit = _line_totals(lines)
         
-        # Find period for the entry date
+        # Find period for the entry date; enforce period control rules
         period = await self._find_period_for_date(entry_date)
-        
-        # Check period status - enforce period control rules
-        if period:
-            if period.status == PeriodStatus.LOCKED:
-                raise LedgerError(
-                    f"Period '{period.name}' is LOCKED and cannot accept any entries. "
-                    f"This period is immutable."
-                )
-            elif period.status == PeriodStatus.FINALIZED:
-                raise LedgerError(
-                    f"Period '{period.name}' is FINALIZED and cannot accept new entries. "
-                    f"To correct entries in this period, create a reversal in the next open period."
-                )
-            elif period.is_closed:
-                raise LedgerError(f"Period {period.name} is closed and cannot accept new entries")
+        _check_period_accepts_entries(period)
         
         # Generate entry number
         entry_number = await self.get_next_entry_number()
@@ -142,25 +290,7 @@ class LedgerService:
         
         # Create lines
         for idx, line_data in enumerate(lines, start=1):
-            line = JournalLine(
-                journal_entry_id=entry.id,
-                account_id=line_data["account_id"],
-                line_number=idx,
-                description=line_data.get("description"),
-                debit_amount=Decimal(str(line_data.get("debit_amount", 0))),
-                credit_amount=Decimal(str(line_data.get("credit_amount", 0))),
-                vat_code_id=line_data.get("vat_code_id"),
-                vat_amount=Decimal(str(line_data["vat_amount"])) if line_data.get("vat_amount") else None,
-                taxable_amount=Decimal(str(line_data["taxable_amount"])) if line_data.get("taxable_amount") else None,
-                # Extended VAT fields for Dutch BTW compliance
-                vat_base_amount=Decimal(str(line_data["vat_base_amount"])) if line_data.get("vat_base_amount") else None,
-                vat_country=line_data.get("vat_country"),
-                vat_is_reverse_charge=line_data.get("vat_is_reverse_charge", False),
-                party_type=line_data.get("party_type"),
-                party_id=line_data.get("party_id"),
-                party_vat_number=line_data.get("party_vat_number"),
-            )
-            self.db.add(line)
+            self.db.add(JournalLine(**_line_values(entry.id, idx, line_data)))
         
         if auto_post:
             await self._post_entry(entry, posted_by_id)
@@ -227,35 +357,201 @@ class LedgerService:
         )
         
         for line, account in result.all():
-            if account.control_type in ("AR", "AP") and line.party_id:
-                # Determine item type and amount
-                item_type = "RECEIVABLE" if account.control_type == "AR" else "PAYABLE"
-                amount = line.debit_amount - line.credit_amount
-                if account.control_type == "AP":
-                    amount = -amount  # AP is credit-normal
-                
-                if amount != 0:
-                    # Get party for payment terms
-                    party_result = await self.db.execute(
-                        select(Party).where(Party.id == line.party_id)
-                    )
-                    party = party_result.scalar_one_or_none()
-                    payment_terms = party.payment_terms_days if party else 30
-                    
-                    open_item = OpenItem(
-                        administration_id=self.administration_id,
-                        party_id=line.party_id,
-                        journal_entry_id=entry.id,
-                        journal_line_id=line.id,
-                        item_type=item_type,
-                        document_number=entry.reference,
-                        document_date=entry.entry_date,
-                        due_date=entry.entry_date + timedelta(days=payment_terms),
-                        original_amount=abs(amount),
-                        open_amount=abs(amount),
-                        status=OpenItemStatus.OPEN,
-                    )
-                    self.db.add(open_item)
+            if account.control_type not in ("AR", "AP") or not line.party_id:
+                continue
+            # Get party for payment terms
+            party_result = await self.db.execute(
+                select(Party).where(Party.id == line.party_id)
+            )
+            party = party_result.scalar_one_or_none()
+            payment_terms = party.payment_terms_days if party else DEFAULT_PAYMENT_TERMS_DAYS
+            
+            values = _open_item_values(
+                self.administration_id, entry.id, entry.entry_date, entry.reference, line.id,
+                {"party_id": line.party_id, "debit_amount": line.debit_amount, "credit_amount": line.credit_amount},
+                account.control_type, payment_terms,
+            )
+            if values:
+                self.db.add(OpenItem(**values))
+    
+    async def post_entries(
+        self,
+        drafts: Sequence[JournalEntryDraft],
+        auto_post: bool = True,
+        posted_by_id: Optional[uuid.UUID] = None,
+        chunk_size: int = POSTING_CHUNK_SIZE,
+    ) -> PostingBatchResult:
+        """
+        Create (and by default post) many journal entries in one transaction.
+        
+        Follows the rules of create_journal_entry for every draft, but checks
+        the whole batch before writing anything: an unbalanced entry, a
+        closed period or an account of another administration rejects the
+        batch. The error carries a note with the index of the failing draft.
+        
+        Returns:
+            PostingBatchResult with ids and numbers in draft order
+        """
+        result = await self._insert_entries(drafts, auto_post, posted_by_id, chunk_size)
+        await self.db.commit()
+        return result
+    
+    async def _insert_entries(
+        self,
+        drafts: Sequence[JournalEntryDraft],
+        auto_post: bool,
+        posted_by_id: Optional[uuid.UUID],
+        chunk_size: int,
+    ) -> PostingBatchResult:
+        """Validate and bulk-insert a batch without committing."""
+        drafts = list(drafts)
+        if not drafts:
+            return PostingBatchResult()
+        
+        # Balance: in memory, before any query
+        totals = []
+        for index, draft in enumerate(drafts):
+            try:
+                totals.append(_line_totals(draft.lines))
+            except LedgerError as exc:
+                exc.add_note(f"batch entry {index}")
+                raise
+        
+        # Periods: every period overlapping the batch's date range, once
+        periods = await self._load_periods(
+            min(d.entry_date for d in drafts), max(d.entry_date for d in drafts)
+        )
+        period_by_date: Dict[date, Optional[AccountingPeriod]] = {}
+        for index, draft in enumerate(drafts):
+            if draft.entry_date not in period_by_date:
+                period_by_date[draft.entry_date] = next(
+                    (p for p in periods if p.start_date <= draft.entry_date <= p.end_date), None
+                )
+            try:
+                _check_period_accepts_entries(period_by_date[draft.entry_date])
+            except LedgerError as exc:
+                exc.add_note(f"batch entry {index}")
+                raise
+        
+        # Accounts: all must belong to this administration
+        account_ids = {line["account_id"] for draft in drafts for line in draft.lines}
+        control_types = await self._load_control_types(account_ids, chunk_size)
+        for index, draft in enumerate(drafts):
+            for line in draft.lines:
+                if line["account_id"] not in control_types:
+                    error = LedgerError(f"Account {line['account_id']} not found")
+                    error.add_note(f"batch entry {index}")
+                    raise error
+        
+        # Parties: payment terms for lines that will become open items
+        payment_terms: Dict[uuid.UUID, int] = {}
+        if auto_post:
+            party_ids = {
+                line["party_id"]
+                for draft in drafts for line in draft.lines
+                if line.get("party_id") and control_types[line["account_id"]] in ("AR", "AP")
+            }
+            payment_terms = await self._load_payment_terms(party_ids, chunk_size)
+        
+        entry_numbers = await self.allocate_entry_numbers(len(drafts))
+        posted_at = datetime.now(timezone.utc) if auto_post else None
+        status = JournalEntryStatus.POSTED if auto_post else JournalEntryStatus.DRAFT
+        
+        result = PostingBatchResult(entry_numbers=entry_numbers)
+        entry_rows: List[dict] = []
+        line_rows: List[dict] = []
+        open_item_rows: List[dict] = []
+        for draft, entry_number, (total_debit, total_credit) in zip(drafts, entry_numbers, totals):
+            entry_id = uuid.uuid4()
+            period = period_by_date[draft.entry_date]
+            result.entry_ids.append(entry_id)
+            entry_rows.append(dict(
+                id=entry_id,
+                administration_id=self.administration_id,
+                period_id=period.id if period else None,
+                document_id=draft.document_id,
+                entry_number=entry_number,
+                entry_date=draft.entry_date,
+                description=draft.description,
+                reference=draft.reference,
+                source_type=draft.source_type,
+                source_id=draft.source_id,
+                total_debit=total_debit,
+                total_credit=total_credit,
+                is_balanced=True,
+                status=status,
+                posted_at=posted_at,
+                posted_by_id=posted_by_id if auto_post else None,
+            ))
+            for idx, line_data in enumerate(draft.lines, start=1):
+                line = _line_values(entry_id, idx, line_data)
+                line["id"] = uuid.uuid4()
+                line_rows.append(line)
+                if not auto_post:
+                    continue
+                open_item = _open_item_values(
+                    self.administration_id, entry_id, draft.entry_date, draft.reference, line["id"],
+                    line, control_types[line["account_id"]],
+                    payment_terms.get(line["party_id"], DEFAULT_PAYMENT_TERMS_DAYS),
+                )
+                if open_item:
+                    open_item_rows.append(open_item)
+        
+        # Bulk INSERTs bypass the flush hooks; write their audit records directly.
+        # render_nulls keeps rows with different NULL columns in one statement.
+        audit_rows = build_bulk_create_audit_rows(JournalEntry, entry_rows)
+        for model, rows in (
+            (JournalEntry, entry_rows),
+            (JournalLine, line_rows),
+            (OpenItem, open_item_rows),
+            (AuditLog, audit_rows),
+        ):
+            for chunk in _chunks(rows, chunk_size):
+                await self.db.execute(insert(model).execution_options(render_nulls=True), chunk)
+        
+        # The work queue's flush hook does not see Core INSERTs either
+        await self.db.run_sync(flag_work_items_outdated, [self.administration_id])
+        if auto_post:
+            LEDGER_POSTINGS_TOTAL.inc(len(entry_rows))
+        result.lines_created = len(line_rows)
+        result.open_items_created = len(open_item_rows)
+        return result
+    
+    async def _load_periods(self, first_date: date, last_date: date) -> List[AccountingPeriod]:
+        """Periods of the administration overlapping a date range."""
+        result = await self.db.execute(
+            select(AccountingPeriod)
+            .where(AccountingPeriod.administration_id == self.administration_id)
+            .where(AccountingPeriod.start_date <= last_date)
+            .where(AccountingPeriod.end_date >= first_date)
+            .order_by(AccountingPeriod.start_date)
+        )
+        return list(result.scalars().all())
+    
+    async def _load_control_types(
+        self, account_ids: set, chunk_size: int
+    ) -> Dict[uuid.UUID, Optional[str]]:
+        """Map the administration's accounts to their control type (None if not a control account)."""
+        control_types: Dict[uuid.UUID, Optional[str]] = {}
+        for chunk in _chunks(list(account_ids), chunk_size):
+            result = await self.db.execute(
+                select(ChartOfAccount.id, ChartOfAccount.is_control_account, ChartOfAccount.control_type)
+                .where(ChartOfAccount.administration_id == self.administration_id)
+                .where(ChartOfAccount.id.in_(chunk))
+            )
+            for account_id, is_control, control_type in result.all():
+                control_types[account_id] = control_type if is_control else None
+        return control_types
+    
+    async def _load_payment_terms(self, party_ids: set, chunk_size: int) -> Dict[uuid.UUID, int]:
+        """Payment terms per party."""
+        payment_terms: Dict[uuid.UUID, int] = {}
+        for chunk in _chunks(list(party_ids), chunk_size):
+            result = await self.db.execute(
+                select(Party.id, Party.payment_terms_days).where(Party.id.in_(chunk))
+            )
+            payment_terms.update(result.tuples().all())
+        return payment_terms
     
     async def reverse_entry(
         self,
@@ -480,3 +776,65 @@ class LedgerService:
         
         await self.db.commit()
         return entry
+
+    async def post_depreciation_batch(
+        self,
+        schedules: Sequence[DepreciationSchedule],
+        posted_by_id: Optional[uuid.UUID] = None,
+        commit: bool = True,
+    ) -> PostingBatchResult:
+        """
+        Post many depreciation schedule entries with post_entries.
+        
+        Already posted schedules are skipped. Entries are the same as those
+        of post_depreciation; assets are loaded with one query. With
+        ``commit=False`` the caller owns the transaction (decision execution).
+        """
+        pending = [s for s in schedules if not s.is_posted]
+        if not pending:
+            return PostingBatchResult()
+        
+        result = await self.db.execute(
+            select(FixedAsset)
+            .where(FixedAsset.id.in_({s.fixed_asset_id for s in pending}))
+        )
+        assets = {asset.id: asset for asset in result.scalars().all()}
+        
+        drafts = []
+        for schedule in pending:
+            asset = assets[schedule.fixed_asset_id]
+            drafts.append(JournalEntryDraft(
+                entry_date=schedule.period_date,
+                description=f"Depreciation: {asset.name} ({schedule.period_date.strftime('%Y-%m')})",
+                lines=[
+                    {
+                        "account_id": asset.expense_account_id,
+                        "debit_amount": schedule.depreciation_amount,
+                        "credit_amount": Decimal("0.00"),
+                        "description": f"Depreciation expense for {asset.name}",
+                    },
+                    {
+                        "account_id": asset.depreciation_account_id,
+                        "debit_amount": Decimal("0.00"),
+                        "credit_amount": schedule.depreciation_amount,
+                        "description": f"Accumulated depreciation for {asset.name}",
+                    },
+                ],
+                source_type="ASSET_DEPRECIATION",
+                source_id=asset.id,
+            ))
+        
+        batch = await self._insert_entries(drafts, True, posted_by_id, POSTING_CHUNK_SIZE)
+        
+        posted_at = datetime.now(timezone.utc)
+        for schedule, entry_id in zip(pending, batch.entry_ids):
+            schedule.journal_entry_id = entry_id
+            schedule.is_posted = True
+            schedule.posted_at = posted_at
+            asset = assets[schedule.fixed_asset_id]
+            asset.accumulated_depreciation += schedule.depreciation_amount
+            asset.update_book_value()
+        
+        if commit:
+            await self.db.commit()
+        return batch
@@ -8,8 +8,12 @@ Provides application metrics for observability:
 - postings_created
 - failed_operations_count
 
-Exposes metrics in structured JSON suitable for later Prometheus integration.
+Exposes metrics in structured JSON, and publishes the global snapshot as
+Prometheus gauges (see app.core.metrics). Because the snapshot costs a dozen
+aggregate queries, it is refreshed on a background interval and cached
+between scrapes instead of being computed per request.
 """
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 from uuid import UUID
@@ -22,6 +26,7 @@ from app.models.issues import ClientIssue, IssueSeverity
 from app.models.decisions import AccountantDecision, DecisionType, ExecutionStatus
 from app.models.ledger import JournalEntry, JournalEntryStatus
 from app.models.alerts import Alert, AlertSeverity
+from app.core.metrics import registry
 
 
 class MetricsService:
@@ -355,3 +360,67 @@ class MetricsService:
                 "active_critical_alerts": alert_metrics["active_alerts"]["critical"],
             }
         }
+
+
+# ============ Cached business gauges ============
+
+DOCUMENTS_BY_STATUS = registry.gauge(
+    "business_documents", "Documents by status.", ("status",),
+)
+ACTIVE_ISSUES = registry.gauge(
+    "business_active_issues", "Unresolved client issues by severity.", ("severity",),
+)
+ACTIVE_ALERTS = registry.gauge(
+    "business_active_alerts", "Unresolved alerts by severity.", ("severity",),
+)
+JOURNAL_ENTRIES_BY_STATUS = registry.gauge(
+    "business_journal_entries", "Journal entries by status.", ("status",),
+)
+TODAY_SUMMARY = registry.gauge(
+    "business_today", "Daily business counters from the metrics summary.", ("metric",),
+)
+SNAPSHOT_TIMESTAMP = registry.gauge(
+    "business_metrics_refreshed_timestamp_seconds", "Unix time of the last business metrics refresh.",
+)
+
+
+@dataclass
+class BusinessMetricsCache:
+    """Last global metrics snapshot computed by the background refresher."""
+    snapshot: Optional[dict] = None
+    refreshed_at: Optional[datetime] = None
+
+    def get(self, max_age_seconds: float) -> Optional[dict]:
+        """Return the snapshot if it is younger than max_age_seconds."""
+        if self.snapshot is None or self.refreshed_at is None:
+            return None
+        age = (datetime.now(timezone.utc) - self.refreshed_at).total_seconds()
+        return self.snapshot if age <= max_age_seconds else None
+
+
+business_metrics_cache = BusinessMetricsCache()
+
+
+def publish_business_gauges(snapshot: dict) -> None:
+    """Copy a global metrics snapshot into the Prometheus gauges."""
+    for status, count in snapshot["documents"]["documents_by_status"].items():
+        DOCUMENTS_BY_STATUS.set(count, status=status)
+    for severity in ("red", "yellow"):
+        ACTIVE_ISSUES.set(snapshot["issues"]["active_issues"][severity], severity=severity)
+    for severity in ("critical", "warning", "info"):
+        ACTIVE_ALERTS.set(snapshot["alerts"]["active_alerts"][severity], severity=severity)
+    for status, count in snapshot["postings"]["entries_by_status"].items():
+        JOURNAL_ENTRIES_BY_STATUS.set(count, status=status)
+    for name, value in snapshot["summary"].items():
+        TODAY_SUMMARY.set(value, metric=name)
+
+
+async def refresh_business_metrics(db: AsyncSession) -> dict:
+    """Recompute the global metrics snapshot, cache it and publish the gauges."""
+    snapshot = await MetricsService(db).get_all_metrics()
+    now = datetime.now(timezone.utc)
+    business_metrics_cache.snapshot = snapshot
+    business_metrics_cache.refreshed_at = now
+    publish_business_gauges(snapshot)
+    SNAPSHOT_TIMESTAMP.set(now.timestamp())
+    return snapshot
@@ -737,7 +737,7 @@ class MollieSubscriptionService:
         )
         existing_event = result.scalar_one_or_none()
         
-        if existing_event:
+        if existing_event and existing_event.status == "PROCESSED":
             logger.info(
                 "Mollie webhook already processed: event_id=%s resource_id=%s",
                 event_id,
@@ -771,21 +771,20 @@ class MollieSubscriptionService:
                     subscription_id=subscription_id
                 )
         
-        # Record webhook event (use resource_id + event_type for idempotency)
-        webhook_event = WebhookEvent(
+        # Record webhook event (use resource_id + event_type for idempotency);
+        # an event still queued by the webhook endpoint is completed here
+        webhook_event = existing_event or WebhookEvent(
             provider="mollie",
             event_id=event_id,
             event_type=event_type,
             resource_id=resource_id,
-            payload=json.dumps(resource_data)[:5000],  # Truncate if needed
         )
+        webhook_event.status = "PROCESSED"
+        webhook_event.processed_at = datetime.now(timezone.utc)
+        webhook_event.payload = json.dumps(resource_data)[:5000]  # Truncate if needed
         db.add(webhook_event)
         
-        # Process based on resource type
-        if payment_id:
-            await self._process_payment_webhook(db, resource_data)
-        else:
-            await self._process_subscription_webhook(db, resource_data)
+        await self.apply_webhook_resource(db, event_type, resource_data)
         
         await db.commit()
 
@@ -806,6 +805,22 @@ class MollieSubscriptionService:
 
         return {"status": "processed", "event_id": event_id}
     
+    async def apply_webhook_resource(
+        self,
+        db: AsyncSession,
+        event_type: str,
+        resource_data: Dict[str, Any],
+    ) -> None:
+        """
+        Apply a payment or subscription fetched from Mollie to the internal
+        subscription. Used by process_webhook and the webhook queue consumer;
+        the caller commits.
+        """
+        if event_type == "payment":
+            await self._process_payment_webhook(db, resource_data)
+        else:
+            await self._process_subscription_webhook(db, resource_data)
+    
     async def _process_payment_webhook(
         self,
         db: AsyncSession,
@@ -0,0 +1,417 @@
+"""
+Mollie Webhook Queue
+
+Mollie callbacks only carry a resource ID; handling one means fetching
+the payment/subscription from Mollie and updating the subscription. The
+webhook endpoint therefore only verifies the request, stores the event
+(``WebhookEvent`` with status RECEIVED) and acknowledges. This module
+processes the stored events:
+
+- Repeated deliveries of a resource coalesce into its single event row
+  (``event_id`` is unique); a new delivery revives a FAILED event
+- Events are claimed in batches with ``FOR UPDATE SKIP LOCKED`` and a
+  lease, so several consumers can drain the queue and events held by a
+  crashed consumer are picked up again
+- Resources are fetched from Mollie concurrently (bounded), then applied
+  per subscription in receipt order; different subscriptions are applied
+  concurrently, each in its own session
+- A failed event is retried on a later run until MOLLIE_WEBHOOK_MAX_ATTEMPTS;
+  later events of the same subscription wait for it
+- Lag and backlog are exported as ``mollie_webhook_*`` metrics
+
+The endpoint drains the queue after responding; a background loop
+(see main.py) sweeps up retries and anything left behind.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import (
+    MOLLIE_WEBHOOK_BACKLOG,
+    MOLLIE_WEBHOOK_EVENTS,
+    MOLLIE_WEBHOOK_LAG,
+    MOLLIE_WEBHOOK_OLDEST_PENDING,
+)
+from app.models.subscription import Subscription, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+PROVIDER = "mollie"
+
+RECEIVED = "RECEIVED"
+PROCESSING = "PROCESSING"
+PROCESSED = "PROCESSED"
+FAILED = "FAILED"
+
+
+def mollie_event_type(resource_id: str) -> Optional[str]:
+    """Event type for a Mollie resource ID (payments start with tr_, subscriptions with sub_)."""
+    if resource_id.startswith("tr_"):
+        return "payment"
+    if resource_id.startswith("sub_"):
+        return "subscription"
+    return None
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+@dataclass
+class EnqueueResult:
+    event_id: str
+    queued: bool  # False when coalesced into an event that is already pending or processed
+    status: str
+
+
+async def enqueue_mollie_webhook(db: AsyncSession, resource_id: str) -> EnqueueResult:
+    """
+    Store a Mollie callback for the consumer. Deliveries for a resource
+    that is already queued or processed are coalesced. The caller commits.
+    """
+    event_type = mollie_event_type(resource_id)
+    if event_type is None:
+        raise ValueError(f"Unknown Mollie resource type: {resource_id}")
+    event_id = f"{event_type}_{resource_id}"
+    now = datetime.now(timezone.utc)
+
+    existing = (await db.execute(
+        select(WebhookEvent).where(WebhookEvent.event_id == event_id)
+    )).scalar_one_or_none()
+
+    if existing is not None and existing.status != FAILED:
+        MOLLIE_WEBHOOK_EVENTS.inc(outcome="coalesced")
+        return EnqueueResult(event_id, False, existing.status)
+
+    if existing is not None:
+        # Mollie delivered a resource we gave up on: try again from scratch
+        existing.status = RECEIVED
+        existing.received_at = now
+        existing.claimed_at = None
+        existing.attempts = 0
+        existing.last_error = None
+        await db.flush()
+    else:
+        try:
+            async with db.begin_nested():
+                db.add(WebhookEvent(
+                    provider=PROVIDER,
+                    event_id=event_id,
+                    event_type=event_type,
+                    resource_id=resource_id,
+                    status=RECEIVED,
+                    received_at=now,
+                    attempts=0,
+                ))
+        except IntegrityError:
+            # A concurrent delivery of the same resource inserted it first
+            MOLLIE_WEBHOOK_EVENTS.inc(outcome="coalesced")
+            return EnqueueResult(event_id, False, RECEIVED)
+
+    MOLLIE_WEBHOOK_EVENTS.inc(outcome="queued")
+    return EnqueueResult(event_id, True, RECEIVED)
+
+
+@dataclass
+class ClaimedEvent:
+    id: uuid.UUID
+    event_type: str
+    resource_id: str
+    received_at: datetime
+    attempts: int
+    customer_id: Optional[str] = None  # Mollie customer of a subscription event
+
+
+@dataclass
+class WebhookBatchResult:
+    claimed: int = 0
+    processed: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+def ordering_key(event: ClaimedEvent, resource: Dict[str, Any]) -> str:
+    """Events with the same key are applied one after the other, in receipt order."""
+    if event.event_type == "subscription":
+        return resource.get("id") or event.resource_id
+    metadata = resource.get("metadata") or {}
+    return (
+        resource.get("subscriptionId")
+        or metadata.get("subscription_id")
+        or resource.get("customerId")
+        or event.resource_id
+    )
+
+
+class MollieWebhookConsumer:
+    """
+    Processes queued Mollie webhook events.
+
+    ``mollie_factory`` returns an async context manager exposing
+    ``get_payment`` and ``get_subscription`` (MollieClient by default;
+    tests pass a stub).
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        mollie_factory: Optional[Callable[[], Any]] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        if mollie_factory is None:
+            from app.integrations.mollie.client import MollieClient
+            mollie_factory = MollieClient
+        from app.services.mollie_subscription_service import mollie_subscription_service
+
+        self.session_factory = session_factory
+        self.mollie_factory = mollie_factory
+        self.service = mollie_subscription_service
+        self.batch_size = batch_size or settings.MOLLIE_WEBHOOK_BATCH_SIZE
+        self.concurrency = max(1, concurrency or settings.MOLLIE_WEBHOOK_CONCURRENCY)
+        self.max_attempts = max_attempts or settings.MOLLIE_WEBHOOK_MAX_ATTEMPTS
+
+    async def run_once(self) -> WebhookBatchResult:
+        """Drain the queue. Events that fail are retried on the next run, not this one."""
+        result = WebhookBatchResult()
+        seen: Set[uuid.UUID] = set()
+        while True:
+            events = await self._claim_batch(seen)
+            if not events:
+                break
+            seen.update(e.id for e in events)
+            result.claimed += len(events)
+            await self._process_batch(events, result)
+        await self.refresh_backlog_metrics()
+        if result.claimed:
+            logger.info(
+                "Mollie webhooks: claimed=%d processed=%d retried=%d failed=%d",
+                result.claimed, result.processed, result.retried, result.failed,
+            )
+        return result
+
+    async def refresh_backlog_metrics(self) -> None:
+        async with self.session_factory() as db:
+            count, oldest = (await db.execute(
+                select(func.count(WebhookEvent.id), func.min(WebhookEvent.received_at))
+                .where(WebhookEvent.provider == PROVIDER)
+                .where(WebhookEvent.status.in_((RECEIVED, PROCESSING)))
+            )).one()
+        MOLLIE_WEBHOOK_BACKLOG.set(count or 0)
+        age = (datetime.now(timezone.utc) - _aware(oldest)).total_seconds() if oldest else 0.0
+        MOLLIE_WEBHOOK_OLDEST_PENDING.set(max(age, 0.0))
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    async def _claim_batch(self, exclude: Set[uuid.UUID]) -> List[ClaimedEvent]:
+        """Lock and mark the next batch PROCESSING (skipping rows other consumers hold)."""
+        now = datetime.now(timezone.utc)
+        lease_expired = now - timedelta(seconds=settings.MOLLIE_WEBHOOK_LEASE_SECONDS)
+        stmt = (
+            select(
+                WebhookEvent.id,
+                WebhookEvent.event_type,
+                WebhookEvent.resource_id,
+                WebhookEvent.received_at,
+                WebhookEvent.attempts,
+            )
+            .where(WebhookEvent.provider == PROVIDER)
+            .where(or_(
+                WebhookEvent.status == RECEIVED,
+                and_(WebhookEvent.status == PROCESSING, WebhookEvent.claimed_at < lease_expired),
+            ))
+            .order_by(WebhookEvent.received_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        if exclude:
+            stmt = stmt.where(WebhookEvent.id.notin_(exclude))
+
+        async with self.session_factory() as db:
+            rows = (await db.execute(stmt)).all()
+            if not rows:
+                await db.rollback()
+                return []
+            events = [
+                ClaimedEvent(r.id, r.event_type, r.resource_id, _aware(r.received_at), r.attempts)
+                for r in rows
+            ]
+            await db.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id.in_([e.id for e in events]))
+                .values(status=PROCESSING, claimed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+
+            # Fetching a subscription needs its customer: one lookup for the batch
+            subscription_ids = [e.resource_id for e in events if e.event_type == "subscription"]
+            if subscription_ids:
+                customers = dict((await db.execute(
+                    select(Subscription.provider_subscription_id, Subscription.provider_customer_id)
+                    .where(Subscription.provider_subscription_id.in_(subscription_ids))
+                )).all())
+                for event in events:
+                    event.customer_id = customers.get(event.resource_id)
+            await db.commit()
+        return events
+
+    async def _process_batch(self, events: List[ClaimedEvent], result: WebhookBatchResult) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with self.mollie_factory() as mollie:
+            fetched = await asyncio.gather(*(self._fetch(mollie, event, semaphore) for event in events))
+
+        groups: Dict[str, List[Tuple[ClaimedEvent, Dict[str, Any]]]] = {}
+        failures: List[Tuple[ClaimedEvent, str]] = []
+        for event, resource, error in fetched:
+            if error is not None:
+                failures.append((event, error))
+            else:
+                groups.setdefault(ordering_key(event, resource), []).append((event, resource))
+
+        if failures:
+            async with self.session_factory() as db:
+                for event, error in failures:
+                    await self._record_failure(db, event, error, result)
+                await db.commit()
+
+        # Each group keeps receipt order (events were claimed oldest first)
+        await asyncio.gather(*(self._apply_group(group, semaphore, result) for group in groups.values()))
+
+    async def _fetch(
+        self,
+        mollie: Any,
+        event: ClaimedEvent,
+        semaphore: asyncio.Semaphore,
+    ) -> Tuple[ClaimedEvent, Optional[Dict[str, Any]], Optional[str]]:
+        async with semaphore:
+            try:
+                if event.event_type == "payment":
+                    return event, await mollie.get_payment(event.resource_id), None
+                if not event.customer_id:
+                    return event, None, "Subscription not found"
+                resource = await mollie.get_subscription(
+                    customer_id=event.customer_id,
+                    subscription_id=event.resource_id,
+                )
+                return event, resource, None
+            except Exception as e:
+                logger.warning("Mollie webhook fetch failed: resource_id=%s error=%s", event.resource_id, e)
+                return event, None, str(e) or type(e).__name__
+
+    async def _apply_group(
+        self,
+        group: List[Tuple[ClaimedEvent, Dict[str, Any]]],
+        semaphore: asyncio.Semaphore,
+        result: WebhookBatchResult,
+    ) -> None:
+        async with semaphore:
+            async with self.session_factory() as db:
+                for index, (event, resource) in enumerate(group):
+                    try:
+                        await self.service.apply_webhook_resource(db, event.event_type, resource)
+                        now = datetime.now(timezone.utc)
+                        await db.execute(
+                            update(WebhookEvent)
+                            .where(WebhookEvent.id == event.id)
+                            .values(
+                                status=PROCESSED,
+                                processed_at=now,
+                                claimed_at=None,
+                                last_error=None,
+                                payload=json.dumps(resource)[:5000],
+                            )
+                            .execution_options(synchronize_session=False)
+                        )
+                        await db.commit()
+                    except Exception as e:
+                        logger.exception("Mollie webhook processing failed: resource_id=%s", event.resource_id)
+                        await db.rollback()
+                        await self._record_failure(db, event, str(e) or type(e).__name__, result)
+                        # Later events of this subscription must not overtake the failed one
+                        await self._release(db, [later for later, _ in group[index + 1:]])
+                        await db.commit()
+                        return
+                    result.processed += 1
+                    MOLLIE_WEBHOOK_EVENTS.inc(outcome="processed")
+                    MOLLIE_WEBHOOK_LAG.observe(max((now - event.received_at).total_seconds(), 0.0))
+
+    async def _record_failure(
+        self,
+        db: AsyncSession,
+        event: ClaimedEvent,
+        error: str,
+        result: WebhookBatchResult,
+    ) -> None:
+        attempts = event.attempts + 1
+        give_up = attempts >= self.max_attempts
+        await db.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id == event.id)
+            .values(
+                status=FAILED if give_up else RECEIVED,
+                attempts=attempts,
+                claimed_at=None,
+                last_error=error[:1000],
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if give_up:
+            result.failed += 1
+            MOLLIE_WEBHOOK_EVENTS.inc(outcome="failed")
+            logger.error("Mollie webhook gave up after %d attempts: resource_id=%s error=%s",
+                         attempts, event.resource_id, error)
+        else:
+            result.retried += 1
+            MOLLIE_WEBHOOK_EVENTS.inc(outcome="retried")
+
+    @staticmethod
+    async def _release(db: AsyncSession, events: List[ClaimedEvent]) -> None:
+        if events:
+            await db.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id.in_([e.id for e in events]))
+                .values(status=RECEIVED, claimed_at=None)
+                .execution_options(synchronize_session=False)
+            )
+
+
+_drain_running = False
+_drain_requested = False
+
+
+async def drain_mollie_webhooks(session_factory: async_sessionmaker, **consumer_options: Any) -> None:
+    """
+    Run the consumer until the queue is empty. A drain requested while one
+    is running in this process makes the running drain go round again
+    instead of starting a second one, so a webhook burst costs one drain.
+    """
+    global _drain_running, _drain_requested
+    _drain_requested = True
+    if _drain_running:
+        return
+    _drain_running = True
+    try:
+        while _drain_requested:
+            _drain_requested = False
+            try:
+                await MollieWebhookConsumer(session_factory, **consumer_options).run_once()
+            except Exception:
+                logger.exception("Mollie webhook drain failed (non-fatal)")
+                break
+    finally:
+        _drain_running = False
@@ -0,0 +1,362 @@
+"""
+Reminder Dispatch Pipeline
+
+Background pipeline that delivers due ``ClientReminder`` rows:
+- Claims due reminders in bounded batches with ``FOR UPDATE SKIP LOCKED``
+  so several workers can drain the queue without double-sending
+- Substitutes ``$name`` / ``${name}`` variables into the subject and body;
+  all other text is sent as written
+- Sends EMAIL reminders concurrently through a shared HTTP client with a
+  concurrency cap, a send-rate cap and retry/backoff for transient errors
+- Writes the resulting SENT/FAILED statuses with a single bulk UPDATE per batch
+
+A claimed batch is marked SENDING and committed before anything is sent, so
+no row locks or transaction stay open while waiting on the email provider.
+If the process dies mid-batch, SENDING reminders whose claim is older than
+REMINDER_DISPATCH_LEASE_SECONDS are claimed again by the next run.
+"""
+import asyncio
+import logging
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.integrations.http import BoundClient
+from app.models.accountant_dashboard import ClientReminder
+
+logger = logging.getLogger(__name__)
+
+RESEND_EMAILS_URL = "https://api.resend.com/emails"
+
+# HTTP statuses worth retrying (rate limited / upstream hiccup).
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# ``$$`` is matched so that it is left alone, not read as an escaped ``$``
+_PLACEHOLDER_RE = re.compile(r"\$\$|\$\{(\w+)\}|\$(\w+)")
+
+
+def render_text(text: str, variables: Optional[Dict[str, Any]]) -> str:
+    """
+    Substitute ``$name`` / ``${name}`` placeholders that have a variable.
+
+    Everything else, including unknown placeholders and ``$$``, is kept as
+    written.
+    """
+    if not variables or "$" not in text:
+        return text
+
+    def substitute(match: "re.Match[str]") -> str:
+        name = match.group(1) or match.group(2)
+        if name is None or name not in variables:
+            return match.group(0)
+        value = variables[name]
+        return "" if value is None else str(value)
+
+    return _PLACEHOLDER_RE.sub(substitute, text)
+
+
+class ReminderDeliveryError(Exception):
+    """Raised when a reminder email could not be delivered."""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Async send-rate cap (evenly spaced slots, ``rate`` per second).
+
+    Each ``acquire()`` reserves the next free slot and sleeps until it;
+    reserving under a lock keeps the spacing correct across tasks.
+    """
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ResendEmailClient:
+    """
+    Minimal Resend client on the shared, pooled Resend connection.
+
+    ``transport`` can be injected (e.g. ``httpx.MockTransport``) for tests;
+    the client then owns a private ``httpx.AsyncClient``.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        from_email: str,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        timeout: float = 30.0,
+    ):
+        self.api_key = api_key
+        self.from_email = from_email
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+        self._owns_client = transport is not None
+        if self._owns_client:
+            self._client = httpx.AsyncClient(transport=transport, timeout=timeout, headers=headers)
+        else:
+            # Retries are handled per reminder by the dispatcher
+            self._client = BoundClient("resend", headers, retry=False)
+
+    async def send(self, to: str, subject: str, text: str) -> None:
+        try:
+            response = await self._client.post(
+                RESEND_EMAILS_URL,
+                json={
+                    "from": self.from_email,
+                    "to": [to],
+                    "subject": subject,
+                    "text": text,
+                },
+            )
+        except httpx.RequestError as e:
+            raise ReminderDeliveryError(f"Failed to send email: {e}", retryable=True) from e
+
+        if response.status_code in (200, 201, 202):
+            return
+
+        retry_after = None
+        header = response.headers.get("Retry-After")
+        if header:
+            try:
+                retry_after = float(header)
+            except ValueError:
+                retry_after = None
+        raise ReminderDeliveryError(
+            f"Resend API error: {response.status_code} - {response.text}",
+            retryable=response.status_code in RETRYABLE_STATUS_CODES,
+            retry_after=retry_after,
+        )
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._client.aclose()
+
+
+@dataclass
+class DispatchResult:
+    """Summary of one dispatch run."""
+    claimed: int = 0
+    sent: int = 0
+    failed: int = 0
+    batches: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed
+
+
+class ReminderDispatcher:
+    """
+    Drains due reminders in batches.
+
+    Usage:
+        dispatcher = ReminderDispatcher()
+        result = await dispatcher.run(db)
+    """
+
+    def __init__(
+        self,
+        email_client: Optional[ResendEmailClient] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        rate_per_second: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base_seconds: float = 0.5,
+        max_batches: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+    ):
+        self.email_client = email_client
+        self.batch_size = batch_size or settings.REMINDER_DISPATCH_BATCH_SIZE
+        self.concurrency = concurrency or settings.REMINDER_DISPATCH_CONCURRENCY
+        self.rate_per_second = (
+            rate_per_second if rate_per_second is not None else settings.REMINDER_EMAIL_RATE_PER_SECOND
+        )
+        self.max_retries = max_retries if max_retries is not None else settings.REMINDER_EMAIL_MAX_RETRIES
+        self.backoff_base_seconds = backoff_base_seconds
+        self.max_batches = max_batches
+        self.lease_seconds = (
+            lease_seconds if lease_seconds is not None else settings.REMINDER_DISPATCH_LEASE_SECONDS
+        )
+        self._owns_client = False
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def run(self, db: AsyncSession, now: Optional[datetime] = None) -> DispatchResult:
+        """Dispatch due reminders until the queue is drained (or max_batches hit)."""
+        now = now or datetime.now(timezone.utc)
+        result = DispatchResult()
+        limiter = RateLimiter(self.rate_per_second)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        if self.email_client is None and settings.email_enabled:
+            self.email_client = ResendEmailClient(settings.RESEND_API_KEY, settings.RESEND_FROM_EMAIL)
+            self._owns_client = True
+
+        try:
+            while self.max_batches is None or result.batches < self.max_batches:
+                claimed = await self._claim_batch(db, now)
+                if not claimed:
+                    break
+                result.batches += 1
+                result.claimed += len(claimed)
+
+                outcomes = await asyncio.gather(
+                    *(self._deliver(row, limiter, semaphore) for row in claimed)
+                )
+                await self._write_statuses(db, outcomes, now, result)
+                await db.commit()
+
+                if len(claimed) < self.batch_size:
+                    break
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            if self._owns_client and self.email_client is not None:
+                await self.email_client.aclose()
+                self.email_client = None
+                self._owns_client = False
+
+        if result.claimed:
+            logger.info(
+                "Reminder dispatch: claimed=%d sent=%d failed=%d batches=%d",
+                result.claimed, result.sent, result.failed, result.batches,
+            )
+        return result
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    async def _claim_batch(self, db: AsyncSession, now: datetime) -> List[Any]:
+        """
+        Claim the next batch of due reminders.
+
+        Rows other workers hold are skipped. The batch is marked SENDING and
+        committed, which releases the row locks before anything is sent.
+        SENDING rows whose lease expired (crashed worker) are claimed again.
+        """
+        claimed_at = datetime.now(timezone.utc)
+        lease_expired = claimed_at - timedelta(seconds=self.lease_seconds)
+        result = await db.execute(
+            select(
+                ClientReminder.id,
+                ClientReminder.channel,
+                ClientReminder.email_address,
+                ClientReminder.title,
+                ClientReminder.message,
+                ClientReminder.template_id,
+                ClientReminder.variables,
+            )
+            .where(or_(
+                and_(ClientReminder.status == "SCHEDULED", ClientReminder.scheduled_at <= now),
+                and_(ClientReminder.status == "SENDING", ClientReminder.claimed_at <= lease_expired),
+            ))
+            .order_by(ClientReminder.scheduled_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = result.all()
+        if rows:
+            await db.execute(
+                update(ClientReminder)
+                .where(ClientReminder.id.in_([row.id for row in rows]))
+                .values(status="SENDING", claimed_at=claimed_at)
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+        return rows
+
+    async def _deliver(
+        self,
+        row: Any,
+        limiter: RateLimiter,
+        semaphore: asyncio.Semaphore,
+    ) -> Tuple[uuid.UUID, Optional[str]]:
+        """Deliver one reminder. Returns (id, error) where error is None on success."""
+        if row.channel != "EMAIL":
+            return row.id, None
+        if self.email_client is None:
+            return row.id, "Resend API key not configured"
+        if not row.email_address:
+            return row.id, "No email address for client"
+
+        subject = render_text(row.title, row.variables)
+        body = render_text(row.message, row.variables)
+
+        attempt = 0
+        async with semaphore:
+            while True:
+                await limiter.acquire()
+                try:
+                    await self.email_client.send(row.email_address, subject, body)
+                    return row.id, None
+                except ReminderDeliveryError as e:
+                    if not e.retryable or attempt >= self.max_retries:
+                        return row.id, str(e)
+                    delay = e.retry_after or self.backoff_base_seconds * (2 ** attempt)
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                except Exception as e:  # pragma: no cover - defensive
+                    return row.id, str(e)
+
+    async def _write_statuses(
+        self,
+        db: AsyncSession,
+        outcomes: List[Tuple[uuid.UUID, Optional[str]]],
+        now: datetime,
+        result: DispatchResult,
+    ) -> None:
+        """Persist SENT/FAILED for a whole batch with bulk UPDATE statements."""
+        sent_ids = [rid for rid, error in outcomes if error is None]
+        failed = [
+            {"id": rid, "status": "FAILED", "send_error": error}
+            for rid, error in outcomes
+            if error is not None
+        ]
+
+        if sent_ids:
+            await db.execute(
+                update(ClientReminder)
+                .where(ClientReminder.id.in_(sent_ids))
+                .values(status="SENT", sent_at=now, send_error=None)
+                .execution_options(synchronize_session=False)
+            )
+        if failed:
+            await db.execute(update(ClientReminder), failed)
+
+        result.sent += len(sent_ids)
+        result.failed += len(failed)
+        for row in failed:
+            result.errors[str(row["id"])] = row["send_error"]
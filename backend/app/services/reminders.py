@@ -13,12 +13,6 @@ from typing import List, Dict, Any, Optional
 from sqlalchemy import select, func, and_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-try:
-    import httpx
-    HTTPX_AVAILABLE = True
-except ImportError:
-    HTTPX_AVAILABLE = False
-
 from app.models.administration import Administration
 from app.models.accountant_dashboard import (
     ClientReminder, 
@@ -28,6 +22,10 @@ from app.models.accountant_dashboard import (
 )
 from app.models.work_queue import DashboardAuditLog, DashboardAuditActionType
 from app.core.config import settings
+from app.core.startup import lazy_module
+
+# Imported on first use so API workers don't load the HTTP client stack at startup
+reminder_dispatch = lazy_module("app.services.reminder_dispatch")
 
 
 class ReminderServiceError(Exception):
@@ -181,19 +179,17 @@ class ReminderService:
         
         await self.db.flush()
         
-        # Send emails if channel is EMAIL
+        # IN_APP reminders are delivered by being stored. EMAIL reminders are
+        # queued for the background dispatcher (see reminder_dispatch) so the
+        # request never waits on the email provider.
+        now = datetime.now(timezone.utc)
         for reminder in reminders:
             if reminder.channel == "EMAIL":
-                try:
-                    await self._send_email(reminder)
-                    reminder.status = "SENT"
-                    reminder.sent_at = datetime.now(timezone.utc)
-                except Exception as e:
-                    reminder.status = "FAILED"
-                    reminder.send_error = str(e)
+                reminder.status = "SCHEDULED"
+                reminder.scheduled_at = now
             else:
                 reminder.status = "SENT"
-                reminder.sent_at = datetime.now(timezone.utc)
+                reminder.sent_at = now
         
         # Create audit log entries
         for reminder in reminders:
@@ -373,44 +369,6 @@ class ReminderService:
             "limit": limit,
             "offset": offset,
         }
-    
-    async def _send_email(self, reminder: ClientReminder) -> None:
-        """
-        Send email via Resend API.
-        
-        This is a basic implementation that can be extended with templates.
-        """
-        if not self.email_enabled:
-            raise EmailNotConfiguredError("Resend API key not configured")
-        
-        if not reminder.email_address:
-            raise ReminderServiceError("No email address for client")
-        
-        if not HTTPX_AVAILABLE:
-            raise ReminderServiceError("httpx package not installed - email sending unavailable")
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.resend.com/emails",
-                    headers={
-                        "Authorization": f"Bearer {self.resend_api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "from": self.from_email,
-                        "to": [reminder.email_address],
-                        "subject": reminder.title,
-                        "text": reminder.message,
-                    },
-                    timeout=30.0,
-                )
-                
-                if response.status_code != 200:
-                    raise ReminderServiceError(f"Resend API error: {response.status_code} - {response.text}")
-                    
-        except httpx.RequestError as e:
-            raise ReminderServiceError(f"Failed to send email: {str(e)}")
 
 
 async def process_scheduled_reminders(db: AsyncSession) -> int:
@@ -418,36 +376,12 @@ async def process_scheduled_reminders(db: AsyncSession) -> int:
     Background task to process scheduled reminders.
     
     Should be called periodically (e.g., every minute) to send reminders
-    that are scheduled for the current time.
+    that are scheduled for the current time. Delivery is delegated to
+    ReminderDispatcher, which claims due reminders in batches and sends
+    EMAIL reminders concurrently.
     
     Returns:
         Number of reminders processed
     """
-    now = datetime.now(timezone.utc)
-    
-    # Find reminders scheduled for now or earlier
-    result = await db.execute(
-        select(ClientReminder)
-        .where(ClientReminder.status == "SCHEDULED")
-        .where(ClientReminder.scheduled_at <= now)
-    )
-    reminders = result.scalars().all()
-    
-    processed = 0
-    for reminder in reminders:
-        try:
-            if reminder.channel == "EMAIL":
-                # Would need to instantiate service with proper accountant_id
-                # For now, mark as SENT for IN_APP or leave for external processor
-                reminder.status = "SENT"
-                reminder.sent_at = now
-            else:
-                reminder.status = "SENT"
-                reminder.sent_at = now
-            processed += 1
-        except Exception as e:
-            reminder.status = "FAILED"
-            reminder.send_error = str(e)
-    
-    await db.commit()
-    return processed
+    result = await reminder_dispatch.ReminderDispatcher().run(db)
+    return result.processed
@@ -6,20 +6,39 @@ Provides financial reports:
 - Profit & Loss (Winst- en verliesrekening)
 - Accounts Receivable (Debiteuren)
 - Accounts Payable (Crediteuren)
+
+Balance sheet and trial balance start from the latest FINALIZED/LOCKED
+PeriodSnapshot at or before the report date and only aggregate journal
+lines posted after it, so report latency depends on the open period
+rather than on the age of the administration.
 """
+import logging
 import uuid
-from datetime import date
-from decimal import Decimal
-from typing import List, Optional, Dict, Any
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass, field
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.ledger import JournalEntry, JournalLine, JournalEntryStatus
+from app.core.config import settings
+from app.models.ledger import (
+    AccountingPeriod,
+    JournalEntry,
+    JournalLine,
+    JournalEntryStatus,
+    PeriodSnapshot,
+    PeriodStatus,
+)
 from app.models.accounting import ChartOfAccount
 from app.models.subledger import OpenItem, OpenItemStatus, Party
 
+logger = logging.getLogger(__name__)
+
+# (debit_total, credit_total) per account
+AccountTotals = Dict[uuid.UUID, Tuple[Decimal, Decimal]]
+
 
 @dataclass
 class AccountBalance:
@@ -111,6 +130,39 @@ class SubledgerReport:
     overdue_amount: Decimal = Decimal("0.00")
 
 
+@dataclass
+class SnapshotBaseline:
+    """Cumulative account totals from a finalized period's snapshot."""
+    snapshot_id: uuid.UUID
+    period_id: uuid.UUID
+    period_end_date: date
+    created_at: datetime
+    totals: AccountTotals
+
+
+@dataclass
+class BalanceDifference:
+    """Account whose snapshot-based and full totals disagree."""
+    account_id: uuid.UUID
+    snapshot_debit: Decimal
+    snapshot_credit: Decimal
+    full_debit: Decimal
+    full_credit: Decimal
+
+
+@dataclass
+class SnapshotVerification:
+    """Result of comparing snapshot+delta balances with a full aggregation."""
+    as_of_date: date
+    snapshot_id: Optional[uuid.UUID]
+    period_end_date: Optional[date]
+    differences: List[BalanceDifference]
+
+    @property
+    def matches(self) -> bool:
+        return not self.differences
+
+
 class ReportService:
     """
     Service for generating financial reports.
@@ -118,11 +170,24 @@ class ReportService:
     All reports are:
     - Multi-tenant: always scoped by administration_id
     - Point-in-time: based on as_of_date or date range
+    
+    Cumulative balances (balance sheet, trial balance) start from the latest
+    FINALIZED/LOCKED period snapshot at or before as_of_date and add the
+    journal lines after it. Without a usable snapshot, or with
+    use_snapshots=False, every posted line is aggregated.
     """
     
-    def __init__(self, db: AsyncSession, administration_id: uuid.UUID):
+    def __init__(
+        self,
+        db: AsyncSession,
+        administration_id: uuid.UUID,
+        use_snapshots: Optional[bool] = None,
+    ):
         self.db = db
         self.administration_id = administration_id
+        self.use_snapshots = (
+            settings.REPORT_USE_PERIOD_SNAPSHOTS if use_snapshots is None else use_snapshots
+        )
     
     async def get_balance_sheet(self, as_of_date: date) -> BalanceSheet:
         """
@@ -283,6 +348,27 @@ class ReportService:
         """
         return await self._get_subledger_report("PAYABLE", as_of_date)
     
+    async def verify_snapshot_balances(self, as_of_date: date) -> SnapshotVerification:
+        """
+        Compare the snapshot+delta account totals with a full aggregation.
+        
+        Differences point at ledger changes the snapshot cannot see, e.g. an
+        entry inside a finalized period that was marked REVERSED afterwards
+        (its reversal is dated in a later period, so the snapshot path keeps
+        the original while the full aggregation drops it).
+        """
+        baseline = await self._get_snapshot_baseline(as_of_date)
+        full = await self._aggregate_posted_lines(as_of_date)
+        if baseline is None:
+            return SnapshotVerification(as_of_date, None, None, [])
+        from_snapshot = await self._aggregate_posted_lines(as_of_date, baseline=baseline)
+        return SnapshotVerification(
+            as_of_date=as_of_date,
+            snapshot_id=baseline.snapshot_id,
+            period_end_date=baseline.period_end_date,
+            differences=_diff_totals(from_snapshot, full),
+        )
+    
     async def _get_account_balances(
         self, 
         as_of_date: date
@@ -297,24 +383,24 @@ class ReportService:
         )
         accounts = accounts_result.scalars().all()
         
+        baseline = await self._get_snapshot_baseline(as_of_date) if self.use_snapshots else None
+        totals = await self._aggregate_posted_lines(as_of_date, baseline=baseline)
+        
+        if baseline is not None and settings.REPORT_SNAPSHOT_VERIFY:
+            full = await self._aggregate_posted_lines(as_of_date)
+            differences = _diff_totals(totals, full)
+            if differences:
+                logger.warning(
+                    "Snapshot %s (period end %s) disagrees with full aggregation as of %s "
+                    "for administration %s on %d account(s); serving full aggregation",
+                    baseline.snapshot_id, baseline.period_end_date, as_of_date,
+                    self.administration_id, len(differences),
+                )
+            totals = full
+        
         balances = []
         for account in accounts:
-            # Get posted journal line totals for this account
-            result = await self.db.execute(
-                select(
-                    func.coalesce(func.sum(JournalLine.debit_amount), 0),
-                    func.coalesce(func.sum(JournalLine.credit_amount), 0),
-                )
-                .select_from(JournalLine)
-                .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
-                .where(JournalLine.account_id == account.id)
-                .where(JournalEntry.administration_id == self.administration_id)
-                .where(JournalEntry.status == JournalEntryStatus.POSTED)
-                .where(JournalEntry.entry_date <= as_of_date)
-            )
-            row = result.one()
-            debit_total = Decimal(str(row[0]))
-            credit_total = Decimal(str(row[1]))
+            debit_total, credit_total = totals.get(account.id, (Decimal("0.00"), Decimal("0.00")))
             
             # Calculate balance based on account type
             # Assets and Expenses are debit-normal
@@ -353,25 +439,12 @@ class ReportService:
         )
         accounts = accounts_result.scalars().all()
         
+        # Posted journal line totals per account in the date range
+        totals = await self._aggregate_posted_lines(end_date, start_date=start_date)
+        
         balances = []
         for account in accounts:
-            # Get posted journal line totals for this account in the date range
-            result = await self.db.execute(
-                select(
-                    func.coalesce(func.sum(JournalLine.debit_amount), 0),
-                    func.coalesce(func.sum(JournalLine.credit_amount), 0),
-                )
-                .select_from(JournalLine)
-                .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
-                .where(JournalLine.account_id == account.id)
-                .where(JournalEntry.administration_id == self.administration_id)
-                .where(JournalEntry.status == JournalEntryStatus.POSTED)
-                .where(JournalEntry.entry_date >= start_date)
-                .where(JournalEntry.entry_date <= end_date)
-            )
-            row = result.one()
-            debit_total = Decimal(str(row[0]))
-            credit_total = Decimal(str(row[1]))
+            debit_total, credit_total = totals.get(account.id, (Decimal("0.00"), Decimal("0.00")))
             
             # For P&L: Revenue is credit-normal, Expense is debit-normal
             if account.account_type == "REVENUE":
@@ -392,6 +465,88 @@ class ReportService:
         
         return balances
     
+    async def _aggregate_posted_lines(
+        self,
+        end_date: date,
+        start_date: Optional[date] = None,
+        baseline: Optional[SnapshotBaseline] = None,
+    ) -> AccountTotals:
+        """
+        Sum posted journal lines per account up to end_date (one grouped query).
+        
+        With a baseline, only lines the snapshot does not contain are read:
+        entries dated after the snapshot's period end, plus entries posted
+        after the snapshot was taken (back-dated into an earlier open period).
+        The result then includes the baseline totals.
+        """
+        query = (
+            select(
+                JournalLine.account_id,
+                func.coalesce(func.sum(JournalLine.debit_amount), 0),
+                func.coalesce(func.sum(JournalLine.credit_amount), 0),
+            )
+            .select_from(JournalLine)
+            .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
+            .where(JournalEntry.administration_id == self.administration_id)
+            .where(JournalEntry.status == JournalEntryStatus.POSTED)
+            .where(JournalEntry.entry_date <= end_date)
+            .group_by(JournalLine.account_id)
+        )
+        if start_date is not None:
+            query = query.where(JournalEntry.entry_date >= start_date)
+        if baseline is not None:
+            query = query.where(or_(
+                JournalEntry.entry_date > baseline.period_end_date,
+                JournalEntry.posted_at > baseline.created_at,
+            ))
+        
+        result = await self.db.execute(query)
+        totals: AccountTotals = dict(baseline.totals) if baseline is not None else {}
+        for account_id, debit, credit in result.all():
+            base_debit, base_credit = totals.get(account_id, (Decimal("0.00"), Decimal("0.00")))
+            totals[account_id] = (
+                base_debit + Decimal(str(debit)),
+                base_credit + Decimal(str(credit)),
+            )
+        return totals
+    
+    async def _get_snapshot_baseline(self, as_of_date: date) -> Optional[SnapshotBaseline]:
+        """Load the latest FINALIZED/LOCKED period snapshot ending on or before as_of_date."""
+        result = await self.db.execute(
+            select(
+                PeriodSnapshot.id,
+                PeriodSnapshot.period_id,
+                PeriodSnapshot.created_at,
+                PeriodSnapshot.trial_balance,
+                AccountingPeriod.end_date,
+            )
+            .join(AccountingPeriod, PeriodSnapshot.period_id == AccountingPeriod.id)
+            .where(PeriodSnapshot.administration_id == self.administration_id)
+            .where(PeriodSnapshot.snapshot_type == "FINALIZATION")
+            .where(PeriodSnapshot.trial_balance.isnot(None))
+            .where(AccountingPeriod.status.in_([PeriodStatus.FINALIZED, PeriodStatus.LOCKED]))
+            .where(AccountingPeriod.end_date <= as_of_date)
+            .order_by(AccountingPeriod.end_date.desc(), PeriodSnapshot.created_at.desc())
+            .limit(1)
+        )
+        row = result.first()
+        if row is None or row.created_at is None:
+            return None
+        
+        totals = _parse_trial_balance(row.trial_balance)
+        if totals is None:
+            logger.warning(
+                "Ignoring snapshot %s with unreadable trial balance; using full aggregation", row.id
+            )
+            return None
+        return SnapshotBaseline(
+            snapshot_id=row.id,
+            period_id=row.period_id,
+            period_end_date=row.end_date,
+            created_at=row.created_at,
+            totals=totals,
+        )
+    
     async def _get_subledger_report(
         self, 
         item_type: str,
@@ -455,3 +610,38 @@ class ReportService:
         Returns all accounts with their debit/credit totals and balances.
         """
         return await self._get_account_balances(as_of_date)
+
+
+def _parse_trial_balance(trial_balance: Any) -> Optional[AccountTotals]:
+    """Read the JSONB trial balance written by PeriodControlService (None if malformed)."""
+    if not isinstance(trial_balance, list):
+        return None
+    totals: AccountTotals = {}
+    try:
+        for item in trial_balance:
+            account_id = uuid.UUID(str(item["account_id"]))
+            totals[account_id] = (
+                Decimal(str(item["debit_total"])),
+                Decimal(str(item["credit_total"])),
+            )
+    except (KeyError, TypeError, ValueError, InvalidOperation):
+        return None
+    return totals
+
+
+def _diff_totals(candidate: AccountTotals, expected: AccountTotals) -> List[BalanceDifference]:
+    """Accounts whose debit or credit totals differ between two aggregations."""
+    zero = (Decimal("0.00"), Decimal("0.00"))
+    differences = []
+    for account_id in candidate.keys() | expected.keys():
+        cand_debit, cand_credit = candidate.get(account_id, zero)
+        exp_debit, exp_credit = expected.get(account_id, zero)
+        if cand_debit != exp_debit or cand_credit != exp_credit:
+            differences.append(BalanceDifference(
+                account_id=account_id,
+                snapshot_debit=cand_debit,
+                snapshot_credit=cand_credit,
+                full_debit=exp_debit,
+                full_credit=exp_credit,
+            ))
+    return differences
@@ -16,6 +16,7 @@ import httpx
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.integrations.http import get_http_client
 from app.models.ecommerce import (
     EcommerceConnection,
     EcommerceOrder,
@@ -27,6 +28,7 @@ from app.models.ecommerce import (
     SyncStatus,
     EcommerceOrderStatus,
 )
+from app.services.ecommerce_mapping import generate_mappings_after_sync
 
 logger = logging.getLogger(__name__)
 
@@ -79,15 +81,15 @@ class ShopifyService:
         url = self._build_url(shop_url, "shop.json")
         headers = self._headers(access_token)
 
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(url, headers=headers)
-            if resp.status_code == 401:
-                raise ValueError("Ongeldige Shopify-toegangstoken. Controleer je API-token.")
-            if resp.status_code == 404:
-                raise ValueError("Shopify-winkel niet gevonden. Controleer de URL.")
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("shop", {})
+        client = get_http_client("shopify")
+        resp = await client.get(url, headers=headers, timeout=15)
+        if resp.status_code == 401:
+            raise ValueError("Ongeldige Shopify-toegangstoken. Controleer je API-token.")
+        if resp.status_code == 404:
+            raise ValueError("Shopify-winkel niet gevonden. Controleer de URL.")
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("shop", {})
 
     async def sync_all(
         self,
@@ -132,6 +134,9 @@ class ShopifyService:
             ri = await self._sync_refunds(db, connection, refunds_from_orders)
             refunds_imported += ri
 
+            # --- Review mappings for the newly imported records ---
+            await generate_mappings_after_sync(db, connection)
+
             sync_log.status = SyncStatus.SUCCESS
         except Exception as e:
             logger.exception(f"Shopify sync failed for connection {connection.id}")
@@ -173,64 +178,64 @@ class ShopifyService:
         all_refunds: List[Dict] = []
         url = self._build_url(shop_url, "orders.json?status=any&limit=250")
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            while url:
-                resp = await client.get(url, headers=headers)
-                resp.raise_for_status()
-                data = resp.json()
-                orders = data.get("orders", [])
-
-                for order in orders:
-                    ext_id = str(order.get("id", ""))
-                    if not ext_id:
-                        continue
-
-                    # Collect refunds attached to orders
-                    if order.get("refunds"):
-                        for refund in order["refunds"]:
-                            refund["_parent_order_id"] = ext_id
-                            all_refunds.append(refund)
-
-                    # Check if exists
-                    existing = (await db.execute(
-                        select(EcommerceOrder).where(
-                            EcommerceOrder.connection_id == connection.id,
-                            EcommerceOrder.external_order_id == ext_id,
-                        )
-                    )).scalar_one_or_none()
-
-                    customer = order.get("customer", {}) or {}
-                    order_data = {
-                        "external_order_number": str(order.get("order_number", "")),
-                        "status": _map_shopify_financial_status(order.get("financial_status")),
-                        "customer_name": f"{customer.get('first_name', '')} {customer.get('last_name', '')}".strip() or None,
-                        "customer_email": customer.get("email") or order.get("email"),
-                        "currency": order.get("currency", "EUR"),
-                        "total_amount_cents": _cents(order.get("total_price")),
-                        "subtotal_cents": _cents(order.get("subtotal_price")),
-                        "tax_cents": _cents(order.get("total_tax")),
-                        "shipping_cents": sum(_cents(sl.get("price")) for sl in (order.get("shipping_lines") or [])),
-                        "discount_cents": abs(_cents(order.get("total_discounts"))),
-                        "ordered_at": _parse_dt(order.get("created_at")),
-                        "paid_at": _parse_dt(order.get("closed_at")) if order.get("financial_status") == "paid" else None,
-                    }
-
-                    if existing:
-                        for k, v in order_data.items():
-                            setattr(existing, k, v)
-                        updated += 1
-                    else:
-                        new_order = EcommerceOrder(
-                            connection_id=connection.id,
-                            administration_id=connection.administration_id,
-                            external_order_id=ext_id,
-                            **order_data,
-                        )
-                        db.add(new_order)
-                        imported += 1
-
-                # Pagination via Link header
-                url = self._next_page_url(resp)
+        client = get_http_client("shopify")
+        while url:
+            resp = await client.get(url, headers=headers)
+            resp.raise_for_status()
+            data = resp.json()
+            orders = data.get("orders", [])
+
+            for order in orders:
+                ext_id = str(order.get("id", ""))
+                if not ext_id:
+                    continue
+
+                # Collect refunds attached to orders
+                if order.get("refunds"):
+                    for refund in order["refunds"]:
+                        refund["_parent_order_id"] = ext_id
+                        all_refunds.append(refund)
+
+                # Check if exists
+                existing = (await db.execute(
+                    select(EcommerceOrder).where(
+                        EcommerceOrder.connection_id == connection.id,
+                        EcommerceOrder.external_order_id == ext_id,
+                    )
+                )).scalar_one_or_none()
+
+                customer = order.get("customer", {}) or {}
+                order_data = {
+                    "external_order_number": str(order.get("order_number", "")),
+                    "status": _map_shopify_financial_status(order.get("financial_status")),
+                    "customer_name": f"{customer.get('first_name', '')} {customer.get('last_name', '')}".strip() or None,
+                    "customer_email": customer.get("email") or order.get("email"),
+                    "currency": order.get("currency", "EUR"),
+                    "total_amount_cents": _cents(order.get("total_price")),
+                    "subtotal_cents": _cents(order.get("subtotal_price")),
+                    "tax_cents": _cents(order.get("total_tax")),
+                    "shipping_cents": sum(_cents(sl.get("price")) for sl in (order.get("shipping_lines") or [])),
+                    "discount_cents": abs(_cents(order.get("total_discounts"))),
+                    "ordered_at": _parse_dt(order.get("created_at")),
+                    "paid_at": _parse_dt(order.get("closed_at")) if order.get("financial_status") == "paid" else None,
+                }
+
+                if existing:
+                    for k, v in order_data.items():
+                        setattr(existing, k, v)
+                    updated += 1
+                else:
+                    new_order = EcommerceOrder(
+                        connection_id=connection.id,
+                        administration_id=connection.administration_id,
+                        external_order_id=ext_id,
+                        **order_data,
+                    )
+                    db.add(new_order)
+                    imported += 1
+
+            # Pagination via Link header
+            url = self._next_page_url(resp)
 
         await db.flush()
         return imported, updated, all_refunds
@@ -246,49 +251,49 @@ class ShopifyService:
         imported = 0
         url = self._build_url(shop_url, "customers.json?limit=250")
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            while url:
-                resp = await client.get(url, headers=headers)
-                resp.raise_for_status()
-                data = resp.json()
-
-                for cust in data.get("customers", []):
-                    ext_id = str(cust.get("id", ""))
-                    if not ext_id:
-                        continue
-
-                    existing = (await db.execute(
-                        select(EcommerceCustomer).where(
-                            EcommerceCustomer.connection_id == connection.id,
-                            EcommerceCustomer.external_customer_id == ext_id,
-                        )
-                    )).scalar_one_or_none()
-
-                    cust_data = {
-                        "email": cust.get("email"),
-                        "first_name": cust.get("first_name"),
-                        "last_name": cust.get("last_name"),
-                        "company": cust.get("default_address", {}).get("company") if cust.get("default_address") else None,
-                        "phone": cust.get("phone"),
-                        "total_orders": cust.get("orders_count", 0),
-                        "total_spent_cents": _cents(cust.get("total_spent")),
-                        "currency": cust.get("currency", "EUR"),
-                    }
-
-                    if existing:
-                        for k, v in cust_data.items():
-                            setattr(existing, k, v)
-                    else:
-                        new_cust = EcommerceCustomer(
-                            connection_id=connection.id,
-                            administration_id=connection.administration_id,
-                            external_customer_id=ext_id,
-                            **cust_data,
-                        )
-                        db.add(new_cust)
-                        imported += 1
-
-                url = self._next_page_url(resp)
+        client = get_http_client("shopify")
+        while url:
+            resp = await client.get(url, headers=headers)
+            resp.raise_for_status()
+            data = resp.json()
+
+            for cust in data.get("customers", []):
+                ext_id = str(cust.get("id", ""))
+                if not ext_id:
+                    continue
+
+                existing = (await db.execute(
+                    select(EcommerceCustomer).where(
+                        EcommerceCustomer.connection_id == connection.id,
+                        EcommerceCustomer.external_customer_id == ext_id,
+                    )
+                )).scalar_one_or_none()
+
+                cust_data = {
+                    "email": cust.get("email"),
+                    "first_name": cust.get("first_name"),
+                    "last_name": cust.get("last_name"),
+                    "company": cust.get("default_address", {}).get("company") if cust.get("default_address") else None,
+                    "phone": cust.get("phone"),
+                    "total_orders": cust.get("orders_count", 0),
+                    "total_spent_cents": _cents(cust.get("total_spent")),
+                    "currency": cust.get("currency", "EUR"),
+                }
+
+                if existing:
+                    for k, v in cust_data.items():
+                        setattr(existing, k, v)
+                else:
+                    new_cust = EcommerceCustomer(
+                        connection_id=connection.id,
+                        administration_id=connection.administration_id,
+                        external_customer_id=ext_id,
+                        **cust_data,
+                    )
+                    db.add(new_cust)
+                    imported += 1
+
+            url = self._next_page_url(resp)
 
         await db.flush()
         return imported
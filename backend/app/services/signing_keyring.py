@@ -0,0 +1,114 @@
+"""
+Signing Keyring
+
+In-memory cache of decrypted signing keys, keyed by certificate ID.
+
+Loading a PKIoverheid key means reading the PKCS#12/PEM file from secret
+storage and decrypting it with its passphrase; doing that for every
+submission dominates the cost of signing when an accountant files returns
+for many clients at once. The keyring keeps recently used keys for
+SIGNING_KEYRING_TTL_SECONDS (least recently used first out when
+SIGNING_KEYRING_MAX_ENTRIES is reached) and wipes every key it evicts.
+
+Certificate ownership and validity are still checked against the database
+on every use (see CertificateService.load_signing_key); only the file read
+and decryption are cached.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional, Tuple
+
+from app.core.config import settings
+from app.services.xml_signing import SigningKey
+
+
+@dataclass
+class KeyringStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class SigningKeyring:
+    """Bounded, TTL-evicting LRU of SigningKey objects."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = settings.SIGNING_KEYRING_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl_seconds = settings.SIGNING_KEYRING_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[SigningKey, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = KeyringStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key_id: Hashable) -> Optional[SigningKey]:
+        """Return the cached key, or None when absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key_id)
+            if entry is not None and entry[1] <= self._clock():
+                self._evict_locked(key_id)
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key_id)
+            self.stats.hits += 1
+            return entry[0]
+
+    def put(self, key_id: Hashable, key: SigningKey) -> None:
+        """Cache a key, evicting expired and least recently used entries."""
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return  # Caching disabled
+        with self._lock:
+            if key_id in self._entries:
+                previous = self._entries[key_id][0]
+                if previous is not key:
+                    self._evict_locked(key_id)
+            self._entries[key_id] = (key, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(key_id)
+            self._purge_expired_locked()
+            while len(self._entries) > self.max_entries:
+                self._evict_locked(next(iter(self._entries)))
+
+    def evict(self, key_id: Hashable) -> bool:
+        """Drop and wipe a key (e.g. when its certificate is deactivated)."""
+        with self._lock:
+            return self._evict_locked(key_id)
+
+    def purge_expired(self) -> int:
+        """Evict all expired keys. Returns the number evicted."""
+        with self._lock:
+            return self._purge_expired_locked()
+
+    def clear(self) -> None:
+        with self._lock:
+            for key_id in list(self._entries):
+                self._evict_locked(key_id)
+
+    def _purge_expired_locked(self) -> int:
+        now = self._clock()
+        expired = [key_id for key_id, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key_id in expired:
+            self._evict_locked(key_id)
+        return len(expired)
+
+    def _evict_locked(self, key_id: Hashable) -> bool:
+        entry = self._entries.pop(key_id, None)
+        if entry is None:
+            return False
+        entry[0].wipe()
+        self.stats.evictions += 1
+        return True
+
+
+# Process-wide keyring used by CertificateService
+signing_keyring = SigningKeyring()
@@ -3,25 +3,97 @@ XML Signing Service
 
 Handles PKIoverheid XML signing for VAT submissions.
 Implements XMLDSig (XML Digital Signature) standard.
+
+Decrypted keys are cached in the signing keyring (services/signing_keyring.py)
+and the signing itself lives in services/xml_signing.py, so batches of
+submissions can be signed in worker processes via ``sign_many``.
 """
-import hashlib
-from datetime import datetime, timezone
-from typing import Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from uuid import UUID
 import xml.etree.ElementTree as ET
-from base64 import b64encode
 
-from cryptography import x509
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.services.certificate_service import CertificateService, CertificateError
+from app.services.signing_keyring import SigningKeyring
+from app.services.xml_signing import (
+    SigningError,
+    SigningKey,
+    SignOutcome,
+    canonicalize_xml,
+    embed_signature,
+    sign_chunk,
+    sign_document,
+    sign_items,
+)
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["SigningService", "SigningError", "SigningRequest", "SigningResult"]
+
+
+@dataclass
+class SigningRequest:
+    """One document to sign in a ``sign_many`` batch."""
+    xml_content: str
+    certificate_id: UUID
+    administration_id: UUID
+
+
+@dataclass
+class SigningResult:
+    """Outcome of one ``sign_many`` item; ``error`` is set when it failed."""
+    request: SigningRequest
+    signed_xml: Optional[str] = None
+    signature_info: Optional[dict] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 
+# Shared process pool for batch signing. Workers are spawned (not forked) so
+# they do not inherit the event loop, DB connections or cached keys.
+_signing_pool: Optional[ProcessPoolExecutor] = None
+_signing_pool_workers = 0
+_signing_pool_lock = threading.Lock()
 
-class SigningError(Exception):
-    """Base exception for signing operations."""
-    pass
+
+def _configured_workers() -> int:
+    return settings.SIGNING_WORKERS or os.cpu_count() or 1
+
+
+def _get_signing_pool(workers: int) -> ProcessPoolExecutor:
+    global _signing_pool, _signing_pool_workers
+    with _signing_pool_lock:
+        if _signing_pool is None or _signing_pool_workers != workers:
+            if _signing_pool is not None:
+                _signing_pool.shutdown(wait=False, cancel_futures=True)
+            _signing_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _signing_pool_workers = workers
+        return _signing_pool
+
+
+def shutdown_signing_pool() -> None:
+    """Stop the batch signing worker processes (application shutdown)."""
+    global _signing_pool
+    with _signing_pool_lock:
+        pool, _signing_pool = _signing_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 class SigningService:
@@ -32,9 +104,9 @@ class SigningService:
     XML documents for submission to Belastingdienst via Digipoort.
     """
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, keyring: Optional[SigningKeyring] = None):
         self.db = db
-        self.cert_service = CertificateService(db)
+        self.cert_service = CertificateService(db, keyring=keyring)
     
     async def sign_xml(
         self,
@@ -46,7 +118,7 @@ class SigningService:
         Sign XML content with PKIoverheid certificate.
         
         This method:
-        1. Loads the certificate and private key
+        1. Loads the certificate and private key (cached in the keyring)
         2. Canonicalizes the XML
         3. Computes SHA256 digest of the XML
         4. Signs the digest with the private key
@@ -72,60 +144,8 @@ class SigningService:
                 certificate_id, administration_id
             )
             
-            # Parse XML
-            try:
-                root = ET.fromstring(xml_content)
-            except ET.ParseError as e:
-                raise SigningError(f"Invalid XML content: {str(e)}")
-            
-            # Canonicalize XML (C14N)
-            canonical_xml = self._canonicalize_xml(root)
-            
-            # Compute digest (SHA256)
-            digest = hashlib.sha256(canonical_xml.encode('utf-8')).digest()
-            digest_b64 = b64encode(digest).decode('utf-8')
-            
-            # Sign digest with private key
-            if isinstance(private_key, rsa.RSAPrivateKey):
-                signature = private_key.sign(
-                    digest,
-                    padding.PKCS1v15(),
-                    hashes.SHA256()
-                )
-            else:
-                raise SigningError(f"Unsupported key type: {type(private_key)}")
-            
-            signature_b64 = b64encode(signature).decode('utf-8')
-            
-            # Extract certificate info
-            cert_b64 = b64encode(cert.public_bytes(
-                encoding=serialization.Encoding.DER
-            )).decode('utf-8')
-            
-            # Build signature metadata
-            signature_info = {
-                'algorithm': 'RSA-SHA256',
-                'digest_method': 'SHA256',
-                'digest_value': digest_b64,
-                'signature_value': signature_b64,
-                'certificate_fingerprint': hashlib.sha256(
-                    cert.public_bytes(encoding=serialization.Encoding.DER)
-                ).hexdigest(),
-                'certificate_subject': cert.subject.rfc4514_string(),
-                'certificate_issuer': cert.issuer.rfc4514_string(),
-                'signature_timestamp': datetime.now(timezone.utc).isoformat(),
-            }
-            
-            # Embed signature in XML according to XMLDSig
-            signed_xml = self._embed_signature(
-                root,
-                signature_b64,
-                digest_b64,
-                cert_b64,
-                signature_info
-            )
-            
-            return signed_xml, signature_info
+            # Canonicalize, digest, sign and embed the signature
+            return sign_document(xml_content, SigningKey(cert, private_key))
         
         except CertificateError:
             raise
@@ -134,9 +154,99 @@ class SigningService:
         except Exception as e:
             raise SigningError(f"Failed to sign XML: {str(e)}")
     
+    async def sign_many(
+        self,
+        requests: Sequence[SigningRequest],
+        max_workers: Optional[int] = None,
+    ) -> List[SigningResult]:
+        """
+        Sign a batch of documents, possibly for many administrations.
+        
+        Each distinct (certificate, administration) pair is loaded once
+        (through the keyring). Batches of at least SIGNING_PARALLEL_MIN_BATCH
+        documents are spread over worker processes; smaller ones are signed
+        in a thread. Failures are reported per item instead of aborting
+        the batch.
+        
+        Args:
+            requests: Documents to sign
+            max_workers: Worker processes to use (default SIGNING_WORKERS)
+            
+        Returns:
+            One SigningResult per request, in request order
+        """
+        results: List[Optional[SigningResult]] = [None] * len(requests)
+        keys: Dict[Tuple[UUID, UUID], Union[SigningKey, str]] = {}
+        work: List[Tuple[int, str, SigningKey]] = []
+        
+        for index, request in enumerate(requests):
+            pair = (request.certificate_id, request.administration_id)
+            if pair not in keys:
+                try:
+                    cached = await self.cert_service.load_signing_key(*pair)
+                    # Private copy: the keyring may wipe its entry mid-batch
+                    keys[pair] = SigningKey(cached.certificate, cached.private_key)
+                except CertificateError as e:
+                    keys[pair] = f"Certificate error: {str(e)}"
+            key = keys[pair]
+            if isinstance(key, str):
+                results[index] = SigningResult(request=request, error=key)
+            else:
+                work.append((index, request.xml_content, key))
+        
+        workers = max_workers or _configured_workers()
+        try:
+            if workers > 1 and len(work) >= settings.SIGNING_PARALLEL_MIN_BATCH:
+                outcomes = await self._sign_in_processes(work, workers)
+            else:
+                outcomes = await asyncio.to_thread(sign_items, work)
+        finally:
+            for key in keys.values():
+                if isinstance(key, SigningKey):
+                    key.wipe()
+        
+        for index, signed_xml, signature_info, error in outcomes:
+            results[index] = SigningResult(
+                request=requests[index],
+                signed_xml=signed_xml,
+                signature_info=signature_info,
+                error=error,
+            )
+        return results
+    
+    async def _sign_in_processes(
+        self,
+        work: List[Tuple[int, str, SigningKey]],
+        workers: int,
+    ) -> List[SignOutcome]:
+        """Split the batch into one chunk per worker and sign in the process pool."""
+        chunk_size = -(-len(work) // workers)
+        chunks = [work[i:i + chunk_size] for i in range(0, len(work), chunk_size)]
+        payloads = []
+        for chunk in chunks:
+            chunk_keys = {
+                key.fingerprint: (bytes(key.private_key_der()), key.certificate_der)
+                for _, _, key in chunk
+            }
+            items = [(index, xml_content, key.fingerprint) for index, xml_content, key in chunk]
+            payloads.append((chunk_keys, items))
+        
+        loop = asyncio.get_running_loop()
+        pool = _get_signing_pool(workers)
+        try:
+            chunk_outcomes = await asyncio.gather(*(
+                loop.run_in_executor(pool, sign_chunk, chunk_keys, items)
+                for chunk_keys, items in payloads
+            ))
+        except BrokenProcessPool:
+            logger.warning("Signing worker pool broke; signing batch in-process")
+            shutdown_signing_pool()
+            return await asyncio.to_thread(sign_items, work)
+        return [outcome for outcomes in chunk_outcomes for outcome in outcomes]
+    
     def _canonicalize_xml(self, root: ET.Element) -> str:
         """
-        Canonicalize XML using C14N (Canonical XML).
+        Canonicalize XML using C14N 2.0 (TrimTextNodes), as declared in the signature.
         
         This ensures the XML is in a consistent format before signing,
         preventing signature invalidation due to whitespace or formatting changes.
@@ -147,14 +257,7 @@ class SigningService:
         Returns:
             Canonicalized XML string
         """
-        # Use ElementTree's canonical form
-        # This is a simplified C14N - for production, consider using lxml for full C14N support
-        xml_str = ET.tostring(root, encoding='unicode', method='xml')
-        
-        # Remove unnecessary whitespace between tags
-        xml_str = ' '.join(xml_str.split())
-        
-        return xml_str
+        return canonicalize_xml(ET.tostring(root, encoding='unicode', method='xml'))
     
     def _embed_signature(
         self,
@@ -170,82 +273,10 @@ class SigningService:
         Creates a <Signature> element according to XMLDSig standard
         and appends it to the root element.
         
-        Args:
-            root: Root element of XML tree
-            signature_b64: Base64-encoded signature value
-            digest_b64: Base64-encoded digest value
-            cert_b64: Base64-encoded certificate
-            signature_info: Signature metadata
-            
         Returns:
             Signed XML as string
         """
-        # Create Signature element with XMLDSig namespace
-        ns_ds = "http://www.w3.org/2000/09/xmldsig#"
-        ET.register_namespace('ds', ns_ds)
-        
-        signature = ET.Element(f"{{{ns_ds}}}Signature")
-        
-        # SignedInfo element
-        signed_info = ET.SubElement(signature, f"{{{ns_ds}}}SignedInfo")
-        
-        # CanonicalizationMethod
-        canon_method = ET.SubElement(signed_info, f"{{{ns_ds}}}CanonicalizationMethod")
-        canon_method.set('Algorithm', 'http://www.w3.org/TR/2001/REC-xml-c14n-20010315')
-        
-        # SignatureMethod
-        sig_method = ET.SubElement(signed_info, f"{{{ns_ds}}}SignatureMethod")
-        sig_method.set('Algorithm', 'http://www.w3.org/2001/04/xmldsig-more#rsa-sha256')
-        
-        # Reference
-        reference = ET.SubElement(signed_info, f"{{{ns_ds}}}Reference")
-        reference.set('URI', '')  # Empty URI means entire document
-        
-        # Transforms
-        transforms = ET.SubElement(reference, f"{{{ns_ds}}}Transforms")
-        transform = ET.SubElement(transforms, f"{{{ns_ds}}}Transform")
-        transform.set('Algorithm', 'http://www.w3.org/2000/09/xmldsig#enveloped-signature')
-        
-        # DigestMethod
-        digest_method = ET.SubElement(reference, f"{{{ns_ds}}}DigestMethod")
-        digest_method.set('Algorithm', 'http://www.w3.org/2001/04/xmlenc#sha256')
-        
-        # DigestValue
-        digest_value = ET.SubElement(reference, f"{{{ns_ds}}}DigestValue")
-        digest_value.text = digest_b64
-        
-        # SignatureValue
-        sig_value = ET.SubElement(signature, f"{{{ns_ds}}}SignatureValue")
-        sig_value.text = signature_b64
-        
-        # KeyInfo
-        key_info = ET.SubElement(signature, f"{{{ns_ds}}}KeyInfo")
-        
-        # X509Data
-        x509_data = ET.SubElement(key_info, f"{{{ns_ds}}}X509Data")
-        x509_cert = ET.SubElement(x509_data, f"{{{ns_ds}}}X509Certificate")
-        x509_cert.text = cert_b64
-        
-        # Add signature metadata as comment
-        signature_comment = ET.Comment(
-            f" Signature Info: "
-            f"Algorithm={signature_info['algorithm']}, "
-            f"Timestamp={signature_info['signature_timestamp']}, "
-            f"Fingerprint={signature_info['certificate_fingerprint']} "
-        )
-        signature.append(signature_comment)
-        
-        # Append signature to root
-        root.append(signature)
-        
-        # Convert to string with proper formatting
-        xml_str = ET.tostring(root, encoding='unicode', method='xml')
-        
-        # Add XML declaration
-        if not xml_str.startswith('<?xml'):
-            xml_str = '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_str
-        
-        return xml_str
+        return embed_signature(root, signature_b64, digest_b64, cert_b64, signature_info)
     
     def verify_signature(self, signed_xml: str) -> bool:
         """
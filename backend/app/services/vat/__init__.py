@@ -2,11 +2,10 @@
 from app.services.vat.posting import VatPostingService
 from app.services.vat.report import VatReportService
 from app.services.vat.lineage import VatLineageService
-from app.services.vat.pdf import generate_vat_overview_pdf
 
 __all__ = [
     "VatPostingService",
     "VatReportService",
     "VatLineageService",
-    "generate_vat_overview_pdf",
 ]
+
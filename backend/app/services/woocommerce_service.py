@@ -11,10 +11,10 @@ from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List, Tuple
 from uuid import UUID
 
-import httpx
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.integrations.http import get_http_client
 from app.models.ecommerce import (
     EcommerceConnection,
     EcommerceOrder,
@@ -26,6 +26,7 @@ from app.models.ecommerce import (
     SyncStatus,
     EcommerceOrderStatus,
 )
+from app.services.ecommerce_mapping import generate_mappings_after_sync
 
 logger = logging.getLogger(__name__)
 
@@ -81,22 +82,22 @@ class WooCommerceService:
         url = self._build_url(shop_url, "system_status")
         auth = (consumer_key, consumer_secret)
 
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(url, auth=auth)
-            if resp.status_code == 401:
-                raise ValueError(
-                    "Ongeldige WooCommerce API-sleutels. Controleer je consumer key en secret."
-                )
-            if resp.status_code == 404:
-                raise ValueError(
-                    "WooCommerce API niet gevonden. Controleer de URL en zorg dat de REST API is ingeschakeld."
-                )
-            resp.raise_for_status()
-            data = resp.json()
-            return {
-                "store_url": shop_url,
-                "wc_version": data.get("environment", {}).get("version", "unknown"),
-            }
+        client = get_http_client("woocommerce")
+        resp = await client.get(url, auth=auth, timeout=15)
+        if resp.status_code == 401:
+            raise ValueError(
+                "Ongeldige WooCommerce API-sleutels. Controleer je consumer key en secret."
+            )
+        if resp.status_code == 404:
+            raise ValueError(
+                "WooCommerce API niet gevonden. Controleer de URL en zorg dat de REST API is ingeschakeld."
+            )
+        resp.raise_for_status()
+        data = resp.json()
+        return {
+            "store_url": shop_url,
+            "wc_version": data.get("environment", {}).get("version", "unknown"),
+        }
 
     async def sync_all(
         self,
@@ -142,6 +143,9 @@ class WooCommerceService:
             ri = await self._sync_refunds(db, connection, shop_url, auth, order_ids)
             refunds_imported += ri
 
+            # --- Review mappings for the newly imported records ---
+            await generate_mappings_after_sync(db, connection)
+
             sync_log.status = SyncStatus.SUCCESS
         except Exception as e:
             logger.exception(f"WooCommerce sync failed for connection {connection.id}")
@@ -183,66 +187,66 @@ class WooCommerceService:
         order_ids: List[str] = []
         page = 1
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            while True:
-                url = self._build_url(shop_url, f"orders?per_page=100&page={page}")
-                resp = await client.get(url, auth=auth)
-                resp.raise_for_status()
-                orders = resp.json()
-
-                if not orders:
-                    break
-
-                for order in orders:
-                    ext_id = str(order.get("id", ""))
-                    if not ext_id:
-                        continue
-                    order_ids.append(ext_id)
-
-                    existing = (await db.execute(
-                        select(EcommerceOrder).where(
-                            EcommerceOrder.connection_id == connection.id,
-                            EcommerceOrder.external_order_id == ext_id,
-                        )
-                    )).scalar_one_or_none()
-
-                    billing = order.get("billing", {}) or {}
-                    customer_name = f"{billing.get('first_name', '')} {billing.get('last_name', '')}".strip() or None
-
-                    # WC shipping total
-                    shipping_cents = _cents(order.get("shipping_total"))
-                    discount_cents = _cents(order.get("discount_total"))
-
-                    order_data = {
-                        "external_order_number": str(order.get("number", "")),
-                        "status": _map_wc_status(order.get("status")),
-                        "customer_name": customer_name,
-                        "customer_email": billing.get("email"),
-                        "currency": order.get("currency", "EUR"),
-                        "total_amount_cents": _cents(order.get("total")),
-                        "subtotal_cents": sum(_cents(li.get("subtotal")) for li in (order.get("line_items") or [])),
-                        "tax_cents": _cents(order.get("total_tax")),
-                        "shipping_cents": shipping_cents,
-                        "discount_cents": discount_cents,
-                        "ordered_at": _parse_dt(order.get("date_created_gmt") or order.get("date_created")),
-                        "paid_at": _parse_dt(order.get("date_paid_gmt") or order.get("date_paid")),
-                    }
-
-                    if existing:
-                        for k, v in order_data.items():
-                            setattr(existing, k, v)
-                        updated += 1
-                    else:
-                        new_order = EcommerceOrder(
-                            connection_id=connection.id,
-                            administration_id=connection.administration_id,
-                            external_order_id=ext_id,
-                            **order_data,
-                        )
-                        db.add(new_order)
-                        imported += 1
-
-                page += 1
+        client = get_http_client("woocommerce")
+        while True:
+            url = self._build_url(shop_url, f"orders?per_page=100&page={page}")
+            resp = await client.get(url, auth=auth)
+            resp.raise_for_status()
+            orders = resp.json()
+
+            if not orders:
+                break
+
+            for order in orders:
+                ext_id = str(order.get("id", ""))
+                if not ext_id:
+                    continue
+                order_ids.append(ext_id)
+
+                existing = (await db.execute(
+                    select(EcommerceOrder).where(
+                        EcommerceOrder.connection_id == connection.id,
+                        EcommerceOrder.external_order_id == ext_id,
+                    )
+                )).scalar_one_or_none()
+
+                billing = order.get("billing", {}) or {}
+                customer_name = f"{billing.get('first_name', '')} {billing.get('last_name', '')}".strip() or None
+
+                # WC shipping total
+                shipping_cents = _cents(order.get("shipping_total"))
+                discount_cents = _cents(order.get("discount_total"))
+
+                order_data = {
+                    "external_order_number": str(order.get("number", "")),
+                    "status": _map_wc_status(order.get("status")),
+                    "customer_name": customer_name,
+                    "customer_email": billing.get("email"),
+                    "currency": order.get("currency", "EUR"),
+                    "total_amount_cents": _cents(order.get("total")),
+                    "subtotal_cents": sum(_cents(li.get("subtotal")) for li in (order.get("line_items") or [])),
+                    "tax_cents": _cents(order.get("total_tax")),
+                    "shipping_cents": shipping_cents,
+                    "discount_cents": discount_cents,
+                    "ordered_at": _parse_dt(order.get("date_created_gmt") or order.get("date_created")),
+                    "paid_at": _parse_dt(order.get("date_paid_gmt") or order.get("date_paid")),
+                }
+
+                if existing:
+                    for k, v in order_data.items():
+                        setattr(existing, k, v)
+                    updated += 1
+                else:
+                    new_order = EcommerceOrder(
+                        connection_id=connection.id,
+                        administration_id=connection.administration_id,
+                        external_order_id=ext_id,
+                        **order_data,
+                    )
+                    db.add(new_order)
+                    imported += 1
+
+            page += 1
 
         await db.flush()
         return imported, updated, order_ids
@@ -258,54 +262,54 @@ class WooCommerceService:
         imported = 0
         page = 1
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            while True:
-                url = self._build_url(shop_url, f"customers?per_page=100&page={page}")
-                resp = await client.get(url, auth=auth)
-                resp.raise_for_status()
-                customers = resp.json()
-
-                if not customers:
-                    break
-
-                for cust in customers:
-                    ext_id = str(cust.get("id", ""))
-                    if not ext_id:
-                        continue
-
-                    existing = (await db.execute(
-                        select(EcommerceCustomer).where(
-                            EcommerceCustomer.connection_id == connection.id,
-                            EcommerceCustomer.external_customer_id == ext_id,
-                        )
-                    )).scalar_one_or_none()
-
-                    billing = cust.get("billing", {}) or {}
-                    cust_data = {
-                        "email": cust.get("email"),
-                        "first_name": cust.get("first_name"),
-                        "last_name": cust.get("last_name"),
-                        "company": billing.get("company"),
-                        "phone": billing.get("phone"),
-                        "total_orders": cust.get("orders_count", 0) or 0,
-                        "total_spent_cents": _cents(cust.get("total_spent")),
-                        "currency": "EUR",
-                    }
-
-                    if existing:
-                        for k, v in cust_data.items():
-                            setattr(existing, k, v)
-                    else:
-                        new_cust = EcommerceCustomer(
-                            connection_id=connection.id,
-                            administration_id=connection.administration_id,
-                            external_customer_id=ext_id,
-                            **cust_data,
-                        )
-                        db.add(new_cust)
-                        imported += 1
-
-                page += 1
+        client = get_http_client("woocommerce")
+        while True:
+            url = self._build_url(shop_url, f"customers?per_page=100&page={page}")
+            resp = await client.get(url, auth=auth)
+            resp.raise_for_status()
+            customers = resp.json()
+
+            if not customers:
+                break
+
+            for cust in customers:
+                ext_id = str(cust.get("id", ""))
+                if not ext_id:
+                    continue
+
+                existing = (await db.execute(
+                    select(EcommerceCustomer).where(
+                        EcommerceCustomer.connection_id == connection.id,
+                        EcommerceCustomer.external_customer_id == ext_id,
+                    )
+                )).scalar_one_or_none()
+
+                billing = cust.get("billing", {}) or {}
+                cust_data = {
+                    "email": cust.get("email"),
+                    "first_name": cust.get("first_name"),
+                    "last_name": cust.get("last_name"),
+                    "company": billing.get("company"),
+                    "phone": billing.get("phone"),
+                    "total_orders": cust.get("orders_count", 0) or 0,
+                    "total_spent_cents": _cents(cust.get("total_spent")),
+                    "currency": "EUR",
+                }
+
+                if existing:
+                    for k, v in cust_data.items():
+                        setattr(existing, k, v)
+                else:
+                    new_cust = EcommerceCustomer(
+                        connection_id=connection.id,
+                        administration_id=connection.administration_id,
+                        external_customer_id=ext_id,
+                        **cust_data,
+                    )
+                    db.add(new_cust)
+                    imported += 1
+
+            page += 1
 
         await db.flush()
         return imported
@@ -321,42 +325,42 @@ class WooCommerceService:
         """Fetch refunds for orders that have them."""
         imported = 0
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            for order_ext_id in order_ids:
-                url = self._build_url(shop_url, f"orders/{order_ext_id}/refunds")
-                resp = await client.get(url, auth=auth)
-                if resp.status_code == 404:
-                    continue
-                resp.raise_for_status()
-                refunds = resp.json()
+        client = get_http_client("woocommerce")
+        for order_ext_id in order_ids:
+            url = self._build_url(shop_url, f"orders/{order_ext_id}/refunds")
+            resp = await client.get(url, auth=auth)
+            if resp.status_code == 404:
+                continue
+            resp.raise_for_status()
+            refunds = resp.json()
 
-                for refund in refunds:
-                    ext_id = str(refund.get("id", ""))
-                    if not ext_id:
-                        continue
+            for refund in refunds:
+                ext_id = str(refund.get("id", ""))
+                if not ext_id:
+                    continue
 
-                    existing = (await db.execute(
-                        select(EcommerceRefund).where(
-                            EcommerceRefund.connection_id == connection.id,
-                            EcommerceRefund.external_refund_id == ext_id,
-                        )
-                    )).scalar_one_or_none()
+                existing = (await db.execute(
+                    select(EcommerceRefund).where(
+                        EcommerceRefund.connection_id == connection.id,
+                        EcommerceRefund.external_refund_id == ext_id,
+                    )
+                )).scalar_one_or_none()
 
-                    if existing:
-                        continue
+                if existing:
+                    continue
 
-                    new_refund = EcommerceRefund(
-                        connection_id=connection.id,
-                        administration_id=connection.administration_id,
-                        external_refund_id=ext_id,
-                        external_order_id=order_ext_id,
-                        amount_cents=abs(_cents(refund.get("amount"))),
-                        currency="EUR",
-                        reason=refund.get("reason"),
-                        refunded_at=_parse_dt(refund.get("date_created_gmt") or refund.get("date_created")),
-                    )
-                    db.add(new_refund)
-                    imported += 1
+                new_refund = EcommerceRefund(
+                    connection_id=connection.id,
+                    administration_id=connection.administration_id,
+                    external_refund_id=ext_id,
+                    external_order_id=order_ext_id,
+                    amount_cents=abs(_cents(refund.get("amount"))),
+                    currency="EUR",
+                    reason=refund.get("reason"),
+                    refunded_at=_parse_dt(refund.get("date_created_gmt") or refund.get("date_created")),
+                )
+                db.add(new_refund)
+                imported += 1
 
         await db.flush()
         return imported
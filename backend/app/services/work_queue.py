@@ -3,27 +3,32 @@ Work Queue and Readiness Score Service
 
 Service layer for:
 - Readiness score computation (deterministic, 0-100)
-- Work queue generation with unified work items
+- Work queue generation with unified work items, precomputed per client
+  in the work_items table and filtered, sorted and paginated in SQL
 - SLA policy enforcement and escalation events
 """
 import uuid
+import base64
 import hashlib
+import json
 import calendar
 from datetime import datetime, timezone, date, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 from decimal import Decimal
-from sqlalchemy import select, func, and_, or_, case, desc, asc, update
+from sqlalchemy import select, func, and_, or_, case, desc, asc, update, delete, insert, event
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import Session, selectinload
 
 from app.models.administration import Administration, AdministrationMember, MemberRole
 from app.models.document import Document, DocumentStatus
 from app.models.ledger import AccountingPeriod, PeriodStatus, JournalEntry
-from app.models.issues import ClientIssue, IssueSeverity
+from app.models.issues import ClientIssue, IssueSeverity, ValidationRun
 from app.models.alerts import Alert, AlertSeverity, AlertCode
 from app.models.accountant_dashboard import AccountantClientAssignment
 from app.models.work_queue import (
     ClientReadinessCache,
+    WorkItem,
     EscalationEvent, 
     EscalationType,
     EscalationSeverity,
@@ -172,134 +177,204 @@ class ReadinessScoreEngine:
         return score, breakdown
 
 
-class WorkQueueService:
+# Severity order used for sorting, most urgent first
+SEVERITY_RANK = {"CRITICAL": 0, "RED": 1, "WARNING": 2, "YELLOW": 3, "INFO": 4}
+
+# Work item type (and severity) behind each queue tab
+QUEUE_FILTERS = {
+    "red": ("ISSUE", "RED"),
+    "review": ("BACKLOG", None),
+    "vat_due": ("VAT", None),
+    "stale": ("STALE", None),
+}
+
+# Sort keys; items without a due date sort as due last
+SORT_KEYS = {
+    "readiness_score": WorkItem.readiness_score,
+    "due_date": func.coalesce(WorkItem.due_date, date.max),
+    "severity": WorkItem.severity_rank,
+}
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    """Treat naive datetimes (SQLite) as UTC."""
+    if value is None:
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _cursor_value(sort_by: str, item: WorkItem) -> Any:
+    if sort_by == "due_date":
+        return (item.due_date or date.max).isoformat()
+    if sort_by == "severity":
+        return item.severity_rank
+    return item.readiness_score
+
+
+def _encode_cursor(sort_by: str, item: WorkItem) -> str:
+    payload = json.dumps([sort_by, _cursor_value(sort_by, item), str(item.id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort_by: str) -> Tuple[Any, uuid.UUID]:
     """
-    Service for work queue management.
+    Decode a cursor into the sort value and ID of the last item of a page.
     
-    Provides unified work items for the accountant dashboard:
-    - Normalizes different types of work items (issues, VAT, backlog, alerts)
-    - Supports filtering and pagination
-    - Includes readiness score for prioritization
+    Raises:
+        WorkQueueServiceError: If the cursor is malformed or was issued for
+            another sort key
     """
+    try:
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort_by:
+            raise ValueError("sort key mismatch")
+        if sort_by == "due_date":
+            value = date.fromisoformat(value)
+        elif not isinstance(value, int):
+            raise ValueError("invalid sort value")
+        return value, uuid.UUID(last_id)
+    except (ValueError, TypeError) as e:
+        raise WorkQueueServiceError(f"Invalid cursor: {e}")
+
+
+class WorkItemStore:
+    """
+    Maintains the precomputed work items of clients.
     
-    def __init__(self, db: AsyncSession, accountant_id: uuid.UUID):
+    A client's WorkItem rows and its ClientReadinessCache row are rebuilt
+    together when the cache row is missing, was flagged ``needs_refresh``
+    by the session hook at the bottom of this module, or was computed
+    before today (VAT deadlines and staleness move with the date). Readers
+    call ``ensure_fresh`` and then query WorkItem directly.
+    """
+    
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.accountant_id = accountant_id
     
-    async def get_assigned_client_ids(self) -> List[uuid.UUID]:
-        """Get all client IDs assigned to this accountant."""
+    async def ensure_fresh(self, client_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+        """
+        Rebuild the work items of clients that are out of date.
+        
+        Returns:
+            IDs of the active administrations among client_ids
+        """
+        if not client_ids:
+            return []
+        
         result = await self.db.execute(
-            select(AccountantClientAssignment.administration_id)
-            .where(AccountantClientAssignment.accountant_id == self.accountant_id)
+            select(
+                Administration.id,
+                ClientReadinessCache.id,
+                ClientReadinessCache.needs_refresh,
+                ClientReadinessCache.computed_at,
+            )
+            .outerjoin(ClientReadinessCache, ClientReadinessCache.administration_id == Administration.id)
+            .where(Administration.id.in_(client_ids))
+            .where(Administration.is_active == True)
         )
-        assigned_ids = [r[0] for r in result.all()]
+        today = date.today()
+        active_ids = []
+        outdated: Dict[uuid.UUID, Optional[uuid.UUID]] = {}
+        for admin_id, cache_id, needs_refresh, computed_at in result.all():
+            active_ids.append(admin_id)
+            if cache_id is None or needs_refresh or _aware(computed_at).astimezone().date() < today:
+                outdated[admin_id] = cache_id
         
-        # Also include clients where accountant is a member with appropriate role
-        member_result = await self.db.execute(
-            select(AdministrationMember.administration_id)
-            .where(AdministrationMember.user_id == self.accountant_id)
-            .where(AdministrationMember.role.in_([MemberRole.OWNER, MemberRole.ADMIN, MemberRole.ACCOUNTANT]))
-        )
-        member_ids = [r[0] for r in member_result.all()]
+        if outdated:
+            try:
+                await self.refresh(outdated)
+                await self.db.commit()
+            except IntegrityError:
+                # A concurrent request built the first cache rows of these clients
+                await self.db.rollback()
         
-        return list(set(assigned_ids + member_ids))
+        return active_ids
     
-    async def get_work_queue(
-        self,
-        queue_type: str = "all",
-        limit: int = 50,
-        cursor: Optional[str] = None,
-        sort_by: str = "readiness_score",
-        sort_order: str = "asc",
-    ) -> Dict[str, Any]:
+    async def refresh(self, outdated: Dict[uuid.UUID, Optional[uuid.UUID]]) -> None:
         """
-        Get unified work queue items.
+        Rebuild the work items and readiness cache rows of administrations.
         
-        Args:
-            queue_type: Filter type - red, review, vat_due, stale, all
-            limit: Max items to return
-            cursor: Pagination cursor
-            sort_by: Sort field
-            sort_order: asc or desc
-            
-        Returns:
-            Dict with items, counts, and pagination info
+        ``outdated`` maps administration IDs to their cache row ID (None if
+        there is none yet). The refresh flags are cleared before the client
+        data is read, so a change committed while rebuilding flags the
+        client again.
         """
-        client_ids = await self.get_assigned_client_ids()
-        
-        if not client_ids:
-            return {
-                "items": [],
-                "total_count": 0,
-                "queue_type": queue_type,
-                "counts": {
-                    "red_issues": 0,
-                    "needs_review": 0,
-                    "vat_due": 0,
-                    "stale": 0,
-                },
-            }
-        
-        # Build work items for each client
-        work_items = []
-        counts = {"red_issues": 0, "needs_review": 0, "vat_due": 0, "stale": 0}
+        administration_ids = list(outdated)
+        cache_ids = [cache_id for cache_id in outdated.values() if cache_id is not None]
+        if cache_ids:
+            await self.db.execute(
+                update(ClientReadinessCache)
+                .where(ClientReadinessCache.id.in_(cache_ids))
+                .values(needs_refresh=False)
+                .execution_options(synchronize_session=False)
+            )
         
-        # Get client data with aggregations
-        client_data = await self._get_client_data(client_ids)
+        clients = await self._get_client_data(administration_ids)
+        now = datetime.now(timezone.utc)
         
-        for client in client_data:
-            client_items = self._build_work_items(client)
-            work_items.extend(client_items)
-            
-            # Update counts
-            for item in client_items:
-                if item["work_item_type"] == "ISSUE" and item.get("severity") == "RED":
-                    counts["red_issues"] += 1
-                elif item["work_item_type"] == "BACKLOG":
-                    counts["needs_review"] += 1
-                elif item["work_item_type"] == "VAT":
-                    counts["vat_due"] += 1
-        
-        # Filter by queue type
-        if queue_type == "red":
-            work_items = [i for i in work_items if i["work_item_type"] == "ISSUE" and i.get("severity") == "RED"]
-        elif queue_type == "review":
-            work_items = [i for i in work_items if i["work_item_type"] == "BACKLOG"]
-        elif queue_type == "vat_due":
-            work_items = [i for i in work_items if i["work_item_type"] == "VAT"]
-        elif queue_type == "stale":
-            today = date.today()
-            thirty_days_ago = today - timedelta(days=30)
-            work_items = [i for i in work_items if i.get("staleness_days", 0) > 30]
-        
-        # Sort items
-        reverse = sort_order.lower() == "desc"
-        if sort_by == "readiness_score":
-            work_items.sort(key=lambda x: x.get("readiness_score", 0), reverse=reverse)
-        elif sort_by == "due_date":
-            work_items.sort(
-                key=lambda x: x.get("due_date") or date.max,
-                reverse=reverse
-            )
-        elif sort_by == "severity":
-            severity_order = {"CRITICAL": 0, "RED": 1, "WARNING": 2, "YELLOW": 3, "INFO": 4}
-            work_items.sort(
-                key=lambda x: severity_order.get(x.get("severity", "INFO"), 5),
-                reverse=reverse
-            )
+        await self.db.execute(
+            delete(WorkItem)
+            .where(WorkItem.administration_id.in_(administration_ids))
+            .execution_options(synchronize_session=False)
+        )
+        rows = [
+            self._work_item_row(client, item, now)
+            for client in clients
+            for item in self._build_work_items(client)
+        ]
+        if rows:
+            await self.db.execute(insert(WorkItem).execution_options(render_nulls=True), rows)
         
-        # Apply limit
-        total_count = len(work_items)
-        work_items = work_items[:limit]
+        cache_updates = []
+        cache_inserts = []
+        for client in clients:
+            values = {
+                "readiness_score": client["readiness_score"],
+                "readiness_breakdown": client["readiness_breakdown"],
+                "red_issue_count": client["red_issue_count"],
+                "yellow_issue_count": client["yellow_issue_count"],
+                "document_backlog": client["document_backlog"],
+                "vat_days_remaining": client["vat_days_remaining"],
+                "period_status": client["period_status"],
+                "has_critical_alerts": client["has_critical_alerts"],
+                "staleness_days": client["staleness_days"],
+                "computed_at": now,
+            }
+            cache_id = outdated[client["administration_id"]]
+            if cache_id is None:
+                cache_inserts.append({"administration_id": client["administration_id"], **values})
+            else:
+                cache_updates.append({"id": cache_id, **values})
+        if cache_updates:
+            await self.db.execute(update(ClientReadinessCache), cache_updates)
+        if cache_inserts:
+            await self.db.execute(insert(ClientReadinessCache).execution_options(render_nulls=True), cache_inserts)
         
+        # Later writes in this session must flag these clients again
+        marked = self.db.sync_session.info.get(_SESSION_KEY)
+        if marked:
+            marked.difference_update(administration_ids)
+    
+    def _work_item_row(self, client: Dict[str, Any], item: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Table row for a work item built by _build_work_items."""
         return {
-            "items": work_items,
-            "total_count": total_count,
-            "returned_count": len(work_items),
-            "queue_type": queue_type,
-            "counts": counts,
-            "sort_by": sort_by,
-            "sort_order": sort_order,
+            "administration_id": client["administration_id"],
+            "client_name": client["name"],
+            "period_id": uuid.UUID(item["period_id"]) if item.get("period_id") else None,
+            "period_status": item.get("period_status"),
+            "work_item_type": item["work_item_type"],
+            "severity": item["severity"],
+            "severity_rank": SEVERITY_RANK[item["severity"]],
+            "readiness_score": client["readiness_score"],
+            "due_date": item["due_date"],
+            "since": item["since"],
+            "age_days": item["age_days"],
+            "item_count": item["item_count"],
+            "title": item["title"],
+            "description": item["description"],
+            "suggested_next_action": item["suggested_next_action"],
+            "counts": item["counts"],
+            "computed_at": now,
         }
     
     async def _get_client_data(self, client_ids: List[uuid.UUID]) -> List[Dict[str, Any]]:
@@ -315,23 +390,25 @@ class WorkQueueService:
         )
         administrations = admins_result.scalars().all()
         
-        # Get issue counts per client
+        # Get issue counts (and oldest issue) per client
         issues_result = await self.db.execute(
             select(
                 ClientIssue.administration_id,
                 ClientIssue.severity,
-                func.count(ClientIssue.id)
+                func.count(ClientIssue.id),
+                func.min(ClientIssue.created_at),
             )
             .where(ClientIssue.administration_id.in_(client_ids))
             .where(ClientIssue.is_resolved == False)
             .group_by(ClientIssue.administration_id, ClientIssue.severity)
         )
         issue_counts = {}
-        for admin_id, severity, count in issues_result.all():
+        for admin_id, severity, count, oldest_created in issues_result.all():
             if admin_id not in issue_counts:
-                issue_counts[admin_id] = {"red": 0, "yellow": 0}
+                issue_counts[admin_id] = {"red": 0, "yellow": 0, "red_since": None}
             if severity == IssueSeverity.RED:
                 issue_counts[admin_id]["red"] = count
+                issue_counts[admin_id]["red_since"] = _aware(oldest_created)
             elif severity == IssueSeverity.YELLOW:
                 issue_counts[admin_id]["yellow"] = count
         
@@ -354,27 +431,33 @@ class WorkQueueService:
             .where(AccountingPeriod.status.in_([PeriodStatus.OPEN, PeriodStatus.REVIEW]))
             .order_by(AccountingPeriod.end_date.desc())
         )
+        # The latest open period describes the client; every open period
+        # still has its own VAT filing, so older ones past their deadline
+        # keep showing up
         period_info = {}
+        vat_periods = {}
         for period in periods_result.scalars().all():
-            if period.administration_id not in period_info:
-                # Calculate VAT deadline
-                if period.end_date.month == 12:
+            # Calculate VAT deadline
+            if period.end_date.month == 12:
+                deadline = date(period.end_date.year + 1, 1, 31)
+            else:
+                next_month = period.end_date.month + 1
+                if next_month > 12:
                     deadline = date(period.end_date.year + 1, 1, 31)
                 else:
-                    next_month = period.end_date.month + 1
-                    if next_month > 12:
-                        deadline = date(period.end_date.year + 1, 1, 31)
-                    else:
-                        last_day = calendar.monthrange(period.end_date.year, next_month)[1]
-                        deadline = date(period.end_date.year, next_month, last_day)
-                
-                period_info[period.administration_id] = {
-                    "id": str(period.id),
-                    "status": period.status.value,
-                    "name": period.name,
-                    "vat_deadline": deadline,
-                    "days_to_deadline": (deadline - today).days,
-                }
+                    last_day = calendar.monthrange(period.end_date.year, next_month)[1]
+                    deadline = date(period.end_date.year, next_month, last_day)
+            
+            info = {
+                "id": str(period.id),
+                "status": period.status.value,
+                "name": period.name,
+                "vat_deadline": deadline,
+                "days_to_deadline": (deadline - today).days,
+                "review_started_at": _aware(period.review_started_at or period.created_at),
+            }
+            period_info.setdefault(period.administration_id, info)
+            vat_periods.setdefault(period.administration_id, []).append(info)
         
         # Get last activity per client
         activity_result = await self.db.execute(
@@ -388,7 +471,7 @@ class WorkQueueService:
         last_activity = {}
         for admin_id, activity_time in activity_result.all():
             if activity_time:
-                activity_aware = activity_time if activity_time.tzinfo else activity_time.replace(tzinfo=timezone.utc)
+                activity_aware = _aware(activity_time)
                 staleness = (datetime.now(timezone.utc) - activity_aware).days
                 last_activity[admin_id] = {"time": activity_aware, "staleness_days": staleness}
         
@@ -407,9 +490,12 @@ class WorkQueueService:
         # Build client data
         for admin in administrations:
             admin_id = admin.id
-            issues = issue_counts.get(admin_id, {"red": 0, "yellow": 0})
+            issues = issue_counts.get(admin_id, {"red": 0, "yellow": 0, "red_since": None})
             docs = doc_counts.get(admin_id, 0)
             period = period_info.get(admin_id, {})
+            open_periods = vat_periods.get(admin_id, [])
+            # Score and cache follow the most urgent VAT deadline
+            vat_days_remaining = min((p["days_to_deadline"] for p in open_periods), default=None)
             activity = last_activity.get(admin_id, {"staleness_days": None})
             has_critical = critical_alerts.get(admin_id, False)
             
@@ -419,25 +505,30 @@ class WorkQueueService:
                 yellow_issue_count=issues["yellow"],
                 document_backlog=docs,
                 has_critical_alerts=has_critical,
-                vat_days_remaining=period.get("days_to_deadline"),
+                vat_days_remaining=vat_days_remaining,
                 staleness_days=activity.get("staleness_days"),
             )
             
             clients.append({
+                "administration_id": admin_id,
                 "id": str(admin_id),
                 "name": admin.name,
                 "kvk_number": admin.kvk_number,
                 "btw_number": admin.btw_number,
                 "red_issue_count": issues["red"],
+                "red_since": issues["red_since"],
                 "yellow_issue_count": issues["yellow"],
                 "document_backlog": docs,
                 "period_id": period.get("id"),
                 "period_status": period.get("status"),
                 "period_name": period.get("name"),
+                "review_started_at": period.get("review_started_at"),
                 "vat_deadline": period.get("vat_deadline"),
-                "vat_days_remaining": period.get("days_to_deadline"),
+                "vat_days_remaining": vat_days_remaining,
+                "vat_periods": open_periods,
                 "has_critical_alerts": has_critical,
                 "staleness_days": activity.get("staleness_days"),
+                "last_activity_at": activity.get("time"),
                 "readiness_score": score,
                 "readiness_breakdown": breakdown,
             })
@@ -467,6 +558,8 @@ class WorkQueueService:
                 "suggested_next_action": "Review and resolve RED issues",
                 "age_days": None,
                 "due_date": None,
+                "since": client.get("red_since"),
+                "item_count": client["red_issue_count"],
                 "counts": {
                     "red": client["red_issue_count"],
                     "yellow": client["yellow_issue_count"],
@@ -485,6 +578,8 @@ class WorkQueueService:
                 "suggested_next_action": "Review and acknowledge or resolve YELLOW issues",
                 "age_days": None,
                 "due_date": None,
+                "since": None,
+                "item_count": client["yellow_issue_count"],
                 "counts": {
                     "red": 0,
                     "yellow": client["yellow_issue_count"],
@@ -503,6 +598,8 @@ class WorkQueueService:
                 "suggested_next_action": "Review and process pending documents",
                 "age_days": None,
                 "due_date": None,
+                "since": None,
+                "item_count": client["document_backlog"],
                 "counts": {
                     "red": client["red_issue_count"],
                     "yellow": client["yellow_issue_count"],
@@ -510,20 +607,24 @@ class WorkQueueService:
                 },
             })
         
-        # VAT deadline work item
-        if client.get("vat_days_remaining") is not None:
-            days = client["vat_days_remaining"]
+        # VAT deadline work items, one per open period
+        for period in client.get("vat_periods", []):
+            days = period["days_to_deadline"]
             if days <= 14:
                 severity = "CRITICAL" if days <= 7 else "WARNING"
                 items.append({
                     **base,
+                    "period_id": period["id"],
+                    "period_status": period["status"],
                     "work_item_type": "VAT",
                     "severity": severity,
                     "title": f"VAT deadline in {days} day(s)",
-                    "description": f"BTW Aangifte due for {client.get('period_name', 'current period')}",
+                    "description": f"BTW Aangifte due for {period['name']}",
                     "suggested_next_action": "Generate VAT draft and review" if days > 7 else "Finalize and submit VAT filing",
                     "age_days": None,
-                    "due_date": client.get("vat_deadline"),
+                    "due_date": period["vat_deadline"],
+                    "since": None,
+                    "item_count": 0,
                     "counts": {
                         "red": client["red_issue_count"],
                         "yellow": client["yellow_issue_count"],
@@ -542,6 +643,8 @@ class WorkQueueService:
                 "suggested_next_action": "Review validation results and finalize period",
                 "age_days": None,
                 "due_date": client.get("vat_deadline"),
+                "since": client.get("review_started_at"),
+                "item_count": 0,
                 "counts": {
                     "red": client["red_issue_count"],
                     "yellow": client["yellow_issue_count"],
@@ -561,7 +664,8 @@ class WorkQueueService:
                 "suggested_next_action": "Send reminder or check in with client",
                 "age_days": staleness,
                 "due_date": None,
-                "staleness_days": staleness,
+                "since": client.get("last_activity_at"),
+                "item_count": 0,
                 "counts": {
                     "red": client["red_issue_count"],
                     "yellow": client["yellow_issue_count"],
@@ -580,6 +684,8 @@ class WorkQueueService:
                 "suggested_next_action": "Review and resolve critical alerts",
                 "age_days": None,
                 "due_date": None,
+                "since": None,
+                "item_count": 0,
                 "counts": {
                     "red": client["red_issue_count"],
                     "yellow": client["yellow_issue_count"],
@@ -590,6 +696,171 @@ class WorkQueueService:
         return items
 
 
+class WorkQueueService:
+    """
+    Service for work queue management.
+    
+    Provides unified work items for the accountant dashboard:
+    - Normalizes different types of work items (issues, VAT, backlog, alerts)
+    - Supports filtering and cursor pagination in SQL over WorkItem
+    - Includes readiness score for prioritization
+    """
+    
+    def __init__(self, db: AsyncSession, accountant_id: uuid.UUID):
+        self.db = db
+        self.accountant_id = accountant_id
+        self.store = WorkItemStore(db)
+    
+    async def get_assigned_client_ids(self) -> List[uuid.UUID]:
+        """Get all client IDs assigned to this accountant."""
+        result = await self.db.execute(
+            select(AccountantClientAssignment.administration_id)
+            .where(AccountantClientAssignment.accountant_id == self.accountant_id)
+        )
+        assigned_ids = [r[0] for r in result.all()]
+        
+        # Also include clients where accountant is a member with appropriate role
+        member_result = await self.db.execute(
+            select(AdministrationMember.administration_id)
+            .where(AdministrationMember.user_id == self.accountant_id)
+            .where(AdministrationMember.role.in_([MemberRole.OWNER, MemberRole.ADMIN, MemberRole.ACCOUNTANT]))
+        )
+        member_ids = [r[0] for r in member_result.all()]
+        
+        return list(set(assigned_ids + member_ids))
+    
+    async def get_work_queue(
+        self,
+        queue_type: str = "all",
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        sort_by: str = "readiness_score",
+        sort_order: str = "asc",
+        work_item_type: Optional[str] = None,
+        severity: Optional[str] = None,
+        due_within_days: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get unified work queue items.
+        
+        Args:
+            queue_type: Filter type - red, review, vat_due, stale, all
+            limit: Max items to return
+            cursor: next_cursor of the previous page
+            sort_by: Sort field - readiness_score, due_date, severity
+            sort_order: asc or desc
+            work_item_type: Only items of this type (ISSUE, VAT, ...)
+            severity: Only items of this severity
+            due_within_days: Only items due within this many days (overdue included)
+            
+        Returns:
+            Dict with items, counts, and pagination info
+            
+        Raises:
+            WorkQueueServiceError: If the cursor is invalid
+        """
+        if sort_by not in SORT_KEYS:
+            sort_by = "readiness_score"
+        descending = sort_order.lower() == "desc"
+        sort_order = "desc" if descending else "asc"
+        last = _decode_cursor(cursor, sort_by) if cursor else None
+        
+        client_ids = await self.get_assigned_client_ids()
+        active_ids = await self.store.ensure_fresh(client_ids)
+        
+        counts = {"red_issues": 0, "needs_review": 0, "vat_due": 0, "stale": 0}
+        result = {
+            "items": [],
+            "total_count": 0,
+            "returned_count": 0,
+            "next_cursor": None,
+            "queue_type": queue_type,
+            "counts": counts,
+            "sort_by": sort_by,
+            "sort_order": sort_order,
+        }
+        if not active_ids:
+            return result
+        
+        # Tab counts over all items of the assigned clients
+        scope = WorkItem.administration_id.in_(active_ids)
+        counts_result = await self.db.execute(
+            select(WorkItem.work_item_type, WorkItem.severity, func.count(WorkItem.id))
+            .where(scope)
+            .group_by(WorkItem.work_item_type, WorkItem.severity)
+        )
+        for item_type, item_severity, count in counts_result.all():
+            if item_type == "ISSUE" and item_severity == "RED":
+                counts["red_issues"] += count
+            elif item_type == "BACKLOG":
+                counts["needs_review"] += count
+            elif item_type == "VAT":
+                counts["vat_due"] += count
+            elif item_type == "STALE":
+                counts["stale"] += count
+        
+        filters = [scope]
+        if queue_type in QUEUE_FILTERS:
+            queue_item_type, queue_severity = QUEUE_FILTERS[queue_type]
+            filters.append(WorkItem.work_item_type == queue_item_type)
+            if queue_severity:
+                filters.append(WorkItem.severity == queue_severity)
+        if work_item_type:
+            filters.append(WorkItem.work_item_type == work_item_type)
+        if severity:
+            filters.append(WorkItem.severity == severity)
+        if due_within_days is not None:
+            filters.append(WorkItem.due_date <= date.today() + timedelta(days=due_within_days))
+        
+        result["total_count"] = await self.db.scalar(
+            select(func.count(WorkItem.id)).where(*filters)
+        ) or 0
+        
+        # Keyset pagination on (sort key, id)
+        key = SORT_KEYS[sort_by]
+        direction = desc if descending else asc
+        query = (
+            select(WorkItem, ClientReadinessCache.readiness_breakdown)
+            .outerjoin(ClientReadinessCache, ClientReadinessCache.administration_id == WorkItem.administration_id)
+            .where(*filters)
+        )
+        if last is not None:
+            value, last_id = last
+            if descending:
+                query = query.where(or_(key < value, and_(key == value, WorkItem.id < last_id)))
+            else:
+                query = query.where(or_(key > value, and_(key == value, WorkItem.id > last_id)))
+        rows = (await self.db.execute(
+            query.order_by(direction(key), direction(WorkItem.id)).limit(limit + 1)
+        )).all()
+        
+        page = rows[:limit]
+        result["items"] = [self._item_dict(item, breakdown) for item, breakdown in page]
+        result["returned_count"] = len(page)
+        if len(rows) > limit:
+            result["next_cursor"] = _encode_cursor(sort_by, page[-1][0])
+        return result
+    
+    def _item_dict(self, item: WorkItem, breakdown: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Work queue item as returned by get_work_queue."""
+        return {
+            "client_id": str(item.administration_id),
+            "client_name": item.client_name,
+            "period_id": str(item.period_id) if item.period_id else None,
+            "period_status": item.period_status,
+            "readiness_score": item.readiness_score,
+            "readiness_breakdown": breakdown,
+            "work_item_type": item.work_item_type,
+            "severity": item.severity,
+            "title": item.title,
+            "description": item.description,
+            "suggested_next_action": item.suggested_next_action,
+            "age_days": item.age_days,
+            "due_date": item.due_date,
+            "counts": item.counts or {},
+        }
+
+
 class SLAService:
     """
     Service for SLA policy enforcement and escalation.
@@ -602,119 +873,69 @@ class SLAService:
         """
         Get SLA summary for given clients.
         
-        Returns counts of violations by type and severity.
+        Returns counts of violations by type and severity, counted from the
+        clients' work items.
         """
-        if not client_ids:
+        active_ids = await WorkItemStore(self.db).ensure_fresh(client_ids)
+        if not active_ids:
             return {
                 "total_violations": 0,
                 "critical_count": 0,
                 "warning_count": 0,
                 "by_type": {},
                 "escalation_events_today": 0,
+                "policy": SLA_POLICY,
             }
         
         today = date.today()
         now = datetime.now(timezone.utc)
-        violations = {"critical": 0, "warning": 0}
-        by_type = {}
+        red_critical_before = now - timedelta(days=SLA_POLICY["red_unresolved_critical_days"])
+        red_warning_before = now - timedelta(days=SLA_POLICY["red_unresolved_warning_days"])
+        vat_critical_until = today + timedelta(days=SLA_POLICY["vat_due_critical_days"])
+        vat_warning_until = today + timedelta(days=SLA_POLICY["vat_due_warning_days"])
+        review_warning_before = now - timedelta(days=SLA_POLICY["review_stale_warning_days"])
         
-        # Check RED issues unresolved > threshold
-        red_issues_result = await self.db.execute(
-            select(
-                ClientIssue.administration_id,
-                func.min(ClientIssue.created_at)
-            )
-            .where(ClientIssue.administration_id.in_(client_ids))
-            .where(ClientIssue.severity == IssueSeverity.RED)
-            .where(ClientIssue.is_resolved == False)
-            .group_by(ClientIssue.administration_id)
+        red = and_(WorkItem.work_item_type == "ISSUE", WorkItem.severity == "RED")
+        vat = WorkItem.work_item_type == "VAT"
+        checks = [
+            # RED issues unresolved > threshold (age of the oldest one)
+            ("RED_UNRESOLVED", "critical", and_(red, WorkItem.since <= red_critical_before)),
+            ("RED_UNRESOLVED", "warning", and_(
+                red, WorkItem.since <= red_warning_before, WorkItem.since > red_critical_before
+            )),
+            # VAT deadlines
+            ("VAT_DEADLINE", "critical", and_(vat, WorkItem.due_date <= vat_critical_until)),
+            ("VAT_DEADLINE", "warning", and_(
+                vat, WorkItem.due_date > vat_critical_until, WorkItem.due_date <= vat_warning_until
+            )),
+            # REVIEW state > threshold
+            ("REVIEW_STALE", "warning", and_(
+                WorkItem.work_item_type == "PERIOD_REVIEW", WorkItem.since <= review_warning_before
+            )),
+            # Document backlog > threshold
+            ("BACKLOG_HIGH", "warning", and_(
+                WorkItem.work_item_type == "BACKLOG",
+                WorkItem.item_count >= SLA_POLICY["backlog_warning_threshold"],
+            )),
+        ]
+        counts_result = await self.db.execute(
+            select(*[func.count(case((condition, 1))) for _, _, condition in checks])
+            .where(WorkItem.administration_id.in_(active_ids))
         )
         
-        for admin_id, oldest_created in red_issues_result.all():
-            if oldest_created:
-                oldest_aware = oldest_created if oldest_created.tzinfo else oldest_created.replace(tzinfo=timezone.utc)
-                age_days = (now - oldest_aware).days
-                
-                if age_days >= SLA_POLICY["red_unresolved_critical_days"]:
-                    violations["critical"] += 1
-                    by_type.setdefault("RED_UNRESOLVED", {"critical": 0, "warning": 0})
-                    by_type["RED_UNRESOLVED"]["critical"] += 1
-                elif age_days >= SLA_POLICY["red_unresolved_warning_days"]:
-                    violations["warning"] += 1
-                    by_type.setdefault("RED_UNRESOLVED", {"critical": 0, "warning": 0})
-                    by_type["RED_UNRESOLVED"]["warning"] += 1
-        
-        # Check VAT deadlines
-        periods_result = await self.db.execute(
-            select(AccountingPeriod)
-            .where(AccountingPeriod.administration_id.in_(client_ids))
-            .where(AccountingPeriod.status.in_([PeriodStatus.OPEN, PeriodStatus.REVIEW]))
-        )
-        
-        for period in periods_result.scalars().all():
-            # Calculate deadline
-            if period.end_date.month == 12:
-                deadline = date(period.end_date.year + 1, 1, 31)
-            else:
-                next_month = period.end_date.month + 1
-                if next_month > 12:
-                    deadline = date(period.end_date.year + 1, 1, 31)
-                else:
-                    last_day = calendar.monthrange(period.end_date.year, next_month)[1]
-                    deadline = date(period.end_date.year, next_month, last_day)
-            
-            days_remaining = (deadline - today).days
-            
-            if days_remaining <= SLA_POLICY["vat_due_critical_days"]:
-                violations["critical"] += 1
-                by_type.setdefault("VAT_DEADLINE", {"critical": 0, "warning": 0})
-                by_type["VAT_DEADLINE"]["critical"] += 1
-            elif days_remaining <= SLA_POLICY["vat_due_warning_days"]:
-                violations["warning"] += 1
-                by_type.setdefault("VAT_DEADLINE", {"critical": 0, "warning": 0})
-                by_type["VAT_DEADLINE"]["warning"] += 1
-        
-        # Check REVIEW state > threshold
-        review_periods = await self.db.execute(
-            select(AccountingPeriod)
-            .where(AccountingPeriod.administration_id.in_(client_ids))
-            .where(AccountingPeriod.status == PeriodStatus.REVIEW)
-        )
-        
-        for period in review_periods.scalars().all():
-            # Check how long in REVIEW state (using updated_at as proxy)
-            if period.updated_at:
-                updated_aware = period.updated_at if period.updated_at.tzinfo else period.updated_at.replace(tzinfo=timezone.utc)
-                days_in_review = (now - updated_aware).days
-                
-                if days_in_review >= SLA_POLICY["review_stale_warning_days"]:
-                    violations["warning"] += 1
-                    by_type.setdefault("REVIEW_STALE", {"critical": 0, "warning": 0})
-                    by_type["REVIEW_STALE"]["warning"] += 1
-        
-        # Check document backlog > threshold
-        backlog_result = await self.db.execute(
-            select(
-                Document.administration_id,
-                func.count(Document.id)
-            )
-            .where(Document.administration_id.in_(client_ids))
-            .where(Document.status == DocumentStatus.NEEDS_REVIEW)
-            .group_by(Document.administration_id)
-            .having(func.count(Document.id) >= SLA_POLICY["backlog_warning_threshold"])
-        )
-        
-        backlog_violations = len(backlog_result.all())
-        if backlog_violations > 0:
-            violations["warning"] += backlog_violations
-            by_type.setdefault("BACKLOG_HIGH", {"critical": 0, "warning": 0})
-            by_type["BACKLOG_HIGH"]["warning"] = backlog_violations
+        violations = {"critical": 0, "warning": 0}
+        by_type = {}
+        for (violation_type, level, _), count in zip(checks, counts_result.one()):
+            if count:
+                violations[level] += count
+                by_type.setdefault(violation_type, {"critical": 0, "warning": 0})
+                by_type[violation_type][level] += count
         
         # Count escalation events created today
         today_start = datetime.combine(today, datetime.min.time()).replace(tzinfo=timezone.utc)
         escalation_count_result = await self.db.execute(
             select(func.count(EscalationEvent.id))
-            .where(EscalationEvent.administration_id.in_(client_ids))
+            .where(EscalationEvent.administration_id.in_(active_ids))
             .where(EscalationEvent.created_at >= today_start)
         )
         escalation_events_today = escalation_count_result.scalar() or 0
@@ -753,3 +974,62 @@ class SLAService:
         self.db.add(event)
         await self.db.commit()
         return event
+
+
+# ---------------------------------------------------------------------------
+# Session hooks
+# ---------------------------------------------------------------------------
+#
+# A flush that touches a client's issues, documents, periods, journal
+# entries or alerts flags its ClientReadinessCache row in the same
+# transaction, so the client's work items are rebuilt on the next read.
+# The validation engine deletes issues with a bulk DELETE but always writes
+# a ValidationRun, so it is caught too. Other bulk writes (Core INSERTs in
+# LedgerService.post_entries) call flag_work_items_outdated themselves.
+
+_SESSION_KEY = "work_items_flagged_administrations"
+
+_WATCHED_MODELS = (Document, ClientIssue, ValidationRun, AccountingPeriod, JournalEntry, Alert)
+
+
+def _flag_outdated_work_items(session: Session, flush_context) -> None:
+    touched: Set[uuid.UUID] = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, _WATCHED_MODELS):
+            administration_id = getattr(instance, "administration_id", None)
+            if administration_id is not None:
+                touched.add(administration_id)
+    # Renamed or deactivated clients
+    for instance in session.dirty:
+        if isinstance(instance, Administration):
+            touched.add(instance.id)
+    if touched:
+        flag_work_items_outdated(session, touched)
+
+
+def flag_work_items_outdated(session: Session, administration_ids) -> None:
+    """
+    Mark clients' work items for a rebuild in the current transaction.
+    
+    Called by the flush hook, and by writers whose bulk statements bypass
+    it; from an AsyncSession use ``await db.run_sync(flag_work_items_outdated, ids)``.
+    """
+    flagged: Set[uuid.UUID] = session.info.setdefault(_SESSION_KEY, set())
+    touched = set(administration_ids) - flagged
+    if touched:
+        cache = ClientReadinessCache.__table__
+        session.connection().execute(
+            cache.update()
+            .where(cache.c.administration_id.in_(touched))
+            .values(needs_refresh=True)
+        )
+        flagged |= touched
+
+
+def _forget_flagged(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+event.listen(Session, "after_flush", _flag_outdated_work_items)
+event.listen(Session, "after_commit", _forget_flagged)
+event.listen(Session, "after_rollback", _forget_flagged)
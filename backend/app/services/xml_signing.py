@@ -0,0 +1,293 @@
+"""
+XMLDSig Signing Primitives
+
+Pure functions that sign an XML document with an already loaded key. They
+do not touch the database or the certificate store, so the same code runs
+in the request path (SigningService.sign_xml) and in the worker processes
+used by SigningService.sign_many.
+
+This module deliberately imports only the standard library and
+cryptography: it is imported by freshly spawned worker processes.
+"""
+import hashlib
+from base64 import b64encode
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import xml.etree.ElementTree as ET
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+NS_DS = "http://www.w3.org/2000/09/xmldsig#"
+
+# Canonical XML 2.0 with TrimTextNodes: exactly what canonicalize_xml()
+# computes (ElementTree implements C14N 2.0, not C14N 1.0).
+C14N_ALGORITHM = "http://www.w3.org/2010/xml-c14n2"
+NS_C14N2 = C14N_ALGORITHM
+
+
+class SigningError(Exception):
+    """Base exception for signing operations."""
+    pass
+
+
+class SigningKey:
+    """
+    A decrypted private key with its certificate and the derived values
+    every signature needs (DER/base64 certificate, fingerprint, DNs).
+
+    The unencrypted PKCS#8 form of the key is only materialised when it has
+    to be shipped to a worker process, in a bytearray that ``wipe()``
+    overwrites with zeros.
+    """
+
+    __slots__ = (
+        "certificate",
+        "private_key",
+        "certificate_der",
+        "certificate_b64",
+        "fingerprint",
+        "subject",
+        "issuer",
+        "_private_der",
+    )
+
+    def __init__(self, certificate: x509.Certificate, private_key):
+        self.certificate = certificate
+        self.private_key = private_key
+        self.certificate_der = certificate.public_bytes(encoding=serialization.Encoding.DER)
+        self.certificate_b64 = b64encode(self.certificate_der).decode("utf-8")
+        self.fingerprint = hashlib.sha256(self.certificate_der).hexdigest()
+        self.subject = certificate.subject.rfc4514_string()
+        self.issuer = certificate.issuer.rfc4514_string()
+        self._private_der: Optional[bytearray] = None
+
+    @classmethod
+    def from_der(cls, private_der: bytes, certificate_der: bytes) -> "SigningKey":
+        """Rebuild a key from the DER blobs produced by ``private_key_der``."""
+        private_key = serialization.load_der_private_key(private_der, password=None)
+        return cls(x509.load_der_x509_certificate(certificate_der), private_key)
+
+    def private_key_der(self) -> bytearray:
+        """Unencrypted PKCS#8 DER of the private key (cached until wiped)."""
+        if self.private_key is None:
+            raise SigningError("Signing key has been wiped")
+        if self._private_der is None:
+            self._private_der = bytearray(self.private_key.private_bytes(
+                encoding=serialization.Encoding.DER,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption(),
+            ))
+        return self._private_der
+
+    def wipe(self) -> None:
+        """
+        Zero the serialized key material and drop the key object.
+
+        The OpenSSL key behind ``private_key`` is freed (and cleansed by
+        OpenSSL) once the last reference goes away; in-flight signatures
+        that already hold a reference are unaffected.
+        """
+        if self._private_der is not None:
+            for i in range(len(self._private_der)):
+                self._private_der[i] = 0
+            self._private_der = None
+        self.private_key = None
+
+    @property
+    def wiped(self) -> bool:
+        return self.private_key is None
+
+
+def canonicalize_xml(xml_content: str) -> str:
+    """
+    Canonicalize XML with C14N 2.0 and TrimTextNodes=true.
+
+    Runs directly on the serialized document in a single pass. The signature
+    declares this algorithm (see _add_c14n_method) so verifiers canonicalize
+    the same way.
+    """
+    return ET.canonicalize(xml_content, strip_text=True)
+
+
+def _add_c14n_method(parent: ET.Element, tag: str) -> None:
+    """Append a C14N 2.0 method element declaring the TrimTextNodes parameter."""
+    method = ET.SubElement(parent, f"{{{NS_DS}}}{tag}")
+    method.set('Algorithm', C14N_ALGORITHM)
+    trim = ET.SubElement(method, f"{{{NS_C14N2}}}TrimTextNodes")
+    trim.text = "true"
+
+
+def embed_signature(
+    root: ET.Element,
+    signature_b64: str,
+    digest_b64: str,
+    cert_b64: str,
+    signature_info: dict,
+) -> str:
+    """
+    Embed an XMLDSig <Signature> element into the document and serialize it.
+
+    Args:
+        root: Root element of XML tree (modified in place)
+        signature_b64: Base64-encoded signature value
+        digest_b64: Base64-encoded digest value
+        cert_b64: Base64-encoded certificate
+        signature_info: Signature metadata
+
+    Returns:
+        Signed XML as string
+    """
+    ET.register_namespace('ds', NS_DS)
+    ET.register_namespace('c14n2', NS_C14N2)
+
+    signature = ET.Element(f"{{{NS_DS}}}Signature")
+
+    # SignedInfo element
+    signed_info = ET.SubElement(signature, f"{{{NS_DS}}}SignedInfo")
+
+    # CanonicalizationMethod
+    _add_c14n_method(signed_info, "CanonicalizationMethod")
+
+    # SignatureMethod
+    sig_method = ET.SubElement(signed_info, f"{{{NS_DS}}}SignatureMethod")
+    sig_method.set('Algorithm', 'http://www.w3.org/2001/04/xmldsig-more#rsa-sha256')
+
+    # Reference
+    reference = ET.SubElement(signed_info, f"{{{NS_DS}}}Reference")
+    reference.set('URI', '')  # Empty URI means entire document
+
+    # Transforms
+    transforms = ET.SubElement(reference, f"{{{NS_DS}}}Transforms")
+    transform = ET.SubElement(transforms, f"{{{NS_DS}}}Transform")
+    transform.set('Algorithm', 'http://www.w3.org/2000/09/xmldsig#enveloped-signature')
+    _add_c14n_method(transforms, "Transform")
+
+    # DigestMethod
+    digest_method = ET.SubElement(reference, f"{{{NS_DS}}}DigestMethod")
+    digest_method.set('Algorithm', 'http://www.w3.org/2001/04/xmlenc#sha256')
+
+    # DigestValue
+    digest_value = ET.SubElement(reference, f"{{{NS_DS}}}DigestValue")
+    digest_value.text = digest_b64
+
+    # SignatureValue
+    sig_value = ET.SubElement(signature, f"{{{NS_DS}}}SignatureValue")
+    sig_value.text = signature_b64
+
+    # KeyInfo
+    key_info = ET.SubElement(signature, f"{{{NS_DS}}}KeyInfo")
+
+    # X509Data
+    x509_data = ET.SubElement(key_info, f"{{{NS_DS}}}X509Data")
+    x509_cert = ET.SubElement(x509_data, f"{{{NS_DS}}}X509Certificate")
+    x509_cert.text = cert_b64
+
+    # Add signature metadata as comment
+    signature_comment = ET.Comment(
+        f" Signature Info: "
+        f"Algorithm={signature_info['algorithm']}, "
+        f"Timestamp={signature_info['signature_timestamp']}, "
+        f"Fingerprint={signature_info['certificate_fingerprint']} "
+    )
+    signature.append(signature_comment)
+
+    # Append signature to root
+    root.append(signature)
+
+    # Convert to string with proper formatting
+    xml_str = ET.tostring(root, encoding='unicode', method='xml')
+
+    # Add XML declaration
+    if not xml_str.startswith('<?xml'):
+        xml_str = '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_str
+
+    return xml_str
+
+
+def sign_document(xml_content: str, key: SigningKey) -> Tuple[str, dict]:
+    """
+    Sign an XML document and embed the signature.
+
+    Returns:
+        Tuple of (signed_xml, signature_info)
+
+    Raises:
+        SigningError: If the XML is invalid or the key type is unsupported
+    """
+    try:
+        root = ET.fromstring(xml_content)
+    except ET.ParseError as e:
+        raise SigningError(f"Invalid XML content: {str(e)}")
+
+    canonical_xml = canonicalize_xml(xml_content)
+
+    # Compute digest (SHA256)
+    digest = hashlib.sha256(canonical_xml.encode('utf-8')).digest()
+    digest_b64 = b64encode(digest).decode('utf-8')
+
+    # Sign digest with private key
+    if isinstance(key.private_key, rsa.RSAPrivateKey):
+        signature = key.private_key.sign(digest, padding.PKCS1v15(), hashes.SHA256())
+    else:
+        raise SigningError(f"Unsupported key type: {type(key.private_key)}")
+
+    signature_b64 = b64encode(signature).decode('utf-8')
+
+    signature_info = {
+        'algorithm': 'RSA-SHA256',
+        'digest_method': 'SHA256',
+        'digest_value': digest_b64,
+        'signature_value': signature_b64,
+        'certificate_fingerprint': key.fingerprint,
+        'certificate_subject': key.subject,
+        'certificate_issuer': key.issuer,
+        'signature_timestamp': datetime.now(timezone.utc).isoformat(),
+    }
+
+    signed_xml = embed_signature(root, signature_b64, digest_b64, key.certificate_b64, signature_info)
+    return signed_xml, signature_info
+
+
+# Outcome of one batch item: (index, signed_xml, signature_info, error)
+SignOutcome = Tuple[int, Optional[str], Optional[dict], Optional[str]]
+
+
+def sign_items(items: List[Tuple[int, str, SigningKey]]) -> List[SignOutcome]:
+    """Sign a list of (index, xml_content, key) items, capturing per-item errors."""
+    outcomes: List[SignOutcome] = []
+    for index, xml_content, key in items:
+        try:
+            signed_xml, signature_info = sign_document(xml_content, key)
+            outcomes.append((index, signed_xml, signature_info, None))
+        except SigningError as e:
+            outcomes.append((index, None, None, str(e)))
+        except Exception as e:
+            outcomes.append((index, None, None, f"Failed to sign XML: {str(e)}"))
+    return outcomes
+
+
+def sign_chunk(
+    keys: Dict[str, Tuple[bytes, bytes]],
+    items: List[Tuple[int, str, str]],
+) -> List[SignOutcome]:
+    """
+    Worker-process entry point.
+
+    Keys are rebuilt once per chunk and dropped when it is done, so worker
+    processes never hold key material between batches.
+
+    Args:
+        keys: fingerprint -> (private key PKCS#8 DER, certificate DER)
+        items: (index, xml_content, fingerprint)
+    """
+    resolved = {
+        fingerprint: SigningKey.from_der(private_der, certificate_der)
+        for fingerprint, (private_der, certificate_der) in keys.items()
+    }
+    try:
+        return sign_items([(index, xml_content, resolved[fp]) for index, xml_content, fp in items])
+    finally:
+        for key in resolved.values():
+            key.wipe()
@@ -17,7 +17,7 @@ from sqlalchemy.pool import NullPool, StaticPool
 from sqlalchemy import select
 
 from app.main import app as fastapi_app
-from app.core.database import get_db, Base
+from app.core.database import get_db, get_read_db, Base
 from app.models.user import User
 from app.core.roles import UserRole
 from app.models.administration import Administration, AdministrationMember, MemberRole
@@ -241,6 +241,7 @@ async def async_client(
         yield db_session
     
     fastapi_app.dependency_overrides[get_db] = override_get_db
+    fastapi_app.dependency_overrides[get_read_db] = override_get_db
     
     async with AsyncClient(
         transport=ASGITransport(app=fastapi_app),
@@ -289,3 +290,20 @@ async def test_invoice_sent(
     await db_session.commit()
     await db_session.refresh(invoice)
     return invoice
+
+
+@pytest.fixture(scope="function")
+def query_budget(test_engine):
+    """Assert a per-block query budget against the test database.
+
+    Usage::
+
+        async def test_list_customers(async_client, auth_headers, query_budget):
+            with query_budget(max_queries=10, max_repeats=2):
+                await async_client.get("/api/v1/zzp/customers", headers=auth_headers)
+    """
+    from app.core.metrics import instrument_engine
+    from app.core.query_profiler import assert_query_budget
+
+    instrument_engine(test_engine)
+    return assert_query_budget
@@ -0,0 +1,41 @@
+"""
+Shared ORM factories for backend tests.
+
+Each factory returns an unsaved model with valid defaults; keyword
+arguments override or add columns. Add the result to the session yourself.
+"""
+import uuid
+from datetime import datetime, timezone
+
+from app.models.document import Document, DocumentStatus
+from app.models.issues import ClientIssue, IssueCode, IssueSeverity
+
+
+def make_document(administration_id, **fields) -> Document:
+    """A Document waiting for review, with a unique storage path."""
+    values = dict(
+        original_filename="factuur.pdf",
+        storage_path=f"/uploads/{uuid.uuid4()}.pdf",
+        mime_type="application/pdf",
+        file_size=1024,
+        status=DocumentStatus.NEEDS_REVIEW,
+    )
+    values.update(fields)
+    return Document(administration_id=administration_id, **values)
+
+
+def make_issue(
+    administration_id,
+    issue_code: str = IssueCode.JOURNAL_UNBALANCED,
+    severity: IssueSeverity = IssueSeverity.RED,
+    **fields,
+) -> ClientIssue:
+    """An unresolved ClientIssue titled after its code."""
+    values = dict(
+        title=issue_code,
+        description=issue_code,
+        is_resolved=False,
+        created_at=datetime.now(timezone.utc),
+    )
+    values.update(fields)
+    return ClientIssue(administration_id=administration_id, issue_code=issue_code, severity=severity, **values)
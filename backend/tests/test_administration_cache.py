@@ -0,0 +1,52 @@
+"""
+Tests for the per-administration result cache.
+
+Covers:
+- Results computed across an invalidation are not cached
+- TTL expiry and LRU eviction
+- Invalidation only drops the administration's own entries
+
+Commit-driven invalidation is covered by test_income_tax_aggregates.py and
+test_closing_checklist.py.
+"""
+from app.services.administration_cache import AdministrationCache
+
+
+def test_cache_refuses_results_computed_across_an_invalidation():
+    now = [0.0]
+    cache = AdministrationCache("test", ttl_seconds=60, max_entries=2, clock=lambda: now[0])
+
+    generation = cache.generation("admin")
+    cache.invalidate("admin")  # A write commits while the result is computed
+    assert cache.set("admin", "q1", "stale", generation) is False
+    assert cache.get("admin", "q1") is None
+
+    assert cache.set("admin", "q1", "fresh", cache.generation("admin"))
+    assert cache.get("admin", "q1") == "fresh"
+    now[0] = 61.0
+    assert cache.get("admin", "q1") is None
+
+    for period in ("q1", "q2", "q3"):
+        cache.set("admin", period, period, cache.generation("admin"))
+    assert len(cache) == 2
+    assert cache.get("admin", "q1") is None
+
+
+def test_invalidation_is_per_administration():
+    cache = AdministrationCache("test", ttl_seconds=60, max_entries=10)
+    cache.set("a", 2024, "a-2024", cache.generation("a"))
+    cache.set("a", 2025, "a-2025", cache.generation("a"))
+    cache.set("b", 2024, "b-2024", cache.generation("b"))
+
+    cache.invalidate("a")
+
+    assert cache.get("a", 2024) is None and cache.get("a", 2025) is None
+    assert cache.get("b", 2024) == "b-2024"
+    assert (cache.generation("a"), cache.generation("b")) == (1, 0)
+
+
+def test_disabled_cache_stores_nothing():
+    cache = AdministrationCache("test", ttl_seconds=0, max_entries=10)
+    assert cache.set("a", 2024, "value", cache.generation("a")) is False
+    assert len(cache) == 0
+
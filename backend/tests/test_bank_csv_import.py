@@ -0,0 +1,198 @@
+"""
+Tests for the streaming CSV bank import.
+
+Covers:
+- Column profile detection (dialect, columns, date format, decimal
+  separator) for generic and ING exports
+- Import through BankReconciliationService: signed amounts, audit rows,
+  profile stored on the bank account and reused for the next import
+- Duplicates within and across chunks; rows of another account
+- Benchmark converting a 1M-row export (opt-in, pytest -m benchmark)
+"""
+import csv
+import io
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.audit_log import AuditLog
+from app.models.bank import BankAccount, BankTransaction
+from app.services import bank_reconciliation
+from app.services.bank import csv_profile
+from app.services.bank.csv_profile import (
+    CsvColumnProfile,
+    CsvStatementReader,
+    detect_decimal_separator,
+    parse_any_amount,
+    parse_any_date,
+)
+from app.services.bank_reconciliation import BankReconciliationService
+
+ING_HEADER = '"Datum";"Naam / Omschrijving";"Rekening";"Tegenrekening";"Code";"Af Bij";"Bedrag (EUR)";"Mutatiesoort";"Mededelingen"\r\n'
+
+
+def _ing_row(i: int, account: str = "NL20INGB0001234567") -> str:
+    direction = "Af" if i % 2 else "Bij"
+    return (
+        f'"202401{1 + i % 28:02d}";"Klant {i}";"{account}";"NL86INGB000244{i:04d}";"OV";'
+        f'"{direction}";"{i},{i % 100:02d}";"Overschrijving";"Factuur {i}"\r\n'
+    )
+
+
+def _ing_export(rows) -> bytes:
+    return (ING_HEADER + "".join(rows)).encode("utf-8")
+
+
+@pytest.fixture
+def service(db_session, test_administration, test_user):
+    return BankReconciliationService(db_session, test_administration.id, test_user.id)
+
+
+def test_detects_ing_profile():
+    reader = CsvStatementReader(_ing_export(_ing_row(i) for i in range(1, 4)))
+
+    profile = reader.profile
+    assert profile.delimiter == ";"
+    assert profile.date_format == "%Y%m%d"
+    assert profile.decimal_separator == ","
+    assert profile.columns["description"] == "Mededelingen"
+    assert profile.columns["counterparty_name"] == "Naam / Omschrijving"
+    assert profile.columns["debit_credit"] == "Af Bij"
+    assert reader.infer_account_iban() == "NL20INGB0001234567"
+
+    convert = profile.compile()
+    first, second = (convert(row) for row in list(reader.rows())[:2])
+    assert (first.booking_date, first.amount) == (date(2024, 1, 2), Decimal("-1.01"))
+    assert (second.amount, second.counterparty_name) == (Decimal("2.02"), "Klant 2")
+
+    # Stored profiles round-trip and only apply to the same header row
+    stored = CsvColumnProfile.from_dict(profile.to_dict())
+    assert CsvStatementReader(_ing_export([_ing_row(5)]), stored).profile_reused is True
+    assert CsvStatementReader(b"Date,Amount,Description\n2024-01-15,10.00,Test\n", stored).profile_reused is False
+    assert CsvColumnProfile.from_dict({"unexpected": 1}) is None
+
+
+def test_profile_formats_with_flexible_fallback():
+    content = b"Date,Amount,Description\n15-01-2024,1.234,Jaaroverzicht\n16-01-2024,100,Rente\n2024-01-17,7,Afwijkend\n"
+    reader = CsvStatementReader(content)
+
+    assert reader.profile.date_format == "%d-%m-%Y"
+    # Only ambiguous amounts in the sample: every cell uses the flexible parser
+    assert reader.profile.decimal_separator is None
+    convert = reader.profile.compile()
+    rows = [convert(row) for row in reader.rows()]
+    assert [r.amount for r in rows] == [Decimal("1.234"), Decimal("100"), Decimal("7")]
+    assert rows[2].booking_date == date(2024, 1, 17)
+
+    assert detect_decimal_separator(["1.234,56", "12,5", "1,234.56"]) == ","
+    assert detect_decimal_separator(["1.234.567"]) == ","
+    assert detect_decimal_separator(["12.50", "1,000"]) == "."
+
+
+def test_amounts_in_the_other_separator_are_not_misread():
+    # Stored ING profile detected from dot decimals, reused for a comma export
+    dotted = ING_HEADER + '"20240102";"Klant";"NL20INGB0001234567";"";"OV";"Af";"12.50";"Overschrijving";"Factuur"\r\n'
+    stored = CsvColumnProfile.from_dict(CsvStatementReader(dotted.encode()).profile.to_dict())
+    assert stored.decimal_separator == "."
+
+    reader = CsvStatementReader(_ing_export([
+        '"20240103";"Klant";"NL20INGB0001234567";"";"OV";"Af";"12,50";"Overschrijving";"Factuur"\r\n',
+        '"20240104";"Klant";"NL20INGB0001234567";"";"OV";"Bij";"1,234.50";"Overschrijving";"Factuur"\r\n',
+    ]), stored)
+    assert reader.profile_reused is True
+    convert = reader.profile.compile()
+    assert [convert(row).amount for row in reader.rows()] == [Decimal("-12.50"), Decimal("1234.50")]
+
+    # Within one file: a "," profile and a row with a dot decimal
+    content = b"Date,Amount,Description\n2024-01-15,\"12,5\",A\n2024-01-16,\"1.234,56\",B\n2024-01-17,12.50,C\n"
+    reader = CsvStatementReader(content)
+    assert reader.profile.decimal_separator == ","
+    convert = reader.profile.compile()
+    assert [convert(row).amount for row in reader.rows()] == [Decimal("12.5"), Decimal("1234.56"), Decimal("12.50")]
+
+
+@pytest.mark.asyncio
+async def test_import_stores_and_reuses_profile(db_session, service):
+    rows = [_ing_row(i) for i in range(1, 6)]
+    result = await service.import_csv(_ing_export(rows), None, "ING")
+
+    assert (result.imported_count, result.skipped_duplicates_count, result.total_in_file) == (5, 0, 5)
+    account = await db_session.get(BankAccount, result.bank_account_id)
+    assert account.iban == "NL20INGB0001234567"
+    assert account.csv_profile["date_format"] == "%Y%m%d"
+
+    amounts = (await db_session.execute(
+        select(BankTransaction.amount).order_by(BankTransaction.booking_date)
+    )).scalars().all()
+    assert amounts == [Decimal("-1.01"), Decimal("2.02"), Decimal("-3.03"), Decimal("4.04"), Decimal("-5.05")]
+    audited = await db_session.scalar(
+        select(func.count(AuditLog.id)).where(AuditLog.entity_type == "bank_transaction")
+    )
+    assert audited == 5
+
+    # The next import of the same export reuses the stored profile
+    account.csv_profile = {**account.csv_profile, "date_format": None}
+    await db_session.commit()
+    again = await service.import_csv(_ing_export(rows + [_ing_row(6)]), "NL20 INGB 0001 2345 67", None)
+    assert (again.imported_count, again.skipped_duplicates_count) == (1, 5)
+    await db_session.refresh(account)
+    assert account.csv_profile["date_format"] is None  # Not re-detected
+
+
+@pytest.mark.asyncio
+async def test_duplicates_across_chunks_and_foreign_rows(db_session, service, monkeypatch):
+    monkeypatch.setattr(bank_reconciliation, "CSV_IMPORT_CHUNK_SIZE", 3)
+    monkeypatch.setattr(csv_profile, "SAMPLE_ROWS", 5)
+    rows = [_ing_row(i) for i in range(1, 8)]
+    rows.insert(4, _ing_row(2))  # Duplicate in a later chunk
+    rows.append(_ing_row(99, account="NL44RABO0123456789"))
+    rows.append('"2024-13-45";"X";"";"";"";"Af";"1,00";"";"Ongeldig"\r\n')
+
+    result = await service.import_csv(_ing_export(rows), None, None)
+
+    assert (result.imported_count, result.skipped_duplicates_count, result.total_in_file) == (7, 1, 10)
+    assert result.errors == [
+        "Rij 10: Andere rekening: NL44RABO0123456789",
+        "Rij 11: Ongeldige datum: 2024-13-45",
+    ]
+    assert await db_session.scalar(select(func.count(BankTransaction.id))) == 7
+
+    missing = await service.import_csv(b"Date,Amount,Description\n2024-01-15,10.00,Test\n", None, None)
+    assert missing.errors == ["Geen IBAN opgegeven en niet kunnen afleiden uit het bestand."]
+
+
+@pytest.mark.benchmark
+def test_conversion_benchmark_1m_rows(record_property):
+    """Compiled profile converter against per-cell format guessing on a 1M-row export."""
+    n = 1_000_000
+    content = ("Date,Amount,Description,Counterparty_Name\n" + "".join(
+        f"{1 + i % 28:02d}-{1 + i % 12:02d}-2024,\"{i % 5000}.{i % 100:02d}\",Betaling {i},Klant {i % 500}\n"
+        for i in range(n)
+    )).encode()
+
+    started = time.perf_counter()
+    reader = CsvStatementReader(content)
+    convert = reader.profile.compile()
+    total = Decimal("0")
+    count = 0
+    for row in reader.rows():
+        total += convert(row).amount
+        count += 1
+    streaming = time.perf_counter() - started
+
+    # Previous approach: DictReader over the decoded file, formats tried per cell
+    started = time.perf_counter()
+    baseline_total = Decimal("0")
+    for row in csv.DictReader(io.StringIO(content.decode("utf-8-sig"))):
+        parse_any_date(row["Date"])
+        baseline_total += parse_any_amount(row["Amount"])
+    baseline = time.perf_counter() - started
+
+    record_property("profile_rows_per_second", round(n / streaming))
+    record_property("per_cell_rows_per_second", round(n / baseline))
+    # Same amounts as the per-cell parser, row for row in aggregate
+    assert count == n
+    assert total == baseline_total
@@ -227,6 +227,145 @@ class TestMT940Parser:
         assert transactions[1].amount == Decimal("200.00")
         assert transactions[2].amount == Decimal("-50.00")
 
+    
+    def test_parse_multi_statement_bank_layouts(self):
+        """Several statements, ING/Rabobank structured :86: blocks and wrapped lines."""
+        parser = MT940Parser()
+        
+        mt940_content = b'''{1:F01INGBNL2AXXXX0000000000}{2:I940INGBNL2AXXXXN}{4:
+:20:INGEB
+:25:NL20INGB0001234567EUR
+:28C:1
+:60F:C231229EUR1000,00
+:61:2312290102C250,00NTRFEREF//00000001
+/TRCD/00100/
+:86:/EREF/INV-7//CNTP/NL86INGB0002445588/INGBNL2A/Acme B.V./AMSTERD
+AM//REMI/USTD//Factuur 2023/0042 december/
+:61:240103RD20,00NDDTNONREF//00000002
+:86:/EREF/NOTPROVIDED//REMI/STRD/CUR/1234567890123456/
+:62F:C240103EUR1230,00
+-}
+:20:RABO
+:25:NL44RABO0123456789
+:28C:2
+:60F:C240110EUR500,00
+:61:240110D75,50NMSCNONREF//REF-9
+:86:Geldautomaat Utrecht
+pas 123
+:62F:C240110EUR424,50
+-'''
+        
+        assert parser.can_parse(mt940_content, "ing.sta") is True
+        transactions, account_iban = parser.parse(mt940_content)
+        
+        assert account_iban == "NL20INGB0001234567"
+        assert [tx.amount for tx in transactions] == [Decimal("250.00"), Decimal("20.00"), Decimal("-75.50")]
+        
+        ing, reversal, cash = transactions
+        assert (ing.value_date, ing.booking_date) == (date(2023, 12, 29), date(2024, 1, 2))
+        assert ing.counterparty_name == "Acme B.V."
+        assert ing.counterparty_iban == "NL86INGB0002445588"
+        assert ing.counterparty_bic == "INGBNL2A"
+        assert ing.description == "Factuur 2023/0042 december / INV-7"
+        assert ing.reference == "00000001"
+        
+        # RD reverses a debit; a structured creditor reference is the description
+        assert reversal.description == "1234567890123456"
+        assert reversal.counterparty_name is None
+        
+        assert cash.description == "Geldautomaat Utrecht pas 123"
+        assert cash.booking_date == date(2024, 1, 10)
+    
+    def test_iter_records_and_lazy_transactions(self):
+        """The tokenizer emits tag/value records; transactions are built while reading."""
+        parser = MT940Parser()
+        content = b''':20:S1\r\n:25:NL91ABNA0417164300\r\n:61:2401150115C1,00NTRFNONREF//A\r\n:86:/REMI/Een\r\n
+:61:2401150115C2,00NTRFNONREF//B\r\n:86:/REMI/Twee\r\n:62F:C240115EUR3,00\r\n'''
+        
+        records = list(parser.iter_records(content))
+        assert records[:3] == [("20", "S1"), ("25", "NL91ABNA0417164300"), ("61", "2401150115C1,00NTRFNONREF//A")]
+        assert [tag for tag, _ in records] == ["20", "25", "61", "86", "61", "86", "62F"]
+        
+        stream = parser.iter_transactions(content)
+        first = next(stream)
+        assert (first.reference, first.description) == ("A", "Een")
+        assert parser.account_iban == "NL91ABNA0417164300"
+        assert [tx.reference for tx in stream] == ["B"]
+    
+    def test_wrapped_information_keeps_the_space_at_the_wrap(self):
+        """:86: lines wrapped after a space rejoin with that space."""
+        parser = MT940Parser()
+        content = (
+            b":20:S1\r\n:25:NL91ABNA0417164300\r\n"
+            b":61:2401150115D12,50NTRFNONREF//A\r\n"
+            b":86:/NAME/Jan \r\n de Vries/REMI/Factuur 7 voor \r\nconsultancy/EREF/E2E-\r\n7\r\n"
+            b":61:2401150115C3,00NTRFNONREF//B\r\n"
+            b":86:Betaling voor \r\n  consultancy \r\n"
+            b":62F:C240115EUR0,00\r\n"
+        )
+        
+        assert dict(parser.iter_records(content))["86"] == "Betaling voor \n  consultancy "
+        structured, free_text = parser.parse(content)[0]
+        assert structured.counterparty_name == "Jan de Vries"
+        assert structured.description == "Factuur 7 voor consultancy / E2E-7"
+        assert free_text.description == "Betaling voor consultancy"
+    
+    def test_continuation_starting_with_dash_is_not_a_separator(self):
+        """Only "-"/"-}" lines and block headers close a record."""
+        parser = MT940Parser()
+        content = (
+            b"{1:F01ABNANL2AXXXX0000000000}{2:I940ABNANL2AXXXXN}{4:\r\n"
+            b":20:S1\r\n:25:NL91ABNA0417164300\r\n"
+            b":61:2401150115D12,50NTRFNONREF//A\r\n"
+            b":86:Korting\r\n-10% op factuur 7\r\n{ref 7}\r\n"
+            b"-}\r\n"
+            b":61:2401150115C3,00NTRFNONREF//B\r\n"
+        )
+        
+        records = list(parser.iter_records(content))
+        assert ("86", "Korting\n-10% op factuur 7\n{ref 7}") in records
+        assert records[-1] == ("61", "2401150115C3,00NTRFNONREF//B")
+        transaction = parser.parse(content)[0][0]
+        assert transaction.description == "Korting -10% op factuur 7 {ref 7}"
+    
+    @pytest.mark.benchmark
+    def test_throughput_benchmark_multi_account(self, record_property):
+        """Lines per second on a generated file with many accounts."""
+        import time
+        
+        accounts, per_account = 20, 5_000
+        statements = []
+        for account in range(accounts):
+            lines = [
+                f":20:STMT-{account}",
+                f":25:NL{10 + account:02d}ABNA{account:010d}",
+                ":28C:1/1",
+                ":60F:C240101EUR1000,00",
+            ]
+            for i in range(account * per_account, (account + 1) * per_account):
+                mark = "D" if i % 3 == 0 else "C"
+                day = f"{1 + i % 12:02d}{1 + i % 28:02d}"
+                lines.append(f":61:24{day}{day}{mark}{i % 1000},{i % 100:02d}NTRFNONREF//B{i}")
+                lines.append(
+                    f":86:/TRTP/SEPA OVERBOEKING/IBAN/NL{10 + i % 89:02d}RABO{i:010d}/BIC/RABONL2U"
+                    f"/NAME/Klant {i % 500}/REMI/Factuur {i}/EREF/E2E-{i}"
+                )
+            lines += [":62F:C241231EUR2000,00", "-"]
+            statements.append("\r\n".join(lines) + "\r\n")
+        content = "".join(statements).encode()
+        line_count = content.count(b"\n")
+        
+        parser = MT940Parser()
+        started = time.perf_counter()
+        transactions, account_iban = parser.parse(content)
+        elapsed = time.perf_counter() - started
+        
+        record_property("lines_per_second", round(line_count / elapsed))
+        assert len(transactions) == accounts * per_account
+        assert account_iban == "NL10ABNA0000000000"
+        last = transactions[-1]
+        assert (last.counterparty_name, last.description) == ("Klant 499", "Factuur 99999 / E2E-99999")
+        assert transactions[3].amount == Decimal("-3.03")
 
 class TestParsedTransaction:
     """Tests for ParsedTransaction dataclass."""
@@ -254,3 +393,138 @@ class TestParsedTransaction:
         )
         
         assert tx.counterparty_bic == "ABNANL2A"
+
+
+CAMT_HEADER = b'''<?xml version="1.0" encoding="UTF-8"?>
+<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.08">
+<BkToCstmrStmt><Stmt><Id>STMT-1</Id>
+<Acct><Id><IBAN>NL91ABNA0417164300</IBAN></Id></Acct>
+'''
+CAMT_FOOTER = b'</Stmt></BkToCstmrStmt></Document>'
+
+
+def _camt_entry(i: int) -> bytes:
+    return (
+        f'<Ntry><NtryRef>{i}</NtryRef><Amt Ccy="EUR">{i % 1000}.{i % 100:02d}</Amt>'
+        f'<CdtDbtInd>{"DBIT" if i % 3 == 0 else "CRDT"}</CdtDbtInd><Sts><Cd>BOOK</Cd></Sts>'
+        f'<BookgDt><Dt>2024-{1 + i % 12:02d}-{1 + i % 28:02d}</Dt></BookgDt>'
+        f'<NtryDtls><TxDtls><Refs><EndToEndId>E2E-{i}</EndToEndId></Refs>'
+        f'<RltdPties><Dbtr><Nm>Klant {i % 500}</Nm></Dbtr></RltdPties>'
+        f'<RmtInf><Ustrd>Factuur {i}</Ustrd></RmtInf></TxDtls></NtryDtls></Ntry>\n'
+    ).encode()
+
+
+class TestCAMT053Streaming:
+    """Tests for the iterparse-based CAMT.053 reader."""
+    
+    def test_batch_booked_entry_yields_each_transaction(self):
+        """An entry with several TxDtls becomes one transaction per TxDtls."""
+        parser = CAMT053Parser()
+        batch = b'''<Ntry><NtryRef>BATCH-7</NtryRef><Amt Ccy="EUR">150.00</Amt><CdtDbtInd>DBIT</CdtDbtInd>
+<BookgDt><Dt>2024-03-01</Dt></BookgDt><ValDt><Dt>2024-03-02</Dt></ValDt>
+<AddtlNtryInf>Batch payment</AddtlNtryInf>
+<NtryDtls>
+  <Btch><NbOfTxs>2</NbOfTxs></Btch>
+  <TxDtls><Refs><EndToEndId>SAL-1</EndToEndId></Refs><Amt Ccy="EUR">100.00</Amt>
+    <RltdPties><Cdtr><Nm>Jan Jansen</Nm></Cdtr><CdtrAcct><Id><IBAN>NL02 RABO 0123 4567 89</IBAN></Id></CdtrAcct></RltdPties>
+    <RmtInf><Ustrd>Salaris maart</Ustrd></RmtInf></TxDtls>
+  <TxDtls><Refs><AcctSvcrRef>SVC-2</AcctSvcrRef></Refs><AmtDtls><TxAmt><Amt Ccy="EUR">50.00</Amt></TxAmt></AmtDtls>
+    <RltdPties><Cdtr><Nm>Piet Pietersen</Nm></Cdtr></RltdPties></TxDtls>
+</NtryDtls></Ntry>
+'''
+        transactions, iban = parser.parse(CAMT_HEADER + batch + _camt_entry(8) + CAMT_FOOTER)
+        
+        assert iban == "NL91ABNA0417164300"
+        assert [tx.amount for tx in transactions] == [Decimal("-100.00"), Decimal("-50.00"), Decimal("8.08")]
+        first, second, single = transactions
+        assert (first.counterparty_name, first.counterparty_iban) == ("Jan Jansen", "NL02RABO0123456789")
+        assert first.description == "Salaris maart"
+        assert first.reference == "SAL-1"
+        assert first.transaction_id == "BATCH-7/1"
+        assert first.value_date == date(2024, 3, 2)
+        assert second.description == "Batch payment"
+        assert second.transaction_id == "SVC-2"
+        assert single.reference == "E2E-8"
+    
+    def test_detects_namespace_from_first_bytes(self):
+        """Format detection does not need the whole file."""
+        parser = CAMT053Parser()
+        truncated = CAMT_HEADER + _camt_entry(1)[:40]  # Not well-formed
+        
+        assert parser.detect_namespace(truncated) == "urn:iso:std:iso:20022:tech:xsd:camt.053.001.08"
+        assert parser.can_parse(truncated, "export.dat") is True
+        assert parser.can_parse(b'<?xml version="1.0"?><Document xmlns="urn:iso:std:iso:20022:tech:xsd:pain.001.001.03"/>') is False
+        with pytest.raises(ValueError, match="Invalid XML"):
+            parser.parse(truncated)
+    
+    def test_yields_lazily_and_drops_processed_entries(self):
+        """Transactions are produced while reading; processed entries leave the tree."""
+        parser = CAMT053Parser()
+        source = CAMT_HEADER + b"".join(_camt_entry(i) for i in range(1, 6)) + CAMT_FOOTER
+        
+        stream = parser.iter_transactions(source)
+        first = next(stream)
+        assert first.transaction_id == "1"
+        assert parser.account_iban == "NL91ABNA0417164300"
+        assert [tx.transaction_id for tx in stream] == ["2", "3", "4", "5"]
+    
+    @pytest.mark.benchmark
+    def test_streaming_benchmark_bounded_memory(self, tmp_path, record_property):
+        """500k entries are parsed from a file with bounded peak memory."""
+        import json
+        import subprocess
+        import sys
+        from pathlib import Path
+        
+        n = 500_000
+        path = tmp_path / "year_export.xml"
+        with open(path, "wb") as f:
+            f.write(CAMT_HEADER)
+            for start in range(0, n, 10_000):
+                f.write(b"".join(_camt_entry(i) for i in range(start, start + 10_000)))
+            f.write(CAMT_FOOTER)
+        size_mb = path.stat().st_size / 1e6
+        
+        # Parse in a fresh interpreter so its peak RSS reflects only the parser
+        script = """
+import json, resource, sys, time
+from app.services.bank.parsers.camt_parser import CAMT053Parser
+
+def peak_rss_mb():
+    # VmHWM starts afresh at exec; ru_maxrss may carry the forking parent's peak
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+parser = CAMT053Parser()
+started = time.perf_counter()
+count = 0
+with open(sys.argv[1], "rb") as f:
+    for tx in parser.iter_transactions(f):
+        count += 1
+print(json.dumps({
+    "count": count,
+    "iban": parser.account_iban,
+    "seconds": time.perf_counter() - started,
+    "peak_rss_mb": peak_rss_mb(),
+}))
+"""
+        backend_dir = Path(__file__).resolve().parents[1]
+        completed = subprocess.run(
+            [sys.executable, "-c", script, str(path)],
+            cwd=backend_dir, capture_output=True, text=True, check=True,
+        )
+        stats = json.loads(completed.stdout.strip().splitlines()[-1])
+        
+        record_property("file_mb", round(size_mb))
+        record_property("seconds", round(stats["seconds"], 1))
+        record_property("peak_rss_mb", round(stats["peak_rss_mb"]))
+        assert stats["count"] == n
+        assert stats["iban"] == "NL91ABNA0417164300"
+        # Memory does not grow with the file: interpreter plus a small working set
+        assert stats["peak_rss_mb"] < min(100, size_mb / 2)
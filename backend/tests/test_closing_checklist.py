@@ -0,0 +1,137 @@
+"""
+Tests for the closing checklist service.
+
+Covers:
+- Document and issue counts come from one aggregate query and produce the
+  expected checklist items
+- The period and issue counts are cached per (administration, period)
+  and invalidated when issues or the period are committed; document
+  counts are always read, so worker status updates show up at once
+"""
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+from app.models.administration import Administration
+from app.models.document import DocumentStatus
+from app.models.issues import IssueCode, IssueSeverity
+from app.models.ledger import AccountingPeriod, PeriodStatus
+from app.services.documents import ClosingChecklistService
+from app.services.documents.checklist_cache import closing_checklist_cache
+from tests.factories import make_document, make_issue
+
+
+@pytest.fixture
+async def quarter(db_session, test_administration):
+    admin_id = test_administration.id
+    other = Administration(name="Andere B.V.", is_active=True)
+    db_session.add(other)
+    await db_session.flush()
+
+    period = AccountingPeriod(
+        administration_id=admin_id,
+        name="2026-Q1",
+        period_type="QUARTER",
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 3, 31),
+    )
+    in_period = datetime(2026, 2, 10, 12, 0)
+    db_session.add_all([
+        period,
+        make_document(admin_id, status=DocumentStatus.POSTED, created_at=in_period),
+        make_document(admin_id, status=DocumentStatus.REJECTED, created_at=in_period),
+        make_document(admin_id, status=DocumentStatus.NEEDS_REVIEW, created_at=in_period),
+        make_document(admin_id, status=DocumentStatus.UPLOADED, created_at=datetime(2026, 3, 31, 23, 59)),
+        make_document(admin_id, status=DocumentStatus.UPLOADED, created_at=datetime(2026, 4, 1, 9, 0)),  # Next quarter
+        make_issue(admin_id, IssueCode.VAT_NEGATIVE, IssueSeverity.RED),
+        make_issue(admin_id, IssueCode.AR_RECON_MISMATCH, IssueSeverity.RED, is_resolved=True),
+        make_issue(admin_id, IssueCode.DEPRECIATION_NOT_POSTED, IssueSeverity.YELLOW),
+        make_issue(admin_id, IssueCode.OVERDUE_RECEIVABLE, IssueSeverity.YELLOW),
+        make_issue(other.id, IssueCode.AP_RECON_MISMATCH, IssueSeverity.RED),
+    ])
+    await db_session.commit()
+    return period
+
+
+@pytest.mark.asyncio
+async def test_checklist_from_one_aggregate_query(db_session, test_administration, quarter, query_budget):
+    service = ClosingChecklistService(db_session, test_administration.id)
+
+    # Period lookup plus one aggregate for documents and issues
+    with query_budget(max_queries=2):
+        checklist = await service.get_checklist(quarter.id, administration_name="Test B.V.")
+
+    assert checklist.client_name == "Test B.V."
+    assert checklist.period_name == "2026-Q1"
+    assert checklist.period_status == "OPEN"
+    assert checklist.documents_posted_percent == Decimal("50.0")
+    assert checklist.documents_pending_review == 1
+    assert (checklist.red_issues_count, checklist.yellow_issues_count) == (1, 2)
+    assert checklist.unacknowledged_yellow_count == 2
+
+    items = {item.name: item for item in checklist.items}
+    assert items["Documents Posted"].status == "WARNING"
+    assert items["Documents Posted"].value == "2/4 (50.0%)"
+    assert items["Critical Issues"].status == "FAILED"
+    assert items["Warning Issues"].status == "WARNING"
+    assert items["VAT Report Ready"].status == "FAILED"
+    assert items["AR Reconciled"].status == "PASSED"
+    assert items["AP Reconciled"].status == "PASSED"  # Only the other client has one
+    assert items["Asset Schedules Consistent"].status == "WARNING"
+    assert (checklist.blocking_items, checklist.warning_items) == (2, 3)
+    assert checklist.can_finalize is False
+    assert checklist.vat_report_ready is False
+    assert checklist.ar_reconciled and checklist.ap_reconciled
+    assert checklist.assets_consistent is False
+
+
+@pytest.mark.asyncio
+async def test_unknown_period_raises(db_session, test_administration):
+    service = ClosingChecklistService(db_session, test_administration.id)
+    with pytest.raises(ValueError):
+        await service.get_checklist(uuid.uuid4())
+
+
+@pytest.mark.asyncio
+async def test_cached_checklist_is_invalidated_on_commit(db_session, test_administration, quarter, query_budget):
+    admin_id = test_administration.id
+    service = ClosingChecklistService(db_session, admin_id)
+    first = await service.get_checklist(quarter.id, administration_name="Test B.V.")
+
+    # Cached period and issue counts; documents are always counted
+    with query_budget(max_queries=1):
+        cached = await service.get_checklist(quarter.id, administration_name="Renamed B.V.")
+    assert cached.client_name == "Renamed B.V."
+    assert cached.items == first.items
+
+    # The worker moves documents along with plain SQL, bypassing the session hooks
+    await db_session.execute(
+        text("UPDATE documents SET status = 'FAILED' WHERE status = 'NEEDS_REVIEW'")
+    )
+    await db_session.commit()
+    failed = await service.get_checklist(quarter.id)
+    assert (failed.documents_pending_review, failed.red_issues_count) == (0, 1)
+
+    # A new issue drops the cached checklist
+    vat_issue = make_issue(admin_id, IssueCode.VAT_NEGATIVE, IssueSeverity.RED)
+    db_session.add(vat_issue)
+    await db_session.commit()
+    assert (await service.get_checklist(quarter.id)).red_issues_count == 2
+
+    # A posted document and a period status change are picked up as well
+    db_session.add(make_document(admin_id, status=DocumentStatus.POSTED, created_at=datetime(2026, 1, 5, 8, 0)))
+    await db_session.commit()
+    assert (await service.get_checklist(quarter.id)).documents_posted_percent == Decimal("60.0")
+
+    quarter.status = PeriodStatus.REVIEW
+    await db_session.commit()
+    assert (await service.get_checklist(quarter.id)).period_status == "REVIEW"
+
+    # Other clients' writes leave the cache alone
+    other_admin = uuid.uuid4()
+    closing_checklist_cache.invalidate(other_admin)
+    with query_budget(max_queries=1):
+        await service.get_checklist(quarter.id)
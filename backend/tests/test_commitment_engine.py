@@ -0,0 +1,242 @@
+"""
+Tests for the commitment engine.
+
+Covers:
+- Name normalization and the trigram name index
+- Recurring payment detection over a long bank history (interval
+  clustering per payee and amount)
+- Cash-flow projection and single computation of next due dates per
+  overview request
+- Bank matching against commitments through the shared name index, with
+  commitments loaded once per engine
+"""
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+from app.models.bank import BankAccount, BankTransaction, BankTransactionStatus
+from app.models.financial_commitment import CommitmentStatus, CommitmentType, FinancialCommitment, RecurringFrequency
+from app.services import commitment_engine
+from app.services.bank_matching_engine import BankMatchingEngine
+from app.services.commitment_engine import (
+    NameIndex,
+    PaymentRecord,
+    add_months,
+    build_schedules,
+    detect_recurring_payments,
+    name_similarity,
+    normalize_name,
+    project_cash_flow,
+)
+
+
+def _commitment(**overrides):
+    values = dict(
+        id=uuid.uuid4(),
+        administration_id=uuid.uuid4(),
+        type=CommitmentType.SUBSCRIPTION,
+        name="Abonnement",
+        amount_cents=1000,
+        monthly_payment_cents=None,
+        recurring_frequency=RecurringFrequency.MONTHLY,
+        start_date=date(2026, 1, 1),
+        end_date=None,
+        contract_term_months=None,
+        renewal_date=None,
+        payment_day=None,
+        last_booked_date=None,
+        provider=None,
+        status=CommitmentStatus.ACTIVE,
+    )
+    values.update(overrides)
+    return FinancialCommitment(**values)
+
+
+def _monthly(payee, start, count, amount_cents, day_jitter=()):
+    records = []
+    for i in range(count):
+        booking = add_months(start, i) + timedelta(days=day_jitter[i % len(day_jitter)] if day_jitter else 0)
+        records.append(PaymentRecord(id=f"{payee}-{i}", booking_date=booking, amount_cents=amount_cents, payee=payee))
+    return records
+
+
+def test_normalize_name_drops_noise():
+    assert normalize_name("Spotify AB") == ("spotify",)
+    assert normalize_name("SEPA Incasso: KPN B.V. 12345678") == ("kpn",)
+    assert normalize_name("Café Señor") == ("cafe", "senor")
+    assert normalize_name(None) == ()
+
+
+def test_name_index_search_scores_only_shared_trigrams():
+    index = NameIndex()
+    index.add("spotify", "Spotify")
+    index.add("kpn", "KPN Mobiel")
+    index.add("adobe", "Adobe Systems")
+
+    matches = index.search("SPOTIFY AB STOCKHOLM", min_score=0.5)
+    assert [key for key, _ in matches] == ["spotify"]
+    assert index.search("Albert Heijn", min_score=0.5) == []
+    assert name_similarity("Adobe Systems Software", "ADOBE SYSTEMS") > 0.7
+
+
+def test_detects_recurring_payments_across_full_history():
+    today = date(2026, 10, 18)
+    payments = (
+        # Monthly over two years with the usual booking-day jitter and a price increase
+        _monthly("Spotify AB", date(2024, 11, 5), 12, 1099, day_jitter=(0, 1, -1, 2))
+        + _monthly("Spotify AB", date(2025, 11, 5), 12, 1199, day_jitter=(0, 2))
+        # Yearly insurance premium
+        + [PaymentRecord(f"ins-{y}", date(y, 3, 1), 48000, "Centraal Beheer") for y in (2023, 2024, 2025, 2026)]
+        # Same payee, irregular amounts and dates: groceries, not a subscription
+        + [
+            PaymentRecord("ah-1", date(2026, 1, 3), 4520, "Albert Heijn 1234"),
+            PaymentRecord("ah-2", date(2026, 1, 9), 1210, "Albert Heijn 1234"),
+            PaymentRecord("ah-3", date(2026, 2, 27), 8030, "Albert Heijn 5678"),
+        ]
+        # A subscription that was cancelled long ago
+        + _monthly("Netflix", date(2023, 1, 10), 6, 1399)
+    )
+
+    detected = {(r.payee_key, r.cadence): r for r in detect_recurring_payments(payments, today)}
+
+    spotify = detected[("spotify", "monthly")]
+    assert len(spotify.payments) == 24
+    assert spotify.latest.booking_date >= date(2026, 10, 5)
+    assert spotify.next_expected_date.month == 11
+    assert spotify.confidence == 0.95
+
+    insurance = detected[("centraal beheer", "yearly")]
+    assert insurance.amount_cents == 48000
+    assert insurance.next_expected_date == date(2027, 3, 1)
+
+    assert not any(key == "albert heijn" for key, _ in detected)
+
+    netflix = detected[("netflix", "monthly")]
+    assert netflix.confidence < spotify.confidence
+
+
+def test_projection_follows_frequency_and_end_dates():
+    today = date(2026, 10, 18)
+    items = [
+        _commitment(type=CommitmentType.LEASE, amount_cents=50000, monthly_payment_cents=50000,
+                    payment_day=25, end_date=date(2027, 1, 31)),
+        _commitment(amount_cents=12000, recurring_frequency=RecurringFrequency.YEARLY,
+                    renewal_date=date(2026, 12, 1)),
+        _commitment(amount_cents=999, payment_day=1),
+        _commitment(amount_cents=5000, status=CommitmentStatus.PAUSED),
+    ]
+
+    projection = project_cash_flow(build_schedules(items, today), today, months=5)
+
+    assert [(m.year, m.month) for m in projection] == [(2026, 10), (2026, 11), (2026, 12), (2027, 1), (2027, 2)]
+    assert [m.by_type["lease"] for m in projection] == [50000, 50000, 50000, 50000, 0]
+    assert [m.by_type["subscription"] for m in projection] == [0, 999, 999 + 12000, 999, 999]
+    assert projection[2].payment_count == 3
+
+
+@pytest.mark.asyncio
+async def test_overview_computes_next_due_date_once_per_commitment(async_client, auth_headers):
+    for i in range(4):
+        response = await async_client.post("/api/v1/zzp/commitments", headers=auth_headers, json={
+            "type": "subscription",
+            "name": f"Tool {i}",
+            "amount_cents": 1500,
+            "recurring_frequency": "monthly",
+            "start_date": "2025-01-01",
+            "payment_day": 28,
+        })
+        assert response.status_code == 201
+
+    calls = []
+    original = commitment_engine.compute_next_due_date
+
+    def counting(*args, **kwargs):
+        calls.append(args[0].id)
+        return original(*args, **kwargs)
+
+    with patch.object(commitment_engine, "compute_next_due_date", side_effect=counting):
+        response = await async_client.get(
+            "/api/v1/zzp/commitments/overview/summary", params={"months": 3}, headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(calls) == 4
+    assert data["monthly_total_cents"] == 6000
+    # The current month depends on whether the 28th has passed already
+    assert [m["total_cents"] for m in data["projection"]][1:] == [6000, 6000]
+
+
+@pytest.mark.asyncio
+async def test_suggestions_skip_tracked_commitments(async_client, auth_headers, db_session, test_administration):
+    account = BankAccount(administration_id=test_administration.id, iban="NL11TEST0123456780", bank_name="Test", currency="EUR")
+    db_session.add(account)
+    await db_session.flush()
+    for i, payee in enumerate(["Spotify AB", "KPN B.V."] * 4):
+        booking = add_months(date(2025, 1, 5), i // 2)
+        db_session.add(BankTransaction(
+            administration_id=test_administration.id,
+            bank_account_id=account.id,
+            booking_date=booking,
+            amount=Decimal("-10.99") if payee.startswith("Spotify") else Decimal("-35.00"),
+            currency="EUR",
+            counterparty_name=payee,
+            description=payee,
+            import_hash=f"{payee}-{i}",
+            status=BankTransactionStatus.NEW,
+        ))
+    db_session.add(_commitment(administration_id=test_administration.id, name="Mobiel", provider="KPN", amount_cents=3500))
+    await db_session.commit()
+
+    response = await async_client.get("/api/v1/zzp/commitments/subscriptions/suggestions", headers=auth_headers)
+
+    suggestions = response.json()["suggestions"]
+    assert [s["description"] for s in suggestions] == ["Spotify AB"]
+    assert suggestions[0]["cadence"] == "monthly"
+    assert suggestions[0]["occurrences"] == 4
+    assert suggestions[0]["amount_cents"] == 1099
+
+
+@pytest.mark.asyncio
+async def test_bank_matching_uses_commitment_index(db_session, test_administration):
+    admin_id = test_administration.id
+    db_session.add_all([
+        _commitment(administration_id=admin_id, name="Spotify", provider="Spotify", amount_cents=1099),
+        _commitment(administration_id=admin_id, name="Huur", provider="Vastgoed Beheer", amount_cents=120000),
+    ] + [
+        _commitment(administration_id=admin_id, name=f"Tool {i}", provider=f"Leverancier {i}", amount_cents=2000 + i)
+        for i in range(50)
+    ])
+    await db_session.commit()
+
+    engine = BankMatchingEngine(db_session, admin_id)
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if "financial_commitments" in statement:
+            statements.append(statement)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", before_execute)
+    try:
+        spotify = await engine._match_commitments(
+            BankTransaction(amount=Decimal("-10.99"), counterparty_name="SPOTIFY AB", description="Spotify")
+        )
+        rent = await engine._match_commitments(
+            BankTransaction(amount=Decimal("-1200.00"), counterparty_name="Onbekend", description="Huur")
+        )
+        nothing = await engine._match_commitments(
+            BankTransaction(amount=Decimal("-3.50"), counterparty_name="Bakker", description="Brood")
+        )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_execute)
+
+    assert len(statements) == 1
+    assert len(spotify) == 1 and spotify[0]["confidence_score"] == 75
+    assert "Leverancier lijkt op 'Spotify'" in spotify[0]["reason"]
+    assert len(rent) == 1 and rent[0]["confidence_score"] == 45
+    assert nothing == []
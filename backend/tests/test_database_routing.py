@@ -0,0 +1,167 @@
+"""
+Tests for connection pool options and read-replica routing in core/database.py.
+
+Covers:
+- Pool sizing / pre-ping / statement timeout options per database URL
+- ReplicaHealth lag threshold, probe caching and failure fallback
+- get_read_db routes to the replica when healthy and to the primary otherwise
+- db_with_statement_timeout dependency factory; timeouts that differ from the
+  connection default are applied once per transaction with SET LOCAL
+- Read-only endpoints are wired to get_read_db
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core import database
+from app.core.database import (
+    ReplicaHealth,
+    _engine_options,
+    _set_local_statement_timeout,
+    db_with_statement_timeout,
+    get_read_db,
+)
+
+
+def test_engine_options_for_postgres_and_sqlite():
+    pg = _engine_options("postgresql+asyncpg://u:p@db/app", statement_timeout_ms=15000)
+    assert pg["pool_size"] == database.settings.DB_POOL_SIZE
+    assert pg["max_overflow"] == database.settings.DB_MAX_OVERFLOW
+    assert pg["pool_pre_ping"] is True
+    assert pg["connect_args"] == {"server_settings": {"statement_timeout": "15000"}}
+
+    no_timeout = _engine_options("postgresql+asyncpg://u:p@db/app", statement_timeout_ms=0)
+    assert "connect_args" not in no_timeout
+
+    lite = _engine_options("sqlite+aiosqlite:///:memory:", statement_timeout_ms=15000)
+    assert "pool_size" not in lite
+    assert "connect_args" not in lite
+
+
+class _FakeHealth(ReplicaHealth):
+    def __init__(self, lags, **kwargs):
+        super().__init__(**kwargs)
+        self.lags = list(lags)
+        self.probes = 0
+
+    async def _probe(self, replica_engine):
+        self.probes += 1
+        return self.lags.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_replica_health_threshold_and_caching():
+    health = _FakeHealth([1.0, 120.0, None], max_lag_seconds=30, check_interval_seconds=3600)
+    assert await health.is_usable(object()) is True
+    # Cached within the check interval: no second probe
+    assert await health.is_usable(object()) is True
+    assert health.probes == 1
+
+    health.check_interval_seconds = 0
+    assert await health.is_usable(object()) is False  # lagging
+    assert health.last_lag_seconds == 120.0
+    assert await health.is_usable(object()) is False  # probe failed
+    assert health.probes == 3
+
+
+def _sqlite_maker(name: str):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _label(engine, value: str) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE node (name TEXT)"))
+        await conn.execute(text("INSERT INTO node VALUES (:v)"), {"v": value})
+
+
+async def _read_node(dependency) -> str:
+    gen = dependency()
+    session = await gen.__anext__()
+    try:
+        return (await session.execute(text("SELECT name FROM node"))).scalar()
+    finally:
+        await gen.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_read_db_routes_by_replica_health(monkeypatch):
+    primary_engine, primary_maker = _sqlite_maker("primary")
+    replica_engine, replica_maker = _sqlite_maker("replica")
+    await _label(primary_engine, "primary")
+    await _label(replica_engine, "replica")
+
+    monkeypatch.setattr(database, "async_session_maker", primary_maker)
+    monkeypatch.setattr(database, "read_engine", replica_engine)
+    monkeypatch.setattr(database, "read_session_maker", replica_maker)
+
+    monkeypatch.setattr(database, "replica_health", _FakeHealth([0.5], max_lag_seconds=30, check_interval_seconds=0))
+    assert await _read_node(get_read_db) == "replica"
+
+    monkeypatch.setattr(database, "replica_health", _FakeHealth([90.0], max_lag_seconds=30, check_interval_seconds=0))
+    assert await _read_node(get_read_db) == "primary"
+
+    # Writes-capable dependency never uses the replica
+    assert await _read_node(db_with_statement_timeout(5000)) == "primary"
+    monkeypatch.setattr(database, "replica_health", _FakeHealth([0.5], max_lag_seconds=30, check_interval_seconds=0))
+    assert await _read_node(db_with_statement_timeout(5000, read_only=True)) == "replica"
+
+    monkeypatch.setattr(database, "read_engine", None)
+    assert await _read_node(get_read_db) == "primary"
+
+    await primary_engine.dispose()
+    await replica_engine.dispose()
+
+
+class _RecordingConnection:
+    def __init__(self, dialect_name):
+        self.dialect = SimpleNamespace(name=dialect_name)
+        self.statements = []
+
+    def exec_driver_sql(self, statement):
+        self.statements.append(statement)
+
+
+@pytest.mark.asyncio
+async def test_statement_timeout_is_set_local_only_when_it_differs(monkeypatch):
+    engine, maker = _sqlite_maker("primary")
+    monkeypatch.setattr(database, "async_session_maker", maker)
+    monkeypatch.setattr(database, "read_engine", None)
+    monkeypatch.setitem(database._engine_statement_timeouts, engine.sync_engine, 5000)
+
+    async def session_info(dependency):
+        gen = dependency()
+        session = await gen.__anext__()
+        try:
+            return dict(session.info)
+        finally:
+            await gen.aclose()
+
+    assert "statement_timeout_ms" not in await session_info(db_with_statement_timeout(5000))
+    info = await session_info(db_with_statement_timeout(60_000))
+    assert info["statement_timeout_ms"] == 60_000
+
+    session = SimpleNamespace(info=info)
+    postgres, sqlite = _RecordingConnection("postgresql"), _RecordingConnection("sqlite")
+    _set_local_statement_timeout(session, None, postgres)
+    _set_local_statement_timeout(session, None, sqlite)
+    assert postgres.statements == ["SET LOCAL statement_timeout = 60000"]
+    assert sqlite.statements == []
+
+    await engine.dispose()
+
+
+def test_read_only_endpoints_use_read_db():
+    from app.api.v1 import accountant, zzp_dashboard
+
+    def dependencies(router, path):
+        for route in router.routes:
+            if route.path == path:
+                return {d.call for d in route.dependant.dependencies}
+        raise AssertionError(path)
+
+    assert get_read_db in dependencies(accountant.router, "/clients/{client_id}/reports/balance-sheet")
+    assert get_read_db in dependencies(zzp_dashboard.router, "/dashboard")
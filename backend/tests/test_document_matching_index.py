@@ -0,0 +1,213 @@
+"""
+Tests for the document matching index and batch matching.
+
+Covers:
+- run_matching_many produces the same duplicates, party matches,
+  open-item matches and suggestions as single-document matching
+- A batch uses a fixed number of queries regardless of its size
+- Benchmarks of the in-memory index at 10k and 100k documents (opt-in,
+  pytest -m benchmark)
+"""
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, select
+
+from app.models.document import DocumentStatus, DocumentSuggestedAction, DocumentSuggestedActionType
+from app.models.subledger import OpenItem, OpenItemStatus, Party
+from app.services.documents import DocumentMatchingService
+from app.services.documents.matching_index import (
+    DocumentCandidate,
+    DocumentMatchingIndex,
+    OpenItemCandidate,
+    PartyCandidate,
+)
+from tests.factories import make_document
+
+INVOICE_DATE = datetime(2026, 3, 10, tzinfo=timezone.utc)
+
+
+def _document(admin_id, supplier, invoice_number, amount, invoice_date=INVOICE_DATE, status=DocumentStatus.EXTRACTED):
+    return make_document(
+        admin_id,
+        id=uuid.uuid4(),
+        original_filename=f"{invoice_number}.pdf",
+        storage_path=f"/uploads/{invoice_number}.pdf",
+        status=status,
+        supplier_name=supplier,
+        invoice_number=invoice_number,
+        invoice_date=invoice_date,
+        total_amount=amount,
+        process_count=0,
+        is_duplicate=False,
+    )
+
+
+@pytest.fixture
+async def matching_data(db_session, test_administration):
+    admin_id = test_administration.id
+    kpn = Party(administration_id=admin_id, party_type="SUPPLIER", name="KPN B.V.", is_active=True)
+    coolblue = Party(administration_id=admin_id, party_type="SUPPLIER", name="Coolblue", is_active=True)
+    db_session.add_all([kpn, coolblue])
+    await db_session.flush()
+
+    def open_item(party, amount, number):
+        return OpenItem(
+            administration_id=admin_id,
+            party_id=party.id,
+            journal_entry_id=uuid.uuid4(),
+            journal_line_id=uuid.uuid4(),
+            item_type="PAYABLE",
+            document_number=number,
+            document_date=date(2026, 3, 1),
+            due_date=date(2026, 3, 31),
+            original_amount=amount,
+            open_amount=amount,
+            status=OpenItemStatus.OPEN,
+        )
+
+    db_session.add_all([
+        open_item(kpn, Decimal("60.50"), "KPN-1"),
+        open_item(coolblue, Decimal("1000.00"), "CB-1"),
+        open_item(coolblue, Decimal("1050.00"), "CB-2"),
+    ])
+
+    posted = _document(admin_id, "KPN B.V.", "F-100", Decimal("60.50"), status=DocumentStatus.POSTED)
+    docs = {
+        "duplicate": _document(admin_id, "kpn b.v.", "F-100", Decimal("60.50"), INVOICE_DATE + timedelta(days=2)),
+        "late_copy": _document(admin_id, "KPN B.V.", "F-100", Decimal("60.50"), INVOICE_DATE + timedelta(days=10)),
+        "kpn_open_item": _document(admin_id, "KPN B.V.", "F-101", Decimal("60.50"), INVOICE_DATE + timedelta(days=30)),
+        "coolblue_partial": _document(admin_id, "Coolblue Nederland", "CB-9", Decimal("1020.00")),
+        "unknown": _document(admin_id, "Bakkerij", "B-1", Decimal("12.00")),
+    }
+    db_session.add(posted)
+    db_session.add_all(docs.values())
+    await db_session.commit()
+    return {"posted": posted, "kpn": kpn, "coolblue": coolblue, **docs}
+
+
+async def _actions(db_session, document):
+    result = await db_session.execute(
+        select(DocumentSuggestedAction).where(DocumentSuggestedAction.document_id == document.id)
+    )
+    return sorted(result.scalars().all(), key=lambda a: a.priority)
+
+
+@pytest.mark.asyncio
+async def test_run_matching_many(db_session, test_administration, matching_data):
+    service = DocumentMatchingService(db_session, test_administration.id)
+    names = ["duplicate", "late_copy", "kpn_open_item", "coolblue_partial", "unknown"]
+    ids = [matching_data[name].id for name in names] + [uuid.uuid4()]
+
+    selects = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", before_execute)
+    try:
+        documents = await service.run_matching_many(ids)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_execute)
+    await db_session.commit()
+
+    # Documents, extracted fields, old suggestions, then one query each for
+    # duplicate candidates, parties and open items - independent of batch size
+    assert len(selects) == 6
+
+    assert [d.id for d in documents] == ids[:5]
+    dup, late, kpn_doc, coolblue_doc, unknown = documents
+
+    assert dup.is_duplicate and dup.duplicate_of_id == matching_data["posted"].id
+    assert not late.is_duplicate  # Outside the 3-day date window
+    assert not kpn_doc.is_duplicate
+
+    assert kpn_doc.matched_party_id == matching_data["kpn"].id
+    assert kpn_doc.matched_open_item_id is not None
+    assert kpn_doc.match_confidence == Decimal("0.85")
+
+    # Partial party name, two open items within 10%
+    assert coolblue_doc.matched_party_id == matching_data["coolblue"].id
+    assert coolblue_doc.matched_open_item_id is None
+    partial = await _actions(db_session, coolblue_doc)
+    assert [a.action_type for a in partial] == [
+        DocumentSuggestedActionType.ALLOCATE_OPEN_ITEM,
+        DocumentSuggestedActionType.ALLOCATE_OPEN_ITEM,
+        DocumentSuggestedActionType.RECLASSIFY_TO_ASSET,
+    ]
+
+    assert unknown.matched_party_id is None
+    assert [a.action_type for a in await _actions(db_session, unknown)] == [DocumentSuggestedActionType.POST_AS_EXPENSE]
+    assert all(d.status == DocumentStatus.NEEDS_REVIEW and d.process_count == 1 for d in documents)
+
+
+@pytest.mark.asyncio
+async def test_run_matching_is_idempotent(db_session, test_administration, matching_data):
+    service = DocumentMatchingService(db_session, test_administration.id)
+    document = matching_data["duplicate"]
+
+    for _ in range(2):
+        await service.run_matching(document.id)
+        await db_session.commit()
+
+    actions = await _actions(db_session, document)
+    assert [a.action_type for a in actions] == [
+        DocumentSuggestedActionType.MARK_DUPLICATE,
+        DocumentSuggestedActionType.ALLOCATE_OPEN_ITEM,
+    ]
+    assert document.process_count == 2
+
+    with pytest.raises(ValueError):
+        await service.run_matching(uuid.uuid4())
+
+
+def _synthetic_index(n):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    suppliers = [f"Leverancier {i}" for i in range(max(n // 50, 1))]
+    documents = []
+    for i in range(n):
+        k = i - 1 if i % 20 == 1 else i  # Every 20th document is uploaded twice
+        documents.append(DocumentCandidate(
+            id=uuid.uuid4(),
+            invoice_number=f"INV-{k}",
+            supplier_name=suppliers[k % len(suppliers)],
+            total_amount=Decimal(1000 + (k * 37) % 90000) / 100,
+            invoice_date=start + timedelta(days=k % 365),
+            created_at=start,
+            original_filename=f"{i}.pdf",
+        ))
+    parties = [PartyCandidate(uuid.uuid4(), name) for name in suppliers]
+    open_items = [
+        OpenItemCandidate(uuid.uuid4(), parties[i % len(parties)].id, Decimal(1000 + (i * 53) % 90000) / 100, f"OI-{i}", start.date())
+        for i in range(n)
+    ]
+    return documents, parties, open_items
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("n", [10_000, 100_000])
+def test_matching_index_benchmark(n, record_property):
+    documents, parties, open_items = _synthetic_index(n)
+
+    started = time.perf_counter()
+    index = DocumentMatchingIndex(documents, parties, open_items)
+    built = time.perf_counter()
+
+    duplicates = 0
+    for doc in documents:
+        if index.find_duplicate(doc.id, doc.invoice_number, doc.supplier_name, doc.total_amount, doc.invoice_date, 3):
+            duplicates += 1
+        party, _ = index.match_party(doc.supplier_name)
+        index.open_items_for(party.id, doc.total_amount, doc.total_amount * Decimal("0.10"))
+    done = time.perf_counter()
+
+    record_property("build_seconds", round(built - started, 3))
+    record_property("match_docs_per_second", round(n / (done - built)))
+    assert duplicates == n // 10
+    # Linear: matching 100k documents must not take anywhere near quadratic time
+    assert done - built < n / 5_000
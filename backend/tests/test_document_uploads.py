@@ -0,0 +1,221 @@
+"""
+Tests for the streaming document upload pipeline.
+
+Covers:
+- Uploads are streamed to disk in chunks and hashed on the way
+- Oversized uploads are cut off without leaving files behind
+- Identical files are deduplicated per administration (no second file,
+  no second processing job), unless the earlier one failed or was rejected
+- Batch uploads enqueue all processing jobs in one Redis pipeline
+- A failed database write removes the staged and promoted files
+"""
+import hashlib
+import io
+from pathlib import Path
+from uuid import UUID
+from unittest.mock import patch
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from app.api.v1.documents import get_redis_client
+from app.main import app as fastapi_app
+from app.models.document import Document, DocumentStatus
+from app.models.zzp import ZZPDocument
+from app.services.documents.upload import STAGING_DIRNAME, UploadTooLarge, stage_upload
+
+PDF_A = b"%PDF-1.4 receipt A " + b"x" * 5000
+PDF_B = b"%PDF-1.4 receipt B " + b"y" * 5000
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def xadd(self, stream, fields, maxlen=None):
+        self.commands.append((stream, fields))
+
+    async def execute(self):
+        self.redis.executed.append(self.commands)
+        return [b"0-1"] * len(self.commands)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.executed = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    with patch("app.services.documents.upload.settings.UPLOAD_DIR", str(tmp_path)), \
+            patch("app.api.v1.documents.settings.UPLOAD_DIR", str(tmp_path)), \
+            patch("app.api.v1.zzp_documents.settings.UPLOAD_DIR", str(tmp_path)):
+        yield tmp_path
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+
+    async def override():
+        yield redis
+
+    fastapi_app.dependency_overrides[get_redis_client] = override
+    yield redis
+    fastapi_app.dependency_overrides.pop(get_redis_client, None)
+
+
+def _stored_files(root: Path):
+    return [p for p in root.rglob("*") if p.is_file() and STAGING_DIRNAME not in p.parts]
+
+
+@pytest.mark.asyncio
+async def test_stage_upload_streams_and_hashes(upload_dir):
+    upload = UploadFile(io.BytesIO(PDF_A), filename="bon.pdf")
+
+    staged = await stage_upload(upload, chunk_size=1024)
+
+    assert staged.size == len(PDF_A)
+    assert staged.sha256 == hashlib.sha256(PDF_A).hexdigest()
+    assert staged.path.read_bytes() == PDF_A
+    assert staged.extension == "pdf"
+
+    final = staged.promote(upload_dir / "a" / "original.pdf")
+    assert final.read_bytes() == PDF_A
+    assert not list((upload_dir / STAGING_DIRNAME).iterdir())
+
+
+@pytest.mark.asyncio
+async def test_stage_upload_cuts_off_oversized_files(upload_dir):
+    upload = UploadFile(io.BytesIO(PDF_A), filename="big.pdf")
+
+    with pytest.raises(UploadTooLarge):
+        await stage_upload(upload, max_size=2048, chunk_size=1024)
+
+    # Stopped after the chunk that crossed the limit, partial file removed
+    assert upload.file.tell() <= 3072
+    assert not list((upload_dir / STAGING_DIRNAME).iterdir())
+
+
+@pytest.mark.asyncio
+async def test_zzp_upload_deduplicates_identical_files(async_client, auth_headers, db_session, upload_dir):
+    files = [
+        ("files", ("bon.pdf", PDF_A, "application/pdf")),
+        ("files", ("bon-kopie.pdf", PDF_A, "application/pdf")),
+    ]
+    response = await async_client.post("/api/v1/zzp/documents/upload", files=files, headers=auth_headers)
+    assert response.status_code == 201
+    first, second = response.json()["documents"]
+    assert first["id"] == second["id"]
+    assert not first["is_duplicate"] and second["is_duplicate"]
+
+    again = await async_client.post(
+        "/api/v1/zzp/documents/upload",
+        files=[("files", ("bon.pdf", PDF_A, "application/pdf"))],
+        headers=auth_headers,
+    )
+    assert again.json()["documents"][0]["id"] == first["id"]
+
+    count = await db_session.scalar(select(func.count()).select_from(ZZPDocument))
+    assert count == 1
+    assert len(_stored_files(upload_dir)) == 1
+
+
+@pytest.mark.asyncio
+async def test_zzp_upload_rejects_oversized_file(async_client, auth_headers, upload_dir):
+    with patch("app.services.documents.upload.settings.MAX_UPLOAD_SIZE", 1024):
+        response = await async_client.post(
+            "/api/v1/zzp/documents/upload",
+            files=[("files", ("bon.pdf", PDF_A, "application/pdf"))],
+            headers=auth_headers,
+        )
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "FILE_TOO_LARGE"
+    assert _stored_files(upload_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_batch_upload_uses_one_pipeline_and_skips_duplicates(
+    async_client, auth_headers, db_session, test_administration, upload_dir, fake_redis,
+):
+    files = [
+        ("files", ("a.pdf", PDF_A, "application/pdf")),
+        ("files", ("b.pdf", PDF_B, "application/pdf")),
+        ("files", ("a-again.pdf", PDF_A, "application/pdf")),
+    ]
+    response = await async_client.post(
+        "/api/v1/documents/upload/batch",
+        files=files,
+        data={"administration_id": str(test_administration.id)},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    docs = response.json()["documents"]
+    assert [d["is_duplicate"] for d in docs] == [False, False, True]
+    assert docs[2]["document_id"] == docs[0]["document_id"]
+
+    # One round trip carrying a job per new document
+    assert len(fake_redis.executed) == 1
+    jobs = [fields for _, fields in fake_redis.executed[0]]
+    assert [j["document_id"] for j in jobs] == [docs[0]["document_id"], docs[1]["document_id"]]
+
+    # Re-uploading an already processed file: existing document, no new job
+    single = await async_client.post(
+        "/api/v1/documents/upload",
+        files={"file": ("a.pdf", PDF_A, "application/pdf")},
+        headers=auth_headers,
+    )
+    assert single.json()["is_duplicate"] is True
+    assert single.json()["document_id"] == docs[0]["document_id"]
+    assert len(fake_redis.executed) == 1
+
+    stored = (await db_session.execute(select(Document))).scalars().all()
+    assert len(stored) == 2
+    assert {d.content_sha256 for d in stored} == {hashlib.sha256(PDF_A).hexdigest(), hashlib.sha256(PDF_B).hexdigest()}
+    assert len(_stored_files(upload_dir)) == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_document_can_be_uploaded_again(
+    async_client, auth_headers, db_session, upload_dir, fake_redis,
+):
+    upload = {"file": ("a.pdf", PDF_A, "application/pdf")}
+    first = (await async_client.post("/api/v1/documents/upload", files=upload, headers=auth_headers)).json()
+    rejected = await db_session.get(Document, UUID(first["document_id"]))
+    rejected.status = DocumentStatus.REJECTED
+    await db_session.commit()
+
+    again = (await async_client.post("/api/v1/documents/upload", files=upload, headers=auth_headers)).json()
+    assert again["is_duplicate"] is False
+    assert again["document_id"] != first["document_id"]
+    assert len(fake_redis.executed) == 2
+    assert len(_stored_files(upload_dir)) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, field", [
+    ("/api/v1/zzp/documents/upload", "files"),
+    ("/api/v1/documents/upload/batch", "files"),
+])
+async def test_failed_commit_removes_staged_and_promoted_files(
+    async_client, auth_headers, db_session, test_administration, upload_dir, fake_redis, path, field,
+):
+    files = [
+        (field, ("a.pdf", PDF_A, "application/pdf")),
+        (field, ("b.pdf", PDF_B, "application/pdf")),
+    ]
+    failure = OperationalError("COMMIT", {}, Exception("connection lost"))
+    with patch.object(db_session, "commit", side_effect=failure), pytest.raises(OperationalError):
+        await async_client.post(path, files=files, headers=auth_headers)
+
+    assert _stored_files(upload_dir) == []
+    assert not list((upload_dir / STAGING_DIRNAME).iterdir())
+    # Per-document directories created by the promotion are gone as well
+    directories = {p.name for p in upload_dir.rglob("*") if p.is_dir()}
+    assert directories <= {STAGING_DIRNAME, "zzp", str(test_administration.id)}
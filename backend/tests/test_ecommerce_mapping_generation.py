@@ -0,0 +1,174 @@
+"""
+Tests for set-based e-commerce mapping generation.
+
+Covers:
+- Mappings for orders and refunds, with VAT inferred from the order
+- Idempotency: mapped records are skipped and counted
+- Only unmapped records are read, in chunks, with a fixed number of
+  queries per chunk
+- Mapping right after a sync picks up the newly imported records only
+"""
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.administration import Administration
+from app.models.ecommerce import (
+    ConnectionStatus,
+    EcommerceConnection,
+    EcommerceMapping,
+    EcommerceOrder,
+    EcommerceOrderStatus,
+    EcommerceProvider,
+    EcommerceRefund,
+    MappingReviewStatus,
+)
+from app.services.ecommerce_mapping import compute_vat, generate_mappings, generate_mappings_after_sync
+
+ORDERED_AT = datetime(2026, 5, 4, 10, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def connection(db_session, test_administration):
+    conn = EcommerceConnection(
+        administration_id=test_administration.id,
+        provider=EcommerceProvider.SHOPIFY,
+        status=ConnectionStatus.CONNECTED,
+        shop_name="Winkel",
+    )
+    db_session.add(conn)
+    await db_session.flush()
+    return conn
+
+
+def _order(conn, number, subtotal=10000, tax=2100):
+    return EcommerceOrder(
+        connection_id=conn.id,
+        administration_id=conn.administration_id,
+        external_order_id=f"ext-{number}",
+        external_order_number=f"#{number}",
+        status=EcommerceOrderStatus.PAID,
+        currency="EUR",
+        subtotal_cents=subtotal,
+        tax_cents=tax,
+        shipping_cents=495,
+        discount_cents=0,
+        total_amount_cents=subtotal + tax + 495,
+        ordered_at=ORDERED_AT,
+    )
+
+
+def _refund(conn, number, amount=1210):
+    return EcommerceRefund(
+        connection_id=conn.id,
+        administration_id=conn.administration_id,
+        external_refund_id=f"ref-{number}",
+        external_order_id=f"ext-{number}",
+        amount_cents=amount,
+        currency="EUR",
+        refunded_at=ORDERED_AT,
+    )
+
+
+async def _mapping_count(db_session):
+    return (await db_session.execute(select(func.count(EcommerceMapping.id)))).scalar()
+
+
+def test_compute_vat():
+    assert compute_vat(2100, 10000) == (Decimal("21.00"), "auto")
+    assert compute_vat(900, 10000) == (Decimal("9.00"), "auto")
+    assert compute_vat(0, 10000) == (None, "unknown")
+    assert compute_vat(1500, 10000) == (None, "needs_review")
+
+
+@pytest.mark.asyncio
+async def test_generates_order_and_refund_mappings(db_session, connection):
+    order = _order(connection, 1001)
+    mixed = _order(connection, 1002, tax=1500)
+    refund = _refund(connection, 1001)
+    db_session.add_all([order, mixed, refund])
+    await db_session.flush()
+
+    result = await generate_mappings(db_session, connection.administration_id)
+    await db_session.commit()
+
+    assert (result.created, result.skipped_existing) == (3, 0)
+    assert (result.total_orders, result.total_refunds) == (2, 1)
+
+    mappings = {
+        m.order_id or m.refund_id: m
+        for m in (await db_session.execute(select(EcommerceMapping))).scalars()
+    }
+    m = mappings[order.id]
+    assert m.record_type == "order"
+    assert m.provider == "shopify"
+    assert m.external_ref == "#1001"
+    assert m.review_status == MappingReviewStatus.NEW
+    assert (m.revenue_cents, m.tax_cents, m.shipping_cents) == (10000, 2100, 495)
+    assert m.vat_rate == Decimal("21.00") and m.vat_status == "auto"
+    assert m.net_amount_cents == 12595
+    assert m.accounting_date == ORDERED_AT.date()
+
+    assert mappings[mixed.id].review_status == MappingReviewStatus.NEEDS_REVIEW
+
+    r = mappings[refund.id]
+    assert r.record_type == "refund"
+    assert (r.refund_cents, r.net_amount_cents) == (1210, -1210)
+    assert r.vat_status == "unknown" and r.vat_rate is None
+
+
+@pytest.mark.asyncio
+async def test_generation_is_idempotent_and_chunked(db_session, connection, query_budget):
+    db_session.add_all([_order(connection, n) for n in range(25)])
+    db_session.add_all([_refund(connection, n) for n in range(5)])
+    await db_session.flush()
+
+    # Two counts, then per chunk one SELECT and one bulk INSERT
+    # (orders: 3 full chunks + an empty read; refunds: 1 partial chunk)
+    with query_budget(max_queries=10):
+        first = await generate_mappings(db_session, connection.administration_id, chunk_size=10)
+    assert first.created == 30
+
+    with query_budget(max_queries=4):
+        second = await generate_mappings(db_session, connection.administration_id, chunk_size=10)
+    assert (second.created, second.skipped_existing) == (0, 30)
+    assert await _mapping_count(db_session) == 30
+
+
+@pytest.mark.asyncio
+async def test_scoped_to_administration_and_connection(db_session, connection):
+    other_admin = Administration(name="Other B.V.")
+    db_session.add(other_admin)
+    await db_session.flush()
+    other = EcommerceConnection(
+        administration_id=other_admin.id,
+        provider=EcommerceProvider.WOOCOMMERCE,
+        status=ConnectionStatus.CONNECTED,
+    )
+    db_session.add(other)
+    await db_session.flush()
+    db_session.add_all([_order(connection, 1), _order(other, 2)])
+    await db_session.flush()
+
+    result = await generate_mappings(db_session, connection.administration_id, connection_id=uuid.uuid4())
+    assert (result.created, result.total_orders) == (0, 0)
+
+    result = await generate_mappings(db_session, connection.administration_id, connection_id=connection.id)
+    assert (result.created, result.total_orders) == (1, 1)
+    assert await _mapping_count(db_session) == 1
+
+
+@pytest.mark.asyncio
+async def test_after_sync_maps_only_new_records(db_session, connection):
+    db_session.add_all([_order(connection, 1), _order(connection, 2)])
+    await db_session.flush()
+    assert await generate_mappings_after_sync(db_session, connection) == 2
+
+    # The next sync imports one more order and a refund
+    db_session.add_all([_order(connection, 3), _refund(connection, 1)])
+    await db_session.flush()
+    assert await generate_mappings_after_sync(db_session, connection) == 2
+    assert await _mapping_count(db_session) == 4
@@ -0,0 +1,184 @@
+"""
+Tests for the aggregate-based income tax overview and its cache.
+
+Covers:
+- Per-year GROUP BY aggregates produce the same figures as the row data
+- Several years are computed with a single query
+- Cached overviews are served without touching the database, and are
+  invalidated when invoices, expenses or time entries are committed
+"""
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, select
+
+from app.api.v1.zzp_income_tax import build_year_overviews, fetch_year_aggregates
+from app.models.zzp import InvoiceStatus, ZZPExpense, ZZPInvoice, ZZPTimeEntry
+from app.services.income_tax_cache import year_overview_cache
+
+
+def _invoice(admin_id, customer_id, number, status, issue_date, subtotal):
+    invoice = ZZPInvoice()
+    invoice.administration_id = admin_id
+    invoice.customer_id = customer_id
+    invoice.invoice_number = number
+    invoice.status = status
+    invoice.issue_date = issue_date
+    invoice.subtotal_cents = subtotal
+    invoice.vat_total_cents = subtotal * 21 // 100
+    invoice.total_cents = subtotal + subtotal * 21 // 100
+    invoice.seller_company_name = "Test Co"
+    invoice.customer_name = "Client"
+    invoice.updated_at = datetime.now(timezone.utc)
+    return invoice
+
+
+def _expense(admin_id, category, expense_date, amount, attachment_url=None):
+    expense = ZZPExpense()
+    expense.administration_id = admin_id
+    expense.vendor = "Vendor"
+    expense.category = category
+    expense.expense_date = expense_date
+    expense.amount_cents = amount
+    expense.vat_rate = Decimal("21.00")
+    expense.vat_amount_cents = amount * 21 // 121
+    expense.attachment_url = attachment_url
+    return expense
+
+
+def _time_entry(admin_id, entry_date, hours):
+    entry = ZZPTimeEntry()
+    entry.administration_id = admin_id
+    entry.entry_date = entry_date
+    entry.description = "Werk"
+    entry.hours = Decimal(hours)
+    entry.billable = True
+    return entry
+
+
+@pytest.fixture
+async def two_years_of_data(db_session, test_administration, test_customer):
+    admin_id = test_administration.id
+    db_session.add_all([
+        _invoice(admin_id, test_customer.id, "2023-001", InvoiceStatus.PAID.value, date(2023, 3, 1), 100000),
+        _invoice(admin_id, test_customer.id, "2023-002", InvoiceStatus.SENT.value, date(2023, 6, 1), 20000),
+        _invoice(admin_id, test_customer.id, "2023-003", InvoiceStatus.OVERDUE.value, date(2023, 7, 1), 5000),
+        _invoice(admin_id, test_customer.id, "2023-004", InvoiceStatus.DRAFT.value, date(2023, 8, 1), 7000),
+        _invoice(admin_id, test_customer.id, "2024-001", InvoiceStatus.PAID.value, date(2024, 1, 15), 40000),
+        _invoice(admin_id, test_customer.id, "2024-002", InvoiceStatus.PAID.value, date(2024, 12, 31), 2500),
+        _expense(admin_id, "kantoor", date(2023, 2, 1), 3000, "/uploads/a.pdf"),
+        _expense(admin_id, "kantoor", date(2023, 4, 1), 2000),
+        _expense(admin_id, None, date(2023, 5, 1), 1000, ""),
+        _expense(admin_id, "reiskosten", date(2024, 1, 1), 4500, "/uploads/b.pdf"),
+        _time_entry(admin_id, date(2023, 1, 2), "8.00"),
+        _time_entry(admin_id, date(2023, 1, 3), "4.50"),
+        _time_entry(admin_id, date(2024, 1, 2), "6.00"),
+    ])
+    await db_session.commit()
+    return admin_id
+
+
+def _count_selects(db_session):
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_execute)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", before_execute)
+
+
+@pytest.mark.asyncio
+async def test_aggregates_match_row_data(db_session, two_years_of_data):
+    aggregates = await fetch_year_aggregates(two_years_of_data, [2023, 2024], db_session)
+
+    y2023 = aggregates[2023]
+    assert y2023.invoices(InvoiceStatus.PAID.value) == (1, 100000)
+    assert y2023.invoices(InvoiceStatus.SENT.value, InvoiceStatus.OVERDUE.value) == (2, 25000)
+    assert y2023.invoices(InvoiceStatus.DRAFT.value) == (1, 7000)
+    assert y2023.expenses_by_category == {"kantoor": (2, 5000, 1), "algemeen": (1, 1000, 1)}
+    assert y2023.hours == Decimal("12.5")
+
+    y2024 = aggregates[2024]
+    assert y2024.invoices(InvoiceStatus.PAID.value) == (2, 42500)
+    assert y2024.expenses_by_category == {"reiskosten": (1, 4500, 0)}
+    assert y2024.hours == Decimal("6")
+
+
+@pytest.mark.asyncio
+async def test_overviews_for_several_years_use_one_query(db_session, two_years_of_data):
+    year_overview_cache.invalidate(two_years_of_data)
+    statements, stop = _count_selects(db_session)
+    try:
+        overviews = await build_year_overviews(two_years_of_data, [2024, 2023, 2022], date(2025, 1, 10), db_session)
+    finally:
+        stop()
+
+    assert len(statements) == 1
+    assert list(overviews) == [2024, 2023, 2022]
+
+    ov = overviews[2023]
+    assert (ov.omzet_cents, ov.kosten_cents, ov.winst_cents) == (100000, 6000, 94000)
+    assert (ov.invoice_count, ov.paid_invoice_count, ov.unpaid_invoice_count, ov.draft_invoice_count) == (4, 1, 2, 1)
+    assert ov.hours_indicator.total_hours == 12.5
+    titles = {w.title for w in ov.warnings}
+    assert "1 conceptfactuur niet meegeteld" in titles
+    assert "2 factuuren nog niet betaald" in titles
+    assert "2 uitgaven zonder bon" in titles
+    assert [c.category for c in ov.cost_breakdown] == ["algemeen", "kantoor"]
+
+    assert overviews[2024].omzet_cents == 42500
+    assert overviews[2022].invoice_count == 0
+
+
+@pytest.mark.asyncio
+async def test_cached_overview_is_invalidated_on_commit(db_session, test_administration, two_years_of_data):
+    admin_id = two_years_of_data
+    today = date(2025, 1, 10)
+    year_overview_cache.invalidate(admin_id)
+    first = (await build_year_overviews(admin_id, [2024], today, db_session))[2024]
+
+    statements, stop = _count_selects(db_session)
+    try:
+        cached = (await build_year_overviews(admin_id, [2024], today, db_session))[2024]
+    finally:
+        stop()
+    assert cached is first
+    assert statements == []
+
+    db_session.add(_expense(admin_id, "kantoor", date(2024, 5, 1), 1500))
+    await db_session.commit()
+    after_expense = (await build_year_overviews(admin_id, [2024], today, db_session))[2024]
+    assert after_expense.kosten_cents == 6000
+
+    invoice = await db_session.scalar(select(ZZPInvoice).where(ZZPInvoice.invoice_number == "2024-002"))
+    invoice.subtotal_cents = 3500
+    await db_session.commit()
+    after_invoice = (await build_year_overviews(admin_id, [2024], today, db_session))[2024]
+    assert after_invoice.omzet_cents == 43500
+
+
+@pytest.mark.asyncio
+async def test_years_endpoint(async_client, auth_headers, db_session, test_administration, test_customer):
+    this_year = date.today().year
+    db_session.add(_invoice(
+        test_administration.id, test_customer.id, "Y-001", InvoiceStatus.PAID.value, date(this_year, 1, 2), 12345,
+    ))
+    await db_session.commit()
+
+    response = await async_client.get("/api/v1/zzp/income-tax/years", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [ov["year"] for ov in data["overviews"]] == data["available_years"]
+    assert data["overviews"][0]["omzet_cents"] == 12345
+
+    response = await async_client.get(
+        "/api/v1/zzp/income-tax/years", params={"years": [this_year - 1]}, headers=auth_headers,
+    )
+    assert [ov["year"] for ov in response.json()["overviews"]] == [this_year - 1]
+
+    response = await async_client.get("/api/v1/zzp/income-tax/years", params={"years": [1990]}, headers=auth_headers)
+    assert response.status_code == 400
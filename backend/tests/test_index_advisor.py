@@ -0,0 +1,69 @@
+"""
+Tests for the hot-path index plan and the EXPLAIN-based index advisor.
+
+Covers:
+- Models declare the composite/partial indexes rolled out by migration 059
+- PostgreSQL EXPLAIN (FORMAT JSON) plans are classified correctly
+- Every canonical hot query is served by an index on a seeded database
+"""
+import pytest
+
+from app.core.index_advisor import (
+    HOT_QUERIES,
+    analyze_postgres_plan,
+    format_report,
+    run_advisor,
+    seed_database,
+)
+from app.models.bank import BankTransaction
+from app.models.ledger import JournalEntry, JournalLine
+from app.models.subledger import OpenItem
+
+
+def _index_names(model):
+    return {ix.name for ix in model.__table__.indexes}
+
+
+def test_models_declare_hot_path_indexes():
+    assert "ix_journal_entries_admin_status_date" in _index_names(JournalEntry)
+    assert {"ix_journal_lines_account_entry", "ix_journal_lines_vat_code_entry"} <= _index_names(JournalLine)
+    assert "ix_bank_transactions_admin_status_date" in _index_names(BankTransaction)
+
+    unmatched = next(ix for ix in BankTransaction.__table__.indexes if ix.name == "ix_bank_transactions_admin_unmatched")
+    assert "NEW" in str(unmatched.dialect_options["postgresql"]["where"])
+    open_items = next(ix for ix in OpenItem.__table__.indexes if ix.name == "ix_open_items_admin_type_due_open")
+    assert "OPEN" in str(open_items.dialect_options["postgresql"]["where"])
+
+
+def test_analyze_postgres_plan_flags_seq_scans_on_hot_tables():
+    plan = [{
+        "Plan": {
+            "Node Type": "Hash Join",
+            "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "journal_lines"},
+                {"Node Type": "Seq Scan", "Relation Name": "vat_codes"},
+                {
+                    "Node Type": "Bitmap Heap Scan", "Relation Name": "journal_entries",
+                    "Plans": [{"Node Type": "Bitmap Index Scan", "Index Name": "ix_journal_entries_admin_status_date"}],
+                },
+            ],
+        },
+    }]
+    found = analyze_postgres_plan(plan)
+    assert found["seq_scans"] == ["journal_lines"]  # vat_codes is not a hot table
+    assert found["indexes"] == ["ix_journal_entries_admin_status_date"]
+
+
+@pytest.mark.asyncio
+async def test_hot_queries_use_indexes_on_seeded_database(test_engine):
+    await seed_database(test_engine, rows_per_table=300, administrations=3)
+
+    plans = await run_advisor(test_engine)
+
+    assert [p.name for p in plans] == [q.name for q in HOT_QUERIES]
+    report = format_report(plans)
+    assert all(p.ok for p in plans), report
+    by_name = {p.name: p for p in plans}
+    assert "ix_bank_transactions_admin_status_date" in by_name["bank_unmatched_recent"].indexes
+    assert "ix_open_items_admin_type_due_open" in by_name["open_receivables"].indexes
+    assert "0 with sequential scans" in report
@@ -0,0 +1,189 @@
+"""
+Tests for the shared integration HTTP clients.
+
+Covers:
+- One pooled client per provider, shared by service calls
+- Retry/backoff honoring Retry-After, and which requests are retried
+- Per-provider concurrency limits and request metrics
+- The process-wide GoCardless token: one token request for many calls,
+  refresh-ahead with the refresh token, and renewal after a 401
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import INTEGRATION_HTTP_RETRIES
+from app.integrations.http import BoundClient, get_http_client, http_clients, parse_retry_after
+from app.services.gocardless import GoCardlessService, GoCardlessTokenCache
+from app.services.shopify_service import SHOPIFY_API_VERSION, ShopifyService
+
+
+class Upstream:
+    """MockTransport handler replaying queued responses per path."""
+
+    def __init__(self, responses=None, delay=0.0):
+        self.responses = responses or {}
+        self.requests = []
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            queue = self.responses.get(request.url.path)
+            if not queue:
+                return httpx.Response(200, json={})
+            return queue.pop(0) if len(queue) > 1 else queue[0]
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def upstream():
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    handler = Upstream()
+    handler.sleeps = sleeps
+    http_clients.set_transport(httpx.MockTransport(handler), sleep=fake_sleep)
+    yield handler
+    http_clients.set_transport(None)
+
+
+@pytest.mark.asyncio
+async def test_services_share_one_client_per_provider(upstream):
+    upstream.responses[f"/admin/api/{SHOPIFY_API_VERSION}/shop.json"] = [httpx.Response(200, json={"shop": {"name": "Winkel"}})]
+    service = ShopifyService()
+
+    for _ in range(3):
+        shop = await service.verify_connection("winkel.myshopify.com", "shpat_test")
+        assert shop["name"] == "Winkel"
+
+    assert get_http_client("shopify") is get_http_client("shopify")
+    assert get_http_client("shopify") is not get_http_client("woocommerce")
+    assert len(upstream.requests) == 3
+    assert upstream.requests[0].headers["X-Shopify-Access-Token"] == "shpat_test"
+
+
+@pytest.mark.asyncio
+async def test_retries_honor_retry_after(upstream):
+    upstream.responses["/orders"] = [
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(503),
+        httpx.Response(200, json={"ok": True}),
+    ]
+    before = INTEGRATION_HTTP_RETRIES.value(provider="shopify")
+
+    response = await get_http_client("shopify").get("https://winkel.test/orders")
+
+    assert response.status_code == 200
+    assert len(upstream.requests) == 3
+    assert upstream.sleeps[0] == 2.0
+    assert 0 < upstream.sleeps[1] <= settings.HTTP_CLIENT_BACKOFF_SECONDS * 2
+    assert INTEGRATION_HTTP_RETRIES.value(provider="shopify") == before + 2
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_and_long_retry_after_are_not_retried(upstream):
+    client = get_http_client("mollie")
+    upstream.responses["/v2/payments"] = [httpx.Response(503), httpx.Response(201)]
+    assert (await client.post("/payments", json={})).status_code == 503
+
+    upstream.responses["/v2/customers"] = [httpx.Response(429, headers={"Retry-After": "3600"}), httpx.Response(200)]
+    assert (await client.get("/customers")).status_code == 429
+
+    upstream.responses["/v2/methods"] = [httpx.Response(502)]
+    response = await client.get("/methods")
+    assert response.status_code == 502
+    assert len(upstream.sleeps) == settings.HTTP_CLIENT_MAX_RETRIES
+
+    resend = BoundClient("resend", {"Authorization": "Bearer re_test"}, retry=False)
+    upstream.responses["/emails"] = [httpx.Response(429), httpx.Response(200)]
+    assert (await resend.post("https://api.resend.com/emails", json={})).status_code == 429
+    assert upstream.requests[-1].headers["Authorization"] == "Bearer re_test"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(later) <= 30
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_limited_per_provider(upstream):
+    upstream.delay = 0.01
+    client = get_http_client("shopify")
+
+    await asyncio.gather(*(client.get(f"https://winkel.test/p/{i}") for i in range(12)))
+
+    assert len(upstream.requests) == 12
+    assert upstream.max_in_flight == client.config.max_concurrency
+
+
+@pytest.fixture
+def gocardless_credentials(monkeypatch):
+    monkeypatch.setattr(settings, "GOCARDLESS_SECRET_ID", "secret-id")
+    monkeypatch.setattr(settings, "GOCARDLESS_SECRET_KEY", "secret-key")
+
+
+def _token(access, refresh="refresh-1"):
+    return httpx.Response(200, json={
+        "access": access, "access_expires": 86400, "refresh": refresh, "refresh_expires": 2592000,
+    })
+
+
+@pytest.mark.asyncio
+async def test_gocardless_token_is_shared_and_refreshed_ahead(upstream, gocardless_credentials, monkeypatch):
+    now = [1000.0]
+    tokens = GoCardlessTokenCache(clock=lambda: now[0])
+    monkeypatch.setattr("app.services.gocardless.gocardless_tokens", tokens)
+    upstream.responses["/api/v2/token/new/"] = [_token("access-1")]
+    upstream.responses["/api/v2/token/refresh/"] = [httpx.Response(200, json={"access": "access-2", "access_expires": 86400})]
+    upstream.responses["/api/v2/institutions/"] = [httpx.Response(200, json=[{"id": "ING_NL"}])]
+
+    services = [GoCardlessService(MagicMock(), uuid.uuid4()) for _ in range(3)]
+    await asyncio.gather(*(s.list_institutions() for s in services))
+
+    paths = [r.url.path for r in upstream.requests]
+    assert paths.count("/api/v2/token/new/") == 1
+    assert paths.count("/api/v2/institutions/") == 3
+
+    # Inside the refresh-ahead window: the current token is still served
+    now[0] += 86400 - settings.GOCARDLESS_TOKEN_REFRESH_AHEAD_SECONDS + 1
+    assert await tokens.get_token() == "access-1"
+    await tokens._refresh_task
+    assert await tokens.get_token() == "access-2"
+    assert [r.url.path for r in upstream.requests].count("/api/v2/token/new/") == 1
+
+
+@pytest.mark.asyncio
+async def test_gocardless_renews_token_after_401(upstream, gocardless_credentials, monkeypatch):
+    tokens = GoCardlessTokenCache()
+    monkeypatch.setattr("app.services.gocardless.gocardless_tokens", tokens)
+    upstream.responses["/api/v2/token/new/"] = [_token("stale")]
+    upstream.responses["/api/v2/token/refresh/"] = [httpx.Response(200, json={"access": "fresh", "access_expires": 86400})]
+    upstream.responses["/api/v2/requisitions/req-1/"] = [
+        httpx.Response(401, json={"detail": "expired"}),
+        httpx.Response(200, json={"id": "req-1"}),
+    ]
+
+    service = GoCardlessService(MagicMock(), uuid.uuid4())
+    assert await service._api_request("GET", "/requisitions/req-1/") == {"id": "req-1"}
+
+    auth = [r.headers.get("Authorization") for r in upstream.requests if "requisitions" in r.url.path]
+    assert auth == ["Bearer stale", "Bearer fresh"]
@@ -0,0 +1,302 @@
+"""
+Tests for batch posting through LedgerService.post_entries.
+
+Covers:
+- Batch entries, lines and open items equal those of create_journal_entry
+- A batch runs in a fixed number of queries regardless of its size
+- Entry numbers stay unique per administration, also after deletes
+- Invalid drafts (unbalanced, closed period, foreign account) reject the
+  whole batch before anything is written
+- Audit records for bulk-inserted entries; batched depreciation posting,
+  also for approved depreciation decisions
+- Benchmark posting 50k entries (opt-in, pytest -m benchmark)
+"""
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.models.accounting import ChartOfAccount
+from app.models.administration import Administration
+from app.models.assets import DepreciationSchedule, FixedAsset
+from app.models.audit_log import AuditLog
+from app.models.decisions import AccountantDecision, ActionType, DecisionType
+from app.models.issues import IssueCode, IssueSeverity
+from app.models.ledger import AccountingPeriod, JournalEntry, JournalEntryStatus, JournalLine, PeriodStatus
+from app.models.subledger import OpenItem, Party
+from app.services.decisions.action_executor import ActionExecutor
+from app.services.ledger import JournalEntryDraft, LedgerError, LedgerService, UnbalancedEntryError
+from tests.factories import make_issue
+
+
+@pytest.fixture
+async def ledger(db_session, test_administration):
+    admin_id = test_administration.id
+    accounts = {
+        "bank": ChartOfAccount(administration_id=admin_id, account_code="1100", account_name="Bank", account_type="ASSET"),
+        "ar": ChartOfAccount(
+            administration_id=admin_id, account_code="1300", account_name="Debiteuren", account_type="ASSET",
+            is_control_account=True, control_type="AR",
+        ),
+        "revenue": ChartOfAccount(administration_id=admin_id, account_code="8000", account_name="Omzet", account_type="REVENUE"),
+        "expense": ChartOfAccount(administration_id=admin_id, account_code="4300", account_name="Afschrijving", account_type="EXPENSE"),
+        "accumulated": ChartOfAccount(
+            administration_id=admin_id, account_code="0210", account_name="Cum. afschrijving", account_type="ASSET",
+        ),
+    }
+    customer = Party(administration_id=admin_id, party_type="CUSTOMER", name="Klant B.V.", payment_terms_days=14)
+    periods = [
+        AccountingPeriod(
+            administration_id=admin_id, name="2026-01", period_type="MONTH",
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), status=PeriodStatus.LOCKED,
+        ),
+        AccountingPeriod(
+            administration_id=admin_id, name="2026-02", period_type="MONTH",
+            start_date=date(2026, 2, 1), end_date=date(2026, 2, 28),
+        ),
+    ]
+    db_session.add_all([*accounts.values(), customer, *periods])
+    await db_session.commit()
+    return LedgerService(db_session, admin_id), accounts, customer, periods
+
+
+def _sale(accounts, customer, entry_date, amount, reference):
+    return JournalEntryDraft(
+        entry_date=entry_date,
+        description=f"Verkoop {reference}",
+        reference=reference,
+        source_type="INVOICE",
+        lines=[
+            {"account_id": accounts["ar"].id, "debit_amount": amount, "credit_amount": 0,
+             "party_type": "CUSTOMER", "party_id": customer.id},
+            {"account_id": accounts["revenue"].id, "debit_amount": 0, "credit_amount": amount,
+             "vat_amount": Decimal("0.00"), "description": "Omzet"},
+        ],
+    )
+
+
+async def _rows(db_session, model, *criteria, order_by=None):
+    result = await db_session.execute(select(model).where(*criteria).order_by(order_by))
+    return list(result.scalars().all())
+
+
+def _columns(obj, exclude):
+    return {
+        c.key: getattr(obj, c.key)
+        for c in obj.__mapper__.column_attrs
+        if c.key not in exclude
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_single_entry_posting(db_session, ledger):
+    service, accounts, customer, periods = ledger
+    draft = _sale(accounts, customer, date(2026, 2, 10), Decimal("121.00"), "F-1")
+
+    single = await service.create_journal_entry(
+        entry_date=draft.entry_date, description=draft.description, lines=draft.lines,
+        reference=draft.reference, source_type=draft.source_type, auto_post=True,
+    )
+    batch = await service.post_entries([draft])
+    assert batch.entry_numbers == ["JE-000002"]
+    assert (batch.lines_created, batch.open_items_created) == (2, 1)
+
+    entries = {e.id: e for e in await _rows(db_session, JournalEntry)}
+    ignore = {"id", "entry_number", "posted_at", "created_at", "updated_at"}
+    assert _columns(entries[batch.entry_ids[0]], ignore) == _columns(entries[single.id], ignore)
+    assert entries[batch.entry_ids[0]].period_id == periods[1].id
+    assert entries[batch.entry_ids[0]].status == JournalEntryStatus.POSTED
+
+    ignore_line = {"id", "journal_entry_id", "created_at"}
+    single_lines, batch_lines = [
+        await _rows(db_session, JournalLine, JournalLine.journal_entry_id == entry_id, order_by=JournalLine.line_number)
+        for entry_id in (single.id, batch.entry_ids[0])
+    ]
+    assert [_columns(l, ignore_line) for l in batch_lines] == [_columns(l, ignore_line) for l in single_lines]
+
+    items = {i.journal_entry_id: i for i in await _rows(db_session, OpenItem)}
+    ignore_item = {"id", "journal_entry_id", "journal_line_id", "created_at", "updated_at"}
+    assert _columns(items[batch.entry_ids[0]], ignore_item) == _columns(items[single.id], ignore_item)
+    assert items[batch.entry_ids[0]].due_date == date(2026, 2, 24)
+    assert items[batch.entry_ids[0]].journal_line_id == batch_lines[0].id
+
+    audited = await _rows(db_session, AuditLog, AuditLog.entity_id == batch.entry_ids[0])
+    assert [(a.entity_type, a.action) for a in audited] == [("journal_entry", "create")]
+    assert audited[0].new_value["entry_number"] == "JE-000002"
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_in_fixed_number_of_queries(db_session, ledger, query_budget):
+    service, accounts, customer, _ = ledger
+    drafts = [
+        _sale(accounts, customer, date(2026, 2, 1 + i % 28), Decimal(100 + i), f"F-{i}")
+        for i in range(300)
+    ]
+
+    # Periods, accounts, parties, entry number lock and block, four bulk
+    # INSERTs and the work queue flag
+    with query_budget(max_queries=10):
+        result = await service._insert_entries(drafts, True, None, chunk_size=1000)
+    await db_session.commit()
+
+    assert result.entry_numbers[0] == "JE-000001" and result.entry_numbers[-1] == "JE-000300"
+    count = await db_session.scalar(select(func.count(OpenItem.id)))
+    assert count == result.open_items_created == 300
+
+    # Smaller chunks only add INSERT statements
+    more = await service.post_entries(drafts[:10], auto_post=False, chunk_size=3)
+    assert more.entry_numbers[0] == "JE-000301"
+    assert more.open_items_created == 0
+    drafts_status = await db_session.scalar(
+        select(func.count(JournalEntry.id)).where(JournalEntry.status == JournalEntryStatus.DRAFT)
+    )
+    assert drafts_status == 10
+
+
+@pytest.mark.asyncio
+async def test_entry_numbers_are_unique_per_administration(db_session, ledger, test_administration):
+    service, accounts, customer, _ = ledger
+    drafts = [_sale(accounts, customer, date(2026, 2, 3), Decimal("10.00"), f"F-{i}") for i in range(3)]
+    first = await service.post_entries(drafts, auto_post=False)
+
+    # A deleted draft lowers the count, not the highest number
+    await db_session.delete(await db_session.get(JournalEntry, first.entry_ids[0]))
+    await db_session.commit()
+    assert await service.allocate_entry_numbers(2) == ["JE-000004", "JE-000005"]
+    other = Administration(name="Ander B.V.", is_active=True)
+    db_session.add(other)
+    await db_session.commit()
+    assert await LedgerService(db_session, other.id).get_next_entry_number() == "JE-000001"
+
+    db_session.add(JournalEntry(
+        administration_id=test_administration.id, entry_number=first.entry_numbers[1],
+        entry_date=date(2026, 2, 3), description="Dubbel",
+    ))
+    with pytest.raises(IntegrityError):
+        await db_session.commit()
+    await db_session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_invalid_draft_rejects_whole_batch(db_session, ledger):
+    service, accounts, customer, _ = ledger
+    valid = _sale(accounts, customer, date(2026, 2, 10), Decimal("50.00"), "OK")
+
+    unbalanced = _sale(accounts, customer, date(2026, 2, 11), Decimal("50.00"), "BAD")
+    unbalanced.lines[1]["credit_amount"] = Decimal("40.00")
+    with pytest.raises(UnbalancedEntryError) as exc_info:
+        await service.post_entries([valid, unbalanced])
+    assert "batch entry 1" in exc_info.value.__notes__
+
+    locked = _sale(accounts, customer, date(2026, 1, 15), Decimal("50.00"), "LOCKED")
+    with pytest.raises(LedgerError, match="LOCKED"):
+        await service.post_entries([valid, locked])
+
+    other = Administration(name="Ander B.V.", is_active=True)
+    db_session.add(other)
+    await db_session.flush()
+    foreign = ChartOfAccount(administration_id=other.id, account_code="1100", account_name="Bank", account_type="ASSET")
+    db_session.add(foreign)
+    await db_session.commit()
+    stolen = _sale(accounts, customer, date(2026, 2, 12), Decimal("50.00"), "FOREIGN")
+    stolen.lines[1]["account_id"] = foreign.id
+    with pytest.raises(LedgerError, match="not found"):
+        await service.post_entries([valid, stolen])
+
+    assert await db_session.scalar(select(func.count(JournalEntry.id))) == 0
+    assert (await service.post_entries([])).entry_ids == []
+
+
+async def _laptop(db_session, accounts, administration_id):
+    """An asset with two unposted depreciation schedules in February."""
+    asset = FixedAsset(
+        administration_id=administration_id, asset_code="A-1", name="Laptop",
+        acquisition_date=date(2026, 1, 1), acquisition_cost=Decimal("1200.00"), useful_life_months=12,
+        asset_account_id=accounts["bank"].id, depreciation_account_id=accounts["accumulated"].id,
+        expense_account_id=accounts["expense"].id, accumulated_depreciation=Decimal("0.00"),
+        book_value=Decimal("1200.00"),
+    )
+    db_session.add(asset)
+    await db_session.flush()
+    schedules = [
+        DepreciationSchedule(
+            fixed_asset_id=asset.id, period_date=date(2026, 2, day), depreciation_amount=Decimal("100.00"),
+            accumulated_depreciation=Decimal("100.00") * n, book_value_end=Decimal("1200.00") - Decimal("100.00") * n,
+        )
+        for n, day in enumerate((1, 15), start=1)
+    ]
+    db_session.add_all(schedules)
+    await db_session.commit()
+    return asset, schedules
+
+
+@pytest.mark.asyncio
+async def test_depreciation_batch(db_session, ledger, test_administration):
+    service, accounts, _, _ = ledger
+    asset, schedules = await _laptop(db_session, accounts, test_administration.id)
+
+    result = await service.post_depreciation_batch(schedules)
+    assert len(result.entry_ids) == 2
+    assert all(s.is_posted and s.journal_entry_id for s in schedules)
+    await db_session.refresh(asset)
+    assert asset.accumulated_depreciation == Decimal("200.00")
+    assert asset.book_value == Decimal("1000.00")
+
+    # Already posted schedules are skipped
+    assert (await service.post_depreciation_batch(schedules)).entry_ids == []
+    entry = (await _rows(db_session, JournalEntry, JournalEntry.id == result.entry_ids[0]))[0]
+    assert entry.description == "Depreciation: Laptop (2026-02)"
+    assert entry.source_type == "ASSET_DEPRECIATION"
+
+
+@pytest.mark.asyncio
+async def test_approved_depreciation_decision_posts_through_the_batch_api(
+    db_session, ledger, test_administration, test_user
+):
+    _, accounts, _, _ = ledger
+    asset, schedules = await _laptop(db_session, accounts, test_administration.id)
+    issue = make_issue(
+        test_administration.id, IssueCode.DEPRECIATION_NOT_POSTED, IssueSeverity.YELLOW, fixed_asset_id=asset.id,
+    )
+    db_session.add(issue)
+    await db_session.flush()
+    decision = AccountantDecision(
+        issue_id=issue.id, action_type=ActionType.CREATE_DEPRECIATION,
+        decision=DecisionType.APPROVED, decided_by_id=test_user.id,
+    )
+    db_session.add(decision)
+    await db_session.commit()
+
+    success, entry_id, error = await ActionExecutor(db_session).execute_decision(decision)
+    await db_session.commit()
+
+    assert (success, error) == (True, None)
+    entry = await db_session.get(JournalEntry, entry_id)
+    assert (entry.entry_number, entry.description) == ("JE-000001", "Depreciation: Laptop (2026-02)")
+    assert (entry.status, entry.posted_by_id) == (JournalEntryStatus.POSTED, test_user.id)
+    assert schedules[0].journal_entry_id == entry_id and not schedules[1].is_posted
+    await db_session.refresh(asset)
+    assert asset.accumulated_depreciation == Decimal("100.00")
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_batch_posting_benchmark(db_session, ledger, record_property):
+    service, accounts, customer, _ = ledger
+    n = 50_000
+    drafts = [
+        _sale(accounts, customer, date(2026, 2, 1 + i % 28), Decimal(100 + i % 900), f"F-{i}")
+        for i in range(n)
+    ]
+
+    started = time.perf_counter()
+    result = await service.post_entries(drafts)
+    elapsed = time.perf_counter() - started
+
+    record_property("entries_per_second", round(n / elapsed))
+    assert result.entry_numbers[-1] == f"JE-{n:06d}"
+    assert await db_session.scalar(select(func.count(JournalLine.id))) == 2 * n
+    assert await db_session.scalar(select(func.count(OpenItem.id))) == n
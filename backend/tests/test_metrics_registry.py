@@ -0,0 +1,140 @@
+"""
+Tests for the in-process metrics subsystem.
+
+Covers:
+- Counter/Gauge/Histogram Prometheus text rendering
+- Request middleware records latency per route template and DB usage
+- Cursor hooks count queries per request/job
+- Postings counter increments when journal entries are flushed as POSTED
+- Business gauges are served from the cached snapshot
+- /ops/metrics/prometheus requires METRICS_TOKEN and is disabled without one
+"""
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+
+from app.core.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    HTTP_REQUEST_DURATION,
+    LEDGER_POSTINGS_TOTAL,
+    MetricsRegistry,
+    instrument_engine,
+    registry,
+    track_job,
+)
+from app.models.ledger import JournalEntry, JournalEntryStatus
+from app.services.metrics import business_metrics_cache, refresh_business_metrics
+
+
+def test_registry_renders_prometheus_text():
+    reg = MetricsRegistry()
+    counter = reg.counter("jobs_total", "Jobs.", ("kind",))
+    gauge = reg.gauge("queue_depth", "Depth.")
+    histogram = reg.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+    gauge.set(7)
+    histogram.observe(0.05, route="/x")
+    histogram.observe(0.5, route="/x")
+    histogram.observe(5, route="/x")
+
+    body = reg.render()
+    assert "# TYPE jobs_total counter" in body
+    assert 'jobs_total{kind="a"} 3' in body
+    assert "queue_depth 7" in body
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 1' in body
+    assert 'latency_seconds_bucket{route="/x",le="1"} 2' in body
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 3' in body
+    assert 'latency_seconds_count{route="/x"} 3' in body
+
+
+def test_labels_must_match():
+    reg = MetricsRegistry()
+    counter = reg.counter("things_total", "Things.", ("kind",))
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+@pytest.mark.asyncio
+async def test_track_job_counts_queries(test_engine, db_session):
+    instrument_engine(test_engine)
+    with track_job("unit_test_job") as stats:
+        await db_session.execute(text("SELECT 1"))
+        await db_session.execute(text("SELECT 2"))
+    assert stats.count == 2
+    assert 'job="unit_test_job",outcome="success"' in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_route_template(async_client, auth_headers, test_engine):
+    instrument_engine(test_engine)
+    route = "/api/v1/zzp/customers"
+    before = HTTP_REQUEST_DURATION.count(method="GET", route=route)
+
+    response = await async_client.get(route, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert HTTP_REQUEST_DURATION.count(method="GET", route=route) == before + 1
+    assert DB_QUERIES_PER_REQUEST.count(route=route) >= 1
+
+
+@pytest.mark.asyncio
+async def test_postings_counter(db_session, test_administration, test_engine):
+    instrument_engine(test_engine)
+    before = LEDGER_POSTINGS_TOTAL.value()
+    entry = JournalEntry(
+        administration_id=test_administration.id,
+        entry_number="JE-000001",
+        entry_date=date.today(),
+        description="Test",
+        total_debit=Decimal("10.00"),
+        total_credit=Decimal("10.00"),
+        is_balanced=True,
+        status=JournalEntryStatus.DRAFT,
+    )
+    db_session.add(entry)
+    await db_session.commit()
+    assert LEDGER_POSTINGS_TOTAL.value() == before
+
+    entry.status = JournalEntryStatus.POSTED
+    await db_session.commit()
+    assert LEDGER_POSTINGS_TOTAL.value() == before + 1
+
+
+@pytest.mark.asyncio
+async def test_prometheus_endpoint_serves_cached_business_gauges(async_client, db_session):
+    await refresh_business_metrics(db_session)
+    assert business_metrics_cache.get(max_age_seconds=60) is not None
+
+    with patch("app.services.metrics.MetricsService.get_all_metrics") as live, \
+            patch("app.api.v1.observability.settings.METRICS_TOKEN", "scrape-secret"):
+        response = await async_client.get(
+            "/api/v1/ops/metrics/prometheus",
+            headers={"Authorization": "Bearer scrape-secret"},
+        )
+        live.assert_not_called()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'business_active_issues{severity="red"} 0' in response.text
+    assert "http_request_duration_seconds" in response.text
+
+
+@pytest.mark.asyncio
+async def test_prometheus_endpoint_requires_token(async_client):
+    with patch("app.api.v1.observability.settings.METRICS_TOKEN", None):
+        disabled = await async_client.get("/api/v1/ops/metrics/prometheus")
+    assert disabled.status_code == 404
+
+    with patch("app.api.v1.observability.settings.METRICS_TOKEN", "scrape-secret"):
+        denied = await async_client.get("/api/v1/ops/metrics/prometheus")
+        allowed = await async_client.get(
+            "/api/v1/ops/metrics/prometheus",
+            headers={"Authorization": "Bearer scrape-secret"},
+        )
+    assert denied.status_code == 401
+    assert allowed.status_code == 200
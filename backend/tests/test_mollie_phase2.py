@@ -808,6 +808,8 @@ async def test_webhook_payment_paid_from_past_due(
             assert response.status_code == 200
             
             # Verify subscription is now ACTIVE
+            # (processed by the webhook consumer in its own session)
+            db_session.expire(subscription)
             result = await db_session.execute(
                 select(Subscription).where(
                     Subscription.administration_id == test_administration.id
@@ -872,6 +874,8 @@ async def test_webhook_subscription_canceled_records_period_end(
             assert response.status_code == 200
             
             # Verify subscription is CANCELED with period end recorded
+            # (processed by the webhook consumer in its own session)
+            db_session.expire(subscription)
             result = await db_session.execute(
                 select(Subscription).where(
                     Subscription.administration_id == test_administration.id
@@ -0,0 +1,220 @@
+"""
+Tests for the Mollie webhook ingestion queue.
+
+Covers:
+- The endpoint stores the event and acknowledges without calling Mollie;
+  repeated deliveries coalesce into one event
+- The consumer fetches with bounded concurrency and applies events per
+  subscription in receipt order
+- Failed events are retried, then marked FAILED; later events of the same
+  subscription wait; a new delivery revives a FAILED event
+- Lag and backlog metrics
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select
+
+from app.core.metrics import MOLLIE_WEBHOOK_BACKLOG, MOLLIE_WEBHOOK_LAG
+from app.integrations.mollie.client import MollieError
+from app.models.subscription import Subscription, SubscriptionStatus, WebhookEvent
+from app.services.mollie_webhook_queue import (
+    FAILED,
+    PROCESSED,
+    RECEIVED,
+    MollieWebhookConsumer,
+    enqueue_mollie_webhook,
+)
+
+WEBHOOK_SECRET = "queue_secret"
+
+
+class StubMollie:
+    """
+    Stands in for MollieClient: serves payments/subscriptions from dicts.
+
+    With ``parties`` set, every call waits until that many calls are in
+    flight at once, so a consumer that runs fewer calls concurrently times
+    out instead of passing by luck.
+    """
+
+    def __init__(self, payments=None, subscriptions=None, parties=None):
+        self.payments = payments or {}
+        self.subscriptions = subscriptions or {}
+        self.barrier = asyncio.Barrier(parties) if parties else None
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def _serve(self, resource_id, resources):
+        self.calls.append(resource_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.barrier is not None:
+                await asyncio.wait_for(self.barrier.wait(), timeout=5)
+            resource = resources[resource_id]
+            if isinstance(resource, Exception):
+                raise resource
+            return resource
+        finally:
+            self.in_flight -= 1
+
+    async def get_payment(self, payment_id):
+        return await self._serve(payment_id, self.payments)
+
+    async def get_subscription(self, customer_id, subscription_id):
+        return await self._serve(subscription_id, self.subscriptions)
+
+
+async def _subscription(db_session, administration, plan, name, status=SubscriptionStatus.TRIALING):
+    now = datetime.now(timezone.utc)
+    subscription = Subscription(
+        administration_id=administration.id,
+        plan_id=plan.id,
+        plan_code=plan.code,
+        status=status,
+        trial_start_at=now - timedelta(days=60),
+        trial_end_at=now - timedelta(days=30),
+        starts_at=now - timedelta(days=60),
+        provider="mollie",
+        provider_customer_id=f"cst_{name}",
+        provider_subscription_id=f"sub_{name}",
+    )
+    db_session.add(subscription)
+    await db_session.commit()
+    return subscription
+
+
+async def _events(db_session):
+    db_session.expire_all()
+    rows = (await db_session.execute(select(WebhookEvent))).scalars().all()
+    return {e.resource_id: e for e in rows}
+
+
+@pytest.mark.asyncio
+async def test_endpoint_queues_and_acknowledges(async_client, db_session):
+    stub = StubMollie()
+    with patch("app.api.v1.webhooks.settings.MOLLIE_WEBHOOK_SECRET", WEBHOOK_SECRET), \
+         patch("app.services.mollie_webhook_queue.drain_mollie_webhooks", new=AsyncMock()) as drain:
+        first = await async_client.post(f"/api/v1/webhooks/mollie?secret={WEBHOOK_SECRET}", data={"id": "tr_burst"})
+        second = await async_client.post(f"/api/v1/webhooks/mollie?secret={WEBHOOK_SECRET}", data={"id": "tr_burst"})
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.json()["result"] == {"status": "queued", "event_id": "payment_tr_burst"}
+    assert second.json()["result"]["status"] == "duplicate"
+    assert drain.await_count == 1  # Only the new event schedules a drain
+    assert stub.calls == []
+
+    events = await _events(db_session)
+    assert list(events) == ["tr_burst"]
+    assert events["tr_burst"].status == RECEIVED
+    assert events["tr_burst"].processed_at is None
+
+
+@pytest.mark.asyncio
+async def test_consumer_orders_per_subscription_with_bounded_concurrency(
+    db_session, test_session_maker, test_administration, test_zzp_plan,
+):
+    ordered = await _subscription(db_session, test_administration, test_zzp_plan, "ordered")
+    others = [
+        await _subscription(db_session, test_administration, test_zzp_plan, f"other{i}")
+        for i in range(6)
+    ]
+    # Mollie reports the failed retry first, then the successful payment
+    payments = {
+        "tr_1_failed": {"id": "tr_1_failed", "status": "failed", "subscriptionId": "sub_ordered"},
+        "tr_2_paid": {"id": "tr_2_paid", "status": "paid", "subscriptionId": "sub_ordered"},
+    }
+    for i, sub in enumerate(others):
+        payments[f"tr_other{i}"] = {"id": f"tr_other{i}", "status": "failed", "subscriptionId": sub.provider_subscription_id}
+    subscriptions = {"sub_other0": {"id": "sub_other0", "status": "canceled"}}
+
+    for resource_id in ["tr_1_failed", "tr_2_paid", *[f"tr_other{i}" for i in range(6)], "sub_other0", "tr_2_paid"]:
+        await enqueue_mollie_webhook(db_session, resource_id)
+        await db_session.commit()
+
+    stub = StubMollie(payments, subscriptions, parties=3)  # 9 fetches: three full rounds
+    lag_before = MOLLIE_WEBHOOK_LAG.count()
+    consumer = MollieWebhookConsumer(test_session_maker, mollie_factory=stub, concurrency=3)
+    result = await consumer.run_once()
+
+    assert (result.claimed, result.processed, result.retried, result.failed) == (9, 9, 0, 0)
+    assert stub.max_in_flight == 3
+    assert sorted(stub.calls) == sorted(set(stub.calls))  # Coalesced: each resource fetched once
+    assert MOLLIE_WEBHOOK_LAG.count() == lag_before + 9
+    assert MOLLIE_WEBHOOK_BACKLOG.value() == 0
+
+    events = await _events(db_session)
+    assert all(e.status == PROCESSED for e in events.values())
+    assert events["tr_2_paid"].processed_at is not None
+
+    await db_session.refresh(ordered)
+    assert ordered.status == SubscriptionStatus.ACTIVE  # paid was received last
+    await db_session.refresh(others[0])
+    assert others[0].status == SubscriptionStatus.CANCELED  # payment, then subscription event
+    await db_session.refresh(others[1])
+    assert others[1].status == SubscriptionStatus.PAST_DUE
+
+    # Nothing left: a second run claims nothing and calls Mollie no more
+    calls = len(stub.calls)
+    assert (await consumer.run_once()).claimed == 0
+    assert len(stub.calls) == calls
+
+
+@pytest.mark.asyncio
+async def test_failures_are_retried_then_failed_and_block_later_events(
+    db_session, test_session_maker, test_administration, test_zzp_plan,
+):
+    subscription = await _subscription(db_session, test_administration, test_zzp_plan, "flaky")
+    payments = {
+        "tr_down": MollieError("Mollie API error (status 503)", status_code=503),
+        "tr_first": {"id": "tr_first", "status": "paid", "subscriptionId": "sub_flaky"},
+        "tr_second": {"id": "tr_second", "status": "failed", "subscriptionId": "sub_flaky"},
+    }
+    for resource_id in ["tr_down", "tr_first", "tr_second"]:
+        await enqueue_mollie_webhook(db_session, resource_id)
+    await db_session.commit()
+
+    stub = StubMollie(payments)
+    consumer = MollieWebhookConsumer(test_session_maker, mollie_factory=stub, max_attempts=2)
+
+    apply = consumer.service.apply_webhook_resource
+    with patch.object(consumer.service, "apply_webhook_resource", side_effect=[RuntimeError("db hiccup")]):
+        result = await consumer.run_once()
+    assert (result.processed, result.retried) == (0, 2)
+
+    events = await _events(db_session)
+    assert (events["tr_down"].status, events["tr_down"].attempts) == (RECEIVED, 1)
+    assert "503" in events["tr_down"].last_error
+    assert (events["tr_first"].status, events["tr_first"].attempts) == (RECEIVED, 1)
+    # The later event of the same subscription was released, not attempted
+    assert (events["tr_second"].status, events["tr_second"].attempts) == (RECEIVED, 0)
+    assert MOLLIE_WEBHOOK_BACKLOG.value() == 3
+
+    with patch.object(consumer.service, "apply_webhook_resource", side_effect=apply):
+        result = await consumer.run_once()
+    assert (result.processed, result.failed) == (2, 1)
+
+    events = await _events(db_session)
+    assert (events["tr_down"].status, events["tr_down"].attempts) == (FAILED, 2)
+    assert events["tr_second"].status == PROCESSED
+    await db_session.refresh(subscription)
+    assert subscription.status == SubscriptionStatus.PAST_DUE  # first (paid), then second (failed)
+
+    # Mollie delivers the failed resource again: it is queued afresh
+    assert (await enqueue_mollie_webhook(db_session, "tr_down")).queued
+    await db_session.commit()
+    events = await _events(db_session)
+    assert (events["tr_down"].status, events["tr_down"].attempts) == (RECEIVED, 0)
@@ -0,0 +1,140 @@
+"""
+Tests for non-blocking password hashing in core/security.py.
+
+Covers:
+- Hashing runs in the bounded pool and round-trips with the sync helpers
+- A full hashing queue sheds login requests with 503 + Retry-After
+- Hashes with an outdated bcrypt cost are upgraded on login
+- Login-storm benchmark (opt-in, pytest -m benchmark): p99 latency of a
+  non-auth endpoint stays low while bcrypt is busy (budget via
+  LOGIN_STORM_P99_BUDGET_SECONDS)
+"""
+import asyncio
+import os
+import statistics
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from passlib.hash import bcrypt
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+from app.core import security
+from app.core.database import get_db
+from app.core.security import (
+    PasswordHashingOverloaded,
+    get_password_hash,
+    get_password_hash_async,
+    pwd_context,
+    verify_and_update_password,
+    verify_password,
+    verify_password_async,
+)
+from app.main import app as fastapi_app
+
+LOGIN_STORM_P99_BUDGET_SECONDS = float(os.environ.get("LOGIN_STORM_P99_BUDGET_SECONDS", "0.15"))
+
+
+async def _login(client, password="TestPassword123"):
+    return await client.post(
+        "/api/v1/auth/token",
+        data={"username": "test-zzp@example.com", "password": password},
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_login_rate_limit():
+    with patch("app.api.v1.auth.check_rate_limit"):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_hashing_runs_off_the_event_loop():
+    seen = []
+    original = security.get_password_hash
+
+    def record(password):
+        seen.append(threading.current_thread().name)
+        return original(password)
+
+    with patch("app.core.security.get_password_hash", record):
+        hashed = await get_password_hash_async("Secret12345")
+
+    assert seen and seen[0].startswith("password-hash")
+    assert verify_password("Secret12345", hashed)
+    assert await verify_password_async("Secret12345", get_password_hash("Secret12345"))
+    assert security.password_hashing_pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_load(async_client):
+    with patch.object(security.settings, "PASSWORD_HASH_MAX_PENDING", 0):
+        with pytest.raises(PasswordHashingOverloaded):
+            await verify_password_async("x", get_password_hash("x"))
+        response = await _login(async_client)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(security.settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)
+    assert security.password_hashing_pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_low_cost_hash(async_client, db_session, test_user):
+    test_user.hashed_password = bcrypt.using(rounds=4).hash("TestPassword123")
+    await db_session.commit()
+    assert pwd_context.needs_update(test_user.hashed_password)
+
+    response = await _login(async_client)
+
+    assert response.status_code == 200
+    await db_session.refresh(test_user)
+    assert not pwd_context.needs_update(test_user.hashed_password)
+    assert verify_password("TestPassword123", test_user.hashed_password)
+
+    valid, new_hash = await verify_and_update_password("TestPassword123", test_user.hashed_password)
+    assert valid and new_hash is None
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_login_storm_keeps_other_endpoints_responsive(test_engine, test_user, record_property):
+    # Each request gets its own session; the shared test session cannot be
+    # used concurrently.
+    session_maker = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def per_request_db():
+        async with session_maker() as session:
+            yield session
+
+    fastapi_app.dependency_overrides[get_db] = per_request_db
+    latencies = []
+    try:
+        async with AsyncClient(transport=ASGITransport(app=fastapi_app), base_url="http://test") as client:
+            await client.get("/")  # warm up
+
+            async def probe():
+                while not storm.done():
+                    start = time.perf_counter()
+                    response = await client.get("/")
+                    latencies.append(time.perf_counter() - start)
+                    assert response.status_code == 200
+                    await asyncio.sleep(0.01)
+
+            started = time.perf_counter()
+            storm = asyncio.gather(*(_login(client, "WrongPassword1") for _ in range(8)))
+            await probe()
+            statuses = [r.status_code for r in await storm]
+            elapsed = time.perf_counter() - started
+    finally:
+        fastapi_app.dependency_overrides.clear()
+
+    assert set(statuses) <= {401, 503}
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    record_property("login_storm_seconds", round(elapsed, 3))
+    record_property("median_ms", round(statistics.median(latencies) * 1000, 1))
+    record_property("p99_ms", round(p99 * 1000, 1))
+    assert len(latencies) >= 5
+    assert p99 < LOGIN_STORM_P99_BUDGET_SECONDS
@@ -0,0 +1,103 @@
+"""
+Tests for per-request query profiling and N+1 detection.
+
+Covers:
+- Statement shape normalization (literals, placeholders, IN-lists)
+- Repeated statement detection and nested scopes
+- query_budget fixture passes within budget and fails on regressions
+- Server-Timing header is only added in DEBUG mode
+- Slow requests and N+1 signatures are logged
+"""
+import logging
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select, text
+
+from app.core.query_profiler import (
+    QueryBudgetExceeded,
+    QueryStats,
+    log_query_profile,
+    normalize_statement,
+)
+from app.models.zzp import ZZPCustomer
+
+
+def test_normalize_statement_collapses_values():
+    a = normalize_statement("SELECT * FROM parties WHERE id = $1 AND name = 'Acme'")
+    b = normalize_statement("SELECT *  FROM parties\n WHERE id = $7 AND name = 'Other B.V.'")
+    assert a == b == "SELECT * FROM parties WHERE id = ? AND name = ?"
+
+    assert normalize_statement("SELECT x FROM t WHERE id IN (?, ?, ?) LIMIT 10") == (
+        "SELECT x FROM t WHERE id IN (...) LIMIT ?"
+    )
+    assert normalize_statement("SELECT x FROM t1 WHERE a = %(a_1)s") == "SELECT x FROM t1 WHERE a = ?"
+
+
+def test_repeated_statements_and_parent_forwarding():
+    parent = QueryStats()
+    child = QueryStats(parent=parent)
+    for i in range(5):
+        child.record(f"SELECT * FROM parties WHERE id = {i}", 0.001)
+    child.record("SELECT count(*) FROM journal_entries", 0.01)
+
+    assert child.count == parent.count == 6
+    repeated = child.repeated_statements(threshold=3)
+    assert len(repeated) == 1
+    assert repeated[0].count == 5
+    assert child.top_statements(limit=1)[0].shape == "SELECT count(*) FROM journal_entries"
+
+
+def test_log_query_profile_flags_slow_and_repeated(caplog):
+    stats = QueryStats()
+    for i in range(4):
+        stats.record(f"SELECT * FROM open_items WHERE id = {i}", 0.2)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_profiler"):
+        repeated = log_query_profile(
+            "request GET /x", stats, elapsed=1.5,
+            slow_threshold_seconds=1.0, repeat_threshold=3,
+        )
+
+    assert len(repeated) == 1
+    assert "Possible N+1 in request GET /x: 4 executions" in caplog.text
+    assert "Slow request GET /x" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_query_budget_fixture(db_session, query_budget):
+    with query_budget(max_queries=2) as stats:
+        await db_session.execute(text("SELECT 1"))
+    assert stats.count == 1
+
+    with pytest.raises(QueryBudgetExceeded, match="Query budget exceeded"):
+        with query_budget(max_queries=2):
+            for _ in range(3):
+                await db_session.execute(text("SELECT 1"))
+
+    with pytest.raises(QueryBudgetExceeded, match="N\\+1"):
+        with query_budget(max_queries=50, max_repeats=2):
+            for i in range(3):
+                await db_session.execute(select(ZZPCustomer).where(ZZPCustomer.name == f"c{i}"))
+
+
+@pytest.mark.asyncio
+async def test_endpoint_query_budget(async_client, auth_headers, test_customer, query_budget):
+    with query_budget(max_queries=15, max_repeats=3) as stats:
+        response = await async_client.get("/api/v1/zzp/customers", headers=auth_headers)
+    assert response.status_code == 200
+    assert stats.count >= 1
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header_only_in_debug(async_client, auth_headers, test_engine):
+    from app.core.metrics import instrument_engine
+    instrument_engine(test_engine)
+
+    response = await async_client.get("/api/v1/zzp/customers", headers=auth_headers)
+    assert "server-timing" not in response.headers
+
+    with patch("app.core.metrics.settings.DEBUG", True):
+        response = await async_client.get("/api/v1/zzp/customers", headers=auth_headers)
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert "queries" in response.headers["server-timing"]
@@ -0,0 +1,201 @@
+"""
+Tests for the batched reminder dispatch pipeline.
+
+Covers:
+- IN_APP and EMAIL reminders are delivered and marked SENT in bulk
+- Reminders are claimed in bounded batches until the queue is drained
+- Future reminders are left SCHEDULED
+- Variables are substituted per reminder; reminders sharing a template
+  keep their own text, and other ``$`` text is sent unchanged
+- Batches are committed as SENDING before sending; expired claims are
+  picked up again
+- Transient (429/5xx) errors are retried; permanent errors mark FAILED
+- EMAIL reminders without an email client are marked FAILED
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.models.accountant_dashboard import ClientReminder
+from app.services.reminder_dispatch import ReminderDispatcher, ResendEmailClient
+from app.services.reminders import process_scheduled_reminders
+
+
+def _make_reminder(admin_id, user_id, **overrides) -> ClientReminder:
+    values = dict(
+        administration_id=admin_id,
+        reminder_type="DOCUMENT_MISSING",
+        title="Herinnering",
+        message="Upload uw bonnen",
+        created_by_id=user_id,
+        channel="IN_APP",
+        status="SCHEDULED",
+        scheduled_at=datetime.now(timezone.utc) - timedelta(minutes=1),
+    )
+    values.update(overrides)
+    return ClientReminder(**values)
+
+
+class _StubResend:
+    """Records requests sent to the Resend API and replays scripted statuses."""
+
+    def __init__(self, statuses=None, on_request=None):
+        self.statuses = list(statuses or [])
+        self.requests = []
+        self.on_request = on_request
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.on_request:
+            self.on_request()
+        self.requests.append(json.loads(request.content))
+        status = self.statuses.pop(0) if self.statuses else 200
+        return httpx.Response(status, json={"id": "email_123"})
+
+    def client(self) -> ResendEmailClient:
+        return ResendEmailClient("re_test", "no-reply@example.com", transport=httpx.MockTransport(self))
+
+
+async def _statuses(db_session):
+    result = await db_session.execute(select(ClientReminder.status, ClientReminder.send_error))
+    return result.all()
+
+
+@pytest.mark.asyncio
+async def test_in_app_reminders_drained_in_batches(db_session, test_user, test_administration):
+    for _ in range(5):
+        db_session.add(_make_reminder(test_administration.id, test_user.id))
+    db_session.add(_make_reminder(
+        test_administration.id, test_user.id,
+        scheduled_at=datetime.now(timezone.utc) + timedelta(hours=1),
+    ))
+    await db_session.commit()
+
+    result = await ReminderDispatcher(batch_size=2).run(db_session)
+
+    assert result.sent == 5
+    assert result.failed == 0
+    assert result.batches == 3
+    statuses = sorted(s for s, _ in await _statuses(db_session))
+    assert statuses == ["SCHEDULED"] + ["SENT"] * 5
+
+
+@pytest.mark.asyncio
+async def test_email_reminders_rendered_and_sent(db_session, test_user, test_administration):
+    for i in range(3):
+        db_session.add(_make_reminder(
+            test_administration.id, test_user.id,
+            channel="EMAIL",
+            email_address=f"client{i}@example.com",
+            title="Aangifte ${period}",
+            message="Beste ${name}, lever uw stukken aan.",
+            template_id="vat_deadline",
+            variables={"period": "Q1", "name": f"Klant {i}"},
+        ))
+    await db_session.commit()
+
+    stub = _StubResend()
+    dispatcher = ReminderDispatcher(email_client=stub.client(), rate_per_second=0)
+    result = await dispatcher.run(db_session)
+
+    assert result.sent == 3
+    assert {r["to"][0] for r in stub.requests} == {f"client{i}@example.com" for i in range(3)}
+    assert all(r["subject"] == "Aangifte Q1" for r in stub.requests)
+    assert {r["text"] for r in stub.requests} == {
+        f"Beste Klant {i}, lever uw stukken aan." for i in range(3)
+    }
+
+
+@pytest.mark.asyncio
+async def test_shared_template_keeps_each_reminders_text(db_session, test_user, test_administration):
+    texts = [
+        ("Aangifte ${period}", "Beste ${name}, uw bijdrage is $$5 of $5 per maand."),
+        ("Herinnering ${period}", "Beste ${name}, kosten: 10$ en $onbekend."),
+    ]
+    for i, (title, message) in enumerate(texts):
+        db_session.add(_make_reminder(
+            test_administration.id, test_user.id,
+            channel="EMAIL",
+            email_address=f"client{i}@example.com",
+            title=title,
+            message=message,
+            template_id="vat_deadline",
+            variables={"period": "Q2", "name": f"Klant {i}", "locale": "nl"},
+        ))
+    await db_session.commit()
+
+    # Nothing may be locked or uncommitted while the provider is called
+    open_transactions = []
+    stub = _StubResend(on_request=lambda: open_transactions.append(db_session.in_transaction()))
+    result = await ReminderDispatcher(email_client=stub.client(), rate_per_second=0).run(db_session)
+
+    assert result.sent == 2
+    assert open_transactions == [False, False]
+    sent = {r["to"][0]: (r["subject"], r["text"]) for r in stub.requests}
+    assert sent == {
+        "client0@example.com": ("Aangifte Q2", "Beste Klant 0, uw bijdrage is $$5 of $5 per maand."),
+        "client1@example.com": ("Herinnering Q2", "Beste Klant 1, kosten: 10$ en $onbekend."),
+    }
+
+
+@pytest.mark.asyncio
+async def test_expired_sending_claims_are_retried(db_session, test_user, test_administration):
+    now = datetime.now(timezone.utc)
+    db_session.add_all([
+        _make_reminder(test_administration.id, test_user.id, status="SENDING", claimed_at=now - timedelta(hours=1)),
+        _make_reminder(test_administration.id, test_user.id, status="SENDING", claimed_at=now),
+    ])
+    await db_session.commit()
+
+    result = await ReminderDispatcher(lease_seconds=600).run(db_session)
+
+    assert result.sent == 1
+    assert sorted(s for s, _ in await _statuses(db_session)) == ["SENDING", "SENT"]
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_retried_and_permanent_errors_failed(db_session, test_user, test_administration):
+    db_session.add(_make_reminder(
+        test_administration.id, test_user.id, channel="EMAIL", email_address="a@example.com",
+    ))
+    await db_session.commit()
+
+    stub = _StubResend(statuses=[429, 503, 200])
+    result = await ReminderDispatcher(
+        email_client=stub.client(), rate_per_second=0, backoff_base_seconds=0,
+    ).run(db_session)
+    assert result.sent == 1
+    assert len(stub.requests) == 3
+
+    db_session.add(_make_reminder(
+        test_administration.id, test_user.id, channel="EMAIL", email_address="b@example.com",
+    ))
+    await db_session.commit()
+
+    stub = _StubResend(statuses=[422])
+    result = await ReminderDispatcher(
+        email_client=stub.client(), rate_per_second=0, backoff_base_seconds=0,
+    ).run(db_session)
+    assert result.failed == 1
+    assert len(stub.requests) == 1
+    rows = await _statuses(db_session)
+    assert ("FAILED", ) == tuple(s for s, e in rows if e)
+    assert any("422" in (e or "") for _, e in rows)
+
+
+@pytest.mark.asyncio
+async def test_process_scheduled_reminders_without_email_config(db_session, test_user, test_administration):
+    db_session.add(_make_reminder(test_administration.id, test_user.id))
+    db_session.add(_make_reminder(
+        test_administration.id, test_user.id, channel="EMAIL", email_address="c@example.com",
+    ))
+    await db_session.commit()
+
+    processed = await process_scheduled_reminders(db_session)
+
+    assert processed == 2
+    rows = await _statuses(db_session)
+    assert sorted(s for s, _ in rows) == ["FAILED", "SENT"]
+    assert any(e == "Resend API key not configured" for _, e in rows)
@@ -0,0 +1,169 @@
+"""
+Tests for snapshot-based balance reports in services/reports/financial.py.
+
+Covers:
+- Balances start from the latest FINALIZED/LOCKED PeriodSnapshot and add
+  only journal lines after it
+- Entries back-dated into the snapshot window after finalization are included
+- Full aggregation fallback when no snapshot covers the report date
+- Verification mode compares both paths
+"""
+import logging
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.models.accounting import ChartOfAccount
+from app.models.ledger import (
+    AccountingPeriod,
+    JournalEntry,
+    JournalEntryStatus,
+    JournalLine,
+    PeriodSnapshot,
+    PeriodStatus,
+)
+from app.services.reports import ReportService
+
+SNAPSHOT_TAKEN_AT = datetime(2025, 1, 10, 12, 0, tzinfo=timezone.utc)
+
+
+async def _post(db, administration_id, accounts, entry_date, amount, posted_at, number):
+    bank, revenue = accounts
+    entry = JournalEntry(
+        administration_id=administration_id,
+        entry_number=number,
+        entry_date=entry_date,
+        description=number,
+        total_debit=amount,
+        total_credit=amount,
+        is_balanced=True,
+        status=JournalEntryStatus.POSTED,
+        posted=True,
+        posted_at=posted_at,
+    )
+    db.add(entry)
+    await db.flush()
+    db.add_all([
+        JournalLine(journal_entry_id=entry.id, account_id=bank.id, line_number=1,
+                    debit_amount=amount, credit_amount=Decimal("0.00")),
+        JournalLine(journal_entry_id=entry.id, account_id=revenue.id, line_number=2,
+                    debit_amount=Decimal("0.00"), credit_amount=amount),
+    ])
+    await db.commit()
+
+
+@pytest.fixture
+async def ledger_with_snapshot(db_session, test_administration):
+    admin_id = test_administration.id
+    bank = ChartOfAccount(administration_id=admin_id, account_code="1100", account_name="Bank", account_type="ASSET")
+    revenue = ChartOfAccount(administration_id=admin_id, account_code="8000", account_name="Omzet", account_type="REVENUE")
+    db_session.add_all([bank, revenue])
+    await db_session.commit()
+    accounts = (bank, revenue)
+
+    await _post(db_session, admin_id, accounts, date(2024, 3, 1), Decimal("100.00"),
+                datetime(2024, 3, 1, tzinfo=timezone.utc), "JE-1")
+
+    period = AccountingPeriod(
+        administration_id=admin_id, name="2024", period_type="YEAR",
+        start_date=date(2024, 1, 1), end_date=date(2024, 12, 31),
+        status=PeriodStatus.FINALIZED,
+    )
+    db_session.add(period)
+    await db_session.flush()
+
+    full = await ReportService(db_session, admin_id, use_snapshots=False).get_trial_balance(date(2024, 12, 31))
+    db_session.add(PeriodSnapshot(
+        period_id=period.id,
+        administration_id=admin_id,
+        snapshot_type="FINALIZATION",
+        created_at=SNAPSHOT_TAKEN_AT,
+        trial_balance=[
+            {
+                "account_id": str(b.account_id),
+                "account_code": b.account_code,
+                "debit_total": str(b.debit_total),
+                "credit_total": str(b.credit_total),
+                "balance": str(b.balance),
+            }
+            for b in full
+        ],
+    ))
+    await db_session.commit()
+
+    # Open period activity after the snapshot
+    await _post(db_session, admin_id, accounts, date(2025, 2, 1), Decimal("50.00"),
+                datetime(2025, 2, 1, tzinfo=timezone.utc), "JE-2")
+    return accounts
+
+
+def _balance(balances, account):
+    return next(b.balance for b in balances if b.account_id == account.id)
+
+
+@pytest.mark.asyncio
+async def test_balances_start_from_snapshot(db_session, test_administration, ledger_with_snapshot):
+    bank, revenue = ledger_with_snapshot
+    admin_id = test_administration.id
+
+    # A line the snapshot already "contains" (posted before it was taken):
+    # the snapshot path must not read it again, the full path does.
+    await _post(db_session, admin_id, ledger_with_snapshot, date(2024, 6, 1), Decimal("7.00"),
+                datetime(2024, 6, 1, tzinfo=timezone.utc), "JE-HIDDEN")
+
+    service = ReportService(db_session, admin_id)
+    balances = await service.get_trial_balance(date(2025, 12, 31))
+    assert _balance(balances, bank) == Decimal("150.00")
+    assert _balance(balances, revenue) == Decimal("150.00")
+
+    full = await ReportService(db_session, admin_id, use_snapshots=False).get_trial_balance(date(2025, 12, 31))
+    assert _balance(full, bank) == Decimal("157.00")
+
+    sheet = await service.get_balance_sheet(date(2025, 12, 31))
+    assert sheet.total_assets == Decimal("150.00")
+
+
+@pytest.mark.asyncio
+async def test_backdated_posting_after_snapshot_is_included(db_session, test_administration, ledger_with_snapshot):
+    bank, _ = ledger_with_snapshot
+    admin_id = test_administration.id
+    await _post(db_session, admin_id, ledger_with_snapshot, date(2024, 11, 15), Decimal("25.00"),
+                datetime(2025, 3, 1, tzinfo=timezone.utc), "JE-LATE")
+
+    balances = await ReportService(db_session, admin_id).get_trial_balance(date(2025, 12, 31))
+    assert _balance(balances, bank) == Decimal("175.00")
+
+    verification = await ReportService(db_session, admin_id).verify_snapshot_balances(date(2025, 12, 31))
+    assert verification.snapshot_id is not None
+    assert verification.matches
+
+
+@pytest.mark.asyncio
+async def test_full_aggregation_before_first_snapshot(db_session, test_administration, ledger_with_snapshot):
+    bank, _ = ledger_with_snapshot
+    service = ReportService(db_session, test_administration.id)
+
+    assert await service._get_snapshot_baseline(date(2024, 12, 30)) is None
+    balances = await service.get_trial_balance(date(2024, 6, 30))
+    assert _balance(balances, bank) == Decimal("100.00")
+
+
+@pytest.mark.asyncio
+async def test_verification_mode_reports_differences(db_session, test_administration, ledger_with_snapshot, caplog):
+    bank, revenue = ledger_with_snapshot
+    admin_id = test_administration.id
+    await _post(db_session, admin_id, ledger_with_snapshot, date(2024, 6, 1), Decimal("7.00"),
+                datetime(2024, 6, 1, tzinfo=timezone.utc), "JE-HIDDEN")
+
+    verification = await ReportService(db_session, admin_id).verify_snapshot_balances(date(2025, 12, 31))
+    assert not verification.matches
+    assert {d.account_id for d in verification.differences} == {bank.id, revenue.id}
+
+    with patch("app.services.reports.financial.settings.REPORT_SNAPSHOT_VERIFY", True), \
+            caplog.at_level(logging.WARNING, logger="app.services.reports.financial"):
+        balances = await ReportService(db_session, admin_id).get_trial_balance(date(2025, 12, 31))
+
+    assert _balance(balances, bank) == Decimal("157.00")  # full result is served
+    assert "disagrees with full aggregation" in caplog.text
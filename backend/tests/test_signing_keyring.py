@@ -0,0 +1,201 @@
+"""
+Tests for the signing keyring and batch signing.
+
+Covers:
+- Keyring TTL/LRU eviction wipes key material
+- CertificateService decrypts a key once and serves later signatures from
+  the keyring; deactivation evicts it
+- sign_many signs in-process and across worker processes, reporting
+  per-item certificate errors
+- The signature declares the C14N 2.0 canonicalization it was computed with
+- Throughput benchmark against a locally generated PKCS#12 certificate
+  (opt-in, pytest -m benchmark)
+"""
+import hashlib
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from base64 import b64decode
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.hazmat.primitives.serialization import pkcs12
+from cryptography.x509.oid import NameOID
+
+from app.models.certificate import Certificate
+from app.services.certificate_service import CertificateService
+from app.services.signing_keyring import SigningKeyring
+from app.services.signing_service import SigningRequest, SigningService, shutdown_signing_pool
+from app.services.xml_signing import C14N_ALGORITHM, NS_DS, SigningKey, canonicalize_xml
+
+PASSPHRASE = "test-passphrase"
+
+
+def _generate_certificate():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([
+        x509.NameAttribute(NameOID.COUNTRY_NAME, "NL"),
+        x509.NameAttribute(NameOID.ORGANIZATION_NAME, "PKIoverheid Test"),
+        x509.NameAttribute(NameOID.COMMON_NAME, "signing.pkioverheid.test"),
+    ])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=365))
+        .sign(private_key, hashes.SHA256())
+    )
+    return cert, private_key
+
+
+@pytest.fixture(scope="module")
+def pkcs12_file(tmp_path_factory):
+    cert, key = _generate_certificate()
+    path = tmp_path_factory.mktemp("pki") / "signing.pfx"
+    path.write_bytes(pkcs12.serialize_key_and_certificates(
+        b"signing", key, cert, None,
+        serialization.BestAvailableEncryption(PASSPHRASE.encode()),
+    ))
+    return path, cert
+
+
+@pytest.fixture
+async def registered_certificate(db_session, test_user, test_administration, pkcs12_file):
+    path, cert = pkcs12_file
+    certificate = Certificate(
+        administration_id=test_administration.id,
+        created_by=test_user.id,
+        type="PKI_OVERHEID",
+        storage_ref=str(path),
+        passphrase_ref=PASSPHRASE,
+        fingerprint=hashlib.sha256(cert.public_bytes(serialization.Encoding.DER)).hexdigest(),
+        subject=cert.subject.rfc4514_string(),
+        issuer=cert.issuer.rfc4514_string(),
+        serial_number=str(cert.serial_number),
+        valid_from=cert.not_valid_before_utc,
+        valid_to=cert.not_valid_after_utc,
+        is_active=True,
+    )
+    db_session.add(certificate)
+    await db_session.commit()
+    return certificate
+
+
+def _assert_valid_signature(xml_content, signature_info, cert, signed_xml=None):
+    digest = hashlib.sha256(canonicalize_xml(xml_content).encode("utf-8")).digest()
+    assert b64decode(signature_info["digest_value"]) == digest
+    if signed_xml is not None:
+        # A verifier applies the declared transforms: enveloped-signature,
+        # then C14N 2.0 with TrimTextNodes
+        root = ET.fromstring(signed_xml)
+        signature = root.find(f"{{{NS_DS}}}Signature")
+        methods = [
+            (m.get("Algorithm"), m.findtext(f"{{{C14N_ALGORITHM}}}TrimTextNodes"))
+            for m in signature.iter()
+            if m.tag in (f"{{{NS_DS}}}CanonicalizationMethod", f"{{{NS_DS}}}Transform")
+        ]
+        assert methods == [
+            (C14N_ALGORITHM, "true"),
+            ("http://www.w3.org/2000/09/xmldsig#enveloped-signature", None),
+            (C14N_ALGORITHM, "true"),
+        ]
+        root.remove(signature)
+        transformed = ET.canonicalize(ET.tostring(root, encoding="unicode"), strip_text=True)
+        assert hashlib.sha256(transformed.encode("utf-8")).digest() == digest
+    cert.public_key().verify(
+        b64decode(signature_info["signature_value"]), digest, padding.PKCS1v15(), hashes.SHA256()
+    )
+
+
+def test_keyring_evicts_expired_and_least_recently_used_keys():
+    now = [0.0]
+    keyring = SigningKeyring(max_entries=2, ttl_seconds=60, clock=lambda: now[0])
+    cert, private_key = _generate_certificate()
+    keys = {name: SigningKey(cert, private_key) for name in "abc"}
+    der = keys["a"].private_key_der()
+
+    keyring.put("a", keys["a"])
+    keyring.put("b", keys["b"])
+    assert keyring.get("a") is keys["a"]  # "b" is now least recently used
+    keyring.put("c", keys["c"])
+
+    assert keyring.get("b") is None and keys["b"].wiped
+    assert keyring.get("a") is keys["a"]
+
+    now[0] = 61
+    assert keyring.get("a") is None
+    assert keys["a"].wiped and not any(der)
+    assert keyring.purge_expired() == 1 and len(keyring) == 0
+    assert keyring.stats.evictions == 3
+
+
+@pytest.mark.asyncio
+async def test_signing_key_is_decrypted_once(db_session, test_administration, registered_certificate, pkcs12_file):
+    keyring = SigningKeyring(max_entries=8, ttl_seconds=600)
+    service = SigningService(db_session, keyring=keyring)
+    loader = CertificateService._load_certificate_from_ref
+
+    with patch.object(CertificateService, "_load_certificate_from_ref", autospec=True, side_effect=loader) as load:
+        for i in range(5):
+            xml_content = f"<aangifte><periode>{i}</periode></aangifte>"
+            signed_xml, info = await service.sign_xml(xml_content, registered_certificate.id, test_administration.id)
+            _assert_valid_signature(xml_content, info, pkcs12_file[1], signed_xml)
+
+    assert load.call_count == 1
+    assert keyring.stats.hits == 4
+
+    await service.cert_service.delete_certificate(registered_certificate.id, test_administration.id)
+    assert len(keyring) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2])
+async def test_sign_many(db_session, test_administration, registered_certificate, pkcs12_file, workers):
+    service = SigningService(db_session, keyring=SigningKeyring(max_entries=8, ttl_seconds=600))
+    requests = [
+        SigningRequest(f"<aangifte><client>{i}</client></aangifte>", registered_certificate.id, test_administration.id)
+        for i in range(6)
+    ]
+    requests.append(SigningRequest("<aangifte/>", uuid.uuid4(), test_administration.id))
+    requests.append(SigningRequest("not xml", registered_certificate.id, test_administration.id))
+
+    try:
+        with patch("app.services.signing_service.settings.SIGNING_PARALLEL_MIN_BATCH", 2):
+            results = await service.sign_many(requests, max_workers=workers)
+    finally:
+        shutdown_signing_pool()
+
+    assert [r.ok for r in results] == [True] * 6 + [False, False]
+    assert results[6].error.startswith("Certificate error")
+    assert "Invalid XML" in results[7].error
+    for result in results[:6]:
+        _assert_valid_signature(result.request.xml_content, result.signature_info, pkcs12_file[1], result.signed_xml)
+        assert "SignatureValue" in result.signed_xml
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_signing_throughput_benchmark(db_session, test_administration, registered_certificate, record_property):
+    documents = [f"<aangifte><client>{i}</client><bedrag>{i * 10}</bedrag></aangifte>" for i in range(40)]
+
+    async def run(keyring):
+        service = SigningService(db_session, keyring=keyring)
+        start = time.perf_counter()
+        for xml_content in documents:
+            await service.sign_xml(xml_content, registered_certificate.id, test_administration.id)
+        return len(documents) / (time.perf_counter() - start)
+
+    uncached = await run(SigningKeyring(max_entries=0))
+    cached = await run(SigningKeyring(max_entries=8, ttl_seconds=600))
+
+    record_property("uncached_docs_per_second", round(uncached))
+    record_property("keyring_docs_per_second", round(cached))
+    assert cached > uncached
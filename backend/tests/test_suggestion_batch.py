@@ -0,0 +1,128 @@
+"""
+Tests for batched suggestion generation.
+
+Covers:
+- refresh_suggestions_for_clients creates the same suggestions as the
+  per-issue generator, for many clients at once
+- Only unresolved issues without suggestions are picked up
+- Patterns of all administrations come from one query; the whole refresh
+  runs in a fixed number of queries
+"""
+import uuid
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.models.administration import Administration
+from app.models.decisions import ActionType, DecisionPattern, SuggestedAction
+from app.models.issues import IssueCode
+from app.services.decisions import SuggestionService
+from tests.factories import make_issue
+
+
+@pytest.fixture
+async def clients(db_session, test_administration):
+    other = Administration(name="Tweede B.V.", is_active=True)
+    db_session.add(other)
+    await db_session.flush()
+
+    issues = {
+        "unbalanced": make_issue(test_administration.id, IssueCode.JOURNAL_UNBALANCED, amount_discrepancy=Decimal("12.50")),
+        "overdue": make_issue(test_administration.id, IssueCode.OVERDUE_RECEIVABLE),
+        "resolved": make_issue(test_administration.id, IssueCode.VAT_NEGATIVE, is_resolved=True),
+        "unmapped": make_issue(test_administration.id, IssueCode.ORPHAN_LINE),
+        "suggested": make_issue(test_administration.id, IssueCode.VAT_RATE_MISMATCH),
+        "other_unbalanced": make_issue(other.id, IssueCode.JOURNAL_UNBALANCED),
+        "other_payable": make_issue(other.id, IssueCode.OVERDUE_PAYABLE),
+    }
+    db_session.add_all(issues.values())
+    await db_session.flush()
+
+    db_session.add(SuggestedAction(
+        issue_id=issues["suggested"].id,
+        action_type=ActionType.CORRECT_VAT_RATE,
+        title="Existing",
+        explanation="Existing",
+        confidence_score=Decimal("0.7000"),
+        priority=1,
+    ))
+    # Learned pattern for the first client only
+    db_session.add(DecisionPattern(
+        administration_id=test_administration.id,
+        issue_code=IssueCode.JOURNAL_UNBALANCED,
+        action_type=ActionType.REVERSE_JOURNAL_ENTRY,
+        approval_count=4,
+        confidence_boost=Decimal("0.4000"),
+    ))
+    await db_session.commit()
+    return test_administration.id, other.id, issues
+
+
+async def _suggestions(db_session, issue_id):
+    result = await db_session.execute(
+        select(SuggestedAction)
+        .where(SuggestedAction.issue_id == issue_id)
+        .order_by(SuggestedAction.priority, SuggestedAction.confidence_score.desc())
+    )
+    return list(result.scalars().all())
+
+
+def _signature(suggestion):
+    return (
+        suggestion.action_type,
+        suggestion.title,
+        suggestion.confidence_score,
+        suggestion.is_auto_suggested,
+        suggestion.priority,
+        suggestion.parameters,
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_per_issue_generation(db_session, clients):
+    admin_id, other_id, issues = clients
+    service = SuggestionService(db_session)
+    expected = {
+        key: [_signature(s) for s in await service.generate_suggestions_for_issue(issues[key])]
+        for key in ("unbalanced", "overdue", "other_unbalanced", "other_payable")
+    }
+
+    counts = await service.refresh_suggestions_for_clients([admin_id, other_id])
+    await db_session.commit()
+
+    assert counts == {admin_id: 4, other_id: 3}
+    for key, signatures in expected.items():
+        stored = await _suggestions(db_session, issues[key].id)
+        assert [_signature(s) for s in stored] == signatures
+
+    # The learned pattern only boosts the first client's reversal suggestion
+    reverse = {
+        key: next(s for s in await _suggestions(db_session, issues[key].id)
+                  if s.action_type == ActionType.REVERSE_JOURNAL_ENTRY)
+        for key in ("unbalanced", "other_unbalanced")
+    }
+    assert reverse["unbalanced"].confidence_score == Decimal("0.9000")
+    assert reverse["unbalanced"].is_auto_suggested is True
+    assert reverse["other_unbalanced"].confidence_score == Decimal("0.5000")
+    assert reverse["other_unbalanced"].parameters["issue_code"] == IssueCode.JOURNAL_UNBALANCED
+
+    assert await _suggestions(db_session, issues["resolved"].id) == []
+    assert await _suggestions(db_session, issues["unmapped"].id) == []
+    assert [s.title for s in await _suggestions(db_session, issues["suggested"].id)] == ["Existing"]
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_in_fixed_number_of_queries(db_session, clients, query_budget):
+    admin_id, other_id, _ = clients
+    service = SuggestionService(db_session)
+
+    # Issues, patterns, one bulk INSERT
+    with query_budget(max_queries=3):
+        counts = await service.refresh_suggestions_for_clients([admin_id, other_id, uuid.uuid4()])
+    assert sum(counts.values()) == 7
+
+    # Nothing left to do: only the issue query runs
+    with query_budget(max_queries=1):
+        assert await service.refresh_suggestions_for_clients([admin_id, other_id]) == {}
+    assert await service.refresh_suggestions_for_client(admin_id) == 0
@@ -48,9 +48,8 @@ class TestWeasyPrintOptional:
 
         # Force ReportLab primary generation to fail so endpoint reaches WeasyPrint fallback,
         # then simulate WeasyPrint being unavailable.
-        with patch.object(
-            zzp_invoices,
-            'generate_invoice_pdf_reportlab',
+        with patch(
+            'app.services.invoice_pdf_reportlab.generate_invoice_pdf_reportlab',
             side_effect=Exception("ReportLab unavailable")
         ), patch.object(
             zzp_invoices,
@@ -0,0 +1,283 @@
+"""
+Tests for the precomputed work queue.
+
+Covers:
+- Work items are built per client into work_items; queue tabs, type,
+  severity and due-window filters, sorting and cursor pagination run in SQL
+- Items are rebuilt when issues or documents of a client are committed,
+  when journal entries are bulk-posted, or when they were computed before
+  today; fresh pages cost a fixed number of queries
+- The SLA summary counts from the same work items, with a VAT item for
+  every open period
+- API: filters, next_cursor and invalid cursors
+"""
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.roles import UserRole
+from app.core.security import create_access_token, get_password_hash
+from app.models.accounting import ChartOfAccount
+from app.models.administration import Administration, AdministrationMember, MemberRole
+from app.models.issues import IssueSeverity
+from app.models.ledger import AccountingPeriod, PeriodStatus
+from app.models.user import User
+from app.models.work_queue import ClientReadinessCache, WorkItem
+from app.services.ledger import JournalEntryDraft, LedgerService
+from app.services.work_queue import SLAService, WorkQueueService, WorkQueueServiceError
+from tests.factories import make_document, make_issue
+
+
+@pytest.fixture
+async def portfolio(db_session):
+    """
+    An accountant with three clients:
+
+    - overdue: two RED issues (oldest 8 days), 3 documents to review and an
+      open period whose VAT deadline has passed
+    - review: one YELLOW issue and a period in REVIEW for 12 days
+    - backlog: 25 documents to review
+    """
+    accountant = User(
+        email="werkvoorraad@example.com",
+        hashed_password=get_password_hash("TestPassword123"),
+        full_name="Werkvoorraad Accountant",
+        role=UserRole.ACCOUNTANT.value,
+        is_active=True,
+        email_verified_at=datetime.now(timezone.utc),
+    )
+    clients = {name: Administration(name=name, is_active=True) for name in ("overdue", "review", "backlog")}
+    db_session.add_all([accountant, *clients.values()])
+    await db_session.flush()
+    db_session.add_all([
+        AdministrationMember(user_id=accountant.id, administration_id=c.id, role=MemberRole.ACCOUNTANT)
+        for c in clients.values()
+    ])
+
+    today = date.today()
+    now = datetime.now(timezone.utc)
+    overdue = clients["overdue"].id
+    db_session.add_all([
+        make_issue(overdue, severity=IssueSeverity.RED, created_at=now - timedelta(days=8)),
+        make_issue(overdue, severity=IssueSeverity.RED),
+        *[make_document(overdue) for _ in range(3)],
+        AccountingPeriod(
+            administration_id=overdue, name="Verlopen", period_type="QUARTER",
+            start_date=today - timedelta(days=200), end_date=today - timedelta(days=110),
+            status=PeriodStatus.OPEN,
+        ),
+    ])
+    review = clients["review"].id
+    db_session.add_all([
+        make_issue(review, severity=IssueSeverity.YELLOW),
+        AccountingPeriod(
+            administration_id=review, name="Lopend", period_type="QUARTER",
+            start_date=today - timedelta(days=30), end_date=today + timedelta(days=60),
+            status=PeriodStatus.REVIEW, review_started_at=now - timedelta(days=12),
+        ),
+    ])
+    db_session.add_all([make_document(clients["backlog"].id) for _ in range(25)])
+    await db_session.commit()
+    return accountant, {name: c.id for name, c in clients.items()}
+
+
+async def _all_pages(service, **kwargs):
+    items, cursor = [], None
+    while True:
+        page = await service.get_work_queue(limit=2, cursor=cursor, **kwargs)
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return page, items
+
+
+@pytest.mark.asyncio
+async def test_filters_sorting_and_cursor_pagination(db_session, portfolio):
+    accountant, clients = portfolio
+    service = WorkQueueService(db_session, accountant.id)
+
+    page, items = await _all_pages(service, sort_by="severity")
+    assert page["total_count"] == len(items) == 6
+    assert page["counts"] == {"red_issues": 1, "needs_review": 2, "vat_due": 1, "stale": 0}
+    assert [(i["work_item_type"], i["severity"]) for i in items][:2] == [("VAT", "CRITICAL"), ("ISSUE", "RED")]
+    assert [i["severity"] for i in items][2:] == ["WARNING", "WARNING", "YELLOW", "INFO"]
+    assert await db_session.scalar(select(WorkItem.id).where(WorkItem.work_item_type == "STALE")) is None
+
+    # Every item once, readiness score ascending, worst client first
+    page, by_score = await _all_pages(service)
+    assert sorted(i["title"] for i in by_score) == sorted(i["title"] for i in items)
+    scores = [i["readiness_score"] for i in by_score]
+    assert scores == sorted(scores)
+    assert by_score[0]["client_id"] == str(clients["overdue"])
+    assert by_score[0]["readiness_breakdown"]["final_score"] == scores[0]
+
+    # Due date: items without one sort last (first when descending)
+    page, by_due = await _all_pages(service, sort_by="due_date", sort_order="desc")
+    assert [i["due_date"] for i in by_due][:4] == [None] * 4
+    assert by_due[-1]["work_item_type"] == "VAT"
+
+    red = await service.get_work_queue(queue_type="red")
+    assert [(i["client_id"], i["counts"]["red"]) for i in red["items"]] == [(str(clients["overdue"]), 2)]
+    due_now = await service.get_work_queue(due_within_days=0)
+    assert [i["work_item_type"] for i in due_now["items"]] == ["VAT"]
+    warnings = await service.get_work_queue(work_item_type="BACKLOG", severity="WARNING")
+    assert [i["client_id"] for i in warnings["items"]] == [str(clients["backlog"])]
+    assert warnings["counts"]["needs_review"] == 2  # Counts ignore the filters
+
+    with pytest.raises(WorkQueueServiceError):
+        await service.get_work_queue(cursor="bm90LWpzb24=")
+    first = await service.get_work_queue(limit=1)
+    with pytest.raises(WorkQueueServiceError):
+        await service.get_work_queue(sort_by="severity", cursor=first["next_cursor"])
+
+
+@pytest.mark.asyncio
+async def test_items_follow_writes_and_the_date(db_session, portfolio, query_budget):
+    accountant, clients = portfolio
+    service = WorkQueueService(db_session, accountant.id)
+    await service.get_work_queue()
+
+    # Nothing changed: the page is read without rebuilding
+    with query_budget(max_queries=6):
+        result = await service.get_work_queue(queue_type="red")
+    assert result["total_count"] == 1
+
+    issue = make_issue(clients["review"], severity=IssueSeverity.RED)
+    db_session.add(issue)
+    await db_session.commit()
+    flagged = await db_session.scalar(
+        select(ClientReadinessCache.needs_refresh).where(ClientReadinessCache.administration_id == clients["review"])
+    )
+    assert flagged is True
+
+    result = await service.get_work_queue(queue_type="red")
+    assert sorted(i["client_id"] for i in result["items"]) == sorted([str(clients["overdue"]), str(clients["review"])])
+
+    issue.is_resolved = True
+    await db_session.commit()
+    result = await service.get_work_queue(queue_type="red")
+    assert [i["client_id"] for i in result["items"]] == [str(clients["overdue"])]
+
+    # Items computed yesterday are rebuilt (deadlines and staleness move)
+    db_session.add(make_document(clients["backlog"]))
+    await db_session.execute(
+        update(ClientReadinessCache)
+        .where(ClientReadinessCache.administration_id == clients["backlog"])
+        .values(needs_refresh=False, computed_at=datetime.now(timezone.utc) - timedelta(days=1))
+    )
+    await db_session.commit()
+    result = await service.get_work_queue(queue_type="review", sort_order="desc", sort_by="readiness_score")
+    assert [i["counts"]["backlog"] for i in result["items"]] == [26, 3]
+
+    # Deactivated clients drop out of the queue
+    backlog = await db_session.get(Administration, clients["backlog"])
+    backlog.is_active = False
+    await db_session.commit()
+    result = await service.get_work_queue(queue_type="review")
+    assert [i["client_id"] for i in result["items"]] == [str(clients["overdue"])]
+
+
+@pytest.mark.asyncio
+async def test_bulk_posted_entries_flag_the_client(db_session, portfolio):
+    accountant, clients = portfolio
+    await WorkQueueService(db_session, accountant.id).get_work_queue()
+    backlog = clients["backlog"]
+    bank, revenue = (
+        ChartOfAccount(administration_id=backlog, account_code=code, account_name=code, account_type=kind)
+        for code, kind in (("1100", "ASSET"), ("8000", "REVENUE"))
+    )
+    db_session.add_all([bank, revenue])
+    await db_session.commit()
+
+    # Core INSERTs bypass the flush hook; post_entries flags the client itself
+    await LedgerService(db_session, backlog).post_entries([JournalEntryDraft(
+        entry_date=date.today(), description="Kas",
+        lines=[
+            {"account_id": bank.id, "debit_amount": Decimal("5.00"), "credit_amount": Decimal("0.00")},
+            {"account_id": revenue.id, "debit_amount": Decimal("0.00"), "credit_amount": Decimal("5.00")},
+        ],
+    )])
+    flagged = await db_session.scalar(
+        select(ClientReadinessCache.needs_refresh).where(ClientReadinessCache.administration_id == backlog)
+    )
+    assert flagged is True
+
+
+@pytest.mark.asyncio
+async def test_sla_summary_counts_work_items(db_session, portfolio):
+    accountant, clients = portfolio
+
+    summary = await SLAService(db_session).get_sla_summary(list(clients.values()))
+
+    assert summary["by_type"] == {
+        "RED_UNRESOLVED": {"critical": 1, "warning": 0},
+        "VAT_DEADLINE": {"critical": 1, "warning": 0},
+        "REVIEW_STALE": {"critical": 0, "warning": 1},
+        "BACKLOG_HIGH": {"critical": 0, "warning": 1},
+    }
+    assert (summary["total_violations"], summary["critical_count"], summary["warning_count"]) == (4, 2, 2)
+    # Built by the summary, reused by the queue
+    assert await db_session.scalar(
+        select(ClientReadinessCache.needs_refresh).where(ClientReadinessCache.administration_id == clients["overdue"])
+    ) is False
+
+    empty = await SLAService(db_session).get_sla_summary([])
+    assert empty["total_violations"] == 0 and "policy" in empty
+
+
+@pytest.mark.asyncio
+async def test_every_open_period_gets_its_vat_deadline(db_session, portfolio):
+    accountant, clients = portfolio
+    today = date.today()
+    # Behind a later period in REVIEW, an earlier quarter was never filed
+    forgotten = AccountingPeriod(
+        administration_id=clients["review"], name="Vergeten", period_type="QUARTER",
+        start_date=today - timedelta(days=190), end_date=today - timedelta(days=100),
+        status=PeriodStatus.OPEN,
+    )
+    db_session.add(forgotten)
+    await db_session.commit()
+
+    summary = await SLAService(db_session).get_sla_summary(list(clients.values()))
+    assert summary["by_type"]["VAT_DEADLINE"] == {"critical": 2, "warning": 0}
+
+    result = await WorkQueueService(db_session, accountant.id).get_work_queue(queue_type="vat_due")
+    assert result["counts"]["vat_due"] == 2
+    late = [i for i in result["items"] if i["client_id"] == str(clients["review"])]
+    assert [(i["period_id"], i["period_status"]) for i in late] == [(str(forgotten.id), "OPEN")]
+    assert "Vergeten" in late[0]["description"]
+    # The client itself is still described by its latest period
+    cache = await db_session.scalar(
+        select(ClientReadinessCache).where(ClientReadinessCache.administration_id == clients["review"])
+    )
+    assert cache.period_status == "REVIEW"
+    assert cache.vat_days_remaining < 0
+
+
+@pytest.mark.asyncio
+async def test_work_queue_endpoint(async_client, portfolio):
+    accountant, clients = portfolio
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(accountant.id), 'email': accountant.email})}"}
+
+    response = await async_client.get(
+        "/api/v1/accountant/work-queue?type=issue&sort=severity&limit=1", headers=headers
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total_count"], body["returned_count"]) == (2, 1)
+    assert body["items"][0]["severity"] == "RED"
+
+    response = await async_client.get(
+        f"/api/v1/accountant/work-queue?type=issue&sort=severity&limit=1&cursor={body['next_cursor']}",
+        headers=headers,
+    )
+    assert [i["severity"] for i in response.json()["items"]] == ["YELLOW"]
+    assert response.json()["next_cursor"] is None
+
+    response = await async_client.get("/api/v1/accountant/work-queue?cursor=bogus", headers=headers)
+    assert response.status_code == 400
+
+    response = await async_client.get("/api/v1/accountant/dashboard/sla-summary", headers=headers)
+    assert response.json()["total_violations"] == 4
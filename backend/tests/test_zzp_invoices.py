@@ -311,7 +311,7 @@ class TestInvoicePdfEndpoint:
         auth_headers: dict
     ):
         """?download=1 sets Cache-Control: no-store for iOS Safari compatibility."""
-        with patch('app.api.v1.zzp_invoices.generate_invoice_pdf_reportlab') as mock_pdf:
+        with patch('app.services.invoice_pdf_reportlab.generate_invoice_pdf_reportlab') as mock_pdf:
             mock_pdf.return_value = b'%PDF-1.4 fake pdf content'
 
             response = await async_client.get(
@@ -340,7 +340,7 @@ class TestInvoicePdfEndpoint:
 
         token = create_access_token(data={"sub": str(test_user.id), "email": test_user.email})
 
-        with patch('app.api.v1.zzp_invoices.generate_invoice_pdf_reportlab') as mock_pdf:
+        with patch('app.services.invoice_pdf_reportlab.generate_invoice_pdf_reportlab') as mock_pdf:
             mock_pdf.return_value = b'%PDF-1.4 fake pdf content'
 
             # No Authorization header – token is passed in query string only
@@ -392,7 +392,7 @@ class TestInvoicePdfEndpoint:
         """PDF endpoint returns 503 when both PDF libraries are not available."""
         # Mock both ReportLab and WeasyPrint to raise RuntimeError
         # Patch where they're used (in zzp_invoices module)
-        with patch('app.api.v1.zzp_invoices.generate_invoice_pdf_reportlab') as mock_reportlab:
+        with patch('app.services.invoice_pdf_reportlab.generate_invoice_pdf_reportlab') as mock_reportlab:
             with patch('app.api.v1.zzp_invoices.generate_invoice_pdf') as mock_weasyprint:
                 mock_reportlab.side_effect = RuntimeError("ReportLab not available")
                 mock_weasyprint.side_effect = RuntimeError(
@@ -492,7 +492,7 @@ class TestInvoiceSendEmail:
         """Draft invoice can be sent via email."""
         # Mock the email service and PDF generation
         with patch('app.api.v1.zzp_invoices.email_service') as mock_email, \
-             patch('app.api.v1.zzp_invoices.generate_invoice_pdf_reportlab') as mock_pdf, \
+             patch('app.services.invoice_pdf_reportlab.generate_invoice_pdf_reportlab') as mock_pdf, \
              patch('app.api.v1.zzp_invoices.get_invoice_pdf_filename') as mock_filename:
             
             # Setup mocks
@@ -0,0 +1,69 @@
+"""
+Accuracy and throughput benchmark for the ledger account predictor.
+
+Compares the compiled word-level predictor with the previous substring
+matcher over the labeled fixtures in fixtures/labeled_predictions.json:
+
+    python benchmark_predictor.py [--repeat 2000]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from ledger_predictor import ACCOUNT_RULES, FALLBACK_ACCOUNT, GLOBAL_PREDICTOR
+
+FIXTURES = Path(__file__).parent / "fixtures" / "labeled_predictions.json"
+
+
+def substring_predict(merchant_name: str, description: str = ""):
+    """The previous predictor: `keyword in text` for every keyword of every rule"""
+    text = f"{merchant_name} {description}".lower()
+    best_match, best_score = None, 0
+    for account_code, rule in ACCOUNT_RULES.items():
+        if not rule['keywords']:
+            continue
+        matches = sum(1 for keyword in rule['keywords'] if keyword in text)
+        if matches > 0:
+            score = matches * (100 // rule['priority'])
+            if score > best_score:
+                best_score = score
+                best_match = (account_code, rule['name'], min(score, 100))
+    return best_match or FALLBACK_ACCOUNT
+
+
+def accuracy(predict, samples):
+    misses = [s for s in samples if predict(s['merchant'], s['description'])[0] != s['account_code']]
+    return 1 - len(misses) / len(samples), misses
+
+
+def throughput(predict_batch, items, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        predict_batch(items)
+    return len(items) * repeat / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    samples = json.loads(FIXTURES.read_text())
+    items = [(s['merchant'], s['description']) for s in samples]
+
+    for name, predict, predict_batch in (
+        ("substring", substring_predict, lambda batch: [substring_predict(*item) for item in batch]),
+        ("compiled", GLOBAL_PREDICTOR.predict, lambda batch: [GLOBAL_PREDICTOR.predict(*item) for item in batch]),
+        ("compiled predict_many", GLOBAL_PREDICTOR.predict, GLOBAL_PREDICTOR.predict_many),
+    ):
+        score, misses = accuracy(predict, samples)
+        rate = throughput(predict_batch, items, args.repeat)
+        print(f"{name:<24} accuracy {score:6.1%}  {rate:>10,.0f} docs/s")
+        for miss in misses:
+            print(f"    miss: {miss['merchant']!r} -> {predict(miss['merchant'], miss['description'])[0]} "
+                  f"(expected {miss['account_code']})")
+
+
+if __name__ == "__main__":
+    main()
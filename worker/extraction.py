@@ -0,0 +1,386 @@
+"""
+Smart Accounting Platform - Document Extraction Engine
+
+Turns an uploaded file into text plus per-page layout for DocumentProcessor:
+
+- PDFs with an embedded text layer are read with pdfplumber; OCR only runs
+  for pages without one (scans)
+- Images and scanned pages are converted to grayscale, downscaled and
+  binarized before Tesseract sees them
+- Multi-page documents are split into page ranges that run in parallel on
+  a process pool
+- Results are cached on disk per file content hash (SHA-256), so a
+  reprocessed or re-uploaded document skips extraction entirely and only
+  field extraction and prediction run again
+
+Every result carries per-stage timings (seconds) for logging and
+extracted_fields.raw_json.
+"""
+import abc
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import pytesseract
+    from PIL import Image, ImageOps
+    HAS_OCR = True
+except ImportError:
+    HAS_OCR = False
+
+try:
+    import pdfplumber
+    HAS_PDF = True
+except ImportError:
+    HAS_PDF = False
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction output changes so stale cache entries are ignored
+ENGINE_VERSION = 1
+
+CACHE_DIR = os.environ.get("EXTRACTION_CACHE_DIR", "/data/uploads/.extraction-cache")
+WORKERS = int(os.environ.get("EXTRACTION_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Documents with fewer pages are extracted inline; the pool start-up costs more
+PARALLEL_MIN_PAGES = int(os.environ.get("EXTRACTION_PARALLEL_MIN_PAGES", "4"))
+OCR_LANG = os.environ.get("OCR_LANG", "nld+eng")
+OCR_CONFIG = os.environ.get("OCR_CONFIG", "--psm 6")
+# Longest image edge fed to Tesseract; phone photos are often 4000px+
+OCR_MAX_DIMENSION = int(os.environ.get("OCR_MAX_DIMENSION", "2500"))
+OCR_BINARIZE = os.environ.get("OCR_BINARIZE", "true").lower() == "true"
+# Rendering resolution for scanned PDF pages
+OCR_PDF_RESOLUTION = int(os.environ.get("OCR_PDF_RESOLUTION", "200"))
+
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg')
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class PageText:
+    """Text of a single page; words hold the pdfplumber layout (text layer only)"""
+    number: int
+    text: str
+    method: str  # 'pdf-text' or 'ocr'
+    words: List[Dict] = field(default_factory=list)
+
+
+@dataclass
+class ExtractionResult:
+    text: str
+    method: str  # 'pdf-text', 'ocr', 'mixed', 'plain' or 'none'
+    pages: List[PageText] = field(default_factory=list)
+    content_sha256: Optional[str] = None
+    cached: bool = False
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def summary(self) -> Dict:
+        """Metadata stored alongside the extracted fields"""
+        return {
+            'method': self.method,
+            'pages': len(self.pages),
+            'cached': self.cached,
+            'content_sha256': self.content_sha256,
+            'timings': {stage: round(seconds, 4) for stage, seconds in self.timings.items()},
+        }
+
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def join_pages(pages: List[PageText]) -> str:
+    return "".join(page.text + "\n" for page in pages if page.text)
+
+
+# ---------------------------------------------------------------------------
+# OCR helpers (module level so they can run in pool processes)
+# ---------------------------------------------------------------------------
+
+def _otsu_threshold(histogram: List[int]) -> int:
+    """Threshold that best separates ink from paper in a grayscale histogram"""
+    total = sum(histogram)
+    weighted_total = sum(i * count for i, count in enumerate(histogram))
+    background = weighted_background = 0
+    best_threshold, best_variance = 127, -1.0
+    for threshold, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        weighted_background += threshold * count
+        mean_background = weighted_background / background
+        mean_foreground = (weighted_total - weighted_background) / foreground
+        variance = background * foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = threshold, variance
+    return best_threshold
+
+
+def preprocess_image(image: "Image.Image") -> "Image.Image":
+    """Grayscale, downscale and binarize an image for OCR"""
+    image = ImageOps.exif_transpose(image).convert('L')
+    if max(image.size) > OCR_MAX_DIMENSION:
+        image.thumbnail((OCR_MAX_DIMENSION, OCR_MAX_DIMENSION), Image.LANCZOS)
+    if OCR_BINARIZE:
+        threshold = _otsu_threshold(image.histogram())
+        image = image.point(lambda p: 255 if p > threshold else 0, mode='1')
+    return image
+
+
+def _ocr(image: "Image.Image") -> str:
+    return pytesseract.image_to_string(image, lang=OCR_LANG, config=OCR_CONFIG)
+
+
+def _pdf_text_pages(file_path: str, numbers: List[int]) -> List[Dict]:
+    """Text layer and word boxes for the given (0-based) pages"""
+    pages = []
+    with pdfplumber.open(file_path) as pdf:
+        for number in numbers:
+            page = pdf.pages[number]
+            words = [
+                {'text': w['text'], 'x0': w['x0'], 'top': w['top'], 'x1': w['x1'], 'bottom': w['bottom']}
+                for w in page.extract_words()
+            ]
+            pages.append({'number': number, 'text': page.extract_text() or "", 'words': words})
+            page.close()  # Release cached page objects on long documents
+    return pages
+
+
+def _pdf_ocr_pages(file_path: str, numbers: List[int]) -> List[Dict]:
+    """Render the given (0-based) pages and OCR them"""
+    pages = []
+    with pdfplumber.open(file_path) as pdf:
+        for number in numbers:
+            page = pdf.pages[number]
+            image = page.to_image(resolution=OCR_PDF_RESOLUTION).original
+            pages.append({'number': number, 'text': _ocr(preprocess_image(image))})
+            page.close()
+    return pages
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class ExtractionCache:
+    """Extraction results on disk, one JSON file per content hash"""
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = Path(directory)
+
+    def _path(self, content_sha256: str) -> Path:
+        return self.directory / content_sha256[:2] / f"{content_sha256}.v{ENGINE_VERSION}.json"
+
+    def get(self, content_sha256: str) -> Optional[ExtractionResult]:
+        try:
+            with open(self._path(content_sha256), 'r') as f:
+                data = json.load(f)
+            return ExtractionResult(
+                text=data['text'],
+                method=data['method'],
+                pages=[PageText(**page) for page in data['pages']],
+                content_sha256=content_sha256,
+                cached=True,
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable extraction cache entry {content_sha256}: {e}")
+            return None
+
+    def set(self, result: ExtractionResult) -> None:
+        path = self._path(result.content_sha256)
+        data = {'text': result.text, 'method': result.method, 'pages': [asdict(page) for page in result.pages]}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so concurrent workers never read half a file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry {result.content_sha256}: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Extractors
+# ---------------------------------------------------------------------------
+
+class Extractor(abc.ABC):
+    """A strategy for one kind of file; returns None when it cannot handle it"""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def extract(self, path: Path, engine: "ExtractionEngine", timings: Dict[str, float]) -> Optional[List[PageText]]:
+        ...
+
+
+class PdfExtractor(Extractor):
+    """Text layer first, OCR only for pages that have none"""
+
+    name = "pdf"
+
+    def extract(self, path, engine, timings):
+        if path.suffix.lower() != '.pdf' or not HAS_PDF:
+            return None
+        with engine.timed(timings, 'pdf_open'):
+            with pdfplumber.open(str(path)) as pdf:
+                page_count = len(pdf.pages)
+        if page_count == 0:
+            return None
+
+        with engine.timed(timings, 'pdf_text'):
+            raw = engine.map_pages(_pdf_text_pages, str(path), page_count)
+        pages = [PageText(number=p['number'], text=p['text'], method='pdf-text', words=p['words']) for p in raw]
+
+        scanned = [page.number for page in pages if not page.text.strip()]
+        if scanned and HAS_OCR:
+            with engine.timed(timings, 'ocr'):
+                ocr_pages = {p['number']: p['text'] for p in engine.map_pages(_pdf_ocr_pages, str(path), scanned)}
+            pages = [
+                PageText(number=page.number, text=ocr_pages[page.number], method='ocr') if page.number in ocr_pages else page
+                for page in pages
+            ]
+        return pages
+
+
+class ImageExtractor(Extractor):
+    name = "image"
+
+    def extract(self, path, engine, timings):
+        if path.suffix.lower() not in IMAGE_SUFFIXES or not HAS_OCR:
+            return None
+        with engine.timed(timings, 'preprocess'):
+            with Image.open(str(path)) as image:
+                prepared = preprocess_image(image)
+        with engine.timed(timings, 'ocr'):
+            text = _ocr(prepared)
+        return [PageText(number=0, text=text, method='ocr')]
+
+
+class ExtractionEngine:
+    """Runs the extractors, parallelizes pages and caches results"""
+
+    def __init__(
+        self,
+        extractors: Optional[List[Extractor]] = None,
+        cache: Optional[ExtractionCache] = None,
+        workers: int = WORKERS,
+    ):
+        self.extractors = extractors if extractors is not None else [PdfExtractor(), ImageExtractor()]
+        self.cache = cache if cache is not None else ExtractionCache()
+        self.workers = max(workers, 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    @contextmanager
+    def timed(timings: Dict[str, float], stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def map_pages(self, func, file_path: str, pages) -> List[Dict]:
+        """
+        Run ``func(file_path, page_numbers)`` over the pages, split into one
+        contiguous range per pool worker. Short documents run inline, and
+        so does a document whose pool broke (a crashed or OOM-killed page
+        task); the pool is replaced on the next call.
+        """
+        numbers = list(range(pages)) if isinstance(pages, int) else list(pages)
+        if self.workers == 1 or len(numbers) < PARALLEL_MIN_PAGES:
+            return func(file_path, numbers)
+        size = -(-len(numbers) // self.workers)
+        chunks = [numbers[i:i + size] for i in range(0, len(numbers), size)]
+        results: List[Dict] = []
+        try:
+            for chunk_result in self._get_pool().map(func, [file_path] * len(chunks), chunks):
+                results.extend(chunk_result)
+        except BrokenProcessPool:
+            logger.warning("Extraction worker pool broke; extracting pages inline")
+            self.shutdown(wait=False)
+            return func(file_path, numbers)
+        return results
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+            self._pool = None
+
+    def extract(self, file_path: str, content_sha256: Optional[str] = None) -> ExtractionResult:
+        """Extract text from a file, using the cache when the content was seen before"""
+        timings: Dict[str, float] = {}
+        path = Path(file_path)
+        if not path.exists():
+            logger.error(f"File not found: {file_path}")
+            return ExtractionResult(text="", method='none', timings=timings)
+
+        if not content_sha256:
+            with self.timed(timings, 'hash'):
+                content_sha256 = file_sha256(file_path)
+
+        with self.timed(timings, 'cache_read'):
+            cached = self.cache.get(content_sha256)
+        if cached is not None:
+            cached.timings = timings
+            return cached
+
+        pages: Optional[List[PageText]] = None
+        method = 'none'
+        for extractor in self.extractors:
+            try:
+                pages = extractor.extract(path, self, timings)
+            except Exception as e:
+                # Fall through to the next strategy
+                logger.warning(f"{extractor.name} extraction failed: {e}")
+                pages = None
+                continue
+            if pages and any(page.text.strip() for page in pages):
+                methods = {page.method for page in pages}
+                method = methods.pop() if len(methods) == 1 else 'mixed'
+                break
+            pages = None
+
+        if pages is None:
+            # Fallback: try reading as text
+            try:
+                with open(file_path, 'r', errors='ignore') as f:
+                    text = f.read()
+                method = 'plain'
+            except Exception:
+                text = ""
+            return ExtractionResult(text=text, method=method, content_sha256=content_sha256, timings=timings)
+
+        result = ExtractionResult(
+            text=join_pages(pages),
+            method=method,
+            pages=pages,
+            content_sha256=content_sha256,
+            timings=timings,
+        )
+        with self.timed(timings, 'cache_write'):
+            self.cache.set(result)
+        return result
@@ -0,0 +1,256 @@
+"""
+Smart Accounting Platform - Ledger Account Predictor
+
+Predicts the ledger account for a document from its merchant name and text.
+
+Keyword rules (the global ACCOUNT_RULES plus the CategorizationRules the
+API learns per administration) are compiled into a single word-level trie:
+
+- Matching works on whole words, so "ns" no longer hits "transport" and
+  "bus" no longer hits "business"
+- Multi-word keywords ("google workspace", "abn amro") are matched
+  leftmost-longest, so the longer keyword wins over a shorter one inside it
+- A text is scanned once, whatever the number of rules
+
+Compiled predictors are cached per administration and rebuilt only when
+the administration's rule version (count, newest update, total
+confidence) changes.
+"""
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Prediction = Tuple[str, str, int]  # (account code, account name, confidence)
+
+ACCOUNT_RULES = {
+    '4000': {
+        'name': 'Autokosten & Brandstof',
+        'keywords': ['shell', 'bp', 'esso', 'texaco', 'total', 'tankstation', 'fuel', 'benzine', 'diesel', 'parkeren', 'parking'],
+        'priority': 1
+    },
+    '4050': {
+        'name': 'Reiskosten Openbaar Vervoer',
+        'keywords': ['ns', 'ov', 'chipkaart', 'trein', 'train', 'metro', 'tram', 'bus'],
+        'priority': 1
+    },
+    '4100': {
+        'name': 'Huisvestingskosten',
+        'keywords': ['huur', 'rent', 'kantoor', 'office', 'workspace'],
+        'priority': 1
+    },
+    '4300': {
+        'name': 'Kantoorkosten & Apparatuur',
+        'keywords': ['laptop', 'computer', 'monitor', 'keyboard', 'mouse', 'desk', 'chair', 'mediamarkt', 'coolblue', 'bol.com'],
+        'priority': 1
+    },
+    '4310': {
+        'name': 'Software & Licenties',
+        'keywords': ['microsoft', 'google workspace', 'adobe', 'dropbox', 'hosting', 'domain', 'aws', 'azure', 'digitalocean', 'heroku', 'github', 'saas', 'software'],
+        'priority': 1
+    },
+    '4500': {
+        'name': 'Algemene kosten',
+        'keywords': ['albert heijn', 'jumbo', 'lidl', 'aldi', 'plus', 'ah to go', 'supermarkt', 'restaurant', 'lunch', 'cafe', 'horeca'],
+        'priority': 2
+    },
+    '4550': {
+        'name': 'Telefoon & Internet',
+        'keywords': ['kpn', 'vodafone', 'tmobile', 'ziggo', 'telecom', 'internet', 'mobile', 'phone', 'sim'],
+        'priority': 1
+    },
+    '4600': {
+        'name': 'Bankkosten',
+        'keywords': ['bank', 'ing', 'rabobank', 'abn amro', 'transaction fee', 'bankcosts'],
+        'priority': 1
+    },
+    '4800': {
+        'name': 'Administratiekosten',
+        'keywords': ['accountant', 'boekhouder', 'administratie', 'bookkeeping'],
+        'priority': 1
+    },
+    '7000': {
+        'name': 'Inkoopkosten',
+        'keywords': ['inkoop', 'purchase', 'supplier', 'leverancier', 'groothandel'],
+        'priority': 2
+    },
+    '9999': {
+        'name': 'Te rubriceren',
+        'keywords': [],
+        'priority': 99
+    }
+}
+
+FALLBACK_ACCOUNT = ('9999', ACCOUNT_RULES['9999']['name'], 10)
+
+# Score per matched keyword of a learned rule; beats any single global keyword
+LEARNED_RULE_WEIGHT = 200
+# Learned rules only count once the user confirmed them (as in the API)
+LEARNED_RULE_MIN_CONFIDENCE = 2
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_END = None  # Trie key marking the end of a keyword
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-free words of a text"""
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', text.lower())
+    return _WORD_RE.findall(text.encode('ascii', 'ignore').decode('ascii'))
+
+
+@dataclass(frozen=True)
+class AccountRule:
+    account_code: str
+    account_name: str
+    keywords: Tuple[str, ...]
+    weight: int  # Score per distinct matched keyword
+
+
+def global_rules() -> List[AccountRule]:
+    return [
+        AccountRule(code, rule['name'], tuple(rule['keywords']), 100 // rule['priority'])
+        for code, rule in ACCOUNT_RULES.items()
+        if rule['keywords']
+    ]
+
+
+def learned_rules(rows: Iterable[Dict]) -> List[AccountRule]:
+    """
+    Rules from categorization_rules rows (match_type, match_value,
+    confidence, account_code, account_name), one per ledger account.
+    """
+    keywords: Dict[Tuple[str, str], List[str]] = OrderedDict()
+    for row in rows:
+        if row['confidence'] < LEARNED_RULE_MIN_CONFIDENCE or not row['match_value']:
+            continue
+        value = row['match_value'].strip()
+        values = [value]
+        if str(row['match_type']).lower() == 'counterparty_iban':
+            # Invoices print IBANs both compact and in groups of four
+            compact = value.replace(' ', '')
+            values = [compact, ' '.join(compact[i:i + 4] for i in range(0, len(compact), 4))]
+        keywords.setdefault((row['account_code'], row['account_name']), []).extend(values)
+    return [
+        AccountRule(code, name, tuple(values), LEARNED_RULE_WEIGHT)
+        for (code, name), values in keywords.items()
+    ]
+
+
+class CompiledPredictor:
+    """Keyword rules compiled into a word-level trie"""
+
+    def __init__(self, rules: Sequence[AccountRule]):
+        self.rules = list(rules)
+        self._trie: Dict = {}
+        for index, rule in enumerate(self.rules):
+            for keyword in rule.keywords:
+                words = tokenize(keyword)
+                if not words:
+                    continue
+                node = self._trie
+                for word in words:
+                    node = node.setdefault(word, {})
+                # (rule, keyword) pairs ending here; a keyword counts once per rule
+                node.setdefault(_END, []).append((index, ' '.join(words)))
+
+    def _matches(self, words: List[str]) -> Dict[int, set]:
+        """Distinct keywords per rule index, matched leftmost-longest"""
+        found: Dict[int, set] = {}
+        i, n = 0, len(words)
+        while i < n:
+            node = self._trie.get(words[i])
+            longest, end = None, i
+            j = i
+            while node is not None:
+                j += 1
+                if _END in node:
+                    longest, end = node[_END], j
+                node = node.get(words[j]) if j < n else None
+            if longest is None:
+                i += 1
+                continue
+            for index, keyword in longest:
+                found.setdefault(index, set()).add(keyword)
+            i = end
+        return found
+
+    def predict(self, merchant_name: str, description: str = "") -> Prediction:
+        """Predict the most appropriate ledger account"""
+        found = self._matches(tokenize(f"{merchant_name} {description}"))
+        best_match, best_score = None, 0
+        # Rule order breaks ties, as learned rules come first
+        for index in sorted(found):
+            rule = self.rules[index]
+            score = len(found[index]) * rule.weight
+            if score > best_score:
+                best_score = score
+                best_match = (rule.account_code, rule.account_name, min(score, 100))
+        return best_match or FALLBACK_ACCOUNT
+
+    def predict_many(self, items: Iterable[Tuple[str, str]]) -> List[Prediction]:
+        """Predict a batch of (merchant, description) pairs; repeated pairs are scored once"""
+        seen: Dict[Tuple[str, str], Prediction] = {}
+        results = []
+        for merchant_name, description in items:
+            key = (merchant_name, description)
+            prediction = seen.get(key)
+            if prediction is None:
+                prediction = seen[key] = self.predict(merchant_name, description)
+            results.append(prediction)
+        return results
+
+
+GLOBAL_PREDICTOR = CompiledPredictor(global_rules())
+
+
+class PredictorCache:
+    """Compiled predictors per administration, keyed by rule version (LRU)"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Hashable, CompiledPredictor]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        administration_id: str,
+        version: Hashable,
+        load_rows: Callable[[], Iterable[Dict]],
+    ) -> CompiledPredictor:
+        """
+        Predictor for an administration; ``load_rows`` is only called when
+        no predictor for this rule version is cached.
+        """
+        with self._lock:
+            entry = self._entries.get(administration_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(administration_id)
+                return entry[1]
+
+        learned = learned_rules(load_rows())
+        if not learned:
+            predictor = GLOBAL_PREDICTOR
+        else:
+            predictor = CompiledPredictor(learned + GLOBAL_PREDICTOR.rules)
+            logger.info(f"Compiled {len(learned)} learned rule(s) for administration {administration_id}")
+
+        with self._lock:
+            self._entries[administration_id] = (version, predictor)
+            self._entries.move_to_end(administration_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return predictor
+
+    def invalidate(self, administration_id: Optional[str] = None) -> None:
+        with self._lock:
+            if administration_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(administration_id, None)
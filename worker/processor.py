@@ -11,24 +11,14 @@ import uuid
 from datetime import datetime, date
 from decimal import Decimal
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import redis
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
-try:
-    import pytesseract
-    from PIL import Image
-    HAS_OCR = True
-except ImportError:
-    HAS_OCR = False
-
-try:
-    import pdfplumber
-    HAS_PDF = True
-except ImportError:
-    HAS_PDF = False
+from extraction import ExtractionEngine, ExtractionResult
+from ledger_predictor import ACCOUNT_RULES, GLOBAL_PREDICTOR, CompiledPredictor, PredictorCache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -38,96 +28,26 @@ logger = logging.getLogger(__name__)
 
 
 class LedgerAccountPredictor:
-    """AI-Powered Ledger Account Prediction Engine"""
+    """AI-Powered Ledger Account Prediction Engine (global rules only)"""
     
-    ACCOUNT_RULES = {
-        '4000': {
-            'name': 'Autokosten & Brandstof',
-            'keywords': ['shell', 'bp', 'esso', 'texaco', 'total', 'tankstation', 'fuel', 'benzine', 'diesel', 'parkeren', 'parking'],
-            'priority': 1
-        },
-        '4050': {
-            'name': 'Reiskosten Openbaar Vervoer',
-            'keywords': ['ns', 'ov', 'chipkaart', 'trein', 'train', 'metro', 'tram', 'bus'],
-            'priority': 1
-        },
-        '4100': {
-            'name': 'Huisvestingskosten',
-            'keywords': ['huur', 'rent', 'kantoor', 'office', 'workspace'],
-            'priority': 1
-        },
-        '4300': {
-            'name': 'Kantoorkosten & Apparatuur',
-            'keywords': ['laptop', 'computer', 'monitor', 'keyboard', 'mouse', 'desk', 'chair', 'mediamarkt', 'coolblue', 'bol.com'],
-            'priority': 1
-        },
-        '4310': {
-            'name': 'Software & Licenties',
-            'keywords': ['microsoft', 'google workspace', 'adobe', 'dropbox', 'hosting', 'domain', 'aws', 'azure', 'digitalocean', 'heroku', 'github', 'saas', 'software'],
-            'priority': 1
-        },
-        '4500': {
-            'name': 'Algemene kosten',
-            'keywords': ['albert heijn', 'jumbo', 'lidl', 'aldi', 'plus', 'ah to go', 'supermarkt', 'restaurant', 'lunch', 'cafe', 'horeca'],
-            'priority': 2
-        },
-        '4550': {
-            'name': 'Telefoon & Internet',
-            'keywords': ['kpn', 'vodafone', 'tmobile', 'ziggo', 'telecom', 'internet', 'mobile', 'phone', 'sim'],
-            'priority': 1
-        },
-        '4600': {
-            'name': 'Bankkosten',
-            'keywords': ['bank', 'ing', 'rabobank', 'abn amro', 'transaction fee', 'bankcosts'],
-            'priority': 1
-        },
-        '4800': {
-            'name': 'Administratiekosten',
-            'keywords': ['accountant', 'boekhouder', 'administratie', 'bookkeeping'],
-            'priority': 1
-        },
-        '7000': {
-            'name': 'Inkoopkosten',
-            'keywords': ['inkoop', 'purchase', 'supplier', 'leverancier', 'groothandel'],
-            'priority': 2
-        },
-        '9999': {
-            'name': 'Te rubriceren',
-            'keywords': [],
-            'priority': 99
-        }
-    }
+    ACCOUNT_RULES = ACCOUNT_RULES
     
     @classmethod
     def predict(cls, merchant_name: str, description: str = "") -> Tuple[str, str, int]:
         """Predict the most appropriate ledger account"""
-        text = f"{merchant_name} {description}".lower()
-        
-        best_match = None
-        best_score = 0
-        
-        for account_code, rule in cls.ACCOUNT_RULES.items():
-            if not rule['keywords']:
-                continue
-            
-            matches = sum(1 for keyword in rule['keywords'] if keyword in text)
-            
-            if matches > 0:
-                score = matches * (100 // rule['priority'])
-                if score > best_score:
-                    best_score = score
-                    best_match = (account_code, rule['name'], min(score, 100))
-        
-        if not best_match:
-            return ('9999', cls.ACCOUNT_RULES['9999']['name'], 10)
-        
-        return best_match
+        return GLOBAL_PREDICTOR.predict(merchant_name, description)
+    
+    @classmethod
+    def predict_many(cls, items: Iterable[Tuple[str, str]]) -> List[Tuple[str, str, int]]:
+        """Predict a batch of (merchant, description) pairs"""
+        return GLOBAL_PREDICTOR.predict_many(items)
 
 
 class DocumentProcessor:
     """Document text extraction and parsing"""
     
-    def __init__(self):
+    def __init__(self, engine: Optional[ExtractionEngine] = None):
+        self.engine = engine or ExtractionEngine()
         self.date_patterns = [
             r'\b(\d{2})[/-](\d{2})[/-](\d{4})\b',
             r'\b(\d{4})[/-](\d{2})[/-](\d{2})\b',
@@ -147,51 +67,18 @@ class DocumentProcessor:
             r'21%\s+btw[:\s]+€?\s*(\d+[.,]\d{2})',
         ]
     
+    def extract(self, file_path: str, content_sha256: Optional[str] = None) -> ExtractionResult:
+        """Extract text and layout from document (cached per content hash)"""
+        result = self.engine.extract(file_path, content_sha256)
+        logger.info(
+            f"Extracted {len(result.text)} chars via {result.method}"
+            f"{' (cached)' if result.cached else ''} - timings: {result.summary()['timings']}"
+        )
+        return result
+
     def extract_text(self, file_path: str) -> str:
         """Extract text from document"""
-        path = Path(file_path)
-        
-        if not path.exists():
-            logger.error(f"File not found: {file_path}")
-            return ""
-        
-        # PDF files
-        if path.suffix.lower() == '.pdf' and HAS_PDF:
-            try:
-                with pdfplumber.open(file_path) as pdf:
-                    text = ""
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                    if text.strip():
-                        logger.info(f"Extracted {len(text)} chars from PDF")
-                        return text
-            except Exception as e:
-                logger.warning(f"PDF extraction failed: {e}")
-        
-        # Image files - OCR
-        if HAS_OCR and path.suffix.lower() in ['.png', '.jpg', '.jpeg']:
-            try:
-                image = Image.open(file_path).convert('L')
-                text = pytesseract.image_to_string(
-                    image,
-                    lang='nld+eng',
-                    config='--psm 6'
-                )
-                logger.info(f"OCR extracted {len(text)} chars")
-                return text
-            except Exception as e:
-                logger.warning(f"OCR extraction failed: {e}")
-        
-        # Fallback: try reading as text
-        try:
-            with open(file_path, 'r', errors='ignore') as f:
-                return f.read()
-        except Exception:
-            pass
-        
-        return ""
+        return self.extract(file_path).text
     
     def extract_date(self, text: str) -> Optional[date]:
         """Extract invoice date from text"""
@@ -258,11 +145,19 @@ class DocumentProcessor:
             return merchant.strip()[:100] or "Unknown Merchant"
         return "Unknown Merchant"
     
-    def process(self, file_path: str, original_filename: str = "") -> Dict:
+    def process(
+        self,
+        file_path: str,
+        original_filename: str = "",
+        content_sha256: Optional[str] = None,
+        predictor: Optional[CompiledPredictor] = None,
+    ) -> Dict:
         """Complete processing pipeline"""
         logger.info(f"Processing document: {file_path}")
         
-        text = self.extract_text(file_path)
+        extraction = self.extract(file_path, content_sha256)
+        text = extraction.text
+        fields_started = time.perf_counter()
         
         if not text.strip():
             # Use filename as fallback
@@ -277,7 +172,7 @@ class DocumentProcessor:
         
         vat_amount, net_amount = self.extract_vat(text, total_amount)
         
-        account_code, account_name, confidence = LedgerAccountPredictor.predict(
+        account_code, account_name, confidence = (predictor or GLOBAL_PREDICTOR).predict(
             merchant, text[:500]
         )
         
@@ -291,8 +186,10 @@ class DocumentProcessor:
             'predicted_account_name': account_name,
             'prediction_confidence': confidence,
             'ocr_text': text[:2000],
+            'extraction': extraction.summary(),
             'processed_at': datetime.utcnow().isoformat()
         }
+        result['extraction']['timings']['fields'] = round(time.perf_counter() - fields_started, 4)
         
         logger.info(f"Extracted: {merchant} - €{total_amount} - Account: {account_code}")
         return result
@@ -342,6 +239,35 @@ class DatabaseManager:
         finally:
             cursor.close()
     
+    def get_categorization_rules_version(self, administration_id: str) -> Tuple:
+        """Cheap fingerprint of an administration's learned categorization rules"""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT COUNT(*), MAX(updated_at), COALESCE(SUM(confidence), 0)
+                FROM categorization_rules
+                WHERE administration_id = %s
+            """, (administration_id,))
+            return tuple(cursor.fetchone())
+        finally:
+            cursor.close()
+    
+    def get_categorization_rules(self, administration_id: str) -> List[Dict]:
+        """Learned categorization rules with their ledger account, most confirmed first"""
+        cursor = self.conn.cursor(cursor_factory=RealDictCursor)
+        try:
+            cursor.execute("""
+                SELECT r.match_type::text AS match_type, r.match_value, r.confidence,
+                       a.account_code, a.account_name
+                FROM categorization_rules r
+                JOIN chart_of_accounts a ON a.id = r.ledger_account_id
+                WHERE r.administration_id = %s
+                ORDER BY r.confidence DESC, r.match_value
+            """, (administration_id,))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    
     def get_vat_code_id(self, code: str = 'BTW_HOOG') -> Optional[str]:
         """Get VAT code ID"""
         cursor = self.conn.cursor(cursor_factory=RealDictCursor)
@@ -574,6 +500,7 @@ class Worker:
         
         self.processor = DocumentProcessor()
         self.db_manager = DatabaseManager(db_url)
+        self.predictors = PredictorCache()
     
     def setup_redis(self):
         """Setup Redis client and consumer group"""
@@ -598,6 +525,8 @@ class Worker:
         administration_id = job_data.get('administration_id')
         storage_path = job_data.get('storage_path')
         original_filename = job_data.get('original_filename', '')
+        # Lets the extraction cache skip hashing the file; older jobs lack it
+        content_sha256 = job_data.get('content_sha256') or None
         
         logger.info(f"Processing job: document={document_id}")
         
@@ -615,8 +544,16 @@ class Worker:
             # Mark as processing
             self.db_manager.update_document_status(document_id, 'PROCESSING')
             
+            # Global rules plus the administration's learned rules, recompiled
+            # only when those rules changed
+            predictor = self.predictors.get(
+                administration_id,
+                self.db_manager.get_categorization_rules_version(administration_id),
+                lambda: self.db_manager.get_categorization_rules(administration_id),
+            )
+            
             # Process document (OCR/text extraction)
-            invoice_data = self.processor.process(storage_path, original_filename)
+            invoice_data = self.processor.process(storage_path, original_filename, content_sha256, predictor)
             
             # All operations below are in a single DB transaction
             # Save extracted fields (uses upsert pattern)
@@ -735,7 +672,10 @@ def main():
         )
 
     worker = Worker(db_url, redis_url)
-    worker.run()
+    try:
+        worker.run()
+    finally:
+        worker.processor.engine.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,10 @@
+"""
+Pytest configuration for worker tests.
+
+The worker runs as a script from its own directory (python processor.py),
+so its modules import each other by bare name; tests do the same.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,163 @@
+"""
+Tests for the document extraction engine.
+
+Covers:
+- ExtractionCache round trips, ignores corrupt entries and entries of
+  another ENGINE_VERSION
+- Otsu threshold of a grayscale histogram
+- map_pages: inline for short documents, one contiguous chunk per worker
+  with pages kept in order, and an inline rerun when the pool breaks
+- extract falls through failing extractors to the next one, then to a
+  plain text read, and caches what it extracted
+
+None of these need pdfplumber, Pillow or Tesseract; run with
+python -m pytest worker/tests
+"""
+import multiprocessing
+import os
+
+import pytest
+
+import extraction
+from extraction import (
+    ExtractionCache,
+    ExtractionEngine,
+    ExtractionResult,
+    Extractor,
+    PageText,
+    _otsu_threshold,
+)
+
+
+def _record_pages(file_path, numbers):
+    return [{'number': n, 'pid': os.getpid()} for n in numbers]
+
+
+def _crash_in_pool(file_path, numbers):
+    if multiprocessing.parent_process() is not None:
+        os._exit(1)  # What a Tesseract segfault looks like to the pool
+    return _record_pages(file_path, numbers)
+
+
+class _Pages(Extractor):
+    name = "pages"
+
+    def __init__(self, text, method='pdf-text'):
+        self.text = text
+        self.method = method
+        self.calls = 0
+
+    def extract(self, path, engine, timings):
+        self.calls += 1
+        return [PageText(number=0, text=self.text, method=self.method)]
+
+
+class _Failing(Extractor):
+    name = "failing"
+
+    def extract(self, path, engine, timings):
+        raise RuntimeError("pdfplumber choked")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(str(tmp_path / "cache"))
+
+
+def _result(sha="ab" * 32):
+    pages = [PageText(number=0, text="Factuur 7", method='pdf-text', words=[{'text': 'Factuur'}])]
+    return ExtractionResult(text="Factuur 7\n", method='pdf-text', pages=pages, content_sha256=sha)
+
+
+def test_cache_round_trip(cache):
+    assert cache.get("ab" * 32) is None
+    cache.set(_result())
+
+    cached = cache.get("ab" * 32)
+    assert (cached.text, cached.method, cached.cached) == ("Factuur 7\n", 'pdf-text', True)
+    assert cached.pages == _result().pages
+
+
+def test_cache_ignores_corrupt_and_other_version_entries(cache, monkeypatch):
+    cache.set(_result())
+    monkeypatch.setattr(extraction, "ENGINE_VERSION", extraction.ENGINE_VERSION + 1)
+    assert cache.get("ab" * 32) is None
+
+    cache._path("ab" * 32).parent.mkdir(parents=True, exist_ok=True)
+    cache._path("ab" * 32).write_text('{"text": "half a fi')
+    assert cache.get("ab" * 32) is None
+    cache._path("ab" * 32).write_text('{"text": "no method"}')
+    assert cache.get("ab" * 32) is None
+
+
+def test_otsu_threshold_separates_ink_from_paper():
+    histogram = [0] * 256
+    histogram[30:50] = [100] * 20    # Ink
+    histogram[200:230] = [300] * 30  # Paper
+    assert 49 <= _otsu_threshold(histogram) < 200
+    assert _otsu_threshold([0] * 256) == 127
+
+
+def test_map_pages_runs_short_documents_inline():
+    engine = ExtractionEngine(extractors=[], workers=4)
+    pages = engine.map_pages(_record_pages, "doc.pdf", extraction.PARALLEL_MIN_PAGES - 1)
+    assert {p['pid'] for p in pages} == {os.getpid()}
+    assert engine._pool is None
+
+
+def test_map_pages_chunks_in_order():
+    engine = ExtractionEngine(extractors=[], workers=3)
+    try:
+        pages = engine.map_pages(_record_pages, "doc.pdf", [2, 3, 5, 7, 8, 9, 11])
+    finally:
+        engine.shutdown()
+
+    assert [p['number'] for p in pages] == [2, 3, 5, 7, 8, 9, 11]
+    # One contiguous range per worker: 3 + 3 + 1 pages
+    runs = [p['pid'] for p in pages]
+    assert os.getpid() not in runs
+    assert runs[0] == runs[1] == runs[2] and runs[3] == runs[4] == runs[5]
+
+
+def test_map_pages_reruns_inline_when_the_pool_breaks():
+    engine = ExtractionEngine(extractors=[], workers=2)
+    pages = engine.map_pages(_crash_in_pool, "doc.pdf", 4)
+
+    assert [p['number'] for p in pages] == [0, 1, 2, 3]
+    assert {p['pid'] for p in pages} == {os.getpid()}
+    assert engine._pool is None  # A fresh pool next time
+
+    try:
+        assert len(engine.map_pages(_record_pages, "doc.pdf", 4)) == 4
+    finally:
+        engine.shutdown()
+
+
+def test_extractor_must_implement_extract():
+    with pytest.raises(TypeError):
+        Extractor()
+
+
+def test_extract_falls_through_to_the_next_extractor(tmp_path, cache):
+    document = tmp_path / "scan.pdf"
+    document.write_bytes(b"%PDF-1.7")
+    blank, ocr = _Pages("  "), _Pages("Totaal 12,50", method='ocr')
+    engine = ExtractionEngine(extractors=[_Failing(), blank, ocr], cache=cache, workers=1)
+
+    result = engine.extract(str(document))
+    assert (result.text, result.method, result.cached) == ("Totaal 12,50\n", 'ocr', False)
+    assert result.content_sha256 == extraction.file_sha256(str(document))
+
+    again = engine.extract(str(document))
+    assert (again.text, again.cached, ocr.calls) == ("Totaal 12,50\n", True, 1)
+
+
+def test_extract_reads_plain_text_when_no_extractor_applies(tmp_path, cache):
+    document = tmp_path / "notes.txt"
+    document.write_text("Bonnetje")
+    engine = ExtractionEngine(extractors=[_Failing()], cache=cache, workers=1)
+
+    result = engine.extract(str(document))
+    assert (result.text, result.method) == ("Bonnetje", 'plain')
+    assert cache.get(result.content_sha256) is None
+    assert engine.extract(str(tmp_path / "missing.pdf")).method == 'none'